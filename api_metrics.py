@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+import boto3
+
+try:
+    from credential_validator import get_credential_validator
+except ImportError:
+    get_credential_validator = None
+
+class ApiCallMetrics:
+    """Per (service, operation, account, region) latency, retry and error stats from botocore events"""
+
+    THROTTLE_CODES = {'Throttling', 'ThrottlingException', 'RequestLimitExceeded', 'TooManyRequestsException',
+                      'RequestThrottled', 'RequestThrottledException', 'SlowDown', 'PriorRequestNotComplete'}
+
+    def __init__(self, tool_name: str):
+        """
+        Initialize the collector
+
+        Args:
+            tool_name (str): Used in the output file name, e.g. 'ultra_ec2_cleanup'
+        """
+        self.tool_name = tool_name
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str, str, str], Dict] = {}
+        self._account_labels: Dict[str, str] = {}
+        self._installed_on = None
+
+    def install(self, botocore_session=None) -> None:
+        """
+        Attach to a botocore session; every client created from it afterwards is instrumented
+
+        Args:
+            botocore_session: Defaults to the session behind boto3.client()
+        """
+        if botocore_session is None:
+            if boto3.DEFAULT_SESSION is None:
+                boto3.setup_default_session()
+            botocore_session = boto3.DEFAULT_SESSION._session
+
+        events = botocore_session.get_component('event_emitter')
+        # The clock starts at parameter build, which runs even when a before-call handler
+        # short-circuits the request (e.g. Stubber); before-call only adds the account
+        events.register('before-parameter-build', self._before_parameter_build, unique_id='api-metrics-before-parameter-build')
+        events.register_first('before-call', self._before_call, unique_id='api-metrics-before-call')
+        events.register('needs-retry', self._needs_retry, unique_id='api-metrics-needs-retry')
+        events.register('after-call', self._after_call, unique_id='api-metrics-after-call')
+        events.register('after-call-error', self._after_call_error, unique_id='api-metrics-after-call-error')
+        self._installed_on = botocore_session
+
+    def install_on_new_sessions(self) -> None:
+        """Also instrument every boto3.Session created afterwards (the EKS and ELB managers build one per task)"""
+        original_init = boto3.session.Session.__init__
+        if getattr(original_init, '_api_metrics_wrapped', False):
+            return
+
+        @wraps(original_init)
+        def init(session, *args, **kwargs):
+            original_init(session, *args, **kwargs)
+            # unique_id makes this a no-op for a session that is already instrumented
+            self.install(session._session)
+
+        init._api_metrics_wrapped = True
+        boto3.session.Session.__init__ = init
+
+    def _account_label(self, request_signer) -> str:
+        credentials = getattr(request_signer, '_credentials', None)
+        access_key = getattr(credentials, 'access_key', None)
+        if not access_key:
+            return 'unknown'
+
+        label = self._account_labels.get(access_key)
+        if label is None:
+            account_id = get_credential_validator().account_for_access_key(access_key) if get_credential_validator else None
+            if account_id is None:
+                # Not validated yet; fall back to a masked key and look again next call
+                return f"{access_key[:4]}…{access_key[-4:]}"
+            label = self._account_labels[access_key] = account_id
+        return label
+
+    def _before_parameter_build(self, model=None, context=None, **kwargs):
+        if context is None or model is None:
+            return None
+        context['api_metrics'] = {
+            'start': time.perf_counter(),
+            'service': model.service_model.service_name,
+            'operation': model.name,
+            'account': 'unknown',
+            'region': context.get('client_region') or 'global',
+            'throttles': 0,
+        }
+        return None
+
+    def _before_call(self, request_signer=None, context=None, **kwargs):
+        call = (context or {}).get('api_metrics')
+        if call is not None:
+            call['account'] = self._account_label(request_signer)
+        return None
+
+    def _needs_retry(self, response=None, request_dict=None, **kwargs):
+        # Observe only; returning None leaves the retry decision to botocore
+        if not response or not request_dict:
+            return None
+        call = request_dict.get('context', {}).get('api_metrics')
+        if call is not None:
+            error_code = (response[1] or {}).get('Error', {}).get('Code')
+            if error_code in self.THROTTLE_CODES:
+                call['throttles'] += 1
+        return None
+
+    def _after_call(self, http_response=None, parsed=None, context=None, **kwargs):
+        call = (context or {}).pop('api_metrics', None)
+        if call is None:
+            return
+        parsed = parsed or {}
+        retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+        error_code = parsed.get('Error', {}).get('Code') if http_response is not None and http_response.status_code >= 300 else None
+        self._record(call, retries, error_code)
+
+    def _after_call_error(self, exception=None, context=None, **kwargs):
+        call = (context or {}).pop('api_metrics', None)
+        if call is None:
+            return
+        self._record(call, 0, type(exception).__name__ if exception else 'Exception')
+
+    def _record(self, call: Dict, retries: int, error_code: Optional[str]) -> None:
+        latency_ms = (time.perf_counter() - call['start']) * 1000
+        key = (call['service'], call['operation'], call['account'], call['region'])
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {'latencies_ms': [], 'retries': 0, 'throttles': 0, 'errors': {}}
+            stats['latencies_ms'].append(latency_ms)
+            stats['retries'] += retries
+            stats['throttles'] += call['throttles']
+            if error_code:
+                stats['errors'][error_code] = stats['errors'].get(error_code, 0) + 1
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], percent: float) -> float:
+        # Nearest-rank percentile
+        if not sorted_values:
+            return 0.0
+        # percent * n first keeps integer percentiles exact (0.07 * 100 is 7.000000000000001)
+        rank = max(1, math.ceil(percent * len(sorted_values) / 100))
+        return sorted_values[min(rank, len(sorted_values)) - 1]
+
+    def summary(self) -> List[Dict]:
+        """One row per (service, operation, account, region), slowest total time first"""
+        with self._lock:
+            items = [(key, list(stats['latencies_ms']), stats['retries'], stats['throttles'], dict(stats['errors']))
+                     for key, stats in self._stats.items()]
+
+        rows = []
+        for (service, operation, account, region), latencies, retries, throttles, errors in items:
+            latencies.sort()
+            rows.append({
+                'service': service,
+                'operation': operation,
+                'account': account,
+                'region': region,
+                'count': len(latencies),
+                'total_ms': round(sum(latencies), 1),
+                'p50_ms': round(self._percentile(latencies, 50), 1),
+                'p95_ms': round(self._percentile(latencies, 95), 1),
+                'p99_ms': round(self._percentile(latencies, 99), 1),
+                'max_ms': round(latencies[-1], 1),
+                'retries': retries,
+                'throttles': throttles,
+                'errors': errors,
+            })
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def print_summary(self, rows: List[Dict], limit: int = 25) -> None:
+        if not rows:
+            print("📊 API metrics: no AWS calls recorded")
+            return
+
+        header = ['SERVICE', 'OPERATION', 'ACCOUNT', 'REGION', 'CALLS', 'P50ms', 'P95ms', 'P99ms', 'TOTALs', 'RETRY', 'THROTTLE', 'ERR']
+        table = [[row['service'], row['operation'], row['account'], row['region'], str(row['count']),
+                  f"{row['p50_ms']:.0f}", f"{row['p95_ms']:.0f}", f"{row['p99_ms']:.0f}",
+                  f"{row['total_ms'] / 1000:.1f}", str(row['retries']), str(row['throttles']),
+                  str(sum(row['errors'].values()))] for row in rows[:limit]]
+        widths = [max(len(line[i]) for line in [header] + table) for i in range(len(header))]
+
+        total_calls = sum(row['count'] for row in rows)
+        print(f"\n📊 AWS API calls: {total_calls} calls, "
+              f"{sum(row['total_ms'] for row in rows) / 1000:.1f}s in API time, "
+              f"{sum(row['retries'] for row in rows)} retries, {sum(row['throttles'] for row in rows)} throttled")
+        print("  ".join(h.ljust(w) for h, w in zip(header, widths)))
+        print("  ".join("-" * w for w in widths))
+        for line in table:
+            print("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
+        if len(rows) > limit:
+            print(f"... {len(rows) - limit} more rows in the JSON dump")
+
+    def write_json(self, rows: List[Dict], folder: str = 'logs') -> str:
+        """Write the full summary atomically to logs/api_metrics_<tool>_<timestamp>.json"""
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"api_metrics_{self.tool_name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        data = {
+            'tool': self.tool_name,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now().isoformat(),
+            'calls': rows,
+        }
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+        return path
+
+    def report(self) -> Optional[str]:
+        """Print the table and write the JSON dump; returns the JSON path"""
+        rows = self.summary()
+        self.print_summary(rows)
+        if not rows:
+            return None
+        path = self.write_json(rows)
+        print(f"📁 API metrics saved to: {path}")
+        return path
+
+_active_metrics = None
+
+def enable_api_metrics(tool_name: str, enabled: Optional[bool] = None) -> Optional[ApiCallMetrics]:
+    """
+    Opt-in instrumentation for a tool run, reported at exit
+
+    Args:
+        tool_name (str): Name used in the report file
+        enabled (bool): Explicit switch (e.g. --api-metrics); None reads AWS_API_METRICS=1
+
+    Returns:
+        ApiCallMetrics or None when disabled
+    """
+    global _active_metrics
+    if enabled is None:
+        enabled = os.environ.get('AWS_API_METRICS', '').lower() in ('1', 'true', 'yes')
+    if not enabled:
+        return None
+    if _active_metrics is None:
+        _active_metrics = ApiCallMetrics(tool_name)
+        _active_metrics.install()
+        _active_metrics.install_on_new_sessions()
+        atexit.register(_active_metrics.report)
+    return _active_metrics
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, carrying the worker thread and resource context"""
+
+    CONTEXT_FIELDS = ('thread_tag', 'account', 'region', 'resource')
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.thread,
+            'thread_name': record.threadName,
+            'message': record.getMessage(),
+        }
+        for field in self.CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RateLimitedConsoleHandler(logging.StreamHandler):
+    """Console handler that drops bursts above a line budget and reports how many were skipped"""
+
+    def __init__(self, stream=None, max_per_second: float = 20.0, burst: int = 50):
+        """
+        Args:
+            max_per_second (float): Sustained console lines per second
+            burst (int): Lines that may be printed at once before throttling starts
+        """
+        super().__init__(stream or sys.stderr)
+        self.max_per_second = max_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self.suppressed = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Runs only on the listener thread, so no locking is needed here
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.max_per_second)
+        self._last = now
+
+        # Errors are never dropped
+        if self._tokens < 1 and record.levelno < logging.ERROR:
+            self.suppressed += 1
+            return
+        self._tokens = max(0.0, self._tokens - 1)
+
+        if self.suppressed:
+            skipped, self.suppressed = self.suppressed, 0
+            self.stream.write(f"... {skipped} log lines not shown on console (see log file){self.terminator}")
+        super().emit(record)
+
+    def close(self) -> None:
+        if self.suppressed:
+            self.stream.write(f"... {self.suppressed} log lines not shown on console (see log file){self.terminator}")
+            self.suppressed = 0
+            self.flush()
+        super().close()
+
+def _stop_listener(listener: Optional[logging.handlers.QueueListener]) -> None:
+    # Flushes queued records; stopping twice is a no-op
+    if listener is not None and listener._thread is not None:
+        listener.stop()
+
+def setup_async_logging(logger_name: str, log_filename: str, console_level: int = logging.WARNING,
+                        fmt: str = '%(asctime)s | %(thread)d | %(levelname)8s | %(message)s',
+                        datefmt: str = '%Y-%m-%d %H:%M:%S',
+                        console_rate: float = 20.0) -> Tuple[logging.Logger, logging.handlers.QueueListener]:
+    """
+    Route a logger through a queue to a single writer thread
+
+    Workers only enqueue records. The listener thread writes the text log, a
+    JSON-lines twin (<log_filename minus .log>.jsonl) and the rate-limited console.
+
+    Args:
+        logger_name (str): Logger to configure; existing handlers are removed
+        log_filename (str): Text log file
+        console_level (int): Minimum level echoed to the console
+        fmt/datefmt (str): Text and console format
+        console_rate (float): Sustained console lines per second
+
+    Returns:
+        tuple: (logger, listener); the listener is stopped (and flushed) at exit
+    """
+    operation_logger = logging.getLogger(logger_name)
+    operation_logger.setLevel(logging.INFO)
+    operation_logger.propagate = False
+
+    for handler in operation_logger.handlers[:]:
+        operation_logger.removeHandler(handler)
+        if isinstance(handler, logging.handlers.QueueHandler):
+            _stop_listener(getattr(handler, 'listener', None))
+
+    formatter = logging.Formatter(fmt, datefmt=datefmt)
+
+    file_handler = logging.FileHandler(log_filename, encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(formatter)
+
+    jsonl_handler = logging.FileHandler(f"{os.path.splitext(log_filename)[0]}.jsonl", encoding='utf-8')
+    jsonl_handler.setLevel(logging.INFO)
+    jsonl_handler.setFormatter(JsonLinesFormatter())
+
+    console_handler = RateLimitedConsoleHandler(max_per_second=console_rate)
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, jsonl_handler, console_handler,
+                                              respect_handler_level=True)
+    queue_handler.listener = listener
+    operation_logger.addHandler(queue_handler)
+    listener.start()
+
+    def shutdown(listener=listener, handlers=(file_handler, jsonl_handler, console_handler)):
+        _stop_listener(listener)
+        for handler in handlers:
+            handler.close()
+
+    atexit.register(shutdown)
+    return operation_logger, listener
+
+def log_with_context(operation_logger: Optional[logging.Logger], level: str, message: str,
+                     thread_id: Optional[str] = None, **context) -> bool:
+    """
+    Enqueue one message at a named level with optional JSON context
+
+    Returns:
+        bool: False if there is no logger, so the caller can fall back to printing
+    """
+    if not operation_logger:
+        return False
+
+    levelno = logging.getLevelName(level.upper())
+    if not isinstance(levelno, int):
+        # Unknown level names are kept rather than dropped
+        levelno = logging.WARNING
+        message = f"[{level}] {message}"
+
+    extra = {key: value for key, value in context.items() if value is not None}
+    if thread_id:
+        extra['thread_tag'] = thread_id
+    operation_logger.log(levelno, message, extra=extra)
+    return True
@@ -12,13 +12,13 @@ import json
 import sys
 import os
 import time
-import glob
-import re
 import random
 import string
 from datetime import datetime
 from botocore.exceptions import ClientError, BotoCoreError
 from logger import setup_logger
+from credentials_resolver import get_credentials_resolver
+from credential_validator import get_credential_validator
 
 # UTF-8 Encoding Support
 os.environ['PYTHONIOENCODING'] = 'utf-8'
@@ -140,29 +140,7 @@ class AWSAccountResourceManager:
     def find_latest_credentials_file(self):
         """Find the latest iam_users_credentials file based on timestamp"""
         try:
-            pattern = "iam_users_credentials_*.json"
-            matching_files = glob.glob(pattern)
-            
-            if not matching_files:
-                raise FileNotFoundError(f"No IAM credentials files found matching pattern: {pattern}")
-            
-            file_timestamps = []
-            for file_path in matching_files:
-                match = re.search(r'iam_users_credentials_(\d{8}_\d{6})\.json', file_path)
-                if match:
-                    timestamp_str = match.group(1)
-                    try:
-                        timestamp = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                        file_timestamps.append((file_path, timestamp, timestamp_str))
-                    except ValueError:
-                        continue
-            
-            if not file_timestamps:
-                raise ValueError("No valid credential files with proper timestamp format found")
-            
-            file_timestamps.sort(key=lambda x: x[1], reverse=True)
-            latest_file = file_timestamps[0][0]
-            
+            latest_file = get_credentials_resolver().find_latest_credentials_file()
             self.print_colored(Colors.GREEN, f"[SUCCESS] Using latest credentials file: {latest_file}")
             return latest_file
             
@@ -497,9 +475,9 @@ echo "AWS CLI configured successfully!"
                 region_name=region
             )
             
-            # Test connection
+            # Test connection (key pair is checked once per process via STS)
             try:
-                ec2_client.describe_regions(RegionNames=[region])
+                get_credential_validator().validate(access_key, secret_key)
                 self.log_operation('INFO', f"Successfully connected to EC2 in {region}")
             except Exception as e:
                 raise ValueError(f"Failed to connect to EC2 in {region}: {str(e)}")
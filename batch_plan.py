@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+import fnmatch
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+class BatchPlanError(ValueError):
+    """Raised for an unreadable plan file or invalid batch flags"""
+
+class BatchPlan:
+    """Headless account/user/region/resource selection and options for one tool run"""
+
+    SELECTORS = ('accounts', 'users', 'regions', 'resources')
+
+    def __init__(self, tool: str, accounts: List[str] = None, users: List[str] = None, regions: List[str] = None,
+                 resources: List[str] = None, options: Dict[str, Any] = None, shard: Tuple[int, int] = (1, 1),
+                 assume_yes: bool = False, list_only: bool = False):
+        """
+        Args:
+            tool (str): Entry point the plan is for, e.g. 'eks_delete'
+            accounts/users/regions/resources (list): fnmatch patterns; None or empty selects everything
+            options (dict): Answers for the tool's other prompts (instance_type, max_nodes, ...)
+            shard (tuple): (index, count), 1-based; this process only runs tasks hashed into its shard
+            assume_yes (bool): Answer confirmation prompts with yes (required for destructive tools)
+            list_only (bool): Print the expanded task list and stop
+        """
+        self.tool = tool
+        self.accounts = list(accounts or [])
+        self.users = list(users or [])
+        self.regions = list(regions or [])
+        self.resources = list(resources or [])
+        self.options = dict(options or {})
+        self.shard = shard
+        self.assume_yes = assume_yes
+        self.list_only = list_only
+
+    @staticmethod
+    def _matches(patterns: List[str], names: Iterable[Optional[str]]) -> bool:
+        if not patterns:
+            return True
+        names = [str(name) for name in names if name is not None]
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns for name in names)
+
+    def match_account(self, *names) -> bool:
+        """True if any of the account's identifiers (key, ID, email) matches the account patterns"""
+        return self._matches(self.accounts, names)
+
+    def match_user(self, *names) -> bool:
+        return self._matches(self.users, names)
+
+    def match_region(self, region: str) -> bool:
+        return self._matches(self.regions, [region])
+
+    def match_resource(self, *names) -> bool:
+        return self._matches(self.resources, names)
+
+    def option(self, name: str, default: Any = None) -> Any:
+        return self.options.get(name, default)
+
+    def in_shard(self, key: str) -> bool:
+        # crc32 rather than hash(): stable across processes and machines, so every worker
+        # expanding the same plan agrees on which shard owns which task
+        index, count = self.shard
+        return count <= 1 or zlib.crc32(key.encode('utf-8')) % count == index - 1
+
+    def plan_tasks(self, tasks: List, key: Callable[[Any], str]) -> List:
+        """
+        Expand candidate tasks into this process's ordered task list
+
+        Args:
+            tasks (list): Candidates already filtered by the selectors
+            key (callable): Stable task key, e.g. 'account01/us-east-1/cluster-name'
+
+        Returns:
+            list: Tasks in this shard, sorted by key
+        """
+        return sorted((task for task in tasks if self.in_shard(key(task))), key=key)
+
+    def print_tasks(self, tasks: List, describe: Callable[[Any], str]) -> None:
+        index, count = self.shard
+        shard_text = f" (shard {index}/{count})" if count > 1 else ""
+        print(f"\n📋 Batch plan for {self.tool}{shard_text}: {len(tasks)} task(s)")
+        for number, task in enumerate(tasks, 1):
+            print(f"   {number:3}. {describe(task)}")
+
+    def confirm(self, action: str, destructive: bool = True) -> bool:
+        """Batch stand-in for a yes/no prompt; destructive steps need --yes (or 'yes: true' in the plan)"""
+        if self.list_only:
+            return False
+        if self.assume_yes or not destructive:
+            print(f"✅ Batch mode: proceeding to {action}")
+            return True
+        print(f"⏸️  Batch mode: not confirmed to {action}; re-run with --yes to proceed")
+        return False
+
+def load_plan_file(path: str, tool: str) -> Dict:
+    """
+    Read a YAML or JSON plan; keys under tools.<tool> override the top level
+
+        accounts: [account01, "account1*"]
+        regions: [us-east-1]
+        yes: true
+        tools:
+          eks_create:
+            users: ["*_clouduser01"]
+            options: {instance_type: c6a.large, max_nodes: 3}
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f) if path.endswith('.json') else yaml.safe_load(f)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        raise BatchPlanError(f"Cannot read plan file {path}: {e}")
+
+    if not isinstance(data, dict):
+        raise BatchPlanError(f"Plan file {path} must contain a mapping")
+
+    merged = {key: value for key, value in data.items() if key != 'tools'}
+    section = (data.get('tools') or {}).get(tool) or {}
+    merged.update({key: value for key, value in section.items() if key != 'options'})
+    merged['options'] = dict(data.get('options') or {}, **(section.get('options') or {}))
+    return merged
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(',') if part.strip()]
+    return [str(item) for item in value]
+
+def _parse_shard(value) -> Tuple[int, int]:
+    if value in (None, ''):
+        return 1, 1
+    try:
+        index, count = (int(part) for part in str(value).split('/'))
+    except ValueError:
+        raise BatchPlanError(f"Shard must look like INDEX/COUNT (e.g. 2/4), got {value!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise BatchPlanError(f"Shard index must be between 1 and {count}, got {value!r}")
+    return index, count
+
+def add_batch_arguments(parser) -> None:
+    """Add the shared batch-mode flags to an entry point's argparse parser"""
+    group = parser.add_argument_group('batch mode', 'Run without prompts; any of these flags enables it')
+    group.add_argument('--plan', metavar='FILE', help='YAML/JSON plan with selections and options (see batch_plan.py)')
+    group.add_argument('--batch', action='store_true', help='Non-interactive run; selectors default to everything')
+    group.add_argument('--accounts', metavar='PATTERNS', help='Comma-separated account keys, IDs or emails (fnmatch patterns)')
+    group.add_argument('--users', metavar='PATTERNS', help='Comma-separated IAM usernames (fnmatch patterns)')
+    group.add_argument('--regions', metavar='PATTERNS', help='Comma-separated regions (fnmatch patterns)')
+    group.add_argument('--resources', metavar='PATTERNS',
+                       help='Comma-separated resource names/IDs (clusters, load balancers, instances, report files)')
+    group.add_argument('--set', action='append', metavar='KEY=VALUE', default=[],
+                       help='Answer another prompt, e.g. --set instance_type=c6a.large (repeatable)')
+    group.add_argument('--shard', metavar='I/N', help='Only run the tasks hashed into shard I of N')
+    group.add_argument('--yes', action='store_true', help='Confirm destructive steps without prompting')
+    group.add_argument('--list-tasks', action='store_true', help='Print the expanded task list and exit')
+
+def plan_from_args(args, tool: str) -> Optional[BatchPlan]:
+    """
+    Build the batch plan from --plan plus CLI overrides
+
+    Returns:
+        BatchPlan, or None when no batch flag was given (interactive run)
+    """
+    flags = [args.plan, args.batch, args.accounts, args.users, args.regions, args.resources,
+             args.set, args.shard, args.yes, args.list_tasks]
+    if not any(flags):
+        return None
+
+    settings = load_plan_file(args.plan, tool) if args.plan else {'options': {}}
+    declared_tool = settings.get('tool')
+    if declared_tool and declared_tool != tool:
+        raise BatchPlanError(f"Plan file is for '{declared_tool}', not '{tool}'")
+
+    for selector in BatchPlan.SELECTORS:
+        value = getattr(args, selector)
+        if value:
+            settings[selector] = value
+
+    options = settings['options']
+    for item in args.set:
+        key, separator, value = item.partition('=')
+        if not separator or not key.strip():
+            raise BatchPlanError(f"--set expects KEY=VALUE, got {item!r}")
+        # YAML scalars, so numbers and booleans keep their type
+        options[key.strip()] = yaml.safe_load(value) if value.strip() else ''
+
+    return BatchPlan(
+        tool,
+        accounts=_as_list(settings.get('accounts')),
+        users=_as_list(settings.get('users')),
+        regions=_as_list(settings.get('regions')),
+        resources=_as_list(settings.get('resources')),
+        options=options,
+        shard=_parse_shard(args.shard or settings.get('shard')),
+        assume_yes=bool(args.yes or settings.get('yes')),
+        list_only=bool(args.list_tasks or settings.get('list_tasks')),
+    )
+
+def shard_commands(argv: List[str], count: int) -> List[List[str]]:
+    """The same command line once per shard, for launching parallel workers or CI jobs"""
+    argv = list(argv)
+    if '--shard' in argv:
+        position = argv.index('--shard')
+        del argv[position:position + 2]
+    argv = [arg for arg in argv if not arg.startswith('--shard=')]
+    return [argv + ['--shard', f"{index}/{count}"] for index in range(1, count + 1)]
+
+def main():
+    """Print one command per shard for a batch run"""
+    import argparse
+    import shlex
+
+    parser = argparse.ArgumentParser(description='Print one command line per shard of a batch run')
+    parser.add_argument('--shards', type=int, required=True, help='Number of shards')
+    parser.add_argument('command', nargs=argparse.REMAINDER,
+                        help='Tool command line, e.g. python eks_delete_cleanup_threaded.py --plan plan.yaml --yes')
+    args = parser.parse_args()
+    if not args.command or args.shards < 1:
+        parser.error('a command and --shards >= 1 are required')
+    for command in shard_commands(args.command, args.shards):
+        print(shlex.join(command))
+
+if __name__ == "__main__":
+    main()
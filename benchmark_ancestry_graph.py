@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for git-filter.py's AncestryGraph: builds a synthetic history
+(mostly linear, with merges) the way RepoFilter does for the original graph,
+then runs is_ancestor() queries, and reports the RSS growth per commit.
+
+    python benchmark_ancestry_graph.py [--commits 2000000]
+    python benchmark_ancestry_graph.py --baseline /tmp/git-filter-old.py
+
+Each implementation is measured in its own process so peak RSS is not shared.
+"""
+
+import importlib.util
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+GIT_FILTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'git-filter.py')
+
+def max_rss_bytes():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def measure(path, commits, merge_every, queries, seed):
+    """Child process: build the graph and report RSS and timings as JSON"""
+    spec = importlib.util.spec_from_file_location('git_filter_repo', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    rng = random.Random(seed)
+    hashes = [b'%040x' % rng.getrandbits(160) for _ in range(1000)]
+
+    rss_before = max_rss_bytes()
+    start = time.perf_counter()
+    graph = module.AncestryGraph()
+    for mark in range(1, commits + 1):
+        if mark == 1:
+            parents = []
+        elif merge_every and mark % merge_every == 0 and mark > merge_every:
+            parents = [mark - 1, mark - rng.randint(2, merge_every)]
+        else:
+            parents = [mark - 1]
+        # Like RepoFilter's _orig_graph: fast-export marks plus the original hash
+        graph.add_commit_and_parents(mark, parents, hashes[mark % len(hashes)] + b'%d' % mark)
+    build_time = time.perf_counter() - start
+    rss_built = max_rss_bytes()
+
+    start = time.perf_counter()
+    found = 0
+    for _ in range(queries):
+        check = rng.randint(2, commits)
+        found += graph.is_ancestor(max(1, check - rng.randint(1, 50)), check)
+    query_time = time.perf_counter() - start
+
+    return {'graph_bytes': rss_built - rss_before, 'peak_bytes': max_rss_bytes() - rss_before,
+            'build_s': build_time, 'query_s': query_time, 'ancestors_found': found}
+
+def run_child(path, args):
+    command = [sys.executable, os.path.abspath(__file__), '--child', path, '--commits', str(args.commits),
+               '--merge-every', str(args.merge_every), '--queries', str(args.queries), '--seed', str(args.seed)]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='AncestryGraph memory benchmark')
+    parser.add_argument('--commits', type=int, default=2000000, help='Commits in the synthetic history')
+    parser.add_argument('--merge-every', type=int, default=20, help='Make every Nth commit a merge (0: no merges)')
+    parser.add_argument('--queries', type=int, default=200000, help='is_ancestor() calls to time')
+    parser.add_argument('--baseline', metavar='GIT_FILTER_PY', help='Older git-filter.py to compare against')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--child', metavar='GIT_FILTER_PY', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.commits, args.merge_every, args.queries, args.seed)))
+        return
+
+    variants = [('current', GIT_FILTER)]
+    if args.baseline:
+        variants.insert(0, ('baseline', args.baseline))
+
+    print(f"📊 AncestryGraph with {args.commits} commits (merge every {args.merge_every}), "
+          f"{args.queries} is_ancestor() queries")
+    print(f"   {'VARIANT':<10} {'RSS MiB':>9} {'BYTES/COMMIT':>13} {'BUILD s':>8} {'QUERY s':>8}")
+    results = {}
+    for label, path in variants:
+        result = results[label] = run_child(path, args)
+        print(f"   {label:<10} {result['graph_bytes'] / 1024 / 1024:>9.1f} "
+              f"{result['graph_bytes'] / args.commits:>13.0f} {result['build_s']:>8.2f} {result['query_s']:>8.2f}")
+
+    if args.baseline:
+        if results['baseline']['ancestors_found'] != results['current']['ancestors_found']:
+            print("❌ is_ancestor() answers differ between baseline and current")
+            sys.exit(1)
+        saved = results['baseline']['graph_bytes'] - results['current']['graph_bytes']
+        print(f"   RSS reduction: {saved / 1024 / 1024:.1f} MiB "
+              f"({saved / max(1, results['baseline']['graph_bytes']):.0%})")
+
+if __name__ == "__main__":
+    main()
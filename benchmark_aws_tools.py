@@ -0,0 +1,1135 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the cleanup, creation and lookup tools.
+
+Every AWS call is answered in-process by FakeAWS, with configurable per-operation
+latency, throttling and waiter completion times, so a run needs no accounts and
+is repeatable. Each tool runs non-interactively in its own child process and
+scratch directory, and the report has wall time, API calls (with retries,
+throttles and errors) and peak RSS per tool.
+
+    python benchmark_aws_tools.py --accounts 50 --regions 5 --resources 100
+    python benchmark_aws_tools.py --tools ultra_ec2,elb_cleanup --latency DescribeInstances=150 --throttle-rate 0.05
+    python benchmark_aws_tools.py --baseline logs/benchmark_aws_tools_20250603_121046.json
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+from botocore.awsrequest import AWSResponse
+from botocore.client import BaseClient
+from botocore.endpoint import Endpoint
+
+from api_metrics import ApiCallMetrics
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_REGIONS = ['us-east-1', 'us-east-2', 'us-west-1', 'us-west-2', 'ap-south-1',
+                   'eu-west-1', 'eu-central-1', 'ap-southeast-1', 'ap-northeast-1', 'ca-central-1']
+
+# Simulated seconds until an asynchronous AWS operation finishes (override with --wait name=seconds)
+DEFAULT_COMPLETION_SECONDS = {
+    'instance_terminate': 45,
+    'cluster_create': 600,
+    'cluster_delete': 300,
+    'nodegroup_create': 240,
+    'nodegroup_delete': 300,
+}
+
+READ_PREFIXES = ('Describe', 'List', 'Get')
+
+class SimulatedClock:
+    """Stands in for time.sleep: waits are shortened by time_scale but still advance the calling thread's clock"""
+
+    def __init__(self, time_scale: float):
+        """
+        Args:
+            time_scale (float): Real seconds slept per simulated second, e.g. 0.001
+        """
+        self.time_scale = time_scale
+        self.real_sleep = time.sleep
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.simulated_wait = 0.0
+        self._max_skipped = 0.0
+
+    def now(self) -> float:
+        """Simulated monotonic time of the calling thread"""
+        return time.monotonic() + getattr(self._local, 'skipped', 0.0)
+
+    def latest(self) -> float:
+        """Furthest simulated time any thread has reached, e.g. for the state left after a run"""
+        return time.monotonic() + self._max_skipped
+
+    def sleep(self, seconds: float) -> None:
+        seconds = max(0.0, seconds)
+        scaled = seconds * self.time_scale
+        self.real_sleep(scaled)
+        # Waiter deadlines are checked by the thread that polls them, so the skipped
+        # time is tracked per thread rather than shared across workers
+        self._local.skipped = getattr(self._local, 'skipped', 0.0) + seconds - scaled
+        with self._lock:
+            self.simulated_wait += seconds
+            self._max_skipped = max(self._max_skipped, self._local.skipped)
+
+class FakeAPIError(Exception):
+    def __init__(self, code: str, message: str = '', status: int = 400):
+        super().__init__(message or code)
+        self.code = code
+        self.message = message or code
+        self.status = status
+
+class FakeAccount:
+    """Per-account state; one lock covers the account since tools shard work by account and region"""
+
+    def __init__(self, account_id: str):
+        self.account_id = account_id
+        self.lock = threading.Lock()
+        self.regions = defaultdict(lambda: {
+            'instances': {},
+            'security_groups': {},
+            'clusters': {},
+            'classic_elbs': {},
+            'load_balancers': {},
+            'target_groups': {},
+        })
+        self.iam_users = {}
+        self.iam_roles = {}
+
+class FakeAWS:
+    """In-process AWS stand-in answering at the botocore endpoint, below retries, waiters and event hooks"""
+
+    def __init__(self, clock: SimulatedClock, latency_ms: float = 40.0, latency_overrides: Dict[str, float] = None,
+                 throttle_rate: float = 0.0, throttle_overrides: Dict[str, float] = None,
+                 completion_seconds: Dict[str, float] = None, seed: int = 42):
+        """
+        Args:
+            clock (SimulatedClock): Clock used for waiter completion times
+            latency_ms (float): Mean latency of read calls; writes take twice as long
+            latency_overrides (dict): Operation name -> mean latency in ms (also 'kubectl')
+            throttle_rate (float): Probability that any attempt is throttled
+            throttle_overrides (dict): Operation name -> throttle probability
+            completion_seconds (dict): Simulated durations, see DEFAULT_COMPLETION_SECONDS
+            seed (int): Seed for latency jitter, throttling and generated IDs
+        """
+        self.clock = clock
+        self.latency_ms = latency_ms
+        self.latency_overrides = latency_overrides or {}
+        self.throttle_rate = throttle_rate
+        self.throttle_overrides = throttle_overrides or {}
+        self.completion_seconds = dict(DEFAULT_COMPLETION_SECONDS, **(completion_seconds or {}))
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._local = threading.local()
+        self._accounts: Dict[str, FakeAccount] = {}  # access key -> account
+        self.stats = defaultdict(int)
+        self._stats_lock = threading.Lock()
+
+        self._handlers = {
+            ('sts', 'GetCallerIdentity'): self._get_caller_identity,
+            ('ec2', 'DescribeInstances'): self._describe_instances,
+            ('ec2', 'TerminateInstances'): self._terminate_instances,
+            ('ec2', 'DescribeSecurityGroups'): self._describe_security_groups,
+            ('ec2', 'RevokeSecurityGroupIngress'): self._revoke_security_group_rules,
+            ('ec2', 'RevokeSecurityGroupEgress'): self._revoke_security_group_rules,
+            ('ec2', 'DeleteSecurityGroup'): self._delete_security_group,
+            ('ec2', 'CreateSecurityGroup'): self._create_security_group,
+            ('ec2', 'DescribeVpcs'): self._describe_vpcs,
+            ('ec2', 'DescribeSubnets'): self._describe_subnets,
+            ('eks', 'ListClusters'): self._list_clusters,
+            ('eks', 'DescribeCluster'): self._describe_cluster,
+            ('eks', 'CreateCluster'): self._create_cluster,
+            ('eks', 'DeleteCluster'): self._delete_cluster,
+            ('eks', 'ListNodegroups'): self._list_nodegroups,
+            ('eks', 'DescribeNodegroup'): self._describe_nodegroup,
+            ('eks', 'CreateNodegroup'): self._create_nodegroup,
+            ('eks', 'DeleteNodegroup'): self._delete_nodegroup,
+            ('elb', 'DescribeLoadBalancers'): self._describe_classic_elbs,
+            ('elb', 'DeleteLoadBalancer'): self._delete_classic_elb,
+            ('elbv2', 'DescribeLoadBalancers'): self._describe_load_balancers,
+            ('elbv2', 'DescribeTargetGroups'): self._describe_target_groups,
+            ('elbv2', 'DeleteTargetGroup'): self._delete_target_group,
+            ('elbv2', 'DeleteLoadBalancer'): self._delete_load_balancer,
+            ('iam', 'GetUser'): self._get_user,
+            ('iam', 'CreateUser'): self._create_user,
+            ('iam', 'CreateAccessKey'): self._create_access_key,
+            ('iam', 'GetRole'): self._get_role,
+            ('iam', 'CreateRole'): self._create_role,
+            ('iam', 'AttachRolePolicy'): self._attach_role_policy,
+            ('iam', 'ListAttachedRolePolicies'): self._list_attached_role_policies,
+            ('cloudwatch', 'GetMetricStatistics'): self._get_metric_statistics,
+        }
+
+    # ------------------------------------------------------------------ wiring
+
+    def install(self, stack: ExitStack) -> None:
+        """Answer every botocore call in this process until the stack is closed"""
+        fake = self
+        original_make_api_call = BaseClient._make_api_call
+
+        def make_api_call(client, operation_name, api_params):
+            # The endpoint only sees the serialized request, so the caller's params ride along per thread
+            previous = getattr(fake._local, 'call', None)
+            fake._local.call = (client, api_params)
+            try:
+                return original_make_api_call(client, operation_name, api_params)
+            finally:
+                fake._local.call = previous
+
+        def do_get_response(endpoint, request, operation_model, context):
+            return fake._respond(operation_model), None
+
+        stack.enter_context(mock.patch.object(BaseClient, '_make_api_call', make_api_call))
+        stack.enter_context(mock.patch.object(Endpoint, '_do_get_response', do_get_response))
+
+    def add_account(self, access_key: str, account_id: str) -> FakeAccount:
+        account = self._accounts[access_key] = FakeAccount(account_id)
+        return account
+
+    def _uniform(self, low: float, high: float) -> float:
+        with self._random_lock:
+            return self._random.uniform(low, high)
+
+    def _new_id(self, prefix: str, length: int = 17) -> str:
+        with self._random_lock:
+            return f"{prefix}{self._random.getrandbits(length * 4):0{length}x}"
+
+    def latency(self, name: str) -> float:
+        """Jittered latency in seconds for an operation (or 'kubectl')"""
+        mean_ms = self.latency_overrides.get(name)
+        if mean_ms is None:
+            mean_ms = self.latency_ms if name.startswith(READ_PREFIXES) else self.latency_ms * 2
+        return mean_ms / 1000 * self._uniform(0.5, 1.5)
+
+    def _respond(self, operation_model) -> Tuple[AWSResponse, Dict]:
+        client, params = self._local.call
+        service = operation_model.service_model.service_name
+        operation = operation_model.name
+        credentials = client._request_signer._credentials
+        access_key = credentials.access_key if credentials else None
+        region = client.meta.region_name
+
+        self.clock.real_sleep(self.latency(operation))
+        with self._stats_lock:
+            self.stats['attempts'] += 1
+
+        throttle_rate = self.throttle_overrides.get(operation, self.throttle_rate)
+        if throttle_rate and self._uniform(0, 1) < throttle_rate:
+            with self._stats_lock:
+                self.stats['throttled'] += 1
+            code = 'RequestLimitExceeded' if service == 'ec2' else 'Throttling'
+            return self._error_response(FakeAPIError(code, 'Rate exceeded', 400))
+
+        try:
+            account = self._accounts.get(access_key)
+            if account is None:
+                raise FakeAPIError('InvalidClientTokenId', 'The security token included in the request is invalid.', 403)
+            handler = self._handlers.get((service, operation))
+            with account.lock:
+                # Operations the tools only need to succeed (tagging, attaching policies, ...) return an empty body
+                parsed = handler(account, region, params) if handler else {}
+        except FakeAPIError as e:
+            return self._error_response(e)
+
+        parsed['ResponseMetadata'] = self._metadata(200)
+        return self._http_response(200), parsed
+
+    @staticmethod
+    def _metadata(status: int) -> Dict:
+        return {'RequestId': str(uuid.uuid4()), 'HTTPStatusCode': status, 'HTTPHeaders': {}, 'RetryAttempts': 0}
+
+    @staticmethod
+    def _http_response(status: int) -> AWSResponse:
+        http_response = AWSResponse('https://fake.amazonaws.com/', status, {}, None)
+        http_response._content = b''
+        return http_response
+
+    def _error_response(self, error: FakeAPIError) -> Tuple[AWSResponse, Dict]:
+        parsed = {
+            'Error': {'Code': error.code, 'Message': error.message},
+            'ResponseMetadata': self._metadata(error.status),
+        }
+        return self._http_response(error.status), parsed
+
+    def fake_subprocess_run(self, cmd, *args, **kwargs) -> subprocess.CompletedProcess:
+        """kubectl / aws CLI calls succeed after the 'kubectl' latency"""
+        self.clock.real_sleep(self.latency('kubectl'))
+        with self._stats_lock:
+            self.stats['subprocess_calls'] += 1
+        return subprocess.CompletedProcess(cmd, 0, stdout='', stderr='')
+
+    # ------------------------------------------------------------------ seeding
+
+    def seed_instances(self, access_key: str, region: str, count: int, sg_count: int) -> List[Dict]:
+        """count running instances spread over sg_count security groups, plus one unattached group"""
+        state = self._accounts[access_key].regions[region]
+        vpc_id = self._default_vpc(region)
+        launched = datetime.now(timezone.utc) - timedelta(hours=6)
+
+        group_ids = []
+        for n in range(sg_count + 1):
+            group_id = self._new_id('sg-')
+            state['security_groups'][group_id] = {
+                'GroupId': group_id,
+                'GroupName': f"bench-sg-{n:03d}",
+                'VpcId': vpc_id,
+                'Description': 'benchmark security group',
+                'IpPermissions': [{'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22,
+                                   'IpRanges': [{'CidrIp': '10.0.0.0/8'}]}],
+                'IpPermissionsEgress': [{'IpProtocol': '-1', 'IpRanges': [{'CidrIp': '0.0.0.0/0'}]}],
+            }
+            group_ids.append(group_id)
+        default_id = self._new_id('sg-')
+        state['security_groups'][default_id] = {
+            'GroupId': default_id, 'GroupName': 'default', 'VpcId': vpc_id,
+            'Description': 'default VPC security group', 'IpPermissions': [], 'IpPermissionsEgress': [],
+        }
+
+        created = []
+        for n in range(count):
+            instance_id = self._new_id('i-')
+            group_id = group_ids[n % max(1, sg_count)]
+            state['instances'][instance_id] = {
+                'InstanceId': instance_id,
+                'InstanceType': ('t3.micro', 't3.small', 'c6a.large')[n % 3],
+                'LaunchTime': launched,
+                'VpcId': vpc_id,
+                'SubnetId': f"subnet-{region}-a",
+                'PrivateIpAddress': f"10.0.{n // 250}.{n % 250 + 1}",
+                'PublicIpAddress': f"54.{n // 250}.{n % 250}.1",
+                'SecurityGroups': [{'GroupId': group_id, 'GroupName': state['security_groups'][group_id]['GroupName']}],
+                'Tags': [{'Key': 'Name', 'Value': f"bench-{n:04d}"}],
+                'terminate_at': None,
+            }
+            created.append(state['instances'][instance_id])
+        return created
+
+    def seed_clusters(self, access_key: str, region: str, count: int, nodegroups: int) -> None:
+        state = self._accounts[access_key].regions[region]
+        created_at = datetime.now(timezone.utc) - timedelta(days=1)
+        for n in range(count):
+            name = f"eks-bench-{region}-{n:03d}"
+            cluster = self._new_cluster(self._accounts[access_key], region, name, ready_at=0.0)
+            cluster['createdAt'] = created_at
+            for g in range(nodegroups):
+                cluster['nodegroups'][f"{name}-ng{g}"] = self._new_nodegroup(cluster, f"{name}-ng{g}", ready_at=0.0,
+                                                                            instance_type='c6a.large', desired=2)
+            state['clusters'][name] = cluster
+
+    def seed_load_balancers(self, access_key: str, region: str, count: int) -> None:
+        account = self._accounts[access_key]
+        state = account.regions[region]
+        created = datetime.now(timezone.utc) - timedelta(days=2)
+        zones = [f"{region}a", f"{region}b"]
+        for n in range(count):
+            kind = ('classic', 'application', 'network')[n % 3]
+            name = f"bench-{kind[:3]}-{n:04d}"
+            if kind == 'classic':
+                state['classic_elbs'][name] = {
+                    'LoadBalancerName': name,
+                    'DNSName': f"{name}.{region}.elb.amazonaws.com",
+                    'Scheme': 'internet-facing',
+                    'VPCId': self._default_vpc(region),
+                    'CreatedTime': created,
+                    'Instances': [{'InstanceId': self._new_id('i-')}],
+                    'AvailabilityZones': zones,
+                }
+                continue
+
+            arn = f"arn:aws:elasticloadbalancing:{region}:{account.account_id}:loadbalancer/{kind[:3]}/{name}/{self._new_id('', 16)}"
+            state['load_balancers'][arn] = {
+                'LoadBalancerArn': arn,
+                'LoadBalancerName': name,
+                'DNSName': f"{name}.{region}.elb.amazonaws.com",
+                'Scheme': 'internet-facing',
+                'VpcId': self._default_vpc(region),
+                'State': {'Code': 'active'},
+                'Type': kind,
+                'CreatedTime': created,
+                'AvailabilityZones': [{'ZoneName': zone} for zone in zones],
+            }
+            tg_name = f"{name}-tg"
+            tg_arn = f"arn:aws:elasticloadbalancing:{region}:{account.account_id}:targetgroup/{tg_name}/{self._new_id('', 16)}"
+            state['target_groups'][tg_arn] = {'TargetGroupArn': tg_arn, 'TargetGroupName': tg_name, 'LoadBalancerArns': [arn]}
+
+    def inventory(self) -> Dict[str, int]:
+        """Live resources left across all accounts, for checking that a tool did its job"""
+        counts = defaultdict(int)
+        now = self.clock.latest()
+        for account in self._accounts.values():
+            with account.lock:
+                counts['iam_users'] += len(account.iam_users)
+                for state in account.regions.values():
+                    counts['instances'] += sum(1 for i in state['instances'].values()
+                                               if self._instance_state(i, now) != 'terminated')
+                    counts['security_groups'] += sum(1 for g in state['security_groups'].values()
+                                                     if g['GroupName'] != 'default')
+                    counts['clusters'] += sum(1 for c in state['clusters'].values() if self._lifecycle(c, now) is not None)
+                    counts['load_balancers'] += len(state['classic_elbs']) + len(state['load_balancers'])
+        return dict(counts)
+
+    # ------------------------------------------------------------------ helpers
+
+    @staticmethod
+    def _default_vpc(region: str) -> str:
+        return f"vpc-default-{region}"
+
+    @staticmethod
+    def _filters(params: Dict) -> Dict[str, set]:
+        return {f['Name']: set(f.get('Values', [])) for f in params.get('Filters', [])}
+
+    def _instance_state(self, instance: Dict, now: float) -> str:
+        if instance['terminate_at'] is None:
+            return 'running'
+        if now < instance['terminate_at'] + self.completion_seconds['instance_terminate']:
+            return 'shutting-down'
+        return 'terminated'
+
+    @staticmethod
+    def _lifecycle(resource: Dict, now: float) -> Optional[str]:
+        """CREATING/ACTIVE/DELETING, or None once a deletion has finished"""
+        if resource['gone_at'] is not None:
+            return None if now >= resource['gone_at'] else 'DELETING'
+        return 'ACTIVE' if now >= resource['ready_at'] else 'CREATING'
+
+    def _new_cluster(self, account: FakeAccount, region: str, name: str, ready_at: float) -> Dict:
+        return {
+            'name': name,
+            'arn': f"arn:aws:eks:{region}:{account.account_id}:cluster/{name}",
+            'version': '1.27',
+            'endpoint': f"https://{self._new_id('', 32).upper()}.gr7.{region}.eks.amazonaws.com",
+            'createdAt': datetime.now(timezone.utc),
+            'ready_at': ready_at,
+            'gone_at': None,
+            'nodegroups': {},
+        }
+
+    def _new_nodegroup(self, cluster: Dict, name: str, ready_at: float, instance_type: str, desired: int) -> Dict:
+        return {
+            'nodegroupName': name,
+            'nodegroupArn': f"{cluster['arn'].replace(':cluster/', ':nodegroup/')}/{name}",
+            'clusterName': cluster['name'],
+            'instanceTypes': [instance_type],
+            'scalingConfig': {'minSize': 1, 'maxSize': max(desired, 3), 'desiredSize': desired},
+            'createdAt': datetime.now(timezone.utc),
+            'ready_at': ready_at,
+            'gone_at': None,
+        }
+
+    def _cluster(self, account: FakeAccount, region: str, name: str, now: float) -> Dict:
+        cluster = account.regions[region]['clusters'].get(name)
+        if cluster is None or self._lifecycle(cluster, now) is None:
+            raise FakeAPIError('ResourceNotFoundException', f"No cluster found for name: {name}.", 404)
+        return cluster
+
+    def _nodegroup(self, cluster: Dict, name: str, now: float) -> Dict:
+        nodegroup = cluster['nodegroups'].get(name)
+        if nodegroup is None or self._lifecycle(nodegroup, now) is None:
+            raise FakeAPIError('ResourceNotFoundException', f"No node group found for name: {name}.", 404)
+        return nodegroup
+
+    # ------------------------------------------------------------------ sts / iam / cloudwatch
+
+    def _get_caller_identity(self, account, region, params):
+        return {'Account': account.account_id, 'Arn': f"arn:aws:iam::{account.account_id}:root",
+                'UserId': account.account_id}
+
+    def _get_user(self, account, region, params):
+        user = account.iam_users.get(params.get('UserName'))
+        if user is None:
+            raise FakeAPIError('NoSuchEntity', f"The user with name {params.get('UserName')} cannot be found.", 404)
+        return {'User': dict(user)}
+
+    def _create_user(self, account, region, params):
+        username = params['UserName']
+        if username in account.iam_users:
+            raise FakeAPIError('EntityAlreadyExists', f"User with name {username} already exists.", 409)
+        account.iam_users[username] = {
+            'UserName': username,
+            'UserId': self._new_id('AIDA', 16).upper(),
+            'Arn': f"arn:aws:iam::{account.account_id}:user/{username}",
+            'Path': '/',
+            'CreateDate': datetime.now(timezone.utc),
+        }
+        return {'User': dict(account.iam_users[username])}
+
+    def _create_access_key(self, account, region, params):
+        return {'AccessKey': {
+            'UserName': params.get('UserName'),
+            'AccessKeyId': self._new_id('AKIA', 16).upper(),
+            'SecretAccessKey': self._new_id('', 40),
+            'Status': 'Active',
+            'CreateDate': datetime.now(timezone.utc),
+        }}
+
+    def _get_role(self, account, region, params):
+        role = account.iam_roles.get(params['RoleName'])
+        if role is None:
+            raise FakeAPIError('NoSuchEntity', f"The role with name {params['RoleName']} cannot be found.", 404)
+        return {'Role': {key: value for key, value in role.items() if key != 'policies'}}
+
+    def _create_role(self, account, region, params):
+        name = params['RoleName']
+        account.iam_roles[name] = {'RoleName': name, 'Arn': f"arn:aws:iam::{account.account_id}:role/{name}",
+                                   'CreateDate': datetime.now(timezone.utc), 'policies': []}
+        return {'Role': {key: value for key, value in account.iam_roles[name].items() if key != 'policies'}}
+
+    def _attach_role_policy(self, account, region, params):
+        account.iam_roles[params['RoleName']]['policies'].append(params['PolicyArn'])
+        return {}
+
+    def _list_attached_role_policies(self, account, region, params):
+        role = account.iam_roles.get(params['RoleName'])
+        if role is None:
+            raise FakeAPIError('NoSuchEntity', f"The role with name {params['RoleName']} cannot be found.", 404)
+        return {'AttachedPolicies': [{'PolicyName': arn.rsplit('/', 1)[-1], 'PolicyArn': arn} for arn in role['policies']]}
+
+    def _get_metric_statistics(self, account, region, params):
+        return {'Label': params.get('MetricName'), 'Datapoints': [
+            {'Timestamp': datetime.now(timezone.utc), 'Average': 3.5, 'Unit': 'Percent'}]}
+
+    # ------------------------------------------------------------------ ec2
+
+    def _instance_view(self, instance: Dict, now: float) -> Dict:
+        state = self._instance_state(instance, now)
+        view = {key: value for key, value in instance.items() if key != 'terminate_at'}
+        view['State'] = {'Code': {'running': 16, 'shutting-down': 32, 'terminated': 48}[state], 'Name': state}
+        view['SecurityGroups'] = [dict(group) for group in instance['SecurityGroups']]
+        view['Tags'] = [dict(tag) for tag in instance['Tags']]
+        return view
+
+    def _describe_instances(self, account, region, params):
+        now = self.clock.now()
+        filters = self._filters(params)
+        instance_ids = set(params.get('InstanceIds', [])) | filters.get('instance-id', set())
+        instances = account.regions[region]['instances']
+
+        if instance_ids:
+            missing = [instance_id for instance_id in instance_ids if instance_id not in instances]
+            if missing and params.get('InstanceIds'):
+                raise FakeAPIError('InvalidInstanceID.NotFound', f"The instance ID '{missing[0]}' does not exist")
+            candidates = [instances[instance_id] for instance_id in instance_ids if instance_id in instances]
+        else:
+            candidates = instances.values()
+
+        reservations = []
+        for instance in candidates:
+            view = self._instance_view(instance, now)
+            if 'instance-state-name' in filters and view['State']['Name'] not in filters['instance-state-name']:
+                continue
+            tags = {tag['Key']: tag['Value'] for tag in instance['Tags']}
+            if any(name.startswith('tag:') and tags.get(name[4:]) not in values for name, values in filters.items()):
+                continue
+            reservations.append({'ReservationId': f"r-{instance['InstanceId'][2:]}", 'Instances': [view]})
+            if params.get('MaxResults') and len(reservations) >= params['MaxResults']:
+                break
+        return {'Reservations': reservations}
+
+    def _terminate_instances(self, account, region, params):
+        now = self.clock.now()
+        instances = account.regions[region]['instances']
+        changes = []
+        for instance_id in params['InstanceIds']:
+            instance = instances.get(instance_id)
+            if instance is None:
+                raise FakeAPIError('InvalidInstanceID.NotFound', f"The instance ID '{instance_id}' does not exist")
+            previous = self._instance_state(instance, now)
+            if instance['terminate_at'] is None:
+                instance['terminate_at'] = now
+            current = self._instance_state(instance, now)
+            changes.append({'InstanceId': instance_id, 'CurrentState': {'Name': current}, 'PreviousState': {'Name': previous}})
+        return {'TerminatingInstances': changes}
+
+    def _describe_security_groups(self, account, region, params):
+        filters = self._filters(params)
+        group_ids = set(params.get('GroupIds', [])) | filters.get('group-id', set())
+        groups = []
+        for group in account.regions[region]['security_groups'].values():
+            if group_ids and group['GroupId'] not in group_ids:
+                continue
+            if 'group-name' in filters and group['GroupName'] not in filters['group-name']:
+                continue
+            if 'vpc-id' in filters and group['VpcId'] not in filters['vpc-id']:
+                continue
+            view = dict(group)
+            view['IpPermissions'] = [dict(rule) for rule in group['IpPermissions']]
+            view['IpPermissionsEgress'] = [dict(rule) for rule in group['IpPermissionsEgress']]
+            groups.append(view)
+        return {'SecurityGroups': groups}
+
+    def _security_group(self, account, region, group_id):
+        group = account.regions[region]['security_groups'].get(group_id)
+        if group is None:
+            raise FakeAPIError('InvalidGroup.NotFound', f"The security group '{group_id}' does not exist")
+        return group
+
+    def _revoke_security_group_rules(self, account, region, params):
+        group = self._security_group(account, region, params['GroupId'])
+        key = 'IpPermissionsEgress' if any(rule.get('IpProtocol') == '-1' for rule in params.get('IpPermissions', [])) \
+            and group['IpPermissionsEgress'] else 'IpPermissions'
+        revoked = params.get('IpPermissions', [])
+        group[key] = [rule for rule in group[key] if rule not in revoked]
+        if key == 'IpPermissions':
+            group['IpPermissionsEgress'] = [rule for rule in group['IpPermissionsEgress'] if rule not in revoked]
+        return {'Return': True}
+
+    def _delete_security_group(self, account, region, params):
+        now = self.clock.now()
+        group_id = params['GroupId']
+        self._security_group(account, region, group_id)
+        for instance in account.regions[region]['instances'].values():
+            if self._instance_state(instance, now) != 'terminated' and \
+                    any(group['GroupId'] == group_id for group in instance['SecurityGroups']):
+                raise FakeAPIError('DependencyViolation', f"resource {group_id} has a dependent object")
+        del account.regions[region]['security_groups'][group_id]
+        return {'Return': True, 'GroupId': group_id}
+
+    def _create_security_group(self, account, region, params):
+        group_id = self._new_id('sg-')
+        account.regions[region]['security_groups'][group_id] = {
+            'GroupId': group_id, 'GroupName': params['GroupName'], 'VpcId': params.get('VpcId', self._default_vpc(region)),
+            'Description': params.get('Description', ''), 'IpPermissions': [], 'IpPermissionsEgress': [],
+        }
+        return {'GroupId': group_id}
+
+    def _describe_vpcs(self, account, region, params):
+        return {'Vpcs': [{'VpcId': self._default_vpc(region), 'IsDefault': True, 'CidrBlock': '172.31.0.0/16', 'State': 'available'}]}
+
+    def _describe_subnets(self, account, region, params):
+        return {'Subnets': [{'SubnetId': f"subnet-{region}-{zone}", 'AvailabilityZone': f"{region}{zone}",
+                             'VpcId': self._default_vpc(region), 'State': 'available'} for zone in 'abc']}
+
+    # ------------------------------------------------------------------ eks
+
+    def _list_clusters(self, account, region, params):
+        now = self.clock.now()
+        return {'clusters': sorted(name for name, cluster in account.regions[region]['clusters'].items()
+                                   if self._lifecycle(cluster, now) is not None)}
+
+    def _describe_cluster(self, account, region, params):
+        now = self.clock.now()
+        cluster = self._cluster(account, region, params['name'], now)
+        return {'cluster': {
+            'name': cluster['name'],
+            'arn': cluster['arn'],
+            'status': self._lifecycle(cluster, now),
+            'version': cluster['version'],
+            'endpoint': cluster['endpoint'],
+            'createdAt': cluster['createdAt'],
+            'certificateAuthority': {'data': 'LS0tLS1CRUdJTiBDRVJUSUZJQ0FURS0tLS0t'},
+        }}
+
+    def _create_cluster(self, account, region, params):
+        now = self.clock.now()
+        name = params['name']
+        clusters = account.regions[region]['clusters']
+        if name in clusters and self._lifecycle(clusters[name], now) is not None:
+            raise FakeAPIError('ResourceInUseException', f"Cluster already exists with name: {name}", 409)
+        clusters[name] = self._new_cluster(account, region, name, now + self.completion_seconds['cluster_create'])
+        return {'cluster': {'name': name, 'arn': clusters[name]['arn'], 'status': 'CREATING'}}
+
+    def _delete_cluster(self, account, region, params):
+        now = self.clock.now()
+        cluster = self._cluster(account, region, params['name'], now)
+        if any(self._lifecycle(nodegroup, now) is not None for nodegroup in cluster['nodegroups'].values()):
+            raise FakeAPIError('ResourceInUseException', "Cluster has nodegroups attached", 409)
+        if cluster['gone_at'] is None:
+            cluster['gone_at'] = now + self.completion_seconds['cluster_delete']
+        return {'cluster': {'name': cluster['name'], 'arn': cluster['arn'], 'status': 'DELETING'}}
+
+    def _list_nodegroups(self, account, region, params):
+        now = self.clock.now()
+        cluster = self._cluster(account, region, params['clusterName'], now)
+        return {'nodegroups': sorted(name for name, nodegroup in cluster['nodegroups'].items()
+                                     if self._lifecycle(nodegroup, now) is not None)}
+
+    def _describe_nodegroup(self, account, region, params):
+        now = self.clock.now()
+        cluster = self._cluster(account, region, params['clusterName'], now)
+        nodegroup = self._nodegroup(cluster, params['nodegroupName'], now)
+        view = {key: value for key, value in nodegroup.items() if key not in ('ready_at', 'gone_at')}
+        view['status'] = self._lifecycle(nodegroup, now)
+        view['scalingConfig'] = dict(nodegroup['scalingConfig'])
+        view['instanceTypes'] = list(nodegroup['instanceTypes'])
+        return {'nodegroup': view}
+
+    def _create_nodegroup(self, account, region, params):
+        now = self.clock.now()
+        cluster = self._cluster(account, region, params['clusterName'], now)
+        scaling = params.get('scalingConfig', {})
+        nodegroup = self._new_nodegroup(cluster, params['nodegroupName'], now + self.completion_seconds['nodegroup_create'],
+                                        (params.get('instanceTypes') or ['t3.medium'])[0], scaling.get('desiredSize', 1))
+        cluster['nodegroups'][params['nodegroupName']] = nodegroup
+        return {'nodegroup': {'nodegroupName': nodegroup['nodegroupName'], 'nodegroupArn': nodegroup['nodegroupArn'],
+                              'status': 'CREATING'}}
+
+    def _delete_nodegroup(self, account, region, params):
+        now = self.clock.now()
+        cluster = self._cluster(account, region, params['clusterName'], now)
+        nodegroup = self._nodegroup(cluster, params['nodegroupName'], now)
+        if nodegroup['gone_at'] is None:
+            nodegroup['gone_at'] = now + self.completion_seconds['nodegroup_delete']
+        return {'nodegroup': {'nodegroupName': nodegroup['nodegroupName'], 'status': 'DELETING'}}
+
+    # ------------------------------------------------------------------ elb / elbv2
+
+    def _describe_classic_elbs(self, account, region, params):
+        return {'LoadBalancerDescriptions': [dict(elb) for elb in account.regions[region]['classic_elbs'].values()]}
+
+    def _delete_classic_elb(self, account, region, params):
+        account.regions[region]['classic_elbs'].pop(params['LoadBalancerName'], None)
+        return {}
+
+    def _describe_load_balancers(self, account, region, params):
+        load_balancers = [dict(lb) for lb in account.regions[region]['load_balancers'].values()]
+        if params.get('PageSize'):
+            load_balancers = load_balancers[:params['PageSize']]
+        return {'LoadBalancers': load_balancers}
+
+    def _describe_target_groups(self, account, region, params):
+        names = set(params.get('Names', []))
+        groups = [dict(tg, LoadBalancerArns=list(tg['LoadBalancerArns']))
+                  for tg in account.regions[region]['target_groups'].values()
+                  if (not names or tg['TargetGroupName'] in names)
+                  and (not params.get('LoadBalancerArn') or params['LoadBalancerArn'] in tg['LoadBalancerArns'])]
+        if names and not groups:
+            raise FakeAPIError('TargetGroupNotFound', 'One or more target groups not found', 400)
+        return {'TargetGroups': groups}
+
+    def _delete_target_group(self, account, region, params):
+        account.regions[region]['target_groups'].pop(params['TargetGroupArn'], None)
+        return {}
+
+    def _delete_load_balancer(self, account, region, params):
+        if account.regions[region]['load_balancers'].pop(params['LoadBalancerArn'], None) is None:
+            raise FakeAPIError('LoadBalancerNotFound', 'One or more load balancers not found', 400)
+        return {}
+
+# ---------------------------------------------------------------------- synthetic inputs
+
+def build_accounts_config(accounts: int, regions: List[str], users_per_account: int) -> Dict:
+    """aws_accounts_config.json with the shape every tool reads"""
+    config = {
+        'accounts': {},
+        'user_settings': {
+            'user_regions': regions,
+            'users_per_account': users_per_account,
+            'password': 'Bench-Passw0rd!2025',
+            'allowed_instance_types': ['t3.micro', 't3.small', 'c6a.large'],
+        },
+    }
+    for n in range(1, accounts + 1):
+        config['accounts'][f"account{n:02d}"] = {
+            'account_id': str(100000000000 + n),
+            'email': f"bench-account{n:02d}@example.com",
+            'access_key': f"AKIABENCH{n:011d}",
+            'secret_key': f"bench-secret-{n:028d}",
+        }
+    return config
+
+def write_json(path: str, data) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(temp_path, path)
+
+def register_accounts(fake: FakeAWS, config: Dict) -> None:
+    for account in config['accounts'].values():
+        fake.add_account(account['access_key'], account['account_id'])
+
+def for_each_account_region(config: Dict):
+    for account_name, account in config['accounts'].items():
+        for region in config['user_settings']['user_regions']:
+            yield account_name, account, region
+
+# ---------------------------------------------------------------------- tool drivers
+# Each driver mirrors the tool's interactive run() with every prompt answered "all / yes"
+
+def seed_ultra_ec2(fake: FakeAWS, config: Dict, args) -> None:
+    for _, account, region in for_each_account_region(config):
+        fake.seed_instances(account['access_key'], region, args.resources, max(1, args.resources // 10))
+
+def run_ultra_ec2(config: Dict, args) -> Dict:
+    from ultra_cleanup_ec2 import UltraEC2CleanupManager
+
+    manager = UltraEC2CleanupManager()
+    successful_tasks, failed_tasks = manager.run_parallel_cleanup(max_workers=10)
+    manager.save_cleanup_report()
+    return {
+        'tasks_ok': successful_tasks,
+        'tasks_failed': failed_tasks,
+        'instances_terminated': len(manager.cleanup_results['deleted_instances']),
+        'security_groups_deleted': len(manager.cleanup_results['deleted_security_groups']),
+        'failed_deletions': len(manager.cleanup_results['failed_deletions']),
+    }
+
+def seed_eks_delete(fake: FakeAWS, config: Dict, args) -> None:
+    for _, account, region in for_each_account_region(config):
+        fake.seed_clusters(account['access_key'], region, args.clusters_per_region, args.nodegroups)
+
+def run_eks_delete(config: Dict, args) -> Dict:
+    from eks_delete_cleanup_threaded import EKSClusterDeleteManager
+
+    manager = EKSClusterDeleteManager()
+    manager.scan_all_accounts_and_regions(list(config['accounts']))
+    if not manager.display_discovered_clusters():
+        return {'clusters_found': 0}
+    clusters = list(manager.cluster_mapping.values())
+    manager.journal.save_plan(clusters)
+    manager.delete_selected_clusters(clusters)
+    return {
+        'clusters_found': len(clusters),
+        'clusters_deleted': sum(1 for record in manager.deletion_summary if record.get('status') == 'SUCCESS'),
+        'clusters_failed': sum(1 for record in manager.deletion_summary if record.get('status') != 'SUCCESS'),
+    }
+
+def seed_elb_cleanup(fake: FakeAWS, config: Dict, args) -> None:
+    for _, account, region in for_each_account_region(config):
+        fake.seed_load_balancers(account['access_key'], region, args.resources)
+
+def run_elb_cleanup(config: Dict, args) -> Dict:
+    from elb_cleanup_multi_account import ELBCleanupManager
+
+    manager = ELBCleanupManager()
+    manager.scan_all_accounts_and_regions(list(config['accounts']))
+    if not manager.display_discovered_elbs():
+        return {'elbs_found': 0}
+    elbs = list(manager.elb_mapping.values())
+    manager.delete_selected_elbs(elbs)
+    return {
+        'elbs_found': len(elbs),
+        'elbs_deleted': sum(1 for record in manager.deletion_summary if record.get('status') == 'SUCCESS'),
+        'elbs_failed': sum(1 for record in manager.deletion_summary if record.get('status') != 'SUCCESS'),
+    }
+
+def seed_nothing(fake: FakeAWS, config: Dict, args) -> None:
+    pass
+
+def run_iam_users(config: Dict, args) -> Dict:
+    from create_iam_users import IAMUserManager
+
+    manager = IAMUserManager()
+    created, skipped, failed = [], [], []
+    for account_name in manager.aws_accounts:
+        account_created, account_skipped, account_failed = manager.create_users_in_account(account_name)
+        created.extend(account_created)
+        skipped.extend(account_skipped)
+        failed.extend(account_failed)
+    if created:
+        manager.save_credentials_to_file(created)
+    manager.journal.mark_finished()
+    return {'users_created': len(created), 'users_skipped': len(skipped), 'users_failed': len(failed)}
+
+def run_eks_create(config: Dict, args) -> Dict:
+    import eks_create_cluster_updated
+    from eks_create_cluster_updated import EKSClusterManager
+
+    # One IAM user per account and region, as create_iam_users.py would have written them
+    credentials = {'created_date': datetime.now().strftime('%Y-%m-%d'), 'accounts': {}}
+    for account_name, account, region in for_each_account_region(config):
+        entry = credentials['accounts'].setdefault(account_name, {
+            'account_id': account['account_id'], 'account_email': account['email'], 'users': []})
+        entry['users'].append({
+            'username': f"{account_name}_clouduser{len(entry['users']) + 1:02d}",
+            'region': region,
+            'access_key_id': f"AKIAUSER{account['account_id'][-4:]}{len(entry['users']):08d}",
+            'secret_access_key': f"user-secret-{account['account_id']}-{len(entry['users'])}",
+            'real_user': {'full_name': 'Benchmark User'},
+        })
+    credentials_file = f"iam_users_credentials_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    write_json(credentials_file, credentials)
+
+    manager = EKSClusterManager(config_file=credentials_file)
+    cluster_configs = []
+    for account_name, entry in credentials['accounts'].items():
+        for user in entry['users']:
+            for _ in range(args.clusters_per_region):
+                cluster_configs.append({
+                    'account_key': account_name,
+                    'account_id': entry['account_id'],
+                    'user': user,
+                    'max_nodes': 3,
+                    'cluster_name': manager.generate_cluster_name(user['username'], user['region']),
+                    'instance_type': 'c6a.large',
+                    'capacity_type': 'SPOT',
+                })
+
+    with mock.patch.object(eks_create_cluster_updated.subprocess, 'run', args.fake.fake_subprocess_run), \
+            mock.patch('shutil.which', lambda name, *a, **kw: f"/usr/local/bin/{name}"):
+        manager.create_clusters(cluster_configs)
+    return {'clusters_requested': len(cluster_configs), 'clusters_created': len(manager.kubectl_commands)}
+
+def seed_resource_lookup(fake: FakeAWS, config: Dict, args) -> None:
+    """Live instances plus the ec2_instance_report file the lookup tool starts from"""
+    created_instances = []
+    for account_name, account, region in for_each_account_region(config):
+        for instance in fake.seed_instances(account['access_key'], region, args.resources, 1):
+            created_instances.append({
+                'instance_id': instance['InstanceId'],
+                'instance_type': instance['InstanceType'],
+                'account_name': account_name,
+                'account_id': account['account_id'],
+                'region': region,
+                'state': 'running',
+                'public_ip': instance['PublicIpAddress'],
+                'username': f"{account_name}_clouduser01",
+                'created_at': instance['LaunchTime'].strftime('%Y-%m-%d %H:%M:%S'),
+            })
+    now = datetime.now()
+    write_json(f"ec2_instance_report_{now.strftime('%Y%m%d_%H%M%S')}.json", {
+        'metadata': {'creation_date': now.strftime('%Y-%m-%d'), 'creation_time': now.strftime('%H:%M:%S'),
+                     'created_by': 'benchmark'},
+        'summary': {'total_processed': len(created_instances), 'total_created': len(created_instances)},
+        'created_instances': created_instances,
+    })
+
+def run_resource_lookup(config: Dict, args) -> Dict:
+    from ec2_eks_lookup_resource import AWSResourceManager
+
+    manager = AWSResourceManager()
+    reports = []
+    save_report = manager.save_consolidated_execution_report
+
+    def keep_reports(*a, **kw):
+        # The manager clears execution_reports once they are saved
+        reports.extend(manager.execution_reports)
+        return save_report(*a, **kw)
+
+    answers = lambda prompt='': 'yes' if 'yes/no' in prompt else ''
+    with mock.patch('builtins.input', answers), \
+            mock.patch.object(manager, 'save_consolidated_execution_report', keep_reports):
+        manager.calculate_resource_costs('ec2')
+    return {
+        'resources_priced': sum(1 for report in reports if report['status'] == 'success'),
+        'resources_skipped': sum(1 for report in reports if report['status'] != 'success'),
+    }
+
+TOOLS = {
+    'ultra_ec2': (seed_ultra_ec2, run_ultra_ec2),
+    'eks_delete': (seed_eks_delete, run_eks_delete),
+    'elb_cleanup': (seed_elb_cleanup, run_elb_cleanup),
+    'iam_users': (seed_nothing, run_iam_users),
+    'eks_create': (seed_nothing, run_eks_create),
+    'resource_lookup': (seed_resource_lookup, run_resource_lookup),
+}
+
+# ---------------------------------------------------------------------- measurement
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+def parse_overrides(items: List[str], option: str) -> Dict[str, float]:
+    overrides = {}
+    for item in items or []:
+        name, _, value = item.partition('=')
+        try:
+            overrides[name.strip()] = float(value)
+        except ValueError:
+            raise SystemExit(f"❌ {option} expects NAME=NUMBER, got {item!r}")
+    return overrides
+
+def run_tool(tool: str, args, result_file: str) -> None:
+    """Child process: seed the fake, run one tool against it and write the measurements"""
+    seed, runner = TOOLS[tool]
+    clock = SimulatedClock(args.time_scale)
+    fake = FakeAWS(
+        clock,
+        latency_ms=args.latency_ms,
+        latency_overrides=parse_overrides(args.latency, '--latency'),
+        throttle_rate=args.throttle_rate,
+        throttle_overrides=parse_overrides(args.throttle, '--throttle'),
+        completion_seconds=parse_overrides(args.wait, '--wait'),
+        seed=args.seed,
+    )
+    args.fake = fake
+
+    config = build_accounts_config(args.accounts, DEFAULT_REGIONS[:args.regions], args.resources)
+    write_json('aws_accounts_config.json', config)
+    register_accounts(fake, config)
+    seed(fake, config, args)
+
+    metrics = ApiCallMetrics(f"benchmark_{tool}")
+    metrics.install()
+    metrics.install_on_new_sessions()
+
+    with ExitStack() as stack:
+        fake.install(stack)
+        stack.enter_context(mock.patch.object(time, 'sleep', clock.sleep))
+        rss_before = peak_rss_mb()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        outcome = runner(config, args)
+        wall_seconds = time.perf_counter() - start
+        cpu_seconds = time.process_time() - cpu_start
+
+    rows = metrics.summary()
+    write_json(result_file, {
+        'tool': tool,
+        'wall_seconds': round(wall_seconds, 3),
+        'cpu_seconds': round(cpu_seconds, 3),
+        'api_calls': sum(row['count'] for row in rows),
+        'api_seconds': round(sum(row['total_ms'] for row in rows) / 1000, 3),
+        'retries': sum(row['retries'] for row in rows),
+        'throttles': sum(row['throttles'] for row in rows),
+        'api_errors': sum(sum(row['errors'].values()) for row in rows),
+        'subprocess_calls': fake.stats['subprocess_calls'],
+        'simulated_wait_seconds': round(clock.simulated_wait, 1),
+        'peak_rss_mb': peak_rss_mb(),
+        'rss_before_run_mb': rss_before,
+        'outcome': outcome,
+        'remaining': fake.inventory(),
+        'calls_by_operation': {f"{row['service']}:{row['operation']}": row['count'] for row in rows},
+    })
+
+def print_results(results: List[Dict], baseline: Optional[Dict]) -> None:
+    baseline_by_tool = {result['tool']: result for result in (baseline or {}).get('results', [])}
+
+    def delta(result, key):
+        previous = baseline_by_tool.get(result['tool'], {}).get(key)
+        if not previous or result.get(key) is None:
+            return ''
+        return f" ({(result[key] - previous) / previous * 100:+.0f}%)"
+
+    header = ['TOOL', 'WALL s', 'CPU s', 'API CALLS', 'RETRY', 'THROTTLE', 'API ERR', 'PEAK RSS MB', 'OUTCOME']
+    table = []
+    for result in results:
+        if 'error' in result:
+            table.append([result['tool'], '-', '-', '-', '-', '-', '-', '-', f"❌ {result['error']}"])
+            continue
+        table.append([
+            result['tool'],
+            f"{result['wall_seconds']:.2f}{delta(result, 'wall_seconds')}",
+            f"{result['cpu_seconds']:.2f}{delta(result, 'cpu_seconds')}",
+            f"{result['api_calls']}{delta(result, 'api_calls')}",
+            str(result['retries']),
+            str(result['throttles']),
+            str(result['api_errors']),
+            f"{result['peak_rss_mb']}{delta(result, 'peak_rss_mb')}" if result['peak_rss_mb'] is not None else 'n/a',
+            ', '.join(f"{key}={value}" for key, value in result['outcome'].items()),
+        ])
+    widths = [max(len(line[i]) for line in [header] + table) for i in range(len(header))]
+
+    print("\n📊 Benchmark results" + (" (vs baseline)" if baseline_by_tool else ""))
+    print("  ".join(h.ljust(w) for h, w in zip(header, widths)))
+    print("  ".join("-" * w for w in widths))
+    for line in table:
+        print("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Offline benchmark of the AWS tools against a latency-injecting fake')
+    parser.add_argument('--tools', default=','.join(TOOLS), help=f"Comma-separated subset of: {', '.join(TOOLS)}")
+    parser.add_argument('--accounts', type=int, default=5, help='Synthetic accounts (default: 5)')
+    parser.add_argument('--regions', type=int, default=2, help=f"Regions per account, max {len(DEFAULT_REGIONS)} (default: 2)")
+    parser.add_argument('--resources', type=int, default=20,
+                        help='Instances / load balancers per account-region, IAM users per account (default: 20)')
+    parser.add_argument('--clusters-per-region', type=int, default=1, help='EKS clusters per account-region (default: 1)')
+    parser.add_argument('--nodegroups', type=int, default=2, help='Nodegroups per seeded EKS cluster (default: 2)')
+    parser.add_argument('--latency-ms', type=float, default=40.0, help='Mean read latency; writes take 2x (default: 40)')
+    parser.add_argument('--latency', action='append', metavar='OPERATION=MS',
+                        help="Per-operation mean latency, e.g. DescribeInstances=150 or kubectl=300 (repeatable)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Probability an attempt is throttled (default: 0)')
+    parser.add_argument('--throttle', action='append', metavar='OPERATION=RATE', help='Per-operation throttle rate (repeatable)')
+    parser.add_argument('--wait', action='append', metavar='NAME=SECONDS',
+                        help=f"Simulated completion time, NAME one of: {', '.join(DEFAULT_COMPLETION_SECONDS)} (repeatable)")
+    parser.add_argument('--time-scale', type=float, default=0.001,
+                        help='Real seconds per simulated second of sleeps and waiter delays (default: 0.001)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--baseline', help='Earlier benchmark JSON to compare against')
+    parser.add_argument('--keep-workdirs', action='store_true', help='Keep each tool\'s scratch directory (logs, reports)')
+    parser.add_argument('--run-tool', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_tool:
+        run_tool(args.run_tool, args, args.result_file)
+        return
+
+    tools = [tool.strip() for tool in args.tools.split(',') if tool.strip()]
+    unknown = [tool for tool in tools if tool not in TOOLS]
+    if unknown:
+        parser.error(f"unknown tool(s): {', '.join(unknown)}")
+    args.regions = max(1, min(args.regions, len(DEFAULT_REGIONS)))
+    # Validate overrides before spawning anything
+    parse_overrides(args.latency, '--latency')
+    parse_overrides(args.throttle, '--throttle')
+    parse_overrides(args.wait, '--wait')
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    script = os.path.abspath(__file__)
+    child_args = sys.argv[1:]
+    started_at = datetime.now()
+    print(f"🏁 Benchmarking {len(tools)} tool(s): {args.accounts} accounts × {args.regions} regions × {args.resources} resources "
+          f"(latency {args.latency_ms:.0f}ms, throttle {args.throttle_rate:.0%}, time scale {args.time_scale})")
+
+    results = []
+    for tool in tools:
+        # Each tool gets a fresh process (for a clean peak RSS) and directory (for its logs, caches and journals)
+        workdir = tempfile.mkdtemp(prefix=f"aws_bench_{tool}_")
+        result_file = os.path.join(workdir, 'benchmark_result.json')
+        output_file = os.path.join(workdir, 'tool_output.log')
+        print(f"▶ {tool} ...", end='', flush=True)
+        with open(output_file, 'w', encoding='utf-8') as output:
+            child = subprocess.run([sys.executable, script] + child_args + ['--run-tool', tool, '--result-file', result_file],
+                                   cwd=workdir, stdout=output, stderr=subprocess.STDOUT,
+                                   env=dict(os.environ, PYTHONIOENCODING='utf-8'))
+
+        if child.returncode == 0 and os.path.exists(result_file):
+            with open(result_file, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            print(f" {result['wall_seconds']:.2f}s, {result['api_calls']} calls")
+        else:
+            result = {'tool': tool, 'error': f"exit code {child.returncode}, see {output_file}"}
+            print(f" ❌ failed (exit code {child.returncode})")
+            args.keep_workdirs = True
+
+        if args.keep_workdirs:
+            result['workdir'] = workdir
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+        results.append(result)
+
+    print_results(results, baseline)
+
+    os.makedirs('logs', exist_ok=True)
+    report_file = os.path.join('logs', f"benchmark_aws_tools_{started_at.strftime('%Y%m%d_%H%M%S')}.json")
+    write_json(report_file, {
+        'started_at': started_at.isoformat(),
+        'finished_at': datetime.now().isoformat(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('run_tool', 'result_file', 'baseline')},
+        'results': results,
+    })
+    print(f"\n📁 Benchmark report saved to: {report_file}")
+    if any('workdir' in result for result in results):
+        for result in results:
+            if 'workdir' in result:
+                print(f"   {result['tool']}: {result['workdir']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark: git-filter.py on a message-heavy history, where every commit
+message refers to earlier commits by full and abbreviated hashes (plus some
+hash-like words that are not commits), so that each rewritten commit needs
+its references translated.
+
+    python benchmark_commit_message_hashes.py [--commits 20000] [--refs 8]
+    python benchmark_commit_message_hashes.py --baseline /tmp/git-filter-old.py
+
+Two timings per variant: TRANSLATE s is the in-process work alone (recording
+each commit's rename as RepoFilter does, answered by a stand-in fast-import,
+and rewriting every message), FILTER s is a full run removing a file.
+--baseline runs another copy of git-filter.py (e.g.
+`git show HEAD~1:git-filter.py > /tmp/git-filter-old.py`) on the same
+repository and checks that both rewrite it identically.
+"""
+
+import importlib.util
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+GIT_FILTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'git-filter.py')
+
+def load_git_filter(path, name):
+    """Import a git-filter.py (not importable by name because of the dash)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class NullOutput:
+    """Stand-in for the fast-import pipe"""
+    closed = False
+
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+def read_history(path):
+    """(hash, message) of each commit, oldest first"""
+    output = subprocess.run(['git', '-C', path, 'log', '--reverse', '--format=%H%x00%B%x00'],
+                            check=True, capture_output=True).stdout
+    fields = output.split(b'\0')
+    return [(fields[i].strip(), fields[i + 1]) for i in range(0, len(fields) - 1, 2)]
+
+def translate_messages(module, history):
+    """Seconds to record the renames and rewrite the messages the way
+    RepoFilter._tweak_commit() does, and the rewritten messages"""
+    repo_filter = module.RepoFilter(module.FilteringOptions.parse_args(['--force']))
+    # Every commit "rewritten" to its hash reversed, as fast-import would answer
+    replies = b''.join(old[::-1] + b'\n' for old, _ in history)
+    repo_filter._output = NullOutput()
+    repo_filter._import_pipes = (NullOutput(), io.BytesIO(replies))
+    rewritten = []
+    start = time.perf_counter()
+    for mark, (old, message) in enumerate(history, 1):
+        rewritten.append(repo_filter._hash_re.sub(repo_filter._translate_commit_hash, message))
+        repo_filter._graph.add_commit_and_parents(mark, [mark - 1] if mark > 1 else [])
+        commit = types.SimpleNamespace(id=mark, original_id=old, parents=[])
+        repo_filter._record_remapping(commit, [])
+    return time.perf_counter() - start, rewritten
+
+def build_repo(path, commits, refs, seed):
+    """Commits whose messages cite random earlier commits, imported in batches
+    so the hashes of earlier batches are known when writing later messages"""
+    rng = random.Random(seed)
+    marks = os.path.join(path, '.git', 'benchmark-marks')
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    hashes = []
+    for start in range(0, commits, 500):
+        stream = []
+        for number in range(start, min(commits, start + 500)):
+            lines = [b'Change %d' % number, b'']
+            for _ in range(refs if hashes else 0):
+                cited = rng.choice(hashes)[:rng.choice([7, 10, 12, 40])]
+                lines.append(b'Follow-up to %s, see also 20231105 and deadbeef.' % cited)
+            message = b'\n'.join(lines) + b'\n'
+            stream.append(b'commit refs/heads/main\nmark :%d\ncommitter Bench <bench@example.com> %d +0000\n'
+                          b'data %d\n%s' % (number + 1, 1600000000 + number, len(message), message))
+            if number:
+                stream.append(b'from :%d\n' % number)
+            body = b'%d\n' % number
+            stream.append(b'M 100644 inline src/file%d.txt\ndata %d\n%s\n' % (number % 50, len(body), body))
+            stream.append(b'M 100644 inline secret.txt\ndata 2\n%d\n' % (number % 10))
+        command = ['git', '-C', path, 'fast-import', '--quiet', '--export-marks=' + marks]
+        if start:
+            command.append('--import-marks=' + marks)
+        subprocess.run(command, input=b''.join(stream), check=True)
+        with open(marks, 'rb') as f:
+            hashes = [line.split()[1] for line in f]
+    subprocess.run(['git', '-C', path, 'reset', '-q', '--hard', 'main'], check=True)
+
+def run_filter(git_filter, source, workdir):
+    """Seconds for one run removing secret.txt, and the resulting commit-map"""
+    clone = os.path.join(workdir, 'clone')
+    shutil.rmtree(clone, ignore_errors=True)
+    subprocess.run(['git', 'clone', '-q', '--no-local', source, clone], check=True)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, git_filter, '--invert-paths', '--path', 'secret.txt', '--force', '--quiet'],
+                   cwd=clone, check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(clone, '.git', 'filter-repo', 'commit-map'), 'rb') as f:
+        commit_map = f.read()
+    return elapsed, commit_map
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Commit message hash translation benchmark')
+    parser.add_argument('--commits', type=int, default=20000, help='Commits in the synthetic repository')
+    parser.add_argument('--refs', type=int, default=8, help='Commit references per message')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per variant; the best one is reported')
+    parser.add_argument('--baseline', metavar='GIT_FILTER_PY', help='Older git-filter.py to compare against')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic repository')
+    args = parser.parse_args()
+
+    variants = [('current', GIT_FILTER)]
+    if args.baseline:
+        variants.insert(0, ('baseline', args.baseline))
+
+    workdir = tempfile.mkdtemp(prefix='message_hashes_bench_')
+    try:
+        source = os.path.join(workdir, 'source')
+        build_repo(source, args.commits, args.refs, args.seed)
+        print(f"📊 Synthetic repo: {args.commits} commits, {args.refs} commit references per message")
+
+        history = read_history(source)
+
+        print(f"   {'VARIANT':<10} {'TRANSLATE s':>11} {'FILTER s':>9} {'COMMITS/s':>10}")
+        results = {}
+        for label, git_filter in variants:
+            module = load_git_filter(git_filter, 'git_filter_repo_' + label)
+            translations = [translate_messages(module, history) for _ in range(args.repeat)]
+            runs = [run_filter(git_filter, source, workdir) for _ in range(args.repeat)]
+            best = min(elapsed for elapsed, _ in runs)
+            results[label] = (min(elapsed for elapsed, _ in translations), best,
+                              translations[0][1], runs[0][1])
+            print(f"   {label:<10} {results[label][0]:>11.3f} {best:>9.2f} {args.commits / best:>10.0f}")
+
+        if args.baseline:
+            if results['baseline'][2:] != results['current'][2:]:
+                print("❌ Rewritten messages or commit-map differ between baseline and current")
+                sys.exit(1)
+            print(f"   Speedup vs baseline: {results['baseline'][0] / results['current'][0]:.2f}x translating, "
+                  f"{results['baseline'][1] / results['current'][1]:.2f}x end to end")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
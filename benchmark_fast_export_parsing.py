@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for git-filter.py's FastExportParser on a generated
+fast-export stream, read through a pipe the way RepoFilter reads git fast-export.
+
+    python benchmark_fast_export_parsing.py [--commits 40000] [--blob-bytes 200]
+    python benchmark_fast_export_parsing.py --baseline /tmp/git-filter-old.py
+
+--baseline parses the same stream with another copy of git-filter.py (e.g.
+`git show HEAD~1:git-filter.py > /tmp/git-filter-old.py`) using its own default
+buffer size.
+"""
+
+import importlib.util
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+GIT_FILTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'git-filter.py')
+
+def load_git_filter(path, name):
+    """Import a git-filter.py (not importable by name because of the dash)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class NullOutput:
+    """Stand-in for the fast-import pipe"""
+
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+def generate_stream(path, commits, files_per_commit, blob_bytes, seed):
+    """Blobs and commits shaped like `git fast-export --show-original-ids` output"""
+    rng = random.Random(seed)
+    mark = 0
+    with open(path, 'wb') as f:
+        for number in range(commits):
+            changes = []
+            for index in range(files_per_commit):
+                mark += 1
+                line = b'value %d for file %d\n' % (number, index)
+                body = line * max(1, rng.randint(blob_bytes // 2, blob_bytes * 3 // 2) // len(line))
+                f.write(b'blob\nmark :%d\noriginal-oid %040x\ndata %d\n%s\n'
+                        % (mark, rng.getrandbits(160), len(body), body))
+                changes.append(b'M 100644 :%d src/module%d/file%d.py\n' % (mark, index, rng.randint(0, 999)))
+            mark += 1
+            message = b'Commit %d\n\nGenerated for the parser benchmark.\n' % number
+            f.write(b'commit refs/heads/main\nmark :%d\noriginal-oid %040x\n'
+                    b'author A U Thor <author@example.com> %d +0000\n'
+                    b'committer C O Mitter <committer@example.com> %d +0000\n'
+                    b'data %d\n%s'
+                    % (mark, rng.getrandbits(160), 1600000000 + number, 1600000000 + number,
+                       len(message), message))
+            if number:
+                f.write(b'from :%d\n' % (mark - files_per_commit - 1))
+            f.write(b''.join(changes) + b'\n')
+        f.write(b'done\n')
+
+def parse_once(module, path, bufsize):
+    """Seconds to parse the stream once through a pipe with the given read buffer"""
+    # Fresh id and blob-hash state, as each RepoFilter run starts with
+    module._IDS = module._IDs()
+    module.BLOB_HASH_TO_NEW_ID.clear()
+    module.BLOB_NEW_ID_TO_HASH.clear()
+    cat = subprocess.Popen(['cat', path], stdout=subprocess.PIPE, bufsize=bufsize)
+    start = time.perf_counter()
+    module.FastExportParser().run(cat.stdout, NullOutput())
+    elapsed = time.perf_counter() - start
+    cat.stdout.close()
+    cat.wait()
+    return elapsed
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='FastExportParser throughput benchmark')
+    parser.add_argument('--commits', type=int, default=40000, help='Commits in the generated stream')
+    parser.add_argument('--files', type=int, default=5, help='Changed files (blobs) per commit')
+    parser.add_argument('--blob-bytes', type=int, default=200, help='Average blob size in bytes')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per variant; the best one is reported')
+    parser.add_argument('--baseline', metavar='GIT_FILTER_PY', help='Older git-filter.py to compare against')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated stream')
+    args = parser.parse_args()
+
+    current = load_git_filter(GIT_FILTER, 'git_filter_repo')
+    variants = [('8K buffer (io default)', current, -1),
+                (f"{current.fast_export_buffer_size // 1024}K buffer (current)", current,
+                 current.fast_export_buffer_size)]
+    if args.baseline:
+        variants.insert(0, ('baseline git-filter.py', load_git_filter(args.baseline, 'git_filter_repo_baseline'), -1))
+
+    fd, path = tempfile.mkstemp(prefix='fast_export_bench_', suffix='.fe')
+    os.close(fd)
+    try:
+        generate_stream(path, args.commits, args.files, args.blob_bytes, args.seed)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"📊 Stream: {args.commits} commits, {args.commits * args.files} blobs "
+              f"(~{args.blob_bytes} bytes), {size_mb:.1f} MiB")
+
+        results = []
+        for label, module, bufsize in variants:
+            best = min(parse_once(module, path, bufsize) for _ in range(args.repeat))
+            results.append((label, best))
+            print(f"   {label:<28} {best:7.3f}s  {size_mb / best:8.1f} MiB/s")
+
+        first, last = results[0][1], results[-1][1]
+        print(f"   Speedup vs {results[0][0]}: {first / last:.2f}x")
+    finally:
+        os.unlink(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: git-filter.py path filtering (RepoFilter._filter_files) with
+hundreds of --path, --path-glob, --path-regex and --path-rename rules, as
+given by a --paths-from-file listing, over synthetic commits that touch many
+distinct paths.
+
+    python benchmark_path_filters.py [--paths 200000] [--rules 10,100,1000]
+    python benchmark_path_filters.py --baseline /tmp/git-filter-old.py
+
+--baseline filters the same commits with another copy of git-filter.py (e.g.
+`git show HEAD~1:git-filter.py > /tmp/git-filter-old.py`) and checks that
+both keep and rename exactly the same files.
+"""
+
+import importlib.util
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+GIT_FILTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'git-filter.py')
+
+def load_git_filter(path, name):
+    """Import a git-filter.py (not importable by name because of the dash)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def make_paths(count, rng):
+    """Source-tree-like pathnames, a few directories deep"""
+    tops = ['src', 'lib', 'docs', 'tests', 'vendor', 'tools', 'config', 'assets']
+    extensions = ['py', 'c', 'h', 'md', 'json', 'txt', 'png', 'key', 'pem', 'yml']
+    paths = set()
+    while len(paths) < count:
+        parts = [rng.choice(tops)] + [f"pkg{rng.randint(0, 40)}" for _ in range(rng.randint(0, 3))]
+        parts.append(f"file{rng.randint(0, 9999)}.{rng.choice(extensions)}")
+        paths.add('/'.join(parts).encode())
+    return sorted(paths)
+
+def write_rules(path, count, paths, rng):
+    """A --paths-from-file listing: mostly literal files and directories,
+    then some globs and regexes, and a few renames"""
+    rules = []
+    for _ in range(count * 7 // 10):
+        # A whole file or some directory below the top level one
+        parts = rng.choice(paths).split(b'/')
+        rules.append(b'/'.join(parts[:rng.randint(min(2, len(parts)), len(parts))]))
+    for _ in range(count * 15 // 100):
+        rules.append(b'glob:*/pkg%d/*.%s' % (rng.randint(0, 40), rng.choice([b'key', b'pem', b'png'])))
+    for _ in range(count * 10 // 100):
+        rules.append(b'regex:^(?:src|lib)/pkg%d/.*[.]json$' % rng.randint(0, 40))
+    for number in range(max(1, count * 5 // 100)):
+        rules.append(b'vendor/pkg%d/==>third_party/pkg%d/' % (number, number))
+    with open(path, 'wb') as f:
+        f.write(b''.join(rule + b'\n' for rule in rules))
+
+def filter_commits(module, rules_file, commits):
+    """Seconds to run RepoFilter._filter_files() over the commits, and the
+    resulting filenames of each"""
+    args = module.FilteringOptions.parse_args(['--force', '--paths-from-file', rules_file])
+    repo_filter = module.RepoFilter(args)
+    results = []
+    start = time.perf_counter()
+    for paths in commits:
+        commit = types.SimpleNamespace(original_id=b'0' * 40,
+                                       file_changes=[module.FileChange(b'M', path, b'1', b'100644')
+                                                     for path in paths])
+        repo_filter._filter_files(commit)
+        results.append([change.filename for change in commit.file_changes])
+    return time.perf_counter() - start, results
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Path filtering rules benchmark')
+    parser.add_argument('--paths', type=int, default=200000, help='Distinct paths touched by the commits')
+    parser.add_argument('--per-commit', type=int, default=20, help='Paths changed per commit')
+    parser.add_argument('--rules', default='10,100,1000', help='Comma-separated rule counts to compare')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per variant; the best one is reported')
+    parser.add_argument('--baseline', metavar='GIT_FILTER_PY', help='Older git-filter.py to compare against')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    paths = make_paths(args.paths, rng)
+    shuffled = paths[:]
+    rng.shuffle(shuffled)
+    # Each path first shows up in one commit; a quarter are touched again later
+    touched = shuffled + rng.sample(shuffled, len(shuffled) // 4)
+    commits = [sorted(set(touched[i:i + args.per_commit])) for i in range(0, len(touched), args.per_commit)]
+
+    variants = [('current', load_git_filter(GIT_FILTER, 'git_filter_repo'))]
+    if args.baseline:
+        variants.insert(0, ('baseline', load_git_filter(args.baseline, 'git_filter_repo_baseline')))
+
+    workdir = tempfile.mkdtemp(prefix='path_filters_bench_')
+    try:
+        print(f"📊 {len(commits)} commits touching {args.paths} distinct paths, {args.per_commit} per commit")
+        print(f"   {'RULES':>6}  {'VARIANT':<10} {'FILTER s':>9} {'KEPT':>8} {'PATHS/s':>10}")
+        for count in [int(count) for count in args.rules.split(',')]:
+            rules_file = os.path.join(workdir, f"paths_{count}.txt")
+            write_rules(rules_file, count, paths, rng)
+            results = {}
+            for label, module in variants:
+                runs = [filter_commits(module, rules_file, commits) for _ in range(args.repeat)]
+                best = min(elapsed for elapsed, _ in runs)
+                results[label] = (best, runs[0][1])
+                kept = sum(len(names) for names in runs[0][1])
+                print(f"   {count:>6}  {label:<10} {best:>9.3f} {kept:>8} {args.paths / best:>10.0f}")
+
+            if args.baseline:
+                if results['baseline'][1] != results['current'][1]:
+                    print(f"❌ Filtered paths differ between baseline and current with {count} rules")
+                    sys.exit(1)
+                print(f"   {'':>6}  Speedup vs baseline: {results['baseline'][0] / results['current'][0]:.2f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
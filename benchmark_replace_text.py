@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark: git-filter.py --replace-text with 1, 100 and 1000 literal patterns,
+one bytes.replace pass per literal (previous behaviour) vs the merged
+single-pass matcher, over the blobs of a synthetic repository.
+
+    python benchmark_replace_text.py [--commits 400] [--patterns 1,100,1000] [--end-to-end]
+"""
+
+import importlib.util
+import os
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+GIT_FILTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'git-filter.py')
+
+def load_git_filter():
+    """Import git-filter.py (not importable by name because of the dash)"""
+    spec = importlib.util.spec_from_file_location('git_filter_repo', GIT_FILTER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def make_keys(count, rng):
+    """Access key IDs and secret keys shaped like the ones in iam_users_credentials_*.json"""
+    keys = set()
+    while len(keys) < count:
+        if len(keys) % 2:
+            keys.add('AKIA' + ''.join(rng.choices(string.ascii_uppercase + string.digits, k=16)))
+        else:
+            keys.add(''.join(rng.choices(string.ascii_letters + string.digits + '+/', k=40)))
+    return sorted(keys)
+
+def build_repo(path, commits, files, leaked_keys, rng):
+    """Config/code-like text files with some leaked keys, plus a few binary files"""
+    words = ['region', 'us-east-1', 'aws_access_key_id', 'aws_secret_access_key', 'cluster', 'eks',
+             'instance_type', 't3.micro', 'def', 'return', 'self', 'import', 'boto3', '=', ':', '#']
+    stream = []
+    for number in range(1, commits + 1):
+        message = f"Update configs ({number})\n".encode()
+        stream.append(b'commit refs/heads/main\nmark :%d\ncommitter Bench <bench@example.com> %d +0000\n'
+                      % (number, 1700000000 + number * 60))
+        stream.append(b'data %d\n%s' % (len(message), message))
+        if number > 1:
+            stream.append(b'from :%d\n' % (number - 1))
+        for index in rng.sample(range(files), min(files, 4)):
+            lines = []
+            for _ in range(rng.randint(20, 600)):
+                line = ' '.join(rng.choice(words) for _ in range(rng.randint(3, 12)))
+                if rng.random() < 0.01:
+                    line += f" = {rng.choice(leaked_keys)}"
+                lines.append(line)
+            body = ('\n'.join(lines) + '\n').encode()
+            if index % 23 == 0:
+                body = b'\0PNG' + body
+            stream.append(b'M 100644 inline src/module%d/config%d.py\ndata %d\n%s\n'
+                          % (index % 9, index, len(body), body))
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    subprocess.run(['git', '-C', path, 'fast-import', '--quiet'], input=b''.join(stream), check=True)
+    subprocess.run(['git', '-C', path, 'reset', '-q', '--hard', 'main'], check=True)
+
+def read_blobs(path):
+    output = subprocess.run(['git', '-C', path, 'cat-file', '--batch-all-objects', '--batch'],
+                            check=True, capture_output=True).stdout
+    blobs, position = [], 0
+    while position < len(output):
+        header_end = output.index(b'\n', position)
+        _, kind, size = output[position:header_end].split()
+        start = header_end + 1
+        if kind == b'blob':
+            blobs.append(output[start:start + int(size)])
+        position = start + int(size) + 1
+    return blobs
+
+def run_passes(gfr, blobs, replace_text, legacy):
+    """Replace in every non-binary blob, like RepoFilter._tweak_blob"""
+    results = []
+    start = time.perf_counter()
+    for data in blobs:
+        if not gfr._is_binary(data):
+            if legacy:
+                for literal, replacement in replace_text['literals']:
+                    data = data.replace(literal, replacement)
+                for regex, replacement in replace_text['regexes']:
+                    data = regex.sub(replacement, data)
+            else:
+                data = gfr._apply_replace_text(data, replace_text)
+        results.append(data)
+    return time.perf_counter() - start, results
+
+def run_filter(source, workdir, expressions):
+    clone = os.path.join(workdir, 'clone')
+    shutil.rmtree(clone, ignore_errors=True)
+    subprocess.run(['git', 'clone', '-q', '--no-local', source, clone], check=True)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, GIT_FILTER, '--replace-text', expressions, '--force', '--quiet'],
+                   cwd=clone, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='--replace-text literal matching benchmark')
+    parser.add_argument('--commits', type=int, default=400, help='Commits in the synthetic repository')
+    parser.add_argument('--files', type=int, default=120, help='Distinct files in the synthetic repository')
+    parser.add_argument('--patterns', default='1,100,1000', help='Comma-separated literal counts to compare')
+    parser.add_argument('--end-to-end', action='store_true', help='Also time a full git-filter.py run per count')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data')
+    args = parser.parse_args()
+
+    gfr = load_git_filter()
+    rng = random.Random(args.seed)
+    counts = [int(count) for count in args.patterns.split(',')]
+    all_keys = make_keys(max(counts), rng)
+
+    workdir = tempfile.mkdtemp(prefix='replace_text_bench_')
+    try:
+        source = os.path.join(workdir, 'source')
+        # Leak a sample of the keys so every pattern count has real matches
+        build_repo(source, args.commits, args.files, all_keys[::max(1, len(all_keys) // 50)], rng)
+        blobs = read_blobs(source)
+        total_mb = sum(len(blob) for blob in blobs) / 1024 / 1024
+        print(f"📊 Synthetic repo: {args.commits} commits, {len(blobs)} blobs, {total_mb:.1f} MiB")
+
+        header = f"   {'PATTERNS':>8}  {'PASSES':>6}  {'LEGACY s':>9}  {'MERGED s':>9}  {'SPEEDUP':>7}  {'MiB/s':>7}"
+        if args.end_to_end:
+            header += f"  {'FILTER s':>8}"
+        print(header)
+        for count in counts:
+            expressions = os.path.join(workdir, f"expressions_{count}.txt")
+            with open(expressions, 'w', encoding='utf-8') as f:
+                # Leaked keys first, as a credentials file would list them
+                f.write(''.join(f"{key}\n" for key in all_keys[::max(1, len(all_keys) // count)][:count]))
+            replace_text = gfr.FilteringOptions.get_replace_text(expressions)
+
+            legacy_time, legacy = run_passes(gfr, blobs, replace_text, legacy=True)
+            merged_time, merged = run_passes(gfr, blobs, replace_text, legacy=False)
+            if legacy != merged:
+                print(f"❌ Merged matcher changed the result with {count} patterns")
+                sys.exit(1)
+
+            line = (f"   {count:>8}  {len(replace_text['literal_passes']):>6}  {legacy_time:>9.3f}  "
+                    f"{merged_time:>9.3f}  {legacy_time / merged_time:>6.1f}x  {total_mb / merged_time:>7.1f}")
+            if args.end_to_end:
+                line += f"  {run_filter(source, workdir, expressions):>8.2f}"
+            print(line)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: timestamp_utils.to_utc vs the previous strptime trial-and-error
+in AWSCostCalculator.parse_and_convert_to_utc.
+
+    python benchmark_timestamp_parsing.py [--count 100000]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from timestamp_utils import to_utc
+
+def legacy_parse_and_convert_to_utc(time_string):
+    """The previous implementation, kept here only as the benchmark baseline"""
+    if not time_string or time_string in ['Unknown', '']:
+        return datetime.now(timezone.utc)
+
+    ist_tz = timezone(timedelta(hours=5, minutes=30))
+
+    try:
+        formats = [
+            '%Y-%m-%d %H:%M:%S.%f',
+            '%Y-%m-%d %H:%M:%S',
+            '%Y-%m-%dT%H:%M:%S.%fZ',
+            '%Y-%m-%dT%H:%M:%SZ',
+            '%Y-%m-%dT%H:%M:%S.%f%z',
+            '%Y-%m-%dT%H:%M:%S%z',
+        ]
+
+        for fmt in formats:
+            try:
+                if 'Z' in time_string:
+                    clean_time = time_string.replace('Z', '')
+                    parsed_time = datetime.strptime(clean_time, fmt.replace('Z', ''))
+                    return parsed_time.replace(tzinfo=timezone.utc)
+                elif '+' in time_string or time_string.endswith('IST'):
+                    if time_string.endswith('IST'):
+                        clean_time = time_string.replace(' IST', '')
+                        parsed_time = datetime.strptime(clean_time, fmt.replace('%z', ''))
+                        return parsed_time.replace(tzinfo=ist_tz).astimezone(timezone.utc)
+                    else:
+                        parsed_time = datetime.strptime(time_string, fmt)
+                        return parsed_time.astimezone(timezone.utc)
+                else:
+                    parsed_time = datetime.strptime(time_string, fmt)
+                    return parsed_time.replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+
+        if 'T' in time_string:
+            return datetime.fromisoformat(time_string.replace('Z', '+00:00')).astimezone(timezone.utc)
+
+        parsed_time = datetime.strptime(time_string, '%Y-%m-%d %H:%M:%S')
+        return parsed_time.replace(tzinfo=timezone.utc)
+
+    except Exception:
+        return datetime.now(timezone.utc)
+
+def build_samples(count):
+    """Mix of the shapes found in state files and live API responses"""
+    base = datetime(2025, 6, 3, 12, 10, 46, 123000, tzinfo=timezone.utc)
+    samples = []
+    for i in range(count):
+        dt = base + timedelta(minutes=i)
+        shape = i % 5
+        if shape == 0:
+            samples.append(dt.strftime('%Y-%m-%d %H:%M:%S'))
+        elif shape == 1:
+            samples.append(dt.strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+        elif shape == 2:
+            samples.append(str(dt))  # '2025-06-03 12:10:46.123000+00:00', as str(createdAt)
+        elif shape == 3:
+            samples.append(dt.astimezone(timezone(timedelta(hours=5, minutes=30))).strftime('%Y-%m-%d %H:%M:%S IST'))
+        else:
+            samples.append(dt.strftime('%Y-%m-%d %H:%M:%S.%f'))
+    return samples
+
+def run(parse, samples):
+    start = time.perf_counter()
+    for sample in samples:
+        parse(sample)
+    return time.perf_counter() - start
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Timestamp parsing micro-benchmark')
+    parser.add_argument('--count', type=int, default=100000, help='Number of timestamps to parse')
+    args = parser.parse_args()
+
+    samples = build_samples(args.count)
+
+    # Both parsers must agree before timing means anything. The legacy loop cannot
+    # parse str(datetime) with a +00:00 offset and returns "now" for it; skip those.
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=1)
+    checked = [(s, legacy_parse_and_convert_to_utc(s)) for s in samples[:1000]]
+    legacy_fallbacks = sum(1 for _, legacy in checked if legacy > cutoff)
+    mismatches = [s for s, legacy in checked if legacy <= cutoff and legacy != to_utc(s)]
+    if legacy_fallbacks:
+        print(f"ℹ️  Legacy parser fell back to the current time for {legacy_fallbacks}/{len(checked)} checked samples")
+    if mismatches:
+        print(f"❌ Parsers disagree on {len(mismatches)} sample(s), e.g. {mismatches[0]!r}")
+        sys.exit(1)
+
+    legacy_time = run(legacy_parse_and_convert_to_utc, samples)
+    fast_time = run(to_utc, samples)
+
+    print(f"📊 Parsed {args.count} timestamps ({len(set(s.translate(str.maketrans('0123456789', '9999999999')) for s in samples))} shapes)")
+    print(f"   Legacy strptime loop: {legacy_time:.3f}s ({legacy_time / args.count * 1e6:.2f} µs each)")
+    print(f"   timestamp_utils:      {fast_time:.3f}s ({fast_time / args.count * 1e6:.2f} µs each)")
+    print(f"   Speedup: {legacy_time / fast_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
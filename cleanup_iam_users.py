@@ -6,6 +6,7 @@ import sys
 import os
 from datetime import datetime
 from botocore.exceptions import ClientError, BotoCoreError
+from credential_validator import get_credential_validator
 
 class IAMUserCleanup:
     def __init__(self, config_file='aws_accounts_config.json', mapping_file='user_mapping.json'):
@@ -83,8 +84,8 @@ class IAMUserCleanup:
                 region_name='us-east-1'
             )
             
-            # Test the connection
-            iam_client.get_user()
+            # Key pair is checked once per process via STS instead of a per-client probe
+            get_credential_validator().validate(account_config['access_key'], account_config['secret_key'])
             return iam_client, account_config
             
         except ClientError as e:
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class CostEngine:
+    """Columnar cost engine: prices many EC2 instances or EKS clusters in one vectorized pass"""
+
+    def __init__(self, calculator):
+        """
+        Initialize the cost engine
+
+        Args:
+            calculator (AWSCostCalculator): Source of rates and of the per-record fallback
+        """
+        self.calculator = calculator
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    @staticmethod
+    def _index(keys: List, rate_fn) -> Tuple[object, object]:
+        """Map each key to a rate index, looking every distinct key up only once"""
+        positions = {}
+        rates = []
+        index = np.empty(len(keys), dtype=np.intp)
+
+        for i, key in enumerate(keys):
+            position = positions.get(key)
+            if position is None:
+                position = positions[key] = len(rates)
+                rates.append(rate_fn(key))
+            index[i] = position
+
+        return np.asarray(rates, dtype=np.float64), index
+
+    @staticmethod
+    def _disk_size(value, default: int = 20) -> int:
+        if isinstance(value, str):
+            return int(value) if value.isdigit() else default
+        return value
+
+    def ec2_costs(self, records: List[Tuple[Dict, Optional[Dict]]]) -> List[Dict]:
+        """
+        Price EC2 instances, same breakdown as AWSCostCalculator.calculate_live_ec2_cost
+
+        Args:
+            records (list): (instance_data, live_instance_data) pairs
+        """
+        if np is None or not records:
+            return [self.calculator.calculate_live_ec2_cost(data, live) for data, live in records]
+
+        count = len(records)
+        current_time = self.calculator.get_current_time()
+        launch_times = []
+        launch_epochs = np.full(count, np.nan)
+        instance_types = []
+        regions = []
+        disk_sizes = np.empty(count, dtype=np.float64)
+        parsed_created = {}  # created_at string -> datetime, shared by records from the same run
+
+        for i, (instance_data, live_instance_data) in enumerate(records):
+            launch_time = None
+            if live_instance_data and 'LaunchTime' in live_instance_data:
+                launch_time = live_instance_data['LaunchTime']
+                if hasattr(launch_time, 'replace'):
+                    launch_time = launch_time.replace(tzinfo=timezone.utc)
+
+            if not launch_time:
+                created_at = instance_data.get('created_at', '')
+                if created_at:
+                    if created_at not in parsed_created:
+                        try:
+                            parsed_created[created_at] = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+                        except (TypeError, ValueError):
+                            parsed_created[created_at] = None
+                    launch_time = parsed_created[created_at]
+
+            launch_times.append(launch_time)
+            if launch_time:
+                launch_epochs[i] = launch_time.timestamp()
+
+            instance_types.append(instance_data.get('instance_type', 'unknown'))
+            regions.append(instance_data.get('region', 'us-east-1'))
+            disk_sizes[i] = self._disk_size(instance_data.get('disk_size', 20))
+
+        rates, rate_index = self._index(list(zip(instance_types, regions)),
+                                        lambda key: self.calculator.get_ec2_hourly_rate(*key, default=0.05))
+        storage_rates, storage_rate_index = self._index(regions, lambda region: self.calculator.catalog.get_ebs_monthly_rate('gp3', region))
+
+        # One pass over all columns; missing launch times fall back to 24 hours
+        hours = np.where(np.isnan(launch_epochs), 24.0,
+                         np.maximum(0.01, (current_time.timestamp() - launch_epochs) / 3600))
+        hourly_rates = rates[rate_index]
+        compute_costs = hourly_rates * hours
+        storage_costs = disk_sizes * storage_rates[storage_rate_index] * (hours / 24 / 30)
+        total_costs = compute_costs + storage_costs
+
+        results = []
+        for i, (instance_data, live_instance_data) in enumerate(records):
+            current_state = 'unknown'
+            if live_instance_data:
+                current_state = live_instance_data.get('State', {}).get('Name', 'unknown')
+
+            disk_size_gb = self._disk_size(instance_data.get('disk_size', 20))
+            results.append({
+                'instance_id': instance_data.get('instance_id', 'unknown'),
+                'instance_type': instance_types[i],
+                'hours_running': float(hours[i]),
+                'hourly_rate': float(hourly_rates[i]),
+                'compute_cost': float(compute_costs[i]),
+                'storage_cost': float(storage_costs[i]),
+                'total_cost': float(total_costs[i]),
+                'disk_size_gb': disk_size_gb,
+                'current_state': current_state,
+                'launch_time': launch_times[i],
+                'calculation_time': current_time
+            })
+
+        return results
+
+    def eks_costs(self, records: List[Tuple[Dict, Optional[Dict]]]) -> List[Dict]:
+        """
+        Price EKS clusters, same breakdown as AWSCostCalculator.calculate_live_eks_cost
+
+        Args:
+            records (list): (cluster_data, live_cluster_data) pairs
+        """
+        if np is None or not records:
+            return [self.calculator.calculate_live_eks_cost(data, live) for data, live in records]
+
+        count = len(records)
+        current_time_utc = datetime.now(timezone.utc)
+        created_times = []
+        created_epochs = np.empty(count, dtype=np.float64)
+        node_counts = np.empty(count, dtype=np.float64)
+        disk_sizes = np.empty(count, dtype=np.float64)
+        rate_keys = []
+        regions = []
+        statuses = []
+
+        for i, (cluster_data, live_cluster_data) in enumerate(records):
+            if live_cluster_data and 'createdAt' in live_cluster_data:
+                created_at = live_cluster_data['createdAt']
+                if hasattr(created_at, 'tzinfo'):
+                    if created_at.tzinfo is None:
+                        created_at = created_at.replace(tzinfo=timezone.utc)
+                    elif created_at.tzinfo != timezone.utc:
+                        created_at = created_at.astimezone(timezone.utc)
+                else:
+                    created_at = self.calculator.parse_and_convert_to_utc(str(created_at))
+            else:
+                created_str = cluster_data.get('created_time', '')
+                if not created_str:
+                    created_str = cluster_data.get('creation_time', cluster_data.get('created_on', ''))
+                created_at = self.calculator.parse_and_convert_to_utc(created_str)
+
+            created_times.append(created_at)
+            created_epochs[i] = created_at.timestamp()
+
+            if live_cluster_data and 'nodegroups' in live_cluster_data:
+                node_counts[i] = sum(ng.get('scalingConfig', {}).get('desiredSize', 0)
+                                     for ng in live_cluster_data['nodegroups'])
+                statuses.append(live_cluster_data.get('status', 'UNKNOWN'))
+            else:
+                node_counts[i] = int(cluster_data.get('default_nodes', cluster_data.get('min_nodes', 1)))
+                statuses.append('UNKNOWN (from stored data)')
+
+            region = cluster_data.get('region', 'us-east-1')
+            regions.append(region)
+            rate_keys.append((cluster_data.get('instance_type', 't3.medium'), region))
+            disk_sizes[i] = int(cluster_data.get('disk_size', 20))
+
+        node_rates, node_rate_index = self._index(rate_keys, lambda key: self.calculator.get_ec2_hourly_rate(*key))
+        storage_rates, storage_rate_index = self._index(regions, lambda region: self.calculator.get_ebs_hourly_rate('gp3', region))
+
+        hours = np.maximum(0, (current_time_utc.timestamp() - created_epochs) / 3600)
+        hourly_rates = node_rates[node_rate_index]
+        storage_hourly_rates = storage_rates[storage_rate_index]
+        control_plane_costs = hours * self.calculator.EKS_CLUSTER_HOURLY_COST
+        node_compute_costs = hours * hourly_rates * node_counts
+        node_storage_costs = hours * storage_hourly_rates * disk_sizes * node_counts
+        total_costs = control_plane_costs + node_compute_costs + node_storage_costs
+
+        results = []
+        for i in range(count):
+            hours_running = float(hours[i])
+            actual_nodes = int(node_counts[i])
+            disk_size_gb = int(disk_sizes[i])
+            hourly_rate = float(hourly_rates[i])
+            storage_hourly_rate = float(storage_hourly_rates[i])
+            control_plane_cost = float(control_plane_costs[i])
+            node_compute_cost = float(node_compute_costs[i])
+            node_storage_cost = float(node_storage_costs[i])
+
+            results.append({
+                'total_cost': float(total_costs[i]),
+                'control_plane_cost': control_plane_cost,
+                'node_compute_cost': node_compute_cost,
+                'node_storage_cost': node_storage_cost,
+                'hours_running': hours_running,
+                'calculation_time': current_time_utc,
+                'cluster_created_at_utc': created_times[i],
+                'current_status': statuses[i],
+                'actual_nodes': actual_nodes,
+                'instance_type': rate_keys[i][0],
+                'disk_size_gb': disk_size_gb,
+                'hourly_rate': hourly_rate,
+                'control_plane_hourly_rate': self.calculator.EKS_CLUSTER_HOURLY_COST,
+                'node_storage_hourly_rate': storage_hourly_rate,
+                'cost_breakdown': {
+                    'control_plane': {
+                        'hours': hours_running,
+                        'rate_per_hour': self.calculator.EKS_CLUSTER_HOURLY_COST,
+                        'total': control_plane_cost
+                    },
+                    'compute': {
+                        'hours': hours_running,
+                        'rate_per_hour': hourly_rate,
+                        'nodes': actual_nodes,
+                        'total': node_compute_cost
+                    },
+                    'storage': {
+                        'hours': hours_running,
+                        'rate_per_gb_hour': storage_hourly_rate,
+                        'total_gb': disk_size_gb * actual_nodes,
+                        'total': node_storage_cost
+                    }
+                }
+            })
+
+        return results
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+class CostHistoryStore:
+    """SQLite time series of live cost runs, aggregated offline by account, user, region and day"""
+
+    DEFAULT_DB = os.path.join('livecost', 'cost_history.db')
+
+    # CLI dimension name -> column
+    DIMENSIONS = {
+        'account': 'account',
+        'user': 'username',
+        'region': 'region',
+        'day': 'day',
+        'type': 'resource_type',
+        'resource': 'resource_id',
+    }
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cost_samples (
+            run_id TEXT NOT NULL,
+            recorded_at TEXT NOT NULL,
+            day TEXT NOT NULL,
+            resource_type TEXT NOT NULL,
+            resource_id TEXT NOT NULL,
+            account TEXT,
+            username TEXT,
+            region TEXT,
+            instance_type TEXT,
+            hours REAL,
+            compute_cost REAL,
+            storage_cost REAL,
+            control_plane_cost REAL,
+            total_cost REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_samples_resource ON cost_samples (resource_type, resource_id, recorded_at);
+
+        -- Highest cumulative cost seen per resource per day; queries only touch this table
+        CREATE TABLE IF NOT EXISTS cost_daily (
+            resource_type TEXT NOT NULL,
+            resource_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            account TEXT,
+            username TEXT,
+            region TEXT,
+            instance_type TEXT,
+            hours REAL,
+            compute_cost REAL,
+            storage_cost REAL,
+            control_plane_cost REAL,
+            total_cost REAL,
+            PRIMARY KEY (resource_type, resource_id, day)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_daily_day ON cost_daily (day);
+        CREATE INDEX IF NOT EXISTS idx_daily_account_day ON cost_daily (account, day);
+    """
+
+    def __init__(self, db_file: str = DEFAULT_DB):
+        """
+        Open (and create if needed) the cost history database
+
+        Args:
+            db_file (str): SQLite file, kept next to the livecost/<date> text reports
+        """
+        self.db_file = db_file
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(self.db_file)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _ist_day(dt: datetime) -> str:
+        # Same IST calendar day as the livecost/<date> report folders
+        return dt.astimezone(timezone(timedelta(hours=5, minutes=30))).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def _row_from_report(report: Dict, resource_type: str) -> Optional[Dict]:
+        """Flatten one successful execution report entry into a cost row"""
+        if report.get('status') != 'success':
+            return None
+
+        cost_data = report.get('cost_data', {})
+        calculation_time = cost_data.get('calculation_time')
+        if not isinstance(calculation_time, datetime):
+            calculation_time = datetime.now(timezone.utc)
+
+        if resource_type == 'eks':
+            compute_cost = cost_data.get('node_compute_cost', 0)
+            storage_cost = cost_data.get('node_storage_cost', 0)
+            control_plane_cost = cost_data.get('control_plane_cost', 0)
+        else:
+            compute_cost = cost_data.get('compute_cost', 0)
+            storage_cost = cost_data.get('storage_cost', 0)
+            control_plane_cost = 0
+
+        return {
+            'recorded_at': calculation_time.astimezone(timezone.utc).isoformat(),
+            'day': CostHistoryStore._ist_day(calculation_time),
+            'resource_type': resource_type,
+            'resource_id': report['resource_id'],
+            'account': report.get('account'),
+            'username': report.get('username'),
+            'region': report.get('region'),
+            'instance_type': cost_data.get('instance_type'),
+            'hours': cost_data.get('hours_running', 0),
+            'compute_cost': compute_cost,
+            'storage_cost': storage_cost,
+            'control_plane_cost': control_plane_cost,
+            'total_cost': cost_data.get('total_cost', 0),
+        }
+
+    def append_reports(self, reports: Iterable[Dict], resource_type: str, run_id: str) -> int:
+        """
+        Append the successful entries of one cost run
+
+        Args:
+            reports (iterable): AWSResourceManager.execution_reports entries
+            resource_type (str): 'ec2' or 'eks'
+            run_id (str): Identifier of the run, e.g. the report timestamp
+
+        Returns:
+            int: Number of rows stored
+        """
+        rows = [row for row in (self._row_from_report(r, resource_type) for r in reports) if row]
+        if not rows:
+            return 0
+
+        for row in rows:
+            row['run_id'] = run_id
+
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO cost_samples (run_id, recorded_at, day, resource_type, resource_id, account,
+                    username, region, instance_type, hours, compute_cost, storage_cost, control_plane_cost, total_cost)
+                VALUES (:run_id, :recorded_at, :day, :resource_type, :resource_id, :account,
+                    :username, :region, :instance_type, :hours, :compute_cost, :storage_cost, :control_plane_cost, :total_cost)
+            """, rows)
+
+            # Costs are cumulative since launch, so the day keeps its highest reading
+            self.conn.executemany("""
+                INSERT INTO cost_daily (resource_type, resource_id, day, account, username, region, instance_type,
+                    hours, compute_cost, storage_cost, control_plane_cost, total_cost)
+                VALUES (:resource_type, :resource_id, :day, :account, :username, :region, :instance_type,
+                    :hours, :compute_cost, :storage_cost, :control_plane_cost, :total_cost)
+                ON CONFLICT (resource_type, resource_id, day) DO UPDATE SET
+                    account = COALESCE(excluded.account, account),
+                    username = COALESCE(excluded.username, username),
+                    region = COALESCE(excluded.region, region),
+                    instance_type = COALESCE(excluded.instance_type, instance_type),
+                    hours = excluded.hours,
+                    compute_cost = excluded.compute_cost,
+                    storage_cost = excluded.storage_cost,
+                    control_plane_cost = excluded.control_plane_cost,
+                    total_cost = excluded.total_cost
+                WHERE excluded.total_cost >= cost_daily.total_cost
+            """, rows)
+
+        return len(rows)
+
+    def aggregate(self, group_by: List[str], since: Optional[str] = None, until: Optional[str] = None,
+                  account: Optional[str] = None, username: Optional[str] = None,
+                  region: Optional[str] = None) -> List[Dict]:
+        """
+        Roll up spend without touching AWS
+
+        Spend for a resource on a day is its cumulative cost that day minus its
+        cumulative cost on the previous day it was seen, so repeated runs are not
+        double counted. The first day a resource is seen carries its cost so far.
+
+        Args:
+            group_by (list): Dimensions from DIMENSIONS, e.g. ['account', 'day']
+            since/until (str): Inclusive YYYY-MM-DD bounds (IST days)
+            account/username/region (str): Optional filters
+
+        Returns:
+            list: One dict per group with 'spend', 'compute', 'storage', 'control_plane', 'resources'
+        """
+        columns = [self.DIMENSIONS[name] for name in group_by]
+
+        filters = []
+        params = []
+        for column, value in (('day >=', since), ('day <=', until), ('account =', account),
+                              ('username =', username), ('region =', region)):
+            if value:
+                filters.append(f"{column} ?")
+                params.append(value)
+
+        select_columns = ''.join(f"{column}, " for column in columns)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ''
+        group = f"GROUP BY {', '.join(columns)} ORDER BY {', '.join(columns)}" if columns else ''
+
+        def delta(column: str) -> str:
+            return (f"{column} - COALESCE(LAG({column}) OVER "
+                    f"(PARTITION BY resource_type, resource_id ORDER BY day), 0)")
+
+        query = f"""
+            WITH daily AS (
+                SELECT resource_type, resource_id, day, account, username, region,
+                    {delta('total_cost')} AS spend,
+                    {delta('compute_cost')} AS compute,
+                    {delta('storage_cost')} AS storage,
+                    {delta('control_plane_cost')} AS control_plane
+                FROM cost_daily
+            )
+            SELECT {select_columns}SUM(spend), SUM(compute), SUM(storage), SUM(control_plane),
+                COUNT(DISTINCT resource_type || ':' || resource_id)
+            FROM daily
+            {where}
+            {group}
+        """
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        results = []
+        for row in rows:
+            result = dict(zip(group_by, row[:len(columns)]))
+            result.update({
+                'spend': row[len(columns)] or 0,
+                'compute': row[len(columns) + 1] or 0,
+                'storage': row[len(columns) + 2] or 0,
+                'control_plane': row[len(columns) + 3] or 0,
+                'resources': row[len(columns) + 4],
+            })
+            results.append(result)
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Aggregate recorded live cost runs without calling AWS',
+        epilog="Example: python cost_history_store.py --by account day --since 2025-06-01 --account account01"
+    )
+    parser.add_argument('--db', default=CostHistoryStore.DEFAULT_DB, help='Cost history database')
+    parser.add_argument('--by', nargs='+', default=['account'], choices=list(CostHistoryStore.DIMENSIONS),
+                       help='Dimensions to group by')
+    parser.add_argument('--since', help='First IST day (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Last IST day (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, help='Shortcut for --since N days ago')
+    parser.add_argument('--account', help='Only this account')
+    parser.add_argument('--user', help='Only this IAM user')
+    parser.add_argument('--region', help='Only this region')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ No cost history at {args.db} - run a live cost calculation first")
+        sys.exit(1)
+
+    since = args.since
+    if args.days:
+        since = CostHistoryStore._ist_day(datetime.now(timezone.utc) - timedelta(days=args.days - 1))
+
+    store = CostHistoryStore(args.db)
+    try:
+        rows = store.aggregate(args.by, since=since, until=args.until, account=args.account,
+                               username=args.user, region=args.region)
+    finally:
+        store.close()
+
+    if not rows:
+        print("No recorded costs match the filters")
+        return
+
+    header = [name.upper() for name in args.by] + ['SPEND', 'COMPUTE', 'STORAGE', 'CONTROL', 'RES']
+    table = [[str(row[name]) for name in args.by] +
+             [f"${row['spend']:.2f}", f"${row['compute']:.2f}", f"${row['storage']:.2f}",
+              f"${row['control_plane']:.2f}", str(row['resources'])] for row in rows]
+    widths = [max(len(line[i]) for line in [header] + table) for i in range(len(header))]
+
+    print("  ".join(h.ljust(w) for h, w in zip(header, widths)))
+    print("  ".join("-" * w for w in widths))
+    for line in table:
+        print("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
+    print(f"\n💰 Total spend: ${sum(row['spend'] for row in rows):.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ import re
 from datetime import datetime
 from botocore.exceptions import ClientError, BotoCoreError
 from logger import setup_logger
+from instance_state_waiter import InstanceStateWaiter
+from credentials_resolver import get_credentials_resolver
+from credential_validator import get_credential_validator
 
 class EC2InstanceManager:
     def __init__(self, ami_mapping_file='ec2-region-ami-mapping.json', userdata_file='userdata.sh'):
@@ -18,6 +21,9 @@ class EC2InstanceManager:
         self.userdata_file = userdata_file
         self.logger = setup_logger("ec2_instance_manager", "ec2_creation")
         
+        # One shared poller per account/region instead of a sleep loop per instance
+        self.state_waiter = InstanceStateWaiter(log_fn=self.log_operation)
+        
         # Find the latest credentials file
         self.credentials_file = self.find_latest_credentials_file()
         
@@ -103,42 +109,22 @@ class EC2InstanceManager:
     def find_latest_credentials_file(self):
         """Find the latest iam_users_credentials file based on timestamp"""
         try:
-            # Look for all files matching the pattern
-            pattern = "iam_users_credentials_*.json"
-            matching_files = glob.glob(pattern)
-            
-            if not matching_files:
-                self.logger.error(f"No files found matching pattern: {pattern}")
-                raise FileNotFoundError(f"No IAM credentials files found matching pattern: {pattern}")
-            
-            self.logger.info(f"Found {len(matching_files)} credential files:")
-            
-            # Extract timestamps and sort
-            file_timestamps = []
-            for file_path in matching_files:
-                # Extract timestamp from filename
-                # Expected format: iam_users_credentials_YYYYMMDD_HHMMSS.json
-                match = re.search(r'iam_users_credentials_(\d{8}_\d{6})\.json', file_path)
-                if match:
-                    timestamp_str = match.group(1)
-                    try:
-                        # Parse timestamp to datetime for comparison
-                        timestamp = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                        file_timestamps.append((file_path, timestamp, timestamp_str))
-                        self.logger.info(f"  📄 {file_path} (timestamp: {timestamp_str})")
-                    except ValueError as e:
-                        self.logger.warning(f"  ⚠️  {file_path} has invalid timestamp format: {e}")
-                else:
-                    self.logger.warning(f"  ⚠️  {file_path} doesn't match expected timestamp pattern")
+            resolver = get_credentials_resolver()
+            file_timestamps = resolver.credential_files()
+            skipped_files = resolver.skipped_files()
             
-            if not file_timestamps:
-                raise ValueError("No valid credential files with proper timestamp format found")
+            if not file_timestamps and not skipped_files:
+                self.logger.error(f"No files found matching pattern: {resolver.pattern}")
             
-            # Sort by timestamp (newest first)
-            file_timestamps.sort(key=lambda x: x[1], reverse=True)
+            self.logger.info(f"Found {len(file_timestamps) + len(skipped_files)} credential files:")
+            for file_path, timestamp, timestamp_str in file_timestamps:
+                self.logger.info(f"  📄 {file_path} (timestamp: {timestamp_str})")
+            for file_path, reason in skipped_files:
+                self.logger.warning(f"  ⚠️  {file_path} {reason}")
             
-            # Get the latest file
-            latest_file, latest_timestamp, latest_timestamp_str = file_timestamps[0]
+            # Raises FileNotFoundError / ValueError when nothing usable exists
+            latest_file = resolver.find_latest_credentials_file()
+            _, latest_timestamp, latest_timestamp_str = file_timestamps[0]
             
             self.logger.info(f"🎯 Selected latest file: {latest_file}")
             self.logger.info(f"📅 File timestamp: {latest_timestamp_str}")
@@ -458,8 +444,8 @@ class EC2InstanceManager:
                 region_name=region
             )
             
-            # Test the connection
-            ec2_client.describe_regions(RegionNames=[region])
+            # Key pair is checked once per process via STS instead of a per-client probe
+            get_credential_validator().validate(access_key, secret_key)
             self.log_operation('INFO', f"Successfully connected to EC2 in {region} using access key: {access_key[:10]}...")
             return ec2_client
             
@@ -635,16 +621,15 @@ class EC2InstanceManager:
                 ]
             }
             
-            # use_spot = False
-            # # Add spot instance configuration if requested
-            # if use_spot:
-            #     spot_specification = {
-            #         'MarketType': 'spot',
-            #         'SpotOptions': {
-            #             'SpotInstanceType': 'one-time',  # or 'persistent'
-            #             'InstanceInterruptionBehavior': 'terminate'  # or 'stop' or 'hibernate'
-            #         }
-            #     }
+            # Add spot instance configuration if requested
+            if use_spot:
+                spot_specification = {
+                    'MarketType': 'spot',
+                    'SpotOptions': {
+                        'SpotInstanceType': 'one-time',  # or 'persistent'
+                        'InstanceInterruptionBehavior': 'terminate'  # or 'stop' or 'hibernate'
+                    }
+                }
                 
                 # Add max spot price if specified
                 if max_spot_price:
@@ -685,50 +670,57 @@ class EC2InstanceManager:
             self.log_operation('ERROR', f"❌ Failed to create instance for user {username}: {str(e)}")
             raise
 
-    def wait_for_instance_running(self, ec2_client, instance_id, username, timeout=300):
-        """Wait for instance to be in running state"""
-        self.log_operation('INFO', f"⏳ Waiting for instance {instance_id} to reach running state (timeout: {timeout}s)")
+    def wait_for_instance_running(self, ec2_client, instance_id, username, timeout=300, future=None):
+        """Wait for instance to be in running state (future: an existing state_waiter watch)"""
+        if future is None:
+            self.log_operation('INFO', f"⏳ Waiting for instance {instance_id} to reach running state (timeout: {timeout}s)")
+            future = self.state_waiter.watch(
+                ec2_client,
+                instance_id,
+                ['running'],
+                fail_states=['shutting-down', 'terminated'],
+                timeout=timeout
+            )
         
-        start_time = time.time()
-        last_state = None
+        result = future.result()
+        state = result['state']
+        elapsed_time = result['elapsed_seconds']
         
-        while time.time() - start_time < timeout:
-            try:
-                response = ec2_client.describe_instances(InstanceIds=[instance_id])
-                instance = response['Reservations'][0]['Instances'][0]
-                state = instance['State']['Name']
-                
-                # Log state changes
-                if state != last_state:
-                    self.log_operation('INFO', f"Instance {instance_id} state changed: {last_state} → {state}")
-                    last_state = state
-                
-                if state == 'running':
-                    public_ip = instance.get('PublicIpAddress', 'N/A')
-                    private_ip = instance.get('PrivateIpAddress', 'N/A')
-                    
-                    elapsed_time = int(time.time() - start_time)
-                    self.log_operation('INFO', f"✅ Instance {instance_id} is running (took {elapsed_time}s) - Public: {public_ip}, Private: {private_ip}")
-                    
-                    return {
-                        'state': state,
-                        'public_ip': public_ip,
-                        'private_ip': private_ip,
-                        'startup_time_seconds': elapsed_time
-                    }
-                elif state in ['terminated', 'terminating']:
-                    self.log_operation('ERROR', f"❌ Instance {instance_id} terminated unexpectedly")
-                    return None
-                else:
-                    time.sleep(10)
-                    
-            except Exception as e:
-                self.log_operation('ERROR', f"Error checking instance {instance_id} state: {e}")
-                time.sleep(10)
+        if state == 'running':
+            instance = result['instance']
+            public_ip = instance.get('PublicIpAddress', 'N/A')
+            private_ip = instance.get('PrivateIpAddress', 'N/A')
+            
+            self.log_operation('INFO', f"✅ Instance {instance_id} is running (took {elapsed_time}s) - Public: {public_ip}, Private: {private_ip}")
+            
+            return {
+                'state': state,
+                'public_ip': public_ip,
+                'private_ip': private_ip,
+                'startup_time_seconds': elapsed_time
+            }
+        elif state == 'timeout':
+            self.log_operation('ERROR', f"⏰ Timeout waiting for instance {instance_id} after {elapsed_time} seconds")
+        else:
+            self.log_operation('ERROR', f"❌ Instance {instance_id} terminated unexpectedly")
         
-        elapsed_time = int(time.time() - start_time)
-        self.log_operation('ERROR', f"⏰ Timeout waiting for instance {instance_id} after {elapsed_time} seconds")
         return None
+    
+    def print_instance_success(self, instance_info):
+        """Print the success banner for a created instance"""
+        real_name = instance_info.get('real_user_info', {}).get('full_name', instance_info['username'])
+        
+        print(f"\n🎉 SUCCESS: Instance created for {real_name}")
+        print(f"   👤 Username: {instance_info['username']}")
+        print(f"   📍 Instance ID: {instance_info['instance_id']}")
+        print(f"   🌍 Region: {instance_info['region']}")
+        print(f"   💻 Instance Type: {instance_info['instance_type']}")
+        print(f"   🏦 Account: {instance_info['account_name']} ({instance_info['account_id']})")
+        if 'public_ip' in instance_info:
+            print(f"   🌐 Public IP: {instance_info['public_ip']}")
+        if 'startup_time_seconds' in instance_info:
+            print(f"   ⏱️  Startup Time: {instance_info['startup_time_seconds']}s")
+        print("-" * 60)
 
     def create_instances_for_selected_accounts(self, selected_accounts, instance_type='t3.micro', wait_for_running=True):
         """Create EC2 instances for users in selected accounts"""
@@ -746,6 +738,7 @@ class EC2InstanceManager:
                          for account_data in selected_accounts.values())
         self.log_operation('INFO', f"Total users to process: {total_users}")
         
+        pending_running = []
         user_count = 0
         for account_name, account_data in selected_accounts.items():
             account_id = account_data.get('account_id', 'Unknown')
@@ -796,16 +789,6 @@ class EC2InstanceManager:
                         instance_type
                     )
                     
-                    # Wait for instance to be running (optional)
-                    if wait_for_running:
-                        running_info = self.wait_for_instance_running(
-                            ec2_client, 
-                            instance_info['instance_id'], 
-                            username
-                        )
-                        if running_info:
-                            instance_info.update(running_info)
-                    
                     # Add account and user details
                     instance_info.update({
                         'account_name': account_name,
@@ -815,20 +798,20 @@ class EC2InstanceManager:
                         'created_at': self.current_time
                     })
                     
-                    created_instances.append(instance_info)
+                    # Wait for instance to be running (optional) - collected after all launches
+                    if wait_for_running:
+                        future = self.state_waiter.watch(
+                            ec2_client,
+                            instance_info['instance_id'],
+                            ['running'],
+                            fail_states=['shutting-down', 'terminated'],
+                            group_key=(account_name, region)
+                        )
+                        pending_running.append((instance_info, future))
+                        continue
                     
-                    # Print success message
-                    print(f"\n🎉 SUCCESS: Instance created for {real_name}")
-                    print(f"   👤 Username: {username}")
-                    print(f"   📍 Instance ID: {instance_info['instance_id']}")
-                    print(f"   🌍 Region: {region}")
-                    print(f"   💻 Instance Type: {instance_info['instance_type']}")
-                    print(f"   🏦 Account: {account_name} ({account_id})")
-                    if 'public_ip' in instance_info:
-                        print(f"   🌐 Public IP: {instance_info['public_ip']}")
-                    if 'startup_time_seconds' in instance_info:
-                        print(f"   ⏱️  Startup Time: {instance_info['startup_time_seconds']}s")
-                    print("-" * 60)
+                    created_instances.append(instance_info)
+                    self.print_instance_success(instance_info)
                     
                 except Exception as e:
                     error_msg = str(e)
@@ -848,6 +831,20 @@ class EC2InstanceManager:
                     print("-" * 60)
                     continue
         
+        # All instances are polled together; finish each one as it reaches running
+        for instance_info, future in pending_running:
+            running_info = self.wait_for_instance_running(
+                None,
+                instance_info['instance_id'],
+                instance_info['username'],
+                future=future
+            )
+            if running_info:
+                instance_info.update(running_info)
+            
+            created_instances.append(instance_info)
+            self.print_instance_success(instance_info)
+        
         self.log_operation('INFO', f"Instance creation completed - Created: {len(created_instances)}, Failed: {len(failed_instances)}")
         return created_instances, failed_instances
 
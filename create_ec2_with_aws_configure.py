@@ -5,24 +5,35 @@ import boto3
 import json
 import sys
 import os
-import time
-import glob
-import re
 import random
 import string
 from datetime import datetime
 from botocore.exceptions import ClientError, BotoCoreError
 from logger import setup_logger
+from instance_state_waiter import InstanceStateWaiter
+from credentials_resolver import get_credentials_resolver
+from credential_validator import get_credential_validator
+from api_metrics import enable_api_metrics
+from execution_journal import ExecutionJournal
+from pricing_catalog import get_pricing_catalog
+from batch_plan import BatchPlanError, add_batch_arguments, plan_from_args
 from typing import Set
 
 class EC2InstanceManager:
-    def __init__(self, ami_mapping_file='ec2-region-ami-mapping.json', userdata_file='userdata.sh'):
+    def __init__(self, ami_mapping_file='ec2-region-ami-mapping.json', userdata_file='userdata.sh', resume=False, batch_plan=None):
         self.ami_mapping_file = ami_mapping_file
         self.userdata_file = userdata_file
+        self.batch_plan = batch_plan  # Headless selections; None runs the interactive menus
         self.logger = setup_logger("ec2_instance_manager", "ec2_creation")
         
-        # Find the latest credentials file
-        self.credentials_file = self.find_latest_credentials_file()
+        # Write-ahead journal so an interrupted run can continue with --resume
+        self.journal = ExecutionJournal('ec2_instance_creation', resume=resume)
+        
+        # One shared poller per account/region instead of a sleep loop per instance
+        self.state_waiter = InstanceStateWaiter(log_fn=self.log_operation)
+        
+        # Find the latest credentials file (a batch plan may pin one instead)
+        self.credentials_file = (batch_plan.option('credentials_file') if batch_plan else None) or self.find_latest_credentials_file()
         
         self.load_configurations()
         self.current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -111,42 +122,22 @@ class EC2InstanceManager:
     def find_latest_credentials_file(self):
         """Find the latest iam_users_credentials file based on timestamp"""
         try:
-            # Look for all files matching the pattern
-            pattern = "iam_users_credentials_*.json"
-            matching_files = glob.glob(pattern)
-            
-            if not matching_files:
-                self.logger.error(f"No files found matching pattern: {pattern}")
-                raise FileNotFoundError(f"No IAM credentials files found matching pattern: {pattern}")
-            
-            self.logger.info(f"Found {len(matching_files)} credential files:")
-            
-            # Extract timestamps and sort
-            file_timestamps = []
-            for file_path in matching_files:
-                # Extract timestamp from filename
-                # Expected format: iam_users_credentials_YYYYMMDD_HHMMSS.json
-                match = re.search(r'iam_users_credentials_(\d{8}_\d{6})\.json', file_path)
-                if match:
-                    timestamp_str = match.group(1)
-                    try:
-                        # Parse timestamp to datetime for comparison
-                        timestamp = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                        file_timestamps.append((file_path, timestamp, timestamp_str))
-                        self.logger.info(f"  📄 {file_path} (timestamp: {timestamp_str})")
-                    except ValueError as e:
-                        self.logger.warning(f"  ⚠️  {file_path} has invalid timestamp format: {e}")
-                else:
-                    self.logger.warning(f"  ⚠️  {file_path} doesn't match expected timestamp pattern")
+            resolver = get_credentials_resolver()
+            file_timestamps = resolver.credential_files()
+            skipped_files = resolver.skipped_files()
             
-            if not file_timestamps:
-                raise ValueError("No valid credential files with proper timestamp format found")
+            if not file_timestamps and not skipped_files:
+                self.logger.error(f"No files found matching pattern: {resolver.pattern}")
             
-            # Sort by timestamp (newest first)
-            file_timestamps.sort(key=lambda x: x[1], reverse=True)
+            self.logger.info(f"Found {len(file_timestamps) + len(skipped_files)} credential files:")
+            for file_path, timestamp, timestamp_str in file_timestamps:
+                self.logger.info(f"  📄 {file_path} (timestamp: {timestamp_str})")
+            for file_path, reason in skipped_files:
+                self.logger.warning(f"  ⚠️  {file_path} {reason}")
             
-            # Get the latest file
-            latest_file, latest_timestamp, latest_timestamp_str = file_timestamps[0]
+            # Raises FileNotFoundError / ValueError when nothing usable exists
+            latest_file = resolver.find_latest_credentials_file()
+            _, latest_timestamp, latest_timestamp_str = file_timestamps[0]
             
             self.logger.info(f"🎯 Selected latest file: {latest_file}")
             self.logger.info(f"📅 File timestamp: {latest_timestamp_str}")
@@ -269,6 +260,13 @@ class EC2InstanceManager:
         
         accounts = list(self.credentials_data['accounts'].items())
         
+        if self.batch_plan:
+            selected_indices = [idx for idx, (account_name, account_data) in enumerate(accounts, 1)
+                                if self.batch_plan.match_account(account_name, account_data.get('account_id'),
+                                                                 account_data.get('account_email'))]
+            self.log_operation('INFO', f"Batch plan selected {len(selected_indices)} of {len(accounts)} accounts")
+            return selected_indices
+        
         self.log_operation('INFO', f"Displaying {len(accounts)} available accounts for selection")
         
         print(f"\n🏦 Available AWS Accounts ({len(accounts)} total):")
@@ -466,8 +464,8 @@ class EC2InstanceManager:
                 region_name=region
             )
             
-            # Test the connection
-            ec2_client.describe_regions(RegionNames=[region])
+            # Key pair is checked once per process via STS instead of a per-client probe
+            get_credential_validator().validate(access_key, secret_key)
             self.log_operation('INFO', f"Successfully connected to EC2 in {region} using access key: {access_key[:10]}...")
             return ec2_client
             
@@ -646,6 +644,7 @@ class EC2InstanceManager:
                         for account_data in selected_accounts.values())
         self.log_operation('INFO', f"Total users to process: {total_users}")
         
+        pending_running = []
         user_count = 0
         for account_name, account_data in selected_accounts.items():
             account_id = account_data.get('account_id', 'Unknown')
@@ -666,6 +665,12 @@ class EC2InstanceManager:
                 real_user_info = user_data.get('real_user', {})
                 
                 real_name = real_user_info.get('full_name', username)
+                journal_key = f"{account_name}/{username}"
+                
+                if self.journal.is_done(journal_key):
+                    self.log_operation('INFO', f"♻️  [{user_count}/{total_users}] {username}: already created in the resumed run, skipping")
+                    created_instances.append(self.journal.get_result(journal_key))
+                    continue
                 
                 self.log_operation('INFO', f"👤 [{user_count}/{total_users}] Processing user: {username} ({real_name}) in {region}")
                 
@@ -686,8 +691,8 @@ class EC2InstanceManager:
                     # Create EC2 client with user's credentials
                     ec2_client = self.create_ec2_client(access_key, secret_key, region)
                     
-                    # Create instance
-                    instance_info = self.create_instance_with_capacity_type(
+                    # Create instance (reused from the journal if it was launched before an interruption)
+                    instance_info = self.journal.step(journal_key, 'instance_launched', lambda: self.create_instance_with_capacity_type(
                         ec2_client, 
                         self.user_data_script, 
                         region, 
@@ -697,17 +702,7 @@ class EC2InstanceManager:
                         secret_key,      # Pass credentials
                         instance_type,
                         capacity_type
-                    )
-                    
-                    # Wait for instance to be running (optional)
-                    if wait_for_running:
-                        running_info = self.wait_for_instance_running(
-                            ec2_client, 
-                            instance_info['instance_id'], 
-                            username
-                        )
-                        if running_info:
-                            instance_info.update(running_info)
+                    ))
                     
                     # Add account and user details
                     instance_info.update({
@@ -718,20 +713,21 @@ class EC2InstanceManager:
                         'created_at': self.current_time
                     })
                     
-                    created_instances.append(instance_info)
+                    # Wait for instance to be running (optional) - collected after all launches
+                    if wait_for_running:
+                        future = self.state_waiter.watch(
+                            ec2_client,
+                            instance_info['instance_id'],
+                            ['running'],
+                            fail_states=['shutting-down', 'terminated'],
+                            group_key=(account_name, region)
+                        )
+                        pending_running.append((journal_key, instance_info, future))
+                        continue
                     
-                    # Print success message
-                    print(f"\n🎉 SUCCESS: Instance created for {real_name}")
-                    print(f"   👤 Username: {username}")
-                    print(f"   📍 Instance ID: {instance_info['instance_id']}")
-                    print(f"   🌍 Region: {region}")
-                    print(f"   💻 Instance Type: {instance_info['instance_type']}")
-                    print(f"   🏦 Account: {account_name} ({account_id})")
-                    if 'public_ip' in instance_info:
-                        print(f"   🌐 Public IP: {instance_info['public_ip']}")
-                    if 'startup_time_seconds' in instance_info:
-                        print(f"   ⏱️  Startup Time: {instance_info['startup_time_seconds']}s")
-                    print("-" * 60)
+                    created_instances.append(instance_info)
+                    self.journal.record(journal_key, ExecutionJournal.COMPLETE, instance_info)
+                    self.print_instance_success(instance_info)
                     
                 except Exception as e:
                     error_msg = str(e)
@@ -751,54 +747,76 @@ class EC2InstanceManager:
                     print("-" * 60)
                     continue
         
+        # All instances are polled together; finish each one as it reaches running
+        for journal_key, instance_info, future in pending_running:
+            running_info = self.wait_for_instance_running(
+                None,
+                instance_info['instance_id'],
+                instance_info['username'],
+                future=future
+            )
+            if running_info:
+                instance_info.update(running_info)
+            
+            created_instances.append(instance_info)
+            self.journal.record(journal_key, ExecutionJournal.COMPLETE, instance_info)
+            self.print_instance_success(instance_info)
+        
         self.log_operation('INFO', f"Instance creation completed - Created: {len(created_instances)}, Failed: {len(failed_instances)}")
         return created_instances, failed_instances
 
-    def wait_for_instance_running(self, ec2_client, instance_id, username, timeout=300):
-        """Wait for instance to be in running state"""
-        self.log_operation('INFO', f"⏳ Waiting for instance {instance_id} to reach running state (timeout: {timeout}s)")
+    def wait_for_instance_running(self, ec2_client, instance_id, username, timeout=300, future=None):
+        """Wait for instance to be in running state (future: an existing state_waiter watch)"""
+        if future is None:
+            self.log_operation('INFO', f"⏳ Waiting for instance {instance_id} to reach running state (timeout: {timeout}s)")
+            future = self.state_waiter.watch(
+                ec2_client,
+                instance_id,
+                ['running'],
+                fail_states=['shutting-down', 'terminated'],
+                timeout=timeout
+            )
         
-        start_time = time.time()
-        last_state = None
+        result = future.result()
+        state = result['state']
+        elapsed_time = result['elapsed_seconds']
         
-        while time.time() - start_time < timeout:
-            try:
-                response = ec2_client.describe_instances(InstanceIds=[instance_id])
-                instance = response['Reservations'][0]['Instances'][0]
-                state = instance['State']['Name']
-                
-                # Log state changes
-                if state != last_state:
-                    self.log_operation('INFO', f"Instance {instance_id} state changed: {last_state} → {state}")
-                    last_state = state
-                
-                if state == 'running':
-                    public_ip = instance.get('PublicIpAddress', 'N/A')
-                    private_ip = instance.get('PrivateIpAddress', 'N/A')
-                    
-                    elapsed_time = int(time.time() - start_time)
-                    self.log_operation('INFO', f"✅ Instance {instance_id} is running (took {elapsed_time}s) - Public: {public_ip}, Private: {private_ip}")
-                    
-                    return {
-                        'state': state,
-                        'public_ip': public_ip,
-                        'private_ip': private_ip,
-                        'startup_time_seconds': elapsed_time
-                    }
-                elif state in ['terminated', 'terminating']:
-                    self.log_operation('ERROR', f"❌ Instance {instance_id} terminated unexpectedly")
-                    return None
-                else:
-                    time.sleep(10)
-                    
-            except Exception as e:
-                self.log_operation('ERROR', f"Error checking instance {instance_id} state: {e}")
-                time.sleep(10)
+        if state == 'running':
+            instance = result['instance']
+            public_ip = instance.get('PublicIpAddress', 'N/A')
+            private_ip = instance.get('PrivateIpAddress', 'N/A')
+            
+            self.log_operation('INFO', f"✅ Instance {instance_id} is running (took {elapsed_time}s) - Public: {public_ip}, Private: {private_ip}")
+            
+            return {
+                'state': state,
+                'public_ip': public_ip,
+                'private_ip': private_ip,
+                'startup_time_seconds': elapsed_time
+            }
+        elif state == 'timeout':
+            self.log_operation('ERROR', f"⏰ Timeout waiting for instance {instance_id} after {elapsed_time} seconds")
+        else:
+            self.log_operation('ERROR', f"❌ Instance {instance_id} terminated unexpectedly")
         
-        elapsed_time = int(time.time() - start_time)
-        self.log_operation('ERROR', f"⏰ Timeout waiting for instance {instance_id} after {elapsed_time} seconds")
         return None
     
+    def print_instance_success(self, instance_info):
+        """Print the success banner for a created instance"""
+        real_name = instance_info.get('real_user_info', {}).get('full_name', instance_info['username'])
+        
+        print(f"\n🎉 SUCCESS: Instance created for {real_name}")
+        print(f"   👤 Username: {instance_info['username']}")
+        print(f"   📍 Instance ID: {instance_info['instance_id']}")
+        print(f"   🌍 Region: {instance_info['region']}")
+        print(f"   💻 Instance Type: {instance_info['instance_type']}")
+        print(f"   🏦 Account: {instance_info['account_name']} ({instance_info['account_id']})")
+        if 'public_ip' in instance_info:
+            print(f"   🌐 Public IP: {instance_info['public_ip']}")
+        if 'startup_time_seconds' in instance_info:
+            print(f"   ⏱️  Startup Time: {instance_info['startup_time_seconds']}s")
+        print("-" * 60)
+    
     def prepare_userdata_with_aws_config(self, base_userdata, access_key, secret_key, region):
         """Add AWS credentials to userdata script"""
         
@@ -814,6 +832,12 @@ class EC2InstanceManager:
         capacity_options = ['spot', 'on-demand']
         default_type = 'spot'  # Default to spot for cost efficiency
         
+        if self.batch_plan:
+            selected_type = str(self.batch_plan.option('capacity_type', default_type)).lower()
+            if selected_type not in capacity_options:
+                raise ValueError(f"capacity_type must be one of {', '.join(capacity_options)}, got {selected_type}")
+            return selected_type
+        
         user_prefix = f"for {user_name} " if user_name else ""
         print(f"\n💰 EC2 Capacity Type Selection {user_prefix}")
         print("=" * 60)
@@ -1532,6 +1556,17 @@ class EC2InstanceManager:
             self.log_operation('ERROR', "No users found in selected accounts")
             return []
         
+        if self.batch_plan:
+            user_mapping = dict(enumerate(all_users, 1))
+            candidates = [idx for idx, user_info in user_mapping.items()
+                          if self.batch_plan.match_user(user_info['username'], user_info['real_user'].get('email'))
+                          and self.batch_plan.match_region(user_info['region'])]
+            selected_indices = self.batch_plan.plan_tasks(
+                candidates, key=lambda idx: f"{user_mapping[idx]['account_name']}/{user_mapping[idx]['username']}")
+            self.batch_plan.print_tasks(selected_indices, lambda idx: (
+                f"{user_mapping[idx]['username']} ({user_mapping[idx]['account_name']} - {user_mapping[idx]['region']})"))
+            return selected_indices, user_mapping
+        
         self.log_operation('INFO', f"Displaying {len(all_users)} available users for selection")
         
         print(f"\n👥 Available Users ({len(all_users)} total):")
@@ -1730,6 +1765,13 @@ class EC2InstanceManager:
         allowed_types = self.ami_config['allowed_instance_types']
         default_type = self.ami_config['default_instance_type']
         
+        if self.batch_plan:
+            selected_type = self.batch_plan.option('instance_type', default_type)
+            if selected_type not in allowed_types:
+                raise ValueError(f"instance_type {selected_type} is not allowed (allowed: {', '.join(allowed_types)})")
+            self.log_operation('INFO', f"Batch plan instance type: {selected_type}")
+            return selected_type
+        
         self.log_operation('INFO', f"Displaying instance type menu - {len(allowed_types)} options available")
         
         print("\n🖥️  Available Instance Types:")
@@ -1761,18 +1803,10 @@ class EC2InstanceManager:
 
     # Add cost estimation display for both scripts:
 
-    def display_cost_estimation(self, instance_type: str, capacity_type: str, node_count: int = 1):
+    def display_cost_estimation(self, instance_type: str, capacity_type: str, node_count: int = 1, region: str = 'us-east-1'):
         """Display estimated cost information"""
-        # This is a simplified estimation - you'd want to use actual AWS pricing API
-        base_costs = {
-            't3.micro': 0.0104,
-            't3.small': 0.0208,
-            't3.medium': 0.0416,
-            'c6a.large': 0.0864,
-            'c6a.xlarge': 0.1728
-        }
-        
-        base_cost = base_costs.get(instance_type, 0.05)  # Default fallback
+        # On-demand rate from the offline pricing catalog (see pricing_catalog.py)
+        base_cost = get_pricing_catalog().get_ec2_hourly_rate(instance_type, region, default=0.05)
         
         if capacity_type.lower() in ['spot', 'SPOT']:
             estimated_cost = base_cost * 0.3  # Spot instances are typically 70% cheaper
@@ -1821,23 +1855,42 @@ class EC2InstanceManager:
                 self.log_operation('ERROR', f"User data script not found: {self.userdata_file}")
                 return
             
+            plan = self.journal.get_plan() if self.journal.resumed else None
+            if plan:
+                # Resume an interrupted run without going through the menus again
+                final_accounts = plan['accounts']
+                instance_type = plan['instance_type']
+                capacity_type = plan['capacity_type']
+                summary = self.journal.summary()
+                print(f"♻️  Resuming run from {self.journal.journal_file} ({summary['completed']} instances already created)")
+                self.log_operation('INFO', f"Resuming from journal {self.journal.journal_file}")
+            
             # Step 1: Select accounts to process
-            selected_account_indices = self.display_accounts_menu()
-            if not selected_account_indices:
+            selected_account_indices = None if plan else self.display_accounts_menu()
+            if not plan and not selected_account_indices:
                 self.log_operation('INFO', "Session cancelled - no accounts selected")
                 print("❌ Account selection cancelled")
                 return
             
-            selected_accounts = self.get_selected_accounts_data(selected_account_indices)
+            selected_accounts = None if plan else self.get_selected_accounts_data(selected_account_indices)
             
-            # Step 2: Ask for selection level preference
-            print(f"\n🎯 Selection Level:")
-            print("=" * 50)
-            print("  1. Process ALL users in selected accounts")
-            print("  2. Select specific users from selected accounts")
-            print("=" * 50)
+            # Batch mode plans user-level selection straight from the selectors
+            if not plan and self.batch_plan:
+                selected_user_indices, user_mapping = self.display_users_menu(selected_accounts)
+                if not selected_user_indices:
+                    print("❌ No users matched the batch plan")
+                    return
+                final_accounts = self.convert_selected_users_to_accounts(selected_user_indices, user_mapping)
             
-            while True:
+            # Step 2: Ask for selection level preference
+            if not plan and not self.batch_plan:
+                print(f"\n🎯 Selection Level:")
+                print("=" * 50)
+                print("  1. Process ALL users in selected accounts")
+                print("  2. Select specific users from selected accounts")
+                print("=" * 50)
+            
+            while not plan and not self.batch_plan:
                 selection_level = input("🔢 Choose selection level (1-2): ").strip()
                 self.log_operation('INFO', f"User input for selection level: '{selection_level}'")
                 
@@ -1865,9 +1918,10 @@ class EC2InstanceManager:
                     self.log_operation('WARNING', f"Invalid selection level choice: {selection_level}")
             
             # Select instance type
-            instance_type = self.display_instance_menu()
+            if not plan:
+                instance_type = self.display_instance_menu()
 
-            capacity_type = self.select_capacity_type_ec2()
+                capacity_type = self.select_capacity_type_ec2()
             
             # Calculate totals for final selection
             total_users = sum(len(account_data.get('users', [])) 
@@ -1908,7 +1962,10 @@ class EC2InstanceManager:
             self.log_operation('INFO', f"Final configuration - Accounts: {len(final_accounts)}, Users: {total_users}, Instance type: {instance_type}")
             
             # Final confirmation
-            confirm = input(f"\n🚀 Create {total_users} EC2 instances across {len(final_accounts)} accounts? (y/N): ").lower().strip()
+            if self.batch_plan:
+                confirm = 'y' if self.batch_plan.confirm(f"create {total_users} EC2 instances", destructive=False) else 'n'
+            else:
+                confirm = input(f"\n🚀 Create {total_users} EC2 instances across {len(final_accounts)} accounts? (y/N): ").lower().strip()
             self.log_operation('INFO', f"Final confirmation: '{confirm}'")
             
             if confirm != 'y':
@@ -1916,6 +1973,14 @@ class EC2InstanceManager:
                 print("❌ Instance creation cancelled")
                 return
             
+            # Record the plan first so an interrupted run can be resumed with --resume
+            if not plan:
+                self.journal.save_plan({
+                    'accounts': final_accounts,
+                    'instance_type': instance_type,
+                    'capacity_type': capacity_type
+                })
+            
             # Create instances (rest of the method remains the same...)
             print(f"\n🔄 Starting instance creation...")
             self.log_operation('INFO', f"🔄 Beginning instance creation for {total_users} users")
@@ -1971,6 +2036,9 @@ class EC2InstanceManager:
             
             print(f"✅ Session log saved to: {self.log_filename}")
             
+            if not failed_instances:
+                self.journal.mark_finished()
+            
             # Log final summary
             total_processed = len(created_instances) + len(failed_instances)
             success_rate = (len(created_instances) / total_processed * 100) if total_processed > 0 else 0
@@ -1997,8 +2065,25 @@ class EC2InstanceManager:
         
 def main():
     """Main function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='EC2 Instance Creation for IAM Users')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue the latest interrupted run from its journal')
+    parser.add_argument('--api-metrics', action='store_true',
+                       help='Record per-call AWS API latency/retries and report them at exit (or set AWS_API_METRICS=1)')
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        batch_plan = plan_from_args(args, 'ec2_create')
+    except BatchPlanError as e:
+        parser.error(str(e))
+    
+    enable_api_metrics('ec2_creation', args.api_metrics or None)
+    
     try:
-        manager = EC2InstanceManager()
+        manager = EC2InstanceManager(resume=args.resume, batch_plan=batch_plan)
         manager.run()
     except KeyboardInterrupt:
         print("\n\n❌ Script interrupted by user")
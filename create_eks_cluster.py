@@ -11,7 +11,6 @@ import os
 import sys
 import time
 import boto3
-import glob
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import threading
@@ -29,6 +28,9 @@ except ImportError:
     )
     logger = logging.getLogger('eks_manager')
 
+from prerequisite_reconciler import PrerequisiteReconciler
+from credentials_resolver import get_credentials_resolver
+
 class Colors:
     """ANSI color codes for terminal output"""
     RED = '\033[0;31m'
@@ -54,23 +56,21 @@ class EKSClusterManager:
         self.config_data = None
         self.selected_clusters = []
         self.kubectl_commands = []
+        self.reconciler = PrerequisiteReconciler(log_fn=lambda level, message: getattr(logger, level.lower())(message))
         
         logger.info(f"Initializing EKS Cluster Manager with config: {self.config_file}")
         self.load_configuration()
     
     def find_latest_credentials_file(self) -> str:
         """Find the latest iam_users_credentials_timestamp file"""
-        pattern = "iam_users_credentials_*.json"
-        files = glob.glob(pattern)
+        files = get_credentials_resolver().credential_files()
         
         if not files:
             logger.error("No iam_users_credentials_*.json file found!")
             # Fallback to default config file
             return "aws-accounts-config.json"
         
-        # Sort by timestamp in filename
-        files.sort(reverse=True)
-        latest_file = files[0]
+        latest_file = files[0][0]
         
         logger.info(f"Found {len(files)} credential files, using latest: {latest_file}")
         return latest_file
@@ -370,6 +370,9 @@ class EKSClusterManager:
             policies = ["arn:aws:iam::aws:policy/AmazonEKSClusterPolicy"]
             for policy in policies:
                 iam_client.attach_role_policy(RoleName=eks_role_name, PolicyArn=policy)
+            
+            # Wait for role to be available
+            self.reconciler.wait_for_role_propagation(iam_client, eks_role_name, policies)
         
         try:
             iam_client.get_role(RoleName=node_role_name)
@@ -402,6 +405,9 @@ class EKSClusterManager:
             
             for policy in node_policies:
                 iam_client.attach_role_policy(RoleName=node_role_name, PolicyArn=policy)
+            
+            # Wait for role to be available
+            self.reconciler.wait_for_role_propagation(iam_client, node_role_name, node_policies)
         
         return eks_role_arn, node_role_arn
     
@@ -433,12 +439,18 @@ class EKSClusterManager:
             
             # Ensure IAM roles exist
             logger.debug(f"Ensuring IAM roles exist for {username}")
-            eks_role_arn, node_role_arn = self.ensure_iam_roles(iam_client, account_id)
+            eks_role_arn, node_role_arn = self.reconciler.resolve(
+                ('iam_roles', account_id),
+                lambda: self.ensure_iam_roles(iam_client, account_id)
+            )
             logger.log_user_action(username, "IAM_ROLES_CHECK", "SUCCESS", "IAM roles verified/created")
             
             # Get VPC resources
             logger.debug(f"Getting VPC resources for {username} in {region}")
-            subnet_ids, security_group_id = self.get_or_create_vpc_resources(ec2_client, region)
+            subnet_ids, security_group_id = self.reconciler.resolve(
+                ('vpc', account_id, region),
+                lambda: self.get_or_create_vpc_resources(ec2_client, region)
+            )
             logger.log_user_action(username, "VPC_RESOURCES_CHECK", "SUCCESS", f"VPC resources verified in {region}")
             
             # Step 1: Create EKS cluster (without node group)
@@ -453,7 +465,7 @@ class EKSClusterManager:
                 }
             }
             
-            eks_client.create_cluster(**cluster_config)
+            self.reconciler.create_cluster_with_role_retry(eks_client, cluster_config)
             logger.log_user_action(username, "EKS_CLUSTER_CREATE", "SUCCESS", f"Cluster {cluster_name} creation initiated")
             
             # Wait for cluster to be active
@@ -6,11 +6,16 @@ import sys
 import os
 from datetime import datetime
 from botocore.exceptions import ClientError, BotoCoreError
+from execution_journal import ExecutionJournal
+from credential_validator import get_credential_validator
+from batch_plan import BatchPlanError, add_batch_arguments, plan_from_args
 
 class IAMUserManager:
-    def __init__(self, config_file='aws_accounts_config.json', mapping_file='user_mapping.json'):
+    def __init__(self, config_file='aws_accounts_config.json', mapping_file='user_mapping.json', resume=False, batch_plan=None):
         self.config_file = config_file
         self.mapping_file = mapping_file
+        self.batch_plan = batch_plan
+        self.journal = ExecutionJournal('iam_user_creation', resume=resume)
         self.load_configuration()
         self.load_user_mapping()
         self.current_time = "2025-06-01 16:56:27"
@@ -99,8 +104,8 @@ class IAMUserManager:
                 region_name='us-east-1'
             )
             
-            # Test the connection
-            iam_client.get_user()
+            # Key pair is checked once per process via STS instead of a per-client probe
+            get_credential_validator().validate(account_config['access_key'], account_config['secret_key'])
             return iam_client, account_config
             
         except ClientError as e:
@@ -174,47 +179,62 @@ class IAMUserManager:
         }
 
 
+    def create_access_key(self, iam_client, username):
+        """Create an access key for the user and return (access key ID, secret key)
+
+        Only the key ID is journaled. A key left behind by an interrupted run
+        has lost its secret, so it is deleted and replaced.
+        """
+        stale_key = self.journal.get_result(username, 'access_key_created')
+        if stale_key:
+            try:
+                iam_client.delete_access_key(UserName=username, AccessKeyId=stale_key)
+            except iam_client.exceptions.NoSuchEntityException:
+                pass
+        access_key = iam_client.create_access_key(UserName=username)['AccessKey']
+        self.journal.record(username, 'access_key_created', access_key['AccessKeyId'])
+        return access_key['AccessKeyId'], access_key['SecretAccessKey']
+
     def create_single_user(self, iam_client, username, region, account_config):
         """Create a single IAM user with all necessary configurations"""
         try:
             # 1. Create IAM User
             print("  📝 Creating IAM user...")
-            iam_client.create_user(UserName=username)
+            self.journal.step(username, 'user_created',
+                              lambda: iam_client.create_user(UserName=username)['User']['Arn'])
             print(f"  ✅ User {username} created successfully")
             
             # 2. Enable Console Access
             print("  🔐 Setting up console access...")
-            iam_client.create_login_profile(
+            self.journal.step(username, 'login_profile_created', lambda: iam_client.create_login_profile(
                 UserName=username,
                 Password=self.user_settings['password'],
                 PasswordResetRequired=False
-            )
+            )['ResponseMetadata']['RequestId'])
             print("  ✅ Console access configured")
             
             # 3. Attach AdministratorAccess Policy
             print("  🔑 Attaching AdministratorAccess policy...")
-            iam_client.attach_user_policy(
+            self.journal.step(username, 'admin_policy_attached', lambda: iam_client.attach_user_policy(
                 UserName=username,
                 PolicyArn="arn:aws:iam::aws:policy/AdministratorAccess"
-            )
+            )['ResponseMetadata']['RequestId'])
             print("  ✅ AdministratorAccess policy attached")
             
             # 4. Create Restriction Policy
             print("  🚫 Creating region and instance type restriction policy...")
             restriction_policy = self.create_restriction_policy(region)
             
-            iam_client.put_user_policy(
+            self.journal.step(username, 'restriction_policy_applied', lambda: iam_client.put_user_policy(
                 UserName=username,
                 PolicyName="Restrict-Region-And-EC2Types",
                 PolicyDocument=json.dumps(restriction_policy)
-            )
+            )['ResponseMetadata']['RequestId'])
             print("  ✅ Restriction policy applied")
             
             # 5. Create Access Key
             print("  🔑 Creating access keys...")
-            response = iam_client.create_access_key(UserName=username)
-            access_key = response['AccessKey']['AccessKeyId']
-            secret_key = response['AccessKey']['SecretAccessKey']
+            access_key, secret_key = self.create_access_key(iam_client, username)
             print("  ✅ Access keys created")
             
             return {
@@ -245,7 +265,7 @@ class IAMUserManager:
             return [], [], []
         
         # Get users for this account
-        users_regions = self.get_users_for_account(account_name)
+        users_regions = self.plan_users(account_name)
         
         created_users = []
         skipped_users = []
@@ -254,7 +274,21 @@ class IAMUserManager:
         # Check existing users first
         print(f"\n🔍 Checking for existing users...")
         for username, region in users_regions.items():
+            if self.journal.is_done(username):
+                print(f"  ♻️  User {username} was already created in the resumed run - RESTORED")
+                user_data = dict(self.journal.get_result(username))
+                # The journal has no secret, so the restored user gets a replacement key
+                user_data['access_key'], user_data['secret_key'] = self.create_access_key(iam_client, username)
+                print(f"  🔑 Replaced access key {user_data['access_key']} for {username}")
+                created_users.append(user_data)
+                continue
+            
             try:
+                # Users left half-created by an interrupted run are finished instead of skipped
+                if self.journal.has_started(username):
+                    print(f"  ♻️  User {username} was interrupted mid-creation - will resume")
+                    continue
+                
                 if self.check_user_exists(iam_client, username):
                     user_info = self.get_user_info(username)
                     print(f"  ⚠️  User {username} ({user_info['full_name']}) already exists - SKIPPING")
@@ -276,7 +310,8 @@ class IAMUserManager:
         # Create new users
         users_to_create = {k: v for k, v in users_regions.items() 
                           if k not in [u['username'] for u in skipped_users] 
-                          and k not in failed_users}
+                          and k not in failed_users
+                          and not self.journal.is_done(k)}
         
         if not users_to_create:
             print(f"\n⚠️  No new users to create in {account_name}")
@@ -302,6 +337,8 @@ class IAMUserManager:
                 })
                 
                 created_users.append(user_data)
+                self.journal.record(username, ExecutionJournal.COMPLETE,
+                                    {key: value for key, value in user_data.items() if key != 'secret_key'})
                 
                 # Print credentials with real user info
                 print("\n" + "🎉" * 30)
@@ -325,8 +362,21 @@ class IAMUserManager:
         
         return created_users, skipped_users, failed_users
 
+    def plan_users(self, account_name):
+        """Users and regions for an account, narrowed to the batch plan's users, regions and shard"""
+        users_regions = self.get_users_for_account(account_name)
+        if not self.batch_plan:
+            return users_regions
+        return {username: region for username, region in users_regions.items()
+                if self.batch_plan.match_user(username) and self.batch_plan.match_region(region)
+                and self.batch_plan.in_shard(f"{account_name}/{username}")}
+
     def display_account_menu(self):
         """Display account selection menu"""
+        if self.batch_plan:
+            return [account_name for account_name, config in self.aws_accounts.items()
+                    if self.batch_plan.match_account(account_name, config['account_id'], config['email'])]
+        
         print("\n📋 Available AWS Accounts:")
         for i, (account_name, config) in enumerate(self.aws_accounts.items(), 1):
             print(f"  {i}. {account_name} ({config['account_id']}) - {config['email']}")
@@ -425,8 +475,19 @@ class IAMUserManager:
         print(f"👤 Executed by: {self.current_user}")
         print("=" * 70)
         
-        # Select accounts to process
-        accounts_to_process = self.display_account_menu()
+        # Select accounts to process (a resumed run reuses the journaled selection)
+        accounts_to_process = self.journal.get_plan() if self.journal.resumed else None
+        if accounts_to_process:
+            print(f"♻️  Resuming run from {self.journal.journal_file}")
+        else:
+            accounts_to_process = self.display_account_menu()
+            if self.batch_plan and self.batch_plan.list_only:
+                tasks = [{'account_name': account_name, 'username': username, 'region': region}
+                         for account_name in accounts_to_process
+                         for username, region in self.plan_users(account_name).items()]
+                self.batch_plan.print_tasks(tasks, lambda task: f"{task['username']} ({task['account_name']} - {task['region']})")
+                return
+            self.journal.save_plan(accounts_to_process)
         
         all_created_users = []
         all_skipped_users = []
@@ -474,14 +535,33 @@ class IAMUserManager:
         
         # Optional: Save credentials to file
         if all_created_users:
-            save_to_file = input("\n💾 Save credentials to file? (y/N): ").lower().strip()
+            if self.batch_plan:
+                save_to_file = 'y' if self.batch_plan.option('save_credentials', True) else 'n'
+            else:
+                save_to_file = input("\n💾 Save credentials to file? (y/N): ").lower().strip()
             if save_to_file == 'y':
                 self.save_credentials_to_file(all_created_users)
+        
+        if not all_failed_users:
+            self.journal.mark_finished()
 
 def main():
     """Main function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='AWS IAM User Creation')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue the latest interrupted run from its journal')
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        batch_plan = plan_from_args(args, 'iam_users')
+    except BatchPlanError as e:
+        parser.error(str(e))
+    
     try:
-        manager = IAMUserManager()
+        manager = IAMUserManager(resume=args.resume, batch_plan=batch_plan)
         manager.run()
     except KeyboardInterrupt:
         print("\n\n❌ Script interrupted by user")
@@ -6,13 +6,16 @@ import sys
 import os
 from datetime import datetime
 from botocore.exceptions import ClientError, BotoCoreError
+from execution_journal import ExecutionJournal
 from logger import setup_logger
 from excel_helper import ExcelCredentialsExporter
+from credential_validator import get_credential_validator
 
 class IAMUserManager:
-    def __init__(self, config_file='aws_accounts_config.json', mapping_file='user_mapping.json'):
+    def __init__(self, config_file='aws_accounts_config.json', mapping_file='user_mapping.json', resume=False):
         self.config_file = config_file
         self.mapping_file = mapping_file
+        self.journal = ExecutionJournal('iam_user_creation', resume=resume)
         self.logger = setup_logger("iam_user_manager", "user_creation")
         self.load_configuration()
         self.load_user_mapping()
@@ -97,8 +100,8 @@ class IAMUserManager:
                 region_name='us-east-1'
             )
             
-            # Test the connection
-            iam_client.get_user()
+            # Key pair is checked once per process via STS instead of a per-client probe
+            get_credential_validator().validate(account_config['access_key'], account_config['secret_key'])
             self.logger.log_account_action(account_name, "CONNECT", "SUCCESS", f"Account ID: {account_config['account_id']}")
             return iam_client, account_config
             
@@ -172,29 +175,46 @@ class IAMUserManager:
             ]
         }
 
+    def create_access_key(self, iam_client, username):
+        """Create an access key for the user and return (access key ID, secret key)
+
+        Only the key ID is journaled. A key left behind by an interrupted run
+        has lost its secret, so it is deleted and replaced.
+        """
+        stale_key = self.journal.get_result(username, 'access_key_created')
+        if stale_key:
+            try:
+                iam_client.delete_access_key(UserName=username, AccessKeyId=stale_key)
+            except iam_client.exceptions.NoSuchEntityException:
+                pass
+        access_key = iam_client.create_access_key(UserName=username)['AccessKey']
+        self.journal.record(username, 'access_key_created', access_key['AccessKeyId'])
+        return access_key['AccessKeyId'], access_key['SecretAccessKey']
+
     def create_single_user(self, iam_client, username, region, account_config):
         """Create a single IAM user with all necessary configurations"""
         try:
             # 1. Create IAM User
             self.logger.debug(f"Creating IAM user: {username}")
-            iam_client.create_user(UserName=username)
+            self.journal.step(username, 'user_created',
+                              lambda: iam_client.create_user(UserName=username)['User']['Arn'])
             self.logger.log_user_action(username, "CREATE_USER", "SUCCESS")
             
             # 2. Enable Console Access
             self.logger.debug(f"Setting up console access for: {username}")
-            iam_client.create_login_profile(
+            self.journal.step(username, 'login_profile_created', lambda: iam_client.create_login_profile(
                 UserName=username,
                 Password=self.user_settings['password'],
                 PasswordResetRequired=False
-            )
+            )['ResponseMetadata']['RequestId'])
             self.logger.log_user_action(username, "CREATE_LOGIN_PROFILE", "SUCCESS")
             
             # 3. Attach AdministratorAccess Policy
             self.logger.debug(f"Attaching AdministratorAccess policy to: {username}")
-            iam_client.attach_user_policy(
+            self.journal.step(username, 'admin_policy_attached', lambda: iam_client.attach_user_policy(
                 UserName=username,
                 PolicyArn="arn:aws:iam::aws:policy/AdministratorAccess"
-            )
+            )['ResponseMetadata']['RequestId'])
             self.logger.log_user_action(username, "ATTACH_ADMIN_POLICY", "SUCCESS")
             
             # 4. Create Restriction Policy
@@ -210,9 +230,7 @@ class IAMUserManager:
             
             # 5. Create Access Key
             self.logger.debug(f"Creating access keys for: {username}")
-            response = iam_client.create_access_key(UserName=username)
-            access_key = response['AccessKey']['AccessKeyId']
-            secret_key = response['AccessKey']['SecretAccessKey']
+            access_key, secret_key = self.create_access_key(iam_client, username)
             self.logger.log_user_action(username, "CREATE_ACCESS_KEY", "SUCCESS", f"Key ID: {access_key}")
             
             return {
@@ -249,7 +267,20 @@ class IAMUserManager:
         # Check existing users first
         self.logger.info(f"Checking for existing users in {account_name}...")
         for username, region in users_regions.items():
+            if self.journal.is_done(username):
+                self.logger.log_user_action(username, "RESUME", "SKIPPED", "Already created in the resumed run")
+                user_data = dict(self.journal.get_result(username))
+                # The journal has no secret, so the restored user gets a replacement key
+                user_data['access_key'], user_data['secret_key'] = self.create_access_key(iam_client, username)
+                self.logger.log_user_action(username, "CREATE_ACCESS_KEY", "SUCCESS", f"Key ID: {user_data['access_key']}")
+                created_users.append(user_data)
+                continue
+            
             try:
+                # Users left half-created by an interrupted run are finished instead of skipped
+                if self.journal.has_started(username):
+                    continue
+                
                 if self.check_user_exists(iam_client, username):
                     user_info = self.get_user_info(username)
                     self.logger.log_user_action(username, "SKIP", "ALREADY_EXISTS", user_info['full_name'])
@@ -268,7 +299,8 @@ class IAMUserManager:
         # Create new users
         users_to_create = {k: v for k, v in users_regions.items() 
                           if k not in [u['username'] for u in skipped_users] 
-                          and k not in failed_users}
+                          and k not in failed_users
+                          and not self.journal.is_done(k)}
         
         if not users_to_create:
             self.logger.warning(f"No new users to create in {account_name}")
@@ -292,6 +324,8 @@ class IAMUserManager:
                 })
                 
                 created_users.append(user_data)
+                self.journal.record(username, ExecutionJournal.COMPLETE,
+                                    {key: value for key, value in user_data.items() if key != 'secret_key'})
                 self.logger.log_user_action(username, "COMPLETE", "SUCCESS", 
                                           f"All resources created for {user_info['full_name']}")
                 
@@ -418,8 +452,13 @@ class IAMUserManager:
         self.logger.info(f"Execution time: {self.current_time} UTC")
         self.logger.info(f"Executed by: {self.current_user}")
         
-        # Select accounts to process
-        accounts_to_process = self.display_account_menu()
+        # Select accounts to process (a resumed run reuses the journaled selection)
+        accounts_to_process = self.journal.get_plan() if self.journal.resumed else None
+        if accounts_to_process:
+            self.logger.info(f"Resuming run from {self.journal.journal_file}")
+        else:
+            accounts_to_process = self.display_account_menu()
+            self.journal.save_plan(accounts_to_process)
         self.logger.info(f"Selected accounts for processing: {accounts_to_process}")
         
         all_created_users = []
@@ -445,11 +484,21 @@ class IAMUserManager:
                 if saved_file:
                     print(f"✅ Credentials saved to: {saved_file}")
                     print("📊 Excel files also generated in output/ directory")
+        
+        if not all_failed_users:
+            self.journal.mark_finished()
 
 def main():
     """Main function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='AWS IAM User Creation')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue the latest interrupted run from its journal')
+    args = parser.parse_args()
+    
     try:
-        manager = IAMUserManager()
+        manager = IAMUserManager(resume=args.resume)
         manager.run()
     except KeyboardInterrupt:
         print("\n\n❌ Script interrupted by user")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import boto3
+from botocore.exceptions import ClientError
+
+class CredentialValidator:
+    """Validates each access key pair once with sts:GetCallerIdentity and caches the identity"""
+
+    # Error codes that mean the key pair itself is bad, as opposed to a transient failure
+    INVALID_KEY_CODES = {'InvalidClientTokenId', 'SignatureDoesNotMatch', 'AccessDenied',
+                         'UnrecognizedClientException', 'ExpiredToken'}
+
+    def __init__(self, ttl: int = 900, failure_ttl: int = 60):
+        """
+        Initialize the validator
+
+        Args:
+            ttl (int): Seconds a successful validation is trusted
+            failure_ttl (int): Seconds a rejected key pair is remembered before retrying
+        """
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._cache: Dict[Tuple[str, str], Tuple[float, object]] = {}  # key -> (expires_at, identity or exception)
+        self.stats = {'sts_calls': 0, 'cache_hits': 0}
+
+    @staticmethod
+    def _cache_key(access_key: str, secret_key: str) -> Tuple[str, str]:
+        # The secret only takes part as a digest so a rotated secret is a new entry
+        return access_key, hashlib.sha256(secret_key.encode('utf-8')).hexdigest()
+
+    def validate(self, access_key: str, secret_key: str) -> Dict:
+        """
+        Confirm a key pair works, calling STS at most once per TTL
+
+        Concurrent callers with the same key pair wait for a single STS call.
+
+        Returns:
+            dict: {'account_id', 'arn', 'user_id'}
+
+        Raises:
+            ClientError: The key pair was rejected (also re-raised from cache)
+        """
+        key = self._cache_key(access_key, secret_key)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                with self._lock:
+                    self.stats['cache_hits'] += 1
+                if isinstance(cached[1], Exception):
+                    raise cached[1]
+                return dict(cached[1])
+
+            with self._lock:
+                self.stats['sts_calls'] += 1
+
+            sts_client = boto3.client(
+                'sts',
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name='us-east-1'
+            )
+            try:
+                response = sts_client.get_caller_identity()
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') in self.INVALID_KEY_CODES:
+                    with self._lock:
+                        self._cache[key] = (time.monotonic() + self.failure_ttl, e)
+                raise
+
+            identity = {
+                'account_id': response['Account'],
+                'arn': response['Arn'],
+                'user_id': response['UserId'],
+            }
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.ttl, identity)
+            return dict(identity)
+
+    def account_for_access_key(self, access_key: str) -> Optional[str]:
+        """Account ID of an already validated access key, without calling AWS"""
+        with self._lock:
+            entries = list(self._cache.items())
+        for (cached_access_key, _), (_, identity) in entries:
+            if cached_access_key == access_key and isinstance(identity, dict):
+                return identity['account_id']
+        return None
+
+    def invalidate(self, access_key: str, secret_key: str) -> None:
+        with self._lock:
+            self._cache.pop(self._cache_key(access_key, secret_key), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+_default_validator = None
+_default_validator_lock = threading.Lock()
+
+def get_credential_validator() -> CredentialValidator:
+    """Process-wide validator shared by every EC2 and IAM client factory"""
+    global _default_validator
+    with _default_validator_lock:
+        if _default_validator is None:
+            _default_validator = CredentialValidator()
+        return _default_validator
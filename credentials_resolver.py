@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+import glob
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+class CredentialsResolver:
+    """Loads every iam_users_credentials_*.json once and indexes users by name, newest file wins"""
+
+    DEFAULT_PATTERN = 'iam_users_credentials_*.json'
+    TIMESTAMP_RE = re.compile(r'iam_users_credentials_(\d{8}_\d{6})\.json')
+
+    def __init__(self, pattern: str = DEFAULT_PATTERN):
+        """
+        Initialize the resolver
+
+        Args:
+            pattern (str): Glob for the credential files, relative to the working directory
+        """
+        self.pattern = pattern
+        self._lock = threading.Lock()
+        self._signature = None
+        self._files: List[Tuple[str, datetime, str]] = []
+        self._skipped: List[Tuple[str, str]] = []
+        self._errors: Dict[str, str] = {}
+        self._parsed: Dict[str, Tuple[Tuple[int, int], List[Dict]]] = {}  # path -> ((mtime_ns, size), users)
+        self._users: Dict[str, Dict] = {}
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        signature = {}
+        for file_path in glob.glob(self.pattern):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            signature[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return signature
+
+    @staticmethod
+    def _load_users(file_path: str) -> List[Dict]:
+        """Flatten one credentials file into user entries carrying their account"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            cred_data = json.load(f)
+
+        users = []
+        for account_name, account_data in cred_data.get('accounts', {}).items():
+            for user_data in account_data.get('users', []):
+                entry = dict(user_data)
+                entry['account_name'] = account_name
+                entry['account_id'] = account_data.get('account_id')
+                users.append(entry)
+        return users
+
+    def _refresh(self) -> None:
+        """Rebuild the index if a credentials file was added, removed or modified (lock held)"""
+        signature = self._snapshot()
+        if signature == self._signature:
+            return
+
+        files = []
+        skipped = []
+        for file_path in signature:
+            match = self.TIMESTAMP_RE.search(file_path)
+            if not match:
+                skipped.append((file_path, "doesn't match expected timestamp pattern"))
+                continue
+            timestamp_str = match.group(1)
+            try:
+                files.append((file_path, datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S"), timestamp_str))
+            except ValueError as e:
+                skipped.append((file_path, f"has invalid timestamp format: {e}"))
+
+        files.sort(key=lambda x: x[1], reverse=True)
+
+        # Only files whose (mtime, size) changed are parsed again
+        parsed = {}
+        errors = {}
+        for file_path, _, _ in files:
+            cached = self._parsed.get(file_path)
+            if cached and cached[0] == signature[file_path]:
+                parsed[file_path] = cached
+                continue
+            try:
+                parsed[file_path] = (signature[file_path], self._load_users(file_path))
+            except (OSError, ValueError, AttributeError) as e:
+                errors[file_path] = str(e)
+
+        users = {}
+        for file_path, _, _ in files:
+            if file_path not in parsed:
+                continue
+            for entry in parsed[file_path][1]:
+                username = entry.get('username')
+                if username and username not in users and entry.get('access_key_id') and entry.get('secret_access_key'):
+                    users[username] = dict(entry, source_file=file_path)
+
+        self._signature = signature
+        self._files = files
+        self._skipped = skipped
+        self._errors = errors
+        self._parsed = parsed
+        self._users = users
+
+    def credential_files(self) -> List[Tuple[str, datetime, str]]:
+        """(file_path, timestamp, timestamp_str) for every correctly named file, newest first"""
+        with self._lock:
+            self._refresh()
+            return list(self._files)
+
+    def skipped_files(self) -> List[Tuple[str, str]]:
+        """(file_path, reason) for files matching the glob that are not indexed"""
+        with self._lock:
+            self._refresh()
+            return list(self._skipped)
+
+    def read_errors(self) -> Dict[str, str]:
+        """file_path -> error for correctly named files that could not be parsed"""
+        with self._lock:
+            self._refresh()
+            return dict(self._errors)
+
+    def find_latest_credentials_file(self) -> str:
+        """
+        Path of the newest credentials file
+
+        Raises:
+            FileNotFoundError: No file matches the pattern
+            ValueError: No file has a valid timestamp in its name
+        """
+        with self._lock:
+            self._refresh()
+            if not self._signature:
+                raise FileNotFoundError(f"No IAM credentials files found matching pattern: {self.pattern}")
+            if not self._files:
+                raise ValueError("No valid credential files with proper timestamp format found")
+            return self._files[0][0]
+
+    def get_user_credentials(self, username: str) -> Optional[Dict]:
+        """
+        Credentials for an IAM user from the newest file that has them
+
+        Returns:
+            dict: The user entry plus 'account_name', 'account_id' and 'source_file', or None
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._users.get(username)
+            return dict(entry) if entry else None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._signature = None
+            self._parsed = {}
+
+_default_resolver = None
+_default_resolver_lock = threading.Lock()
+
+def get_credentials_resolver() -> CredentialsResolver:
+    """Process-wide resolver shared by the creation and cleanup scripts"""
+    global _default_resolver
+    with _default_resolver_lock:
+        if _default_resolver is None:
+            _default_resolver = CredentialsResolver()
+        return _default_resolver
@@ -10,10 +10,20 @@ import re
 from datetime import datetime
 from botocore.exceptions import ClientError, BotoCoreError
 from logger import setup_logger
+from instance_state_waiter import InstanceStateWaiter
+from credentials_resolver import get_credentials_resolver
+from credential_validator import get_credential_validator
+from api_metrics import enable_api_metrics
 
 class EC2CleanupManager:
     def __init__(self):
         self.logger = setup_logger("ec2_cleanup_manager", "ec2_cleanup")
+        
+        # Shared termination poller: one describe_instances per client per tick
+        self.state_waiter = InstanceStateWaiter(log_fn=self.log_operation)
+        
+        # Unreadable credentials files already warned about (once per file)
+        self._reported_credential_errors = set()
         self.current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.current_user = "varadharajaan"
         
@@ -333,8 +343,8 @@ class EC2CleanupManager:
                 region_name=region
             )
             
-            # Test the connection
-            ec2_client.describe_regions(RegionNames=[region])
+            # Key pair is checked once per process via STS instead of a per-client probe
+            get_credential_validator().validate(access_key, secret_key)
             return ec2_client
             
         except Exception as e:
@@ -352,50 +362,21 @@ class EC2CleanupManager:
                 self.log_operation('WARNING', f"No username found for instance {instance.get('instance_id', 'unknown')}")
                 return None, None
             
-            # Look for credentials files
-            cred_patterns = ["iam_users_credentials_*.json"]
-            cred_files = []
-            for pattern in cred_patterns:
-                cred_files.extend(glob.glob(pattern))
-            
-            if not cred_files:
+            # All credentials files are indexed once per change, newest file wins
+            resolver = get_credentials_resolver()
+            if not resolver.credential_files():
                 self.log_operation('ERROR', "No credentials files found")
                 return None, None
             
-            # Sort by timestamp and try the latest first
-            cred_files_with_timestamps = []
-            for file_path in cred_files:
-                match = re.search(r'(\d{8}_\d{6})\.json', file_path)
-                if match:
-                    timestamp_str = match.group(1)
-                    try:
-                        timestamp = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                        cred_files_with_timestamps.append((file_path, timestamp))
-                    except ValueError:
-                        continue
+            for cred_file, error in resolver.read_errors().items():
+                if cred_file not in self._reported_credential_errors:
+                    self._reported_credential_errors.add(cred_file)
+                    self.log_operation('WARNING', f"Error reading credentials file {cred_file}: {error}")
             
-            cred_files_with_timestamps.sort(key=lambda x: x[1], reverse=True)
-            
-            # Try to find credentials for the user
-            for cred_file, _ in cred_files_with_timestamps:
-                try:
-                    with open(cred_file, 'r', encoding='utf-8') as f:
-                        cred_data = json.load(f)
-                    
-                    # Search through accounts for the user
-                    if 'accounts' in cred_data:
-                        for account_name, account_data in cred_data['accounts'].items():
-                            for user_data in account_data.get('users', []):
-                                if user_data.get('username') == username:
-                                    access_key = user_data.get('access_key_id')
-                                    secret_key = user_data.get('secret_access_key')
-                                    if access_key and secret_key:
-                                        self.log_operation('INFO', f"Found credentials for {username} in {cred_file}")
-                                        return access_key, secret_key
-                    
-                except Exception as e:
-                    self.log_operation('WARNING', f"Error reading credentials file {cred_file}: {e}")
-                    continue
+            user_creds = resolver.get_user_credentials(username)
+            if user_creds:
+                self.log_operation('INFO', f"Found credentials for {username} in {user_creds['source_file']}")
+                return user_creds['access_key_id'], user_creds['secret_access_key']
             
             self.log_operation('ERROR', f"No credentials found for user {username}")
             return None, None
@@ -446,29 +427,18 @@ class EC2CleanupManager:
             if wait_for_termination:
                 self.log_operation('INFO', f"Waiting for instance {instance_id} to terminate...")
                 
-                start_time = time.time()
-                timeout = 300  # 5 minutes
+                # A vanished instance counts as terminated
+                result = self.state_waiter.watch(
+                    ec2_client,
+                    instance_id,
+                    ['terminated'],
+                    timeout=300,  # 5 minutes
+                    missing_state='terminated'
+                ).result()
                 
-                while time.time() - start_time < timeout:
-                    try:
-                        exists, state, _ = self.check_instance_exists(ec2_client, instance_id)
-                        
-                        if not exists or state == 'terminated':
-                            elapsed = int(time.time() - start_time)
-                            self.log_operation('INFO', f"✅ Instance {instance_id} terminated successfully (took {elapsed}s)")
-                            return True
-                        
-                        if state in ['terminating']:
-                            time.sleep(10)
-                            continue
-                        else:
-                            self.log_operation('WARNING', f"Instance {instance_id} in unexpected state: {state}")
-                            time.sleep(10)
-                            continue
-                            
-                    except Exception as e:
-                        self.log_operation('ERROR', f"Error waiting for termination of {instance_id}: {e}")
-                        break
+                if result['state'] == 'terminated':
+                    self.log_operation('INFO', f"✅ Instance {instance_id} terminated successfully (took {result['elapsed_seconds']}s)")
+                    return True
                 
                 self.log_operation('ERROR', f"Timeout waiting for instance {instance_id} to terminate")
                 return False
@@ -866,6 +836,9 @@ class EC2CleanupManager:
 
 def main():
     """Main function"""
+    # Opt-in via AWS_API_METRICS=1
+    enable_api_metrics('ec2_cleanup')
+    
     try:
         manager = EC2CleanupManager()
         manager.run()
@@ -15,7 +15,14 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Tuple
 from botocore.exceptions import ClientError, NoCredentialsError
 import glob
+import fnmatch
 from collections import defaultdict
+from cost_engine import CostEngine
+from cost_history_store import CostHistoryStore
+from pricing_catalog import get_pricing_catalog
+from timestamp_utils import IST, parse_timestamp, to_ist, to_utc
+from api_metrics import enable_api_metrics
+from batch_plan import BatchPlanError, add_batch_arguments, plan_from_args
 
 # Set UTF-8 encoding for console output
 if sys.platform.startswith('win'):
@@ -29,31 +36,12 @@ sys.stderr = codecs.getwriter('utf-8')(sys.stderr.detach())
 class AWSCostCalculator:
     """Class to handle cost calculations for AWS resources"""
     
-    # AWS pricing (approximate USD per hour)
-    EC2_PRICING = {
-        't2.micro': 0.0116,
-        't2.small': 0.023,
-        't2.medium': 0.0464,
-        't2.large': 0.0928,
-        't3.micro': 0.0104,
-        't3.small': 0.0208,
-        't3.medium': 0.0416,
-        't3.large': 0.0832,
-        't3.xlarge': 0.1664,
-        'c6a.large': 0.0864,
-        'c6a.xlarge': 0.1728,
-        'm5.large': 0.096,
-        'm5.xlarge': 0.192,
-    }
-    
     # EKS cluster base cost - FIXED: Changed from 0.10 to 0.65
     EKS_CLUSTER_HOURLY_COST = 0.65  # $0.65 per hour per cluster
     
-    # Storage costs (per GB per month)
-    EBS_GP3_COST_PER_GB_MONTH = 0.08
-    
     def __init__(self):
-        pass
+        self.catalog = get_pricing_catalog()
+        self.engine = CostEngine(self)
     
     def get_current_time(self) -> datetime:
         """Get current UTC time (timezone-aware)"""
@@ -93,7 +81,8 @@ class AWSCostCalculator:
         if live_instance_data:
             current_state = live_instance_data.get('State', {}).get('Name', 'unknown')
         
-        hourly_rate = self.EC2_PRICING.get(instance_type, 0.05)  # Default fallback
+        region = instance_data.get('region', 'us-east-1')
+        hourly_rate = self.get_ec2_hourly_rate(instance_type, region, default=0.05)
         
         # Calculate compute cost (only for running time)
         compute_cost = hourly_rate * running_hours
@@ -103,7 +92,7 @@ class AWSCostCalculator:
         if isinstance(disk_size_gb, str):
             disk_size_gb = int(disk_size_gb) if disk_size_gb.isdigit() else 20
         
-        storage_cost_monthly = disk_size_gb * self.EBS_GP3_COST_PER_GB_MONTH
+        storage_cost_monthly = disk_size_gb * self.catalog.get_ebs_monthly_rate('gp3', region)
         storage_cost = storage_cost_monthly * (running_hours / 24 / 30)  # Prorated
         
         total_cost = compute_cost + storage_cost
@@ -127,161 +116,33 @@ class AWSCostCalculator:
         if not time_string or time_string in ['Unknown', '']:
             return datetime.now(timezone.utc)
         
-        # IST timezone offset
-        ist_tz = timezone(timedelta(hours=5, minutes=30))
-        
-        try:
-            # Common formats to try
-            formats = [
-                '%Y-%m-%d %H:%M:%S.%f',      # With microseconds
-                '%Y-%m-%d %H:%M:%S',         # Standard format
-                '%Y-%m-%dT%H:%M:%S.%fZ',     # ISO format with Z
-                '%Y-%m-%dT%H:%M:%SZ',        # ISO format without microseconds
-                '%Y-%m-%dT%H:%M:%S.%f%z',    # ISO with timezone
-                '%Y-%m-%dT%H:%M:%S%z',       # ISO with timezone no microseconds
-            ]
-            
-            for fmt in formats:
-                try:
-                    if 'Z' in time_string:
-                        # Remove Z and treat as UTC
-                        clean_time = time_string.replace('Z', '')
-                        parsed_time = datetime.strptime(clean_time, fmt.replace('Z', ''))
-                        return parsed_time.replace(tzinfo=timezone.utc)
-                    elif '+' in time_string or time_string.endswith('IST'):
-                        # Has timezone info
-                        if time_string.endswith('IST'):
-                            # Remove IST and treat as IST timezone
-                            clean_time = time_string.replace(' IST', '')
-                            parsed_time = datetime.strptime(clean_time, fmt.replace('%z', ''))
-                            return parsed_time.replace(tzinfo=ist_tz).astimezone(timezone.utc)
-                        else:
-                            # Has +/- timezone offset
-                            parsed_time = datetime.strptime(time_string, fmt)
-                            return parsed_time.astimezone(timezone.utc)
-                    else:
-                        # No timezone info - assume UTC
-                        parsed_time = datetime.strptime(time_string, fmt)
-                        return parsed_time.replace(tzinfo=timezone.utc)
-                except ValueError:
-                    continue
-            
-            # If no format matches, try to parse ISO format manually
-            if 'T' in time_string:
-                # ISO format
-                return datetime.fromisoformat(time_string.replace('Z', '+00:00')).astimezone(timezone.utc)
-            
-            # Last resort - assume it's a simple date string in UTC
-            parsed_time = datetime.strptime(time_string, '%Y-%m-%d %H:%M:%S')
-            return parsed_time.replace(tzinfo=timezone.utc)
-        
-        except Exception as e:
-            print(f"⚠️ Warning: Could not parse time '{time_string}': {e}")
+        # Single pass over ISO/Z/offset/IST variants with a per-shape format cache
+        parsed_time = to_utc(time_string)
+        if parsed_time is None:
+            print(f"⚠️ Warning: Could not parse time '{time_string}'")
             print(f"   Using current time as fallback")
             return datetime.now(timezone.utc)
+        
+        return parsed_time
     
     def get_ebs_hourly_rate(self, volume_type='gp3', region='us-east-1'):
         """Get EBS storage hourly rate per GB"""
-        # EBS pricing per GB per month, converted to hourly
-        monthly_rates = {
-            'gp3': 0.08,    # $0.08 per GB per month
-            'gp2': 0.10,    # $0.10 per GB per month
-            'io1': 0.125,   # $0.125 per GB per month
-            'io2': 0.125,   # $0.125 per GB per month
-        }
-        
-        monthly_rate = monthly_rates.get(volume_type, 0.08)
-        
-        # Convert monthly to hourly (assuming 730 hours per month)
-        hourly_rate = monthly_rate / 730
-        
-        # Regional pricing multipliers
-        regional_multipliers = {
-            'us-east-1': 1.0,
-            'us-west-1': 1.0,
-            'us-west-2': 1.0,
-            'eu-west-1': 1.0,
-            'ap-southeast-1': 1.0,
-        }
-        
-        multiplier = regional_multipliers.get(region, 1.0)
-        return hourly_rate * multiplier
+        return self.catalog.get_ebs_hourly_rate(volume_type, region)
     
-    def get_ec2_hourly_rate(self, instance_type, region='us-east-1'):
-        """Get EC2 instance hourly rate"""
-        # Your existing EC2 pricing logic
-        base_rates = {
-        't3.micro': 0.0104,
-        't3.small': 0.0208,
-        't3.medium': 0.0416,
-        't3.large': 0.0832,
-        't3.xlarge': 0.1664,
-        't3.2xlarge': 0.3328,
-        'm5.large': 0.0960,
-        'm5.xlarge': 0.1920,
-        'm5.2xlarge': 0.3840,
-        'm5.4xlarge': 0.7680,
-        'c5.large': 0.0850,
-        'c5.xlarge': 0.1700,
-        'c5.2xlarge': 0.3400,
-        'c5.4xlarge': 0.6800,
-        'c5.9xlarge': 1.6200
-        }
-        
-        base_rate = base_rates.get(instance_type, 0.0416)  # Default to t3.medium
-        
-        # Regional pricing multipliers (simplified)
-        regional_multipliers = {
-            'us-east-1': 1.0,
-            'us-west-1': 1.05,
-            'us-west-2': 1.05,
-            'eu-west-1': 1.1,
-            'ap-southeast-1': 1.15,
-        }
-        
-        multiplier = regional_multipliers.get(region, 1.0)
-        return base_rate * multiplier
+    def get_ec2_hourly_rate(self, instance_type, region='us-east-1', default=0.0416):
+        """Get EC2 instance hourly rate (default: t3.medium rate for unknown types)"""
+        return self.catalog.get_ec2_hourly_rate(instance_type, region, default=default)
     
     def format_creation_time_readable(self, timestamp_str):
         """Format creation timestamp to show only hours and minutes"""
-        try:
-            # Parse the timestamp (handles both string and datetime objects)
-            if isinstance(timestamp_str, str):
-                # Handle different formats
-                if '+05:30' in timestamp_str or 'IST' in timestamp_str:
-                    # Remove timezone info for parsing
-                    clean_time = timestamp_str.replace('+05:30', '').replace(' IST', '').strip()
-                    dt = datetime.fromisoformat(clean_time)
-                    # Add IST timezone
-                    ist_tz = timezone(timedelta(hours=5, minutes=30))
-                    dt = dt.replace(tzinfo=ist_tz)
-                else:
-                    dt = datetime.fromisoformat(timestamp_str)
-            else:
-                dt = timestamp_str
-            
-            # Convert to IST if needed
-            if dt.tzinfo != timezone(timedelta(hours=5, minutes=30)):
-                ist_tz = timezone(timedelta(hours=5, minutes=30))
-                dt = dt.astimezone(ist_tz)
-            
-            # Format options:
-            
-            # Option 1: 12:01 PM IST (12-hour format)
-            return dt.strftime('%I:%M %p IST')
-            
-            # Option 2: 12:01 IST (12-hour without AM/PM)
-            # return dt.strftime('%I:%M IST')
-            
-            # Option 3: 12:01 (24-hour format, no timezone)
-            # return dt.strftime('%H:%M')
-            
-            # Option 4: 12:01 PM (12-hour, no timezone)
-            # return dt.strftime('%I:%M %p')
-            
-        except Exception as e:
+        # Naive values keep the previous behaviour of being read as local time
+        dt = parse_timestamp(timestamp_str, naive_tz=None)
+        if dt is None:
             return "Unknown time"
         
+        # Format: 12:01 PM IST (12-hour format)
+        return dt.astimezone(IST).strftime('%I:%M %p IST')
+        
     def calculate_live_eks_cost(self, cluster_data, live_cluster_data=None):
         """Calculate EKS cost with proper timezone handling and live AWS data"""
         
@@ -382,6 +243,14 @@ class AWSCostCalculator:
             }
         }
 
+    def calculate_live_ec2_costs(self, records: List[Tuple[Dict, Optional[Dict]]]) -> List[Dict]:
+        """Calculate live EC2 costs for many (instance_data, live_instance_data) pairs in one pass"""
+        return self.engine.ec2_costs(records)
+    
+    def calculate_live_eks_costs(self, records: List[Tuple[Dict, Optional[Dict]]]) -> List[Dict]:
+        """Calculate live EKS costs for many (cluster_data, live_cluster_data) pairs in one pass"""
+        return self.engine.eks_costs(records)
+    
     def calculate_ec2_cost(self, instance_data: Dict, hours: int = 24) -> Dict:
         """Calculate EC2 instance cost (legacy method for JSON-only data)"""
         instance_type = instance_data.get('instance_type', 'unknown')
@@ -397,7 +266,8 @@ class AWSCostCalculator:
             except:
                 pass
         
-        hourly_rate = self.EC2_PRICING.get(instance_type, 0.05)  # Default fallback
+        region = instance_data.get('region', 'us-east-1')
+        hourly_rate = self.get_ec2_hourly_rate(instance_type, region, default=0.05)
         
         # Calculate compute cost
         compute_cost = hourly_rate * hours
@@ -407,7 +277,7 @@ class AWSCostCalculator:
         if isinstance(disk_size_gb, str):
             disk_size_gb = int(disk_size_gb) if disk_size_gb.isdigit() else 20
         
-        storage_cost_monthly = disk_size_gb * self.EBS_GP3_COST_PER_GB_MONTH
+        storage_cost_monthly = disk_size_gb * self.catalog.get_ebs_monthly_rate('gp3', region)
         storage_cost = storage_cost_monthly * (hours / 24 / 30)  # Prorated
         
         total_cost = compute_cost + storage_cost
@@ -448,7 +318,8 @@ class AWSCostCalculator:
         default_nodes = cluster_data.get('default_nodes', 1)
         
         # Use default_nodes for cost calculation
-        node_hourly_rate = self.EC2_PRICING.get(instance_type, 0.05)
+        region = cluster_data.get('region', 'us-east-1')
+        node_hourly_rate = self.get_ec2_hourly_rate(instance_type, region, default=0.05)
         node_compute_cost = node_hourly_rate * default_nodes * hours
         
         # Node storage cost
@@ -456,7 +327,7 @@ class AWSCostCalculator:
         if isinstance(disk_size_gb, str):
             disk_size_gb = int(disk_size_gb) if str(disk_size_gb).isdigit() else 20
         
-        storage_cost_monthly = disk_size_gb * default_nodes * self.EBS_GP3_COST_PER_GB_MONTH
+        storage_cost_monthly = disk_size_gb * default_nodes * self.catalog.get_ebs_monthly_rate('gp3', region)
         node_storage_cost = storage_cost_monthly * (hours / 24 / 30)  # Prorated
         
         total_cost = control_plane_cost + node_compute_cost + node_storage_cost
@@ -474,9 +345,10 @@ class AWSCostCalculator:
         }
 
 class AWSResourceManager:
-    def __init__(self, config_file: str = "aws_accounts_config.json"):
-        """Initialize the AWS Resource Manager"""
+    def __init__(self, config_file: str = "aws_accounts_config.json", batch_plan=None):
+        """Initialize the AWS Resource Manager (batch_plan answers the menus headlessly)"""
         self.config_file = config_file
+        self.batch_plan = batch_plan
         self.aws_config = self.load_aws_config()
         self.cost_calculator = AWSCostCalculator()
         self.execution_reports = []  # Store reports for consolidated saving
@@ -487,28 +359,10 @@ class AWSResourceManager:
     
     def utc_to_ist(self, utc_time_str: str) -> str:
         """Convert UTC timestamp to IST"""
-        try:
-            if isinstance(utc_time_str, str):
-                # Try different UTC formats
-                for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ']:
-                    try:
-                        utc_dt = datetime.strptime(utc_time_str, fmt).replace(tzinfo=timezone.utc)
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    return utc_time_str  # Return original if no format matches
-            elif hasattr(utc_time_str, 'replace'):
-                # It's already a datetime object
-                utc_dt = utc_time_str.replace(tzinfo=timezone.utc) if utc_time_str.tzinfo is None else utc_time_str
-            else:
-                return str(utc_time_str)
-            
-            # Convert to IST
-            ist_dt = utc_dt.astimezone(timezone(timedelta(hours=5, minutes=30)))
-            return ist_dt.strftime('%Y-%m-%d %H:%M:%S')
-        except:
-            return str(utc_time_str)
+        ist_dt = to_ist(utc_time_str)
+        if ist_dt is None:
+            return str(utc_time_str)  # Return original if no format matches
+        return ist_dt.strftime('%Y-%m-%d %H:%M:%S')
         
     def load_aws_config(self) -> Dict:
         """Load AWS account configuration"""
@@ -534,15 +388,12 @@ class AWSResourceManager:
         
     def format_timestamp_to_ist_readable(self, timestamp_str: str) -> str:
         """Convert timestamp from YYYYMMDD_HHMMSS to readable IST format"""
-        try:
-            # Parse the timestamp (e.g., "20250603_121046")
-            dt = datetime.strptime(timestamp_str, '%Y%m%d_%H%M%S')
-            
-            # Since the timestamp is already in IST, just format it nicely
-            return dt.strftime('%B %d, %Y at %I:%M:%S %p IST')
-            # This will output like: "June 03, 2025 at 12:10:46 PM IST"
-        except:
+        # The timestamp (e.g., "20250603_121046") is already in IST, just format it nicely
+        dt = parse_timestamp(timestamp_str, naive_tz=None)
+        if dt is None:
             return f"{timestamp_str} (Invalid format)"
+        return dt.strftime('%B %d, %Y at %I:%M:%S %p IST')
+        # This will output like: "June 03, 2025 at 12:10:46 PM IST"
 
     def find_state_files(self, patterns: List[str]) -> List[Tuple[str, str]]:
         """Find all state files matching the patterns and return sorted by timestamp"""
@@ -606,6 +457,15 @@ class AWSResourceManager:
             print(f"   Looking for patterns: {', '.join(patterns)}")
             return []
         
+        if self.batch_plan:
+            file_patterns = self.batch_plan.option('files') or ['*']
+            if isinstance(file_patterns, str):
+                file_patterns = [file_patterns]
+            selected_files = [file for file, _ in json_files
+                              if any(fnmatch.fnmatch(os.path.basename(file), pattern) for pattern in file_patterns)]
+            print(f"\n📁 Batch mode: {len(selected_files)} of {len(json_files)} {file_type.upper()} state file(s) selected")
+            return selected_files
+        
         # Group files by date
         date_groups = self.group_files_by_date(json_files)
         
@@ -656,6 +516,17 @@ class AWSResourceManager:
         
         return selected_files
 
+    def plan_resource_numbers(self, all_resources: List[Tuple]) -> List[int]:
+        """Batch counterpart of the resource selection prompt: numbers of this shard's matching resources"""
+        candidates = [resource for resource in all_resources
+                      if self.batch_plan.match_resource(resource[1]) and self.batch_plan.match_account(resource[2])
+                      and self.batch_plan.match_region(resource[3])]
+        planned = self.batch_plan.plan_tasks(candidates, key=lambda resource: f"{resource[2]}/{resource[3]}/{resource[1]}")
+        self.batch_plan.print_tasks(planned, lambda resource: f"{resource[1]} ({resource[2]} - {resource[3]})")
+        if self.batch_plan.list_only:
+            return []
+        return [resource[0] for resource in planned]
+
     def parse_selection_input(self, user_input: str, max_items: int) -> List[int]:
         """Parse user selection input supporting ranges, multiple values, and 'all'"""
         user_input = user_input.strip().lower()
@@ -827,60 +698,18 @@ class AWSResourceManager:
 
     def format_creation_time_readable(self, timestamp_str):
         """Format creation timestamp from YYYYMMDD_HHMMSS to readable date and time"""
-        try:
-            if not timestamp_str or timestamp_str == 'Unknown':
-                return "Unknown time"
-            
-            # Handle YYYYMMDD_HHMMSS format (like "20250602_153150")
-            if '_' in timestamp_str and len(timestamp_str) == 15:
-                # Parse YYYYMMDD_HHMMSS format
-                date_part = timestamp_str[:8]    # "20250602"
-                time_part = timestamp_str[9:]    # "153150"
-                
-                # Extract components
-                year = int(date_part[:4])        # 2025
-                month = int(date_part[4:6])      # 06
-                day = int(date_part[6:8])        # 02
-                
-                hour = int(time_part[:2])        # 15
-                minute = int(time_part[2:4])     # 31
-                second = int(time_part[4:6])     # 50
-                
-                # Create datetime object (assuming IST timezone)
-                ist_tz = timezone(timedelta(hours=5, minutes=30))
-                dt = datetime(year, month, day, hour, minute, second, tzinfo=ist_tz)
-                
-                # Format options with date and time:
-                
-                # Option 1: Jun 02, 2025 at 03:31 PM IST (Recommended - most readable)
-                return dt.strftime('%b %d, %Y at %I:%M %p IST')
-                
-                # Option 2: 2025-06-02 15:31 IST (24-hour format)
-                # return dt.strftime('%Y-%m-%d %H:%M IST')
-                
-                # Option 3: 02/06/2025 03:31 PM IST (DD/MM/YYYY format)
-                # return dt.strftime('%d/%m/%Y %I:%M %p IST')
-                
-                # Option 4: June 2, 2025 03:31 PM IST (Full month name)
-                # return dt.strftime('%B %d, %Y %I:%M %p IST')
-            
-            # Handle other formats (existing logic for ISO timestamps)
-            elif isinstance(timestamp_str, str):
-                if '+05:30' in timestamp_str or 'IST' in timestamp_str:
-                    clean_time = timestamp_str.replace('+05:30', '').replace(' IST', '').strip()
-                    dt = datetime.fromisoformat(clean_time)
-                    ist_tz = timezone(timedelta(hours=5, minutes=30))
-                    dt = dt.replace(tzinfo=ist_tz)
-                else:
-                    dt = datetime.fromisoformat(timestamp_str)
-                    ist_tz = timezone(timedelta(hours=5, minutes=30))
-                    dt = dt.astimezone(ist_tz)
-                
-                return dt.strftime('%b %d, %Y at %I:%M %p IST')
-            
-        except Exception as e:
-            print(f"⚠️ Warning: Could not parse timestamp '{timestamp_str}': {e}")
-        return "Unknown time"
+        if not timestamp_str or timestamp_str == 'Unknown':
+            return "Unknown time"
+        
+        # YYYYMMDD_HHMMSS (like "20250602_153150") is IST; naive ISO values are read as local time
+        is_compact = isinstance(timestamp_str, str) and '_' in timestamp_str and len(timestamp_str) == 15
+        dt = parse_timestamp(timestamp_str, naive_tz=IST if is_compact else None)
+        if dt is None:
+            print(f"⚠️ Warning: Could not parse timestamp '{timestamp_str}'")
+            return "Unknown time"
+        
+        # Format: Jun 02, 2025 at 03:31 PM IST
+        return dt.astimezone(IST).strftime('%b %d, %Y at %I:%M %p IST')
         
     def display_eks_summary(self, data: Dict, file_path: str = "", show_cost: bool = False, start_number: int = 1) -> List[Tuple]:
         """Display EKS cluster summary from JSON file with continuous numbering"""
@@ -1031,8 +860,11 @@ class AWSResourceManager:
         print(f"💡 Available numbers: 1-{len(all_resources)}")
         print("-" * 70)
         
-        selection_input = input(f"Select {resource_type.upper()} for live lookup (default=all): ").strip()
-        selected_indices = self.parse_selection_input(selection_input, len(all_resources))
+        if self.batch_plan:
+            selected_indices = self.plan_resource_numbers(all_resources)
+        else:
+            selection_input = input(f"Select {resource_type.upper()} for live lookup (default=all): ").strip()
+            selected_indices = self.parse_selection_input(selection_input, len(all_resources))
         
         if not selected_indices:
             print("❌ No valid selections made")
@@ -1443,6 +1275,16 @@ class AWSResourceManager:
             
             print(f"\n💾 Consolidated execution report saved to: {full_path}")
             
+            # Append structured rows to the cost history for offline aggregation
+            if operation_type in ['live_cost', 'cost_calculation']:
+                try:
+                    store = CostHistoryStore()
+                    stored = store.append_reports(self.execution_reports, resource_type, timestamp)
+                    store.close()
+                    print(f"📈 {stored} cost record(s) added to {store.db_file} (python cost_history_store.py --by account day)")
+                except Exception as e:
+                    print(f"⚠️ Warning: Could not update cost history: {e}")
+            
             # Clear reports for next execution
             self.execution_reports = []
             
@@ -1493,8 +1335,11 @@ class AWSResourceManager:
         print(f"💡 Available numbers: 1-{len(all_resources)}")
         print("-" * 70)
         
-        selection_input = input(f"Select {resource_type.upper()} for live cost calculation (default=all): ").strip()
-        selected_indices = self.parse_selection_input(selection_input, len(all_resources))
+        if self.batch_plan:
+            selected_indices = self.plan_resource_numbers(all_resources)
+        else:
+            selection_input = input(f"Select {resource_type.upper()} for live cost calculation (default=all): ").strip()
+            selected_indices = self.parse_selection_input(selection_input, len(all_resources))
         
         if not selected_indices:
             print("❌ No valid selections made")
@@ -1550,6 +1395,9 @@ class AWSResourceManager:
             account_successful = 0
             account_skipped = 0
             
+            # Phase 1: fetch live data; costs for the whole account are computed in one pass below
+            live_resources = []
+            
             for selected_resource in group_data['resources']:
                 if resource_type == 'eks':
                     global_number, cluster_name, account_key, region, cluster_data = selected_resource
@@ -1583,38 +1431,7 @@ class AWSResourceManager:
                             live_cluster_data = live_status['cluster']
                             live_cluster_data['nodegroups'] = live_status.get('nodegroups', [])
                         
-                        cost_data = self.cost_calculator.calculate_live_eks_cost(cluster_data, live_cluster_data)
-                        
-                        # Calculate total nodes for display
-                        total_nodes = cost_data['actual_nodes']
-                        
-                        print(f"\n🚀 EKS Cluster {global_number}: {cluster_name}")
-                        print(f"   🌍 Region: {region}")
-                        print(f"   📊 Status: {cost_data.get('current_status', 'unknown')}")
-                        print(f"   📅 Created: {self.utc_to_ist(str(live_cluster_data.get('createdAt', 'Unknown') if live_cluster_data else 'Unknown'))} IST")
-                        print(f"   ⏰ Running Hours: {cost_data['hours_running']:.2f}")
-                        print(f"   🔢 Total Nodes: {total_nodes}")
-                        print(f"   🎛️ Control Plane: ${cost_data['control_plane_cost']:.2f} (${self.cost_calculator.EKS_CLUSTER_HOURLY_COST:.2f}/hr)")
-                        print(f"   🖥️ Node Compute: ${cost_data['node_compute_cost']:.2f} ({total_nodes} × {cost_data['instance_type']})")
-                        print(f"   💾 Node Storage: ${cost_data['node_storage_cost']:.2f} ({cost_data['disk_size_gb']}GB per node)")
-                        print(f"   💰 Total Cost: ${cost_data['total_cost']:.2f}")
-                        print(f"   ⏰ Calculated at: {cost_data['calculation_time'].astimezone(timezone(timedelta(hours=5, minutes=30))).strftime('%Y-%m-%d %H:%M:%S')} IST")
-                        
-                        account_cost += cost_data['total_cost']
-                        successful_resources += 1
-                        account_successful += 1
-                        
-                        # Add to execution reports for successful resources
-                        self.execution_reports.append({
-                            'type': 'eks_cost',
-                            'resource_id': cluster_name,
-                            'global_number': global_number,
-                            'status': 'success',
-                            'data': live_status,
-                            'timestamp': current_time,
-                            'cost_data': cost_data,
-                            'total_nodes': total_nodes
-                        })
+                        live_resources.append((selected_resource, live_status, cluster_data, live_cluster_data))
                         
                     except Exception as e:
                         print(f"⚠️ SKIPPED - EKS Cluster {global_number}: {cluster_name}")
@@ -1666,32 +1483,7 @@ class AWSResourceManager:
                         if live_status['status'] == 'success':
                             live_instance_data = live_status['instance']
                         
-                        cost_data = self.cost_calculator.calculate_live_ec2_cost(instance_data, live_instance_data)
-                        
-                        print(f"\n💻 EC2 Instance {global_number}: {instance_id}")
-                        print(f"   🌍 Region: {region}")
-                        print(f"   🏷️ Type: {cost_data['instance_type']} | 📊 State: {cost_data.get('current_state', 'unknown')}")
-                        print(f"   📅 Launch Time: {self.utc_to_ist(str(live_instance_data.get('LaunchTime', 'Unknown') if live_instance_data else 'Unknown'))} IST")
-                        print(f"   ⏰ Running Hours: {cost_data['hours_running']:.2f}")
-                        print(f"   🖥️ Compute: ${cost_data['compute_cost']:.2f} (${cost_data['hourly_rate']:.4f}/hr)")
-                        print(f"   💾 Storage: ${cost_data['storage_cost']:.2f} ({cost_data['disk_size_gb']}GB)")
-                        print(f"   💰 Total Cost: ${cost_data['total_cost']:.2f}")
-                        print(f"   ⏰ Calculated at: {cost_data['calculation_time'].astimezone(timezone(timedelta(hours=5, minutes=30))).strftime('%Y-%m-%d %H:%M:%S')} IST")
-                        
-                        account_cost += cost_data['total_cost']
-                        successful_resources += 1
-                        account_successful += 1
-                        
-                        # Add to execution reports for successful resources
-                        self.execution_reports.append({
-                            'type': 'ec2_cost',
-                            'resource_id': instance_id,
-                            'global_number': global_number,
-                            'status': 'success',
-                            'data': live_status,
-                            'timestamp': current_time,
-                            'cost_data': cost_data
-                        })
+                        live_resources.append((selected_resource, live_status, instance_data, live_instance_data))
                         
                     except Exception as e:
                         print(f"⚠️ SKIPPED - EC2 Instance {global_number}: {instance_id}")
@@ -1712,6 +1504,81 @@ class AWSResourceManager:
                         })
                         continue
             
+            # Phase 2: vectorized cost pass over every resource fetched for this account
+            cost_records = [(stored_data, live_data) for _, _, stored_data, live_data in live_resources]
+            if resource_type == 'eks':
+                all_cost_data = self.cost_calculator.calculate_live_eks_costs(cost_records)
+            else:
+                all_cost_data = self.cost_calculator.calculate_live_ec2_costs(cost_records)
+            
+            # Phase 3: display and report
+            for (selected_resource, live_status, _, live_data), cost_data in zip(live_resources, all_cost_data):
+                if resource_type == 'eks':
+                    global_number, cluster_name, account_key, region, cluster_data = selected_resource
+                    live_cluster_data = live_data
+                    
+                    # Calculate total nodes for display
+                    total_nodes = cost_data['actual_nodes']
+                    
+                    print(f"\n🚀 EKS Cluster {global_number}: {cluster_name}")
+                    print(f"   🌍 Region: {region}")
+                    print(f"   📊 Status: {cost_data.get('current_status', 'unknown')}")
+                    print(f"   📅 Created: {self.utc_to_ist(str(live_cluster_data.get('createdAt', 'Unknown') if live_cluster_data else 'Unknown'))} IST")
+                    print(f"   ⏰ Running Hours: {cost_data['hours_running']:.2f}")
+                    print(f"   🔢 Total Nodes: {total_nodes}")
+                    print(f"   🎛️ Control Plane: ${cost_data['control_plane_cost']:.2f} (${self.cost_calculator.EKS_CLUSTER_HOURLY_COST:.2f}/hr)")
+                    print(f"   🖥️ Node Compute: ${cost_data['node_compute_cost']:.2f} ({total_nodes} × {cost_data['instance_type']})")
+                    print(f"   💾 Node Storage: ${cost_data['node_storage_cost']:.2f} ({cost_data['disk_size_gb']}GB per node)")
+                    print(f"   💰 Total Cost: ${cost_data['total_cost']:.2f}")
+                    print(f"   ⏰ Calculated at: {cost_data['calculation_time'].astimezone(timezone(timedelta(hours=5, minutes=30))).strftime('%Y-%m-%d %H:%M:%S')} IST")
+                    
+                    # Add to execution reports for successful resources
+                    self.execution_reports.append({
+                        'type': 'eks_cost',
+                        'resource_id': cluster_name,
+                        'global_number': global_number,
+                        'status': 'success',
+                        'data': live_status,
+                        'timestamp': current_time,
+                        'cost_data': cost_data,
+                        'total_nodes': total_nodes,
+                        'account': account_key,
+                        'username': cluster_data.get('username'),
+                        'region': region
+                    })
+                    
+                else:  # EC2
+                    global_number, instance_id, account_name_inner, region, instance_data = selected_resource
+                    live_instance_data = live_data
+                    
+                    print(f"\n💻 EC2 Instance {global_number}: {instance_id}")
+                    print(f"   🌍 Region: {region}")
+                    print(f"   🏷️ Type: {cost_data['instance_type']} | 📊 State: {cost_data.get('current_state', 'unknown')}")
+                    print(f"   📅 Launch Time: {self.utc_to_ist(str(live_instance_data.get('LaunchTime', 'Unknown') if live_instance_data else 'Unknown'))} IST")
+                    print(f"   ⏰ Running Hours: {cost_data['hours_running']:.2f}")
+                    print(f"   🖥️ Compute: ${cost_data['compute_cost']:.2f} (${cost_data['hourly_rate']:.4f}/hr)")
+                    print(f"   💾 Storage: ${cost_data['storage_cost']:.2f} ({cost_data['disk_size_gb']}GB)")
+                    print(f"   💰 Total Cost: ${cost_data['total_cost']:.2f}")
+                    print(f"   ⏰ Calculated at: {cost_data['calculation_time'].astimezone(timezone(timedelta(hours=5, minutes=30))).strftime('%Y-%m-%d %H:%M:%S')} IST")
+                    
+                    # Add to execution reports for successful resources
+                    self.execution_reports.append({
+                        'type': 'ec2_cost',
+                        'resource_id': instance_id,
+                        'global_number': global_number,
+                        'status': 'success',
+                        'data': live_status,
+                        'timestamp': current_time,
+                        'cost_data': cost_data,
+                        'account': account_name_inner,
+                        'username': instance_data.get('username'),
+                        'region': region
+                    })
+                
+                account_cost += cost_data['total_cost']
+                successful_resources += 1
+                account_successful += 1
+            
             # Store the actual calculated cost
             account_costs[account_name] = account_cost
             
@@ -1802,6 +1669,19 @@ class AWSResourceManager:
             else:
                 print("❌ Invalid option, please try again")
 
+    def run_batch(self):
+        """Headless counterpart of ask_resource_type, driven by the plan's operation and resource_type options"""
+        operation = self.batch_plan.option('operation', 'cost')
+        resource_type = str(self.batch_plan.option('resource_type', 'ec2')).lower()
+        if operation not in ('lookup', 'cost') or resource_type not in ('ec2', 'eks'):
+            print(f"❌ Batch mode needs operation=lookup|cost and resource_type=ec2|eks, got {operation}/{resource_type}")
+            sys.exit(2)
+        
+        if operation == 'lookup':
+            self.interactive_live_lookup(resource_type)
+        else:
+            self.calculate_resource_costs(resource_type)
+
 def main():
     parser = argparse.ArgumentParser(
         description='AWS Resource Manager with Live Cost Calculator',
@@ -1811,19 +1691,34 @@ Examples:
 python ec2_eks_lookup_resource.py i-0ea27a17f321529f1    # Direct EC2 lookup
 python ec2_eks_lookup_resource.py eks-cluster-name       # Direct EKS lookup  
 python ec2_eks_lookup_resource.py                        # Interactive mode
+python ec2_eks_lookup_resource.py --batch --set operation=cost --set resource_type=ec2 --accounts account01
+                                                         # Headless EC2 cost run for one account
         """
     )
     
     parser.add_argument('resource_id', nargs='?', help='Resource ID for direct lookup')
     parser.add_argument('--config', default='aws_accounts_config.json', 
                     help='AWS configuration file path')
+    parser.add_argument('--api-metrics', action='store_true',
+                    help='Record per-call AWS API latency/retries and report them at exit (or set AWS_API_METRICS=1)')
+    
+    add_batch_arguments(parser)
     
     args = parser.parse_args()
     
-    manager = AWSResourceManager(args.config)
+    try:
+        batch_plan = plan_from_args(args, 'resource_lookup')
+    except BatchPlanError as e:
+        parser.error(str(e))
+    
+    enable_api_metrics('resource_lookup', args.api_metrics or None)
+    
+    manager = AWSResourceManager(args.config, batch_plan=batch_plan)
     
     if args.resource_id:
         manager.direct_resource_lookup(args.resource_id)
+    elif batch_plan:
+        manager.run_batch()
     else:
         manager.ask_resource_type()
 
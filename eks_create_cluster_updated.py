@@ -12,8 +12,6 @@ import os
 import sys
 import time
 import boto3
-import glob
-import re
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import threading
@@ -38,6 +36,14 @@ except ImportError:
     )
     logger = logging.getLogger('eks_manager')
 
+from execution_journal import ExecutionJournal
+from prerequisite_reconciler import PrerequisiteReconciler
+from credentials_resolver import get_credentials_resolver
+from api_metrics import enable_api_metrics
+from trace_recorder import enable_tracing, trace_span
+from pricing_catalog import get_pricing_catalog
+from batch_plan import BatchPlanError, add_batch_arguments, plan_from_args
+
 class Colors:
     """ANSI color codes for terminal output"""
     RED = '\033[0;31m'
@@ -52,13 +58,16 @@ class Colors:
 class EKSClusterManager:
     """Main class for managing EKS clusters across multiple AWS accounts"""
     
-    def __init__(self, config_file: str = None):
+    def __init__(self, config_file: str = None, resume: bool = False, batch_plan=None):
         """
         Initialize the EKS Cluster Manager
         
         Args:
             config_file (str): Path to the AWS accounts configuration file (optional)
+            resume (bool): Continue the latest interrupted run from its journal
+            batch_plan (BatchPlan): Headless selections and options; None runs the interactive menus
         """
+        self.batch_plan = batch_plan
         self.config_file = config_file or self.find_latest_credentials_file()
         self.admin_config_file = "aws_accounts_config.json"
         self.config_data = None
@@ -68,6 +77,8 @@ class EKSClusterManager:
         self.current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.current_user = "varadharajaan"
         self.execution_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.journal = ExecutionJournal('eks_cluster_creation', resume=resume)
+        self.reconciler = PrerequisiteReconciler(log_fn=self.log_operation)
         
         logger.info(f"Initializing EKS Cluster Manager with config: {self.config_file}")
         self.load_configuration()
@@ -76,47 +87,33 @@ class EKSClusterManager:
     
     def find_latest_credentials_file(self) -> str:
         """Find the latest iam_users_credentials_timestamp file"""
-        pattern = "iam_users_credentials_*.json"
-        files = glob.glob(pattern)
+        resolver = get_credentials_resolver()
+        file_timestamps = resolver.credential_files()
+        skipped_files = resolver.skipped_files()
         
-        if not files:
+        if not file_timestamps and not skipped_files:
             logger.error("No iam_users_credentials_*.json file found!")
             self.print_colored(Colors.RED, "❌ No iam_users_credentials_*.json file found!")
             # Fallback to default config file
             return "aws-accounts-config.json"
         
-        self.print_colored(Colors.BLUE, f"🔍 Found {len(files)} iam_users_credentials files:")
+        self.print_colored(Colors.BLUE, f"🔍 Found {len(file_timestamps) + len(skipped_files)} iam_users_credentials files:")
         
-        # Sort by timestamp in filename
-        file_timestamps = []
-        for file_path in files:
-            # Match pattern: iam_users_credentials_YYYYMMDD_HHMMSS.json
-            match = re.search(r'iam_users_credentials_(\d{8}_\d{6})\.json', file_path)
-            if match:
-                timestamp_str = match.group(1)
-                try:
-                    timestamp = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                    file_timestamps.append((file_path, timestamp, timestamp_str))
-                    
-                    # Display file info
-                    file_size = os.path.getsize(file_path)
-                    file_size_mb = file_size / (1024 * 1024)
-                    formatted_time = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                    print(f"   📄 {file_path} - {formatted_time} UTC ({file_size_mb:.2f} MB)")
-                    
-                except ValueError:
-                    print(f"   ⚠️  Invalid timestamp format in: {file_path}")
-                    continue
-            else:
-                print(f"   ⚠️  Invalid filename format: {file_path}")
+        for file_path, timestamp, timestamp_str in file_timestamps:
+            # Display file info
+            file_size = os.path.getsize(file_path)
+            file_size_mb = file_size / (1024 * 1024)
+            formatted_time = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+            print(f"   📄 {file_path} - {formatted_time} UTC ({file_size_mb:.2f} MB)")
+        for file_path, reason in skipped_files:
+            print(f"   ⚠️  {file_path} {reason}")
         
         if not file_timestamps:
             logger.error("No valid iam_users_credentials files found with proper timestamp format!")
             self.print_colored(Colors.RED, "❌ No valid iam_users_credentials files found with proper timestamp format!")
             return "aws-accounts-config.json"
         
-        # Sort by timestamp (newest first)
-        file_timestamps.sort(key=lambda x: x[1], reverse=True)
+        # Already sorted newest first
         latest_file = file_timestamps[0][0]
         latest_timestamp = file_timestamps[0][2]
         latest_datetime = file_timestamps[0][1]
@@ -276,6 +273,19 @@ class EKSClusterManager:
         
         accounts = list(self.config_data['accounts'].items())
         
+        if self.batch_plan:
+            selected_indices = []
+            for idx, (account_name, account_data) in enumerate(accounts, 1):
+                if not self.batch_plan.match_account(account_name, account_data.get('account_id'), account_data.get('account_email')):
+                    continue
+                if account_name not in self.admin_config_data.get('accounts', {}):
+                    self.log_operation('WARNING', f"Batch plan: skipping {account_name}, no admin credentials")
+                    print(f"⚠️  Skipping {account_name}: no admin credentials in {self.admin_config_file}")
+                    continue
+                selected_indices.append(idx)
+            self.log_operation('INFO', f"Batch plan selected {len(selected_indices)} of {len(accounts)} accounts")
+            return selected_indices
+        
         self.log_operation('INFO', f"Displaying {len(accounts)} available accounts for selection")
         
         print(f"\n🏦 Available AWS Accounts ({len(accounts)} total):")
@@ -453,6 +463,13 @@ class EKSClusterManager:
             self.log_operation('ERROR', "No users found in selected accounts")
             return [], {}
         
+        if self.batch_plan:
+            user_mapping = dict(enumerate(all_users, 1))
+            selected_indices = [idx for idx, user_info in user_mapping.items()
+                                if self.batch_plan.match_user(user_info['username'], user_info['real_user'].get('email'))
+                                and self.batch_plan.match_region(user_info['region'])]
+            return selected_indices, user_mapping
+        
         self.log_operation('INFO', f"Displaying {len(all_users)} available users for selection")
         
         print(f"\n👥 Available Users ({len(all_users)} total):")
@@ -709,7 +726,7 @@ class EKSClusterManager:
                 iam_client.attach_role_policy(RoleName=eks_role_name, PolicyArn=policy)
                 
             # Wait for role to be available
-            time.sleep(10)
+            self.reconciler.wait_for_role_propagation(iam_client, eks_role_name, policies)
         
         try:
             iam_client.get_role(RoleName=node_role_name)
@@ -744,7 +761,7 @@ class EKSClusterManager:
                 iam_client.attach_role_policy(RoleName=node_role_name, PolicyArn=policy)
                 
             # Wait for role to be available
-            time.sleep(10)
+            self.reconciler.wait_for_role_propagation(iam_client, node_role_name, node_policies)
         
         return eks_role_arn, node_role_arn
     
@@ -1004,6 +1021,12 @@ class EKSClusterManager:
         capacity_options = ['SPOT', 'ON_DEMAND']
         default_type = 'SPOT'  # Default to SPOT for cost efficiency
         
+        if self.batch_plan:
+            selected_type = str(self.batch_plan.option('capacity_type', default_type)).upper()
+            if selected_type not in capacity_options:
+                raise ValueError(f"capacity_type must be one of {', '.join(capacity_options)}, got {selected_type}")
+            return selected_type
+        
         user_prefix = f"for {user_name} " if user_name else ""
         print(f"\n💰 Capacity Type Selection {user_prefix}")
         print("=" * 60)
@@ -1194,6 +1217,12 @@ class EKSClusterManager:
         if default_type not in allowed_types:
             default_type = allowed_types[0] if allowed_types else "c6a.large"
         
+        if self.batch_plan:
+            selected_type = self.batch_plan.option('instance_type', default_type)
+            if selected_type not in allowed_types:
+                raise ValueError(f"instance_type {selected_type} is not allowed (allowed: {', '.join(allowed_types)})")
+            return selected_type
+        
         user_prefix = f"for {user_name} " if user_name else ""
         print(f"\n💻 Instance Type Selection {user_prefix}")
         print("=" * 60)
@@ -1231,18 +1260,34 @@ class EKSClusterManager:
             self.print_colored(Colors.YELLOW, "No clusters to create!")
             return
         
-        self.log_operation('INFO', f"Starting creation of {len(cluster_configs)} clusters")
-        self.print_colored(Colors.GREEN, f"🚀 Starting creation of {len(cluster_configs)} clusters...")
-        
-        # Create clusters sequentially
+        # Clusters finished by an interrupted earlier run come straight from the journal
         successful_clusters = []
         failed_clusters = []
         
-        for i, cluster_info in enumerate(cluster_configs, 1):
-            self.print_colored(Colors.BLUE, f"\n📋 Progress: {i}/{len(cluster_configs)}")
+        for completed in self.journal.completed_results():
+            successful_clusters.append(completed['cluster_info'])
+            self.kubectl_commands.append(completed['kubectl_command'])
+        
+        pending_configs = self.journal.pending(cluster_configs, lambda c: c['cluster_name'])
+        if successful_clusters:
+            self.print_colored(Colors.CYAN, f"♻️  Resuming: {len(successful_clusters)} clusters already created, {len(pending_configs)} pending")
+        
+        self.log_operation('INFO', f"Starting creation of {len(pending_configs)} clusters (journal: {self.journal.journal_file})")
+        self.print_colored(Colors.GREEN, f"🚀 Starting creation of {len(pending_configs)} clusters...")
+        
+        # Create clusters sequentially
+        for i, cluster_info in enumerate(pending_configs, 1):
+            self.print_colored(Colors.BLUE, f"\n📋 Progress: {i}/{len(pending_configs)}")
+            
+            with trace_span('create_cluster', 'cluster', resource=cluster_info['cluster_name'], account=cluster_info['account_key']):
+                created = self.create_single_cluster(cluster_info)
             
-            if self.create_single_cluster(cluster_info):
+            if created:
                 successful_clusters.append(cluster_info)
+                self.journal.record(cluster_info['cluster_name'], ExecutionJournal.COMPLETE, {
+                    'cluster_info': cluster_info,
+                    'kubectl_command': self.kubectl_commands[-1]
+                })
             else:
                 failed_clusters.append(cluster_info)
         
@@ -1262,6 +1307,9 @@ class EKSClusterManager:
         # Generate final commands and instructions (silently)
         self.generate_final_commands()
         self.generate_user_instructions()
+        
+        if not failed_clusters:
+            self.journal.mark_finished()
 
     def create_single_cluster(self, cluster_info: Dict) -> bool:
         """Create a single EKS cluster using admin credentials with user-selected instance type and 1 default node"""
@@ -1296,12 +1344,20 @@ class EKSClusterManager:
             
             # Ensure IAM roles exist
             self.log_operation('DEBUG', f"Ensuring IAM roles exist for {account_key}")
-            eks_role_arn, node_role_arn = self.ensure_iam_roles(iam_client, account_id)
+            with trace_span('iam_roles', resource=cluster_name, account=account_key, region=region):
+                eks_role_arn, node_role_arn = self.reconciler.resolve(
+                    ('iam_roles', account_id),
+                    lambda: self.ensure_iam_roles(iam_client, account_id)
+                )
             self.log_operation('INFO', f"IAM roles verified/created for {account_key}")
             
             # Get VPC resources
             self.log_operation('DEBUG', f"Getting VPC resources for {account_key} in {region}")
-            subnet_ids, security_group_id = self.get_or_create_vpc_resources(ec2_client, region)
+            with trace_span('vpc', resource=cluster_name, account=account_key, region=region):
+                subnet_ids, security_group_id = self.reconciler.resolve(
+                    ('vpc', account_id, region),
+                    lambda: self.get_or_create_vpc_resources(ec2_client, region)
+                )
             self.log_operation('INFO', f"VPC resources verified for {account_key} in {region}")
             
             # Step 1: Create EKS cluster
@@ -1316,14 +1372,20 @@ class EKSClusterManager:
                 }
             }
             
-            eks_client.create_cluster(**cluster_config)
+            # Skipped on resume when the cluster was already requested before the interruption
+            with trace_span('cluster_request', resource=cluster_name, account=account_key, region=region):
+                self.journal.step(cluster_name, 'cluster_requested',
+                                  lambda: self.reconciler.create_cluster_with_role_retry(
+                                      eks_client, cluster_config)['cluster']['arn'])
             self.log_operation('INFO', f"EKS cluster {cluster_name} creation initiated")
             
             # Wait for cluster to be active
             self.log_operation('INFO', f"Waiting for cluster {cluster_name} to be active...")
             self.print_colored(Colors.YELLOW, f"⏳ Waiting for cluster {cluster_name} to be active...")
             waiter = eks_client.get_waiter('cluster_active')
-            waiter.wait(name=cluster_name, WaiterConfig={'Delay': 30, 'MaxAttempts': 40})
+            with trace_span('waiter', resource=cluster_name, account=account_key, region=region, waiter='cluster_active'):
+                waiter.wait(name=cluster_name, WaiterConfig={'Delay': 30, 'MaxAttempts': 40})
+            self.journal.record(cluster_name, 'cluster_active')
             
             self.log_operation('INFO', f"Cluster {cluster_name} is now active")
             
@@ -1351,19 +1413,23 @@ class EKSClusterManager:
             # Log the exact configuration being used
             self.log_operation('INFO', f"Creating nodegroup with config: instanceTypes={nodegroup_config['instanceTypes']}, capacityType={nodegroup_config.get('capacityType', 'default')}")
             
-            eks_client.create_nodegroup(**nodegroup_config)
+            with trace_span('nodegroups', resource=cluster_name, account=account_key, region=region, nodegroup=nodegroup_name):
+                self.journal.step(cluster_name, 'nodegroup_requested',
+                                  lambda: eks_client.create_nodegroup(**nodegroup_config)['nodegroup']['nodegroupArn'])
             self.log_operation('INFO', f"Node group {nodegroup_name} creation initiated with {instance_type} instances")
             
             # Wait for node group to be active
             self.log_operation('INFO', f"Waiting for node group {nodegroup_name} to be active...")
             self.print_colored(Colors.YELLOW, f"⏳ Waiting for node group {nodegroup_name} to be active...")
             ng_waiter = eks_client.get_waiter('nodegroup_active')
-            ng_waiter.wait(
-                clusterName=cluster_name,
-                nodegroupName=nodegroup_name,
-                WaiterConfig={'Delay': 30, 'MaxAttempts': 40}
-            )
+            with trace_span('waiter', resource=cluster_name, account=account_key, region=region, waiter='nodegroup_active'):
+                ng_waiter.wait(
+                    clusterName=cluster_name,
+                    nodegroupName=nodegroup_name,
+                    WaiterConfig={'Delay': 30, 'MaxAttempts': 40}
+                )
             
+            self.journal.record(cluster_name, 'nodegroup_active')
             self.log_operation('INFO', f"Node group {nodegroup_name} is now active with 1 {instance_type} node")
             
             # Verify the actual instance type created
@@ -1387,9 +1453,10 @@ class EKSClusterManager:
             self.log_operation('INFO', f"Configuring user access for {username}")
             self.print_colored(Colors.YELLOW, f"🔐 Configuring user access for {username}...")
 
-            auth_success = self.configure_aws_auth_configmap(
-                cluster_name, region, account_id, user, admin_access_key, admin_secret_key
-            )
+            with trace_span('configmap_apply', resource=cluster_name, account=account_key, region=region, user=username):
+                auth_success = self.configure_aws_auth_configmap(
+                    cluster_name, region, account_id, user, admin_access_key, admin_secret_key
+                )
 
             if auth_success:
                 self.log_operation('INFO', f"User access configured for {username}")
@@ -1402,20 +1469,22 @@ class EKSClusterManager:
                 self.log_operation('INFO', f"Verifying cluster access for {username}")
                 
                 # Wait a bit more for ConfigMap to fully propagate
-                time.sleep(15)
+                with trace_span('waiter', resource=cluster_name, account=account_key, region=region, waiter='configmap_propagation'):
+                    time.sleep(15)
                 
                 user_credentials = {
                     'access_key_id': user.get('access_key_id', ''),
                     'secret_access_key': user.get('secret_access_key', '')
                 }
                 
-                verification_success = self.test_user_access_enhanced(
-                    cluster_name, 
-                    region, 
-                    username, 
-                    user_credentials['access_key_id'], 
-                    user_credentials['secret_access_key']
-                )
+                with trace_span('kubectl_test', resource=cluster_name, account=account_key, region=region, user=username):
+                    verification_success = self.test_user_access_enhanced(
+                        cluster_name, 
+                        region, 
+                        username, 
+                        user_credentials['access_key_id'], 
+                        user_credentials['secret_access_key']
+                    )
                 if verification_success:
                     self.log_operation('INFO', f"Cluster access verification successful for {username}")
                     self.print_colored(Colors.GREEN, f"✅ Cluster access verified for {username}")
@@ -1483,6 +1552,14 @@ class EKSClusterManager:
             print(f"🎯 Default Instance Type: {default_type}")
             print("=" * 80)
             
+            # Resume an interrupted run without going through the menus again
+            if self.journal.resumed and self.journal.get_plan():
+                cluster_configs = self.journal.get_plan()
+                summary = self.journal.summary()
+                self.print_colored(Colors.CYAN, f"♻️  Resuming run from {self.journal.journal_file} ({summary['completed']}/{len(cluster_configs)} clusters done)")
+                self.create_clusters(cluster_configs)
+                return
+            
             # Step 1: Select accounts to process
             selected_account_indices = self.display_accounts_menu()
             if not selected_account_indices:
@@ -1491,6 +1568,10 @@ class EKSClusterManager:
             
             selected_accounts = self.get_selected_accounts_data(selected_account_indices)
             
+            if self.batch_plan:
+                self.run_batch(selected_accounts)
+                return
+            
             # Step 2: Ask for selection level preference
             print(f"\n🎯 Selection Level:")
             print("=" * 50)
@@ -1533,7 +1614,7 @@ class EKSClusterManager:
                             
                             cluster_name = self.generate_cluster_name(user_data.get('username', 'unknown'), user_data.get('region', 'us-east-1'))
                             
-                            self.display_cost_estimation(instance_type, capacity_type, max_nodes)
+                            self.display_cost_estimation(instance_type, capacity_type, max_nodes, user_data.get('region', 'us-east-1'))
 
                             cluster_config = {
                                 'account_key': account_name,
@@ -1564,7 +1645,8 @@ class EKSClusterManager:
             
             # Show summary and confirm
             if self.show_cluster_summary(cluster_configs):
-                # Create clusters
+                # Record the plan first so an interrupted run can be resumed with --resume
+                self.journal.save_plan(cluster_configs)
                 self.create_clusters(cluster_configs)
             else:
                 self.print_colored(Colors.YELLOW, "Cluster creation cancelled.")
@@ -1576,6 +1658,38 @@ class EKSClusterManager:
             self.print_colored(Colors.RED, f"Error: {error_msg}")
             sys.exit(1)
 
+    def run_batch(self, selected_accounts) -> None:
+        """Headless steps 2-4: plan users into cluster configs for this shard and create them"""
+        selected_user_indices, user_mapping = self.display_users_menu(selected_accounts)
+        
+        max_nodes = int(self.batch_plan.option('max_nodes', 3))
+        if not 1 <= max_nodes <= 10:
+            raise ValueError(f"max_nodes must be between 1 and 10, got {max_nodes}")
+        instance_type = self.select_instance_type()
+        capacity_type = self.select_capacity_type()
+        
+        users = self.batch_plan.plan_tasks([user_mapping[idx] for idx in selected_user_indices],
+                                           key=lambda user_info: f"{user_info['account_name']}/{user_info['username']}")
+        cluster_configs = [{
+            'account_key': user_info['account_name'],
+            'account_id': user_info['account_id'],
+            'user': user_info['user_data'],
+            'max_nodes': max_nodes,
+            'cluster_name': self.generate_cluster_name(user_info['username'], user_info['region']),
+            'instance_type': instance_type,
+            'capacity_type': capacity_type
+        } for user_info in users]
+        
+        self.batch_plan.print_tasks(cluster_configs, lambda cluster: (
+            f"{cluster['cluster_name']} ({cluster['account_key']} - {cluster['user'].get('region')}, "
+            f"{cluster['instance_type']} {cluster['capacity_type']}, max {cluster['max_nodes']} nodes)"))
+        
+        if not cluster_configs or not self.batch_plan.confirm(f"create {len(cluster_configs)} clusters", destructive=False):
+            return
+        self.log_operation('INFO', f"Batch plan: creating {len(cluster_configs)} clusters")
+        self.journal.save_plan(cluster_configs)
+        self.create_clusters(cluster_configs)
+
     def convert_selected_users_to_clusters(self, selected_user_indices, user_mapping):
         """Convert selected user indices to cluster configuration with max nodes and instance type selection"""
         cluster_configs = []
@@ -1628,18 +1742,10 @@ class EKSClusterManager:
     
     # Add cost estimation display for both scripts:
 
-    def display_cost_estimation(self, instance_type: str, capacity_type: str, node_count: int = 1):
+    def display_cost_estimation(self, instance_type: str, capacity_type: str, node_count: int = 1, region: str = 'us-east-1'):
         """Display estimated cost information"""
-        # This is a simplified estimation - you'd want to use actual AWS pricing API
-        base_costs = {
-            't3.micro': 0.0104,
-            't3.small': 0.0208,
-            't3.medium': 0.0416,
-            'c6a.large': 0.0864,
-            'c6a.xlarge': 0.1728
-        }
-        
-        base_cost = base_costs.get(instance_type, 0.05)  # Default fallback
+        # On-demand rate from the offline pricing catalog (see pricing_catalog.py)
+        base_cost = get_pricing_catalog().get_ec2_hourly_rate(instance_type, region, default=0.05)
         
         if capacity_type.lower() in ['spot', 'SPOT']:
             estimated_cost = base_cost * 0.3  # Spot instances are typically 70% cheaper
@@ -1992,9 +2098,30 @@ class EKSClusterManager:
 
 def main():
     """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Interactive EKS Cluster Manager')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue the latest interrupted run from its journal')
+    parser.add_argument('--api-metrics', action='store_true',
+                       help='Record per-call AWS API latency/retries and report them at exit (or set AWS_API_METRICS=1)')
+    parser.add_argument('--trace', action='store_true',
+                       help='Write a Chrome/Perfetto trace of every stage to logs/ at exit (or set AWS_TRACE=1)')
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        batch_plan = plan_from_args(args, 'eks_create')
+    except BatchPlanError as e:
+        parser.error(str(e))
+    
+    enable_tracing('eks_cluster_creation', args.trace or None)
+    enable_api_metrics('eks_cluster_creation', args.api_metrics or None)
+    
     try:
-        # Run the EKS manager
-        manager = EKSClusterManager()
+        # Run the EKS manager; a plan may pin the credentials file instead of the latest one
+        manager = EKSClusterManager(config_file=batch_plan.option('credentials_file') if batch_plan else None,
+                                    resume=args.resume, batch_plan=batch_plan)
         manager.run()
         
     except Exception as e:
@@ -53,6 +53,13 @@ except ImportError:
     )
     logger = logging.getLogger('eks_delete_manager')
 
+from region_occupancy_cache import RegionOccupancyCache
+from execution_journal import ExecutionJournal
+from async_logging import setup_async_logging, log_with_context
+from api_metrics import enable_api_metrics
+from trace_recorder import enable_tracing, trace_span, traced
+from batch_plan import BatchPlanError, add_batch_arguments, plan_from_args
+
 class Colors:
     """ANSI color codes for terminal output"""
     RED = '\033[0;31m'
@@ -84,14 +91,17 @@ class ThreadSafePrinter:
 class EKSClusterDeleteManager:
     """Main class for deleting EKS clusters across multiple AWS accounts and regions with parallel processing"""
     
-    def __init__(self, admin_config_file: str = "aws_accounts_config.json"):
+    def __init__(self, admin_config_file: str = "aws_accounts_config.json", resume: bool = False, batch_plan=None):
         """
         Initialize the EKS Cluster Delete Manager
         
         Args:
             admin_config_file (str): Path to the admin AWS accounts configuration file
+            resume (bool): Continue the latest interrupted run from its journal
+            batch_plan (BatchPlan): Headless selections; None runs the interactive menus
         """
         self.admin_config_file = admin_config_file
+        self.batch_plan = batch_plan
         self.admin_config_data = None
         self.current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.current_user = "varadharajaan"
@@ -99,10 +109,18 @@ class EKSClusterDeleteManager:
         
         # Define the 5 regions to scan
         self.scan_regions = self.get_regions_from_config()
+        if batch_plan:
+            self.scan_regions = [region for region in self.scan_regions if batch_plan.match_region(region)]
         
         self.discovered_clusters = {}  # account -> region -> clusters
         self.deletion_summary = []
         
+        # Remembers empty account/region pairs between runs
+        self.region_cache = RegionOccupancyCache('eks')
+        
+        # Write-ahead journal of finished deletion steps for --resume
+        self.journal = ExecutionJournal('eks_cluster_deletion', resume=resume)
+        
         # Thread safety
         self.printer = ThreadSafePrinter()
         self.deletion_lock = threading.Lock()
@@ -141,34 +159,14 @@ class EKSClusterDeleteManager:
             # Create a file handler for detailed logging
             import logging
             
-            # Create logger for detailed operations
-            self.operation_logger = logging.getLogger('eks_delete_operations')
-            self.operation_logger.setLevel(logging.INFO)
-            
-            # Remove existing handlers to avoid duplicates
-            for handler in self.operation_logger.handlers[:]:
-                self.operation_logger.removeHandler(handler)
-            
-            # File handler with thread-safe formatter
-            file_handler = logging.FileHandler(self.log_filename, encoding='utf-8')
-            file_handler.setLevel(logging.INFO)
-            
-            # Console handler (reduced verbosity)
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.WARNING)  # Only show warnings and errors on console
-            
-            # Thread-safe formatter
-            formatter = logging.Formatter(
-                '%(asctime)s | %(thread)d | %(levelname)8s | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
+            # Workers only enqueue; one listener thread writes the log, its .jsonl twin and the console
+            self.operation_logger, self.log_listener = setup_async_logging(
+                'eks_delete_operations',
+                self.log_filename,
+                console_level=logging.WARNING,
+                fmt='%(asctime)s | %(thread)d | %(levelname)8s | %(message)s'
             )
             
-            file_handler.setFormatter(formatter)
-            console_handler.setFormatter(formatter)
-            
-            self.operation_logger.addHandler(file_handler)
-            self.operation_logger.addHandler(console_handler)
-            
             # Log initial information
             self.operation_logger.info("=" * 80)
             self.operation_logger.info("EKS Cluster Deletion Session Started (Parallel Processing)")
@@ -185,21 +183,13 @@ class EKSClusterDeleteManager:
             print(f"Warning: Could not setup detailed logging: {e}")
             self.operation_logger = None
 
-    def log_operation(self, level, message, thread_id: str = None):
-        """Thread-safe log operation"""
+    def log_operation(self, level, message, thread_id: str = None, **context):
+        """Thread-safe log operation; account/region/resource context goes to the JSON log"""
         thread_info = f"[T-{thread_id}] " if thread_id else ""
         full_message = f"{thread_info}{message}"
         
-        if self.operation_logger:
-            if level.upper() == 'INFO':
-                self.operation_logger.info(full_message)
-            elif level.upper() == 'WARNING':
-                self.operation_logger.warning(full_message)
-            elif level.upper() == 'ERROR':
-                self.operation_logger.error(full_message)
-            elif level.upper() == 'DEBUG':
-                self.operation_logger.debug(full_message)
-        else:
+        # Non-blocking: the record is queued for the listener thread
+        if not log_with_context(self.operation_logger, level, full_message, thread_id, **context):
             # Only print errors and warnings to console
             if level.upper() in ['ERROR', 'WARNING']:
                 self.printer.print_normal(f"[{level.upper()}] {full_message}")
@@ -224,9 +214,11 @@ class EKSClusterDeleteManager:
     
     def scan_eks_clusters_in_region(self, account_key: str, region: str) -> List[Dict]:
         """Scan EKS clusters in a specific account and region"""
+        log_context = {'account': account_key, 'region': region}
+
         try:
             thread_id = threading.current_thread().ident
-            self.log_operation('INFO', f"Scanning EKS clusters in {account_key} - {region}", str(thread_id))
+            self.log_operation('INFO', f"Scanning EKS clusters in {account_key} - {region}", str(thread_id), **log_context)
             
             # Get admin credentials
             admin_access_key, admin_secret_key = self.get_admin_credentials_for_account(account_key)
@@ -247,7 +239,7 @@ class EKSClusterDeleteManager:
             clusters_info = []
             
             if cluster_names:
-                self.log_operation('INFO', f"Found {len(cluster_names)} clusters in {account_key} - {region}", str(thread_id))
+                self.log_operation('INFO', f"Found {len(cluster_names)} clusters in {account_key} - {region}", str(thread_id), **log_context)
                 
                 for cluster_name in cluster_names:
                     try:
@@ -287,7 +279,7 @@ class EKSClusterDeleteManager:
                                 })
                                 
                             except Exception as e:
-                                self.log_operation('WARNING', f"Failed to get nodegroup {ng_name} details: {str(e)}", str(thread_id))
+                                self.log_operation('WARNING', f"Failed to get nodegroup {ng_name} details: {str(e)}", str(thread_id), **log_context)
                                 nodegroup_details.append({
                                     'name': ng_name,
                                     'status': 'ERROR',
@@ -308,10 +300,10 @@ class EKSClusterDeleteManager:
                         }
                         
                         clusters_info.append(cluster_data)
-                        self.log_operation('INFO', f"Cluster {cluster_name}: {len(nodegroups)} nodegroups, {total_nodes} total nodes", str(thread_id))
+                        self.log_operation('INFO', f"Cluster {cluster_name}: {len(nodegroups)} nodegroups, {total_nodes} total nodes", str(thread_id), **log_context)
                         
                     except Exception as e:
-                        self.log_operation('ERROR', f"Failed to get details for cluster {cluster_name}: {str(e)}", str(thread_id))
+                        self.log_operation('ERROR', f"Failed to get details for cluster {cluster_name}: {str(e)}", str(thread_id), **log_context)
                         clusters_info.append({
                             'name': cluster_name,
                             'status': 'ERROR',
@@ -320,13 +312,16 @@ class EKSClusterDeleteManager:
                             'region': region
                         })
             else:
-                self.log_operation('INFO', f"No clusters found in {account_key} - {region}", str(thread_id))
+                self.log_operation('INFO', f"No clusters found in {account_key} - {region}", str(thread_id), **log_context)
+            
+            # list_clusters doubles as the cheap probe, so only the outcome is cached here
+            self.region_cache.record(account_key, region, len(cluster_names))
             
             return clusters_info
             
         except Exception as e:
             thread_id = threading.current_thread().ident
-            self.log_operation('ERROR', f"Failed to scan clusters in {account_key} - {region}: {str(e)}", str(thread_id))
+            self.log_operation('ERROR', f"Failed to scan clusters in {account_key} - {region}: {str(e)}", str(thread_id), **log_context)
             return []
     
     def scan_all_accounts_and_regions(self, selected_accounts: List[str]) -> None:
@@ -348,6 +343,7 @@ class EKSClusterDeleteManager:
         for account_key in selected_accounts:
             for region in self.scan_regions:
                 scan_tasks.append((account_key, region))
+        scan_tasks = self.region_cache.order_tasks(scan_tasks)
         
         # Initialize cluster storage
         for account_key in selected_accounts:
@@ -361,7 +357,8 @@ class EKSClusterDeleteManager:
         with ThreadPoolExecutor(max_workers=max_scan_workers, thread_name_prefix="ScanWorker") as executor:
             # Submit all scan tasks
             future_to_task = {
-                executor.submit(self.scan_eks_clusters_in_region, account_key, region): (account_key, region)
+                executor.submit(traced('scan', self.scan_eks_clusters_in_region, account=account_key, region=region),
+                                account_key, region): (account_key, region)
                 for account_key, region in scan_tasks
             }
             
@@ -388,6 +385,7 @@ class EKSClusterDeleteManager:
                     self.discovered_clusters[account_key][region] = []
                     self.printer.print_colored(Colors.RED, f"[{current_scan:2}/{total_scans}] {account_key} - {region}: ❌ Error: {str(e)}")
         
+        self.region_cache.save_async()
         self.print_colored(Colors.GREEN, f"✅ Completed scanning {total_scans} account-region combinations")
     
     def display_discovered_clusters(self) -> bool:
@@ -475,6 +473,9 @@ class EKSClusterDeleteManager:
         if not hasattr(self, 'cluster_mapping') or not self.cluster_mapping:
             return []
         
+        if self.batch_plan:
+            return self.select_clusters_from_plan()
+        
         total_clusters = len(self.cluster_mapping)
         
         print(f"\n🗑️  Cluster Deletion Selection")
@@ -540,6 +541,21 @@ class EKSClusterDeleteManager:
                 print("   Please use format like: 1,3,5 or 1-5 or 1-3,5,7-9")
                 continue
     
+    def select_clusters_from_plan(self) -> List[Dict]:
+        """Batch counterpart of select_clusters_to_delete: --resources patterns, this shard's clusters, --yes to delete"""
+        candidates = [cluster_info for cluster_info in self.cluster_mapping.values()
+                      if self.batch_plan.match_resource(cluster_info['cluster']['name'], cluster_info['cluster'].get('arn'))]
+        selected_clusters = self.batch_plan.plan_tasks(
+            candidates, key=lambda info: f"{info['account_key']}/{info['region']}/{info['cluster']['name']}")
+        self.batch_plan.print_tasks(selected_clusters, lambda info: (
+            f"{info['cluster']['name']} ({info['account_key']} - {info['region']}, "
+            f"{info['cluster']['nodegroup_count']} nodegroups)"))
+        
+        if not selected_clusters or not self.batch_plan.confirm(f"delete {len(selected_clusters)} clusters"):
+            return []
+        self.log_operation('INFO', f"Batch plan selected {len(selected_clusters)} clusters for deletion")
+        return selected_clusters
+    
     def parse_selection(self, selection, max_items):
         """Parse selection string and return list of indices"""
         selected_indices = set()
@@ -585,13 +601,16 @@ class EKSClusterDeleteManager:
     
     def delete_cluster_nodegroups(self, cluster_info: Dict, thread_id: str) -> bool:
         """Delete all nodegroups in a cluster"""
+        log_context = {'account': cluster_info.get('account_key'), 'region': cluster_info.get('region'),
+                       'resource': cluster_info.get('cluster', {}).get('name')}
+
         try:
             account_key = cluster_info['account_key']
             region = cluster_info['region']
             cluster = cluster_info['cluster']
             cluster_name = cluster['name']
             
-            self.log_operation('INFO', f"Deleting nodegroups for cluster {cluster_name} in {account_key} - {region}", thread_id)
+            self.log_operation('INFO', f"Deleting nodegroups for cluster {cluster_name} in {account_key} - {region}", thread_id, **log_context)
             
             # Get admin credentials
             admin_access_key, admin_secret_key = self.get_admin_credentials_for_account(account_key)
@@ -610,29 +629,29 @@ class EKSClusterDeleteManager:
             nodegroups = nodegroups_response.get('nodegroups', [])
             
             if not nodegroups:
-                self.log_operation('INFO', f"No nodegroups found in cluster {cluster_name}", thread_id)
+                self.log_operation('INFO', f"No nodegroups found in cluster {cluster_name}", thread_id, **log_context)
                 return True
             
-            self.log_operation('INFO', f"Found {len(nodegroups)} nodegroups to delete in {cluster_name}", thread_id)
+            self.log_operation('INFO', f"Found {len(nodegroups)} nodegroups to delete in {cluster_name}", thread_id, **log_context)
             
             # Delete all nodegroups
             for nodegroup_name in nodegroups:
                 try:
-                    self.log_operation('INFO', f"Deleting nodegroup {nodegroup_name} from cluster {cluster_name}", thread_id)
+                    self.log_operation('INFO', f"Deleting nodegroup {nodegroup_name} from cluster {cluster_name}", thread_id, **log_context)
                     
                     eks_client.delete_nodegroup(
                         clusterName=cluster_name,
                         nodegroupName=nodegroup_name
                     )
                     
-                    self.log_operation('INFO', f"Nodegroup {nodegroup_name} deletion initiated", thread_id)
+                    self.log_operation('INFO', f"Nodegroup {nodegroup_name} deletion initiated", thread_id, **log_context)
                     
                 except Exception as e:
-                    self.log_operation('ERROR', f"Failed to delete nodegroup {nodegroup_name}: {str(e)}", thread_id)
+                    self.log_operation('ERROR', f"Failed to delete nodegroup {nodegroup_name}: {str(e)}", thread_id, **log_context)
                     return False
             
             # Wait for all nodegroups to be deleted
-            self.log_operation('INFO', f"Waiting for {len(nodegroups)} nodegroups to be deleted...", thread_id)
+            self.log_operation('INFO', f"Waiting for {len(nodegroups)} nodegroups to be deleted...", thread_id, **log_context)
             
             for nodegroup_name in nodegroups:
                 try:
@@ -644,28 +663,31 @@ class EKSClusterDeleteManager:
                         WaiterConfig={'Delay': 30, 'MaxAttempts': 40}
                     )
                     
-                    self.log_operation('INFO', f"Nodegroup {nodegroup_name} successfully deleted", thread_id)
+                    self.log_operation('INFO', f"Nodegroup {nodegroup_name} successfully deleted", thread_id, **log_context)
                     
                 except Exception as e:
-                    self.log_operation('ERROR', f"Failed to wait for nodegroup {nodegroup_name} deletion: {str(e)}", thread_id)
+                    self.log_operation('ERROR', f"Failed to wait for nodegroup {nodegroup_name} deletion: {str(e)}", thread_id, **log_context)
                     return False
             
-            self.log_operation('INFO', f"All nodegroups deleted successfully from cluster {cluster_name}", thread_id)
+            self.log_operation('INFO', f"All nodegroups deleted successfully from cluster {cluster_name}", thread_id, **log_context)
             return True
             
         except Exception as e:
-            self.log_operation('ERROR', f"Failed to delete nodegroups: {str(e)}", thread_id)
+            self.log_operation('ERROR', f"Failed to delete nodegroups: {str(e)}", thread_id, **log_context)
             return False
         
     def delete_cluster_scrappers(self, cluster_info: Dict, thread_id: str) -> bool:
         """Delete all scrappers associated with a cluster"""
+        log_context = {'account': cluster_info.get('account_key'), 'region': cluster_info.get('region'),
+                       'resource': cluster_info.get('cluster', {}).get('name')}
+
         try:
             account_key = cluster_info['account_key']
             region = cluster_info['region']
             cluster = cluster_info['cluster']
             cluster_name = cluster['name']
             
-            self.log_operation('INFO', f"Deleting scrappers for cluster {cluster_name} in {account_key} - {region}", thread_id)
+            self.log_operation('INFO', f"Deleting scrappers for cluster {cluster_name} in {account_key} - {region}", thread_id, **log_context)
             
             # Get admin credentials
             admin_access_key, admin_secret_key = self.get_admin_credentials_for_account(account_key)
@@ -700,12 +722,12 @@ class EKSClusterDeleteManager:
                                 for alarm in alarms_response.get('MetricAlarms', []):
                                     cloudwatch_client.delete_alarms(AlarmNames=[alarm['AlarmName']])
                                     deleted_scrappers.append(f"CloudWatch Alarm: {alarm['AlarmName']}")
-                                    self.log_operation('INFO', f"Deleted CloudWatch alarm: {alarm['AlarmName']}", thread_id)
+                                    self.log_operation('INFO', f"Deleted CloudWatch alarm: {alarm['AlarmName']}", thread_id, **log_context)
                             except Exception as e:
-                                self.log_operation('WARNING', f"Failed to delete CloudWatch alarm: {str(e)}", thread_id)
+                                self.log_operation('WARNING', f"Failed to delete CloudWatch alarm: {str(e)}", thread_id, **log_context)
                                 
             except Exception as e:
-                self.log_operation('WARNING', f"Failed to process CloudWatch scrappers: {str(e)}", thread_id)
+                self.log_operation('WARNING', f"Failed to process CloudWatch scrappers: {str(e)}", thread_id, **log_context)
             
             # 2. Delete Prometheus/Grafana related resources
             try:
@@ -728,13 +750,13 @@ class EKSClusterDeleteManager:
                             for scraper in scrape_configs.get('scrapers', []):
                                 amp_client.delete_scraper(scraperId=scraper['scraperId'])
                                 deleted_scrappers.append(f"AMP Scraper: {scraper['scraperId']}")
-                                self.log_operation('INFO', f"Deleted AMP scraper: {scraper['scraperId']}", thread_id)
+                                self.log_operation('INFO', f"Deleted AMP scraper: {scraper['scraperId']}", thread_id, **log_context)
                                 
                         except Exception as e:
-                            self.log_operation('WARNING', f"Failed to delete AMP scrapers: {str(e)}", thread_id)
+                            self.log_operation('WARNING', f"Failed to delete AMP scrapers: {str(e)}", thread_id, **log_context)
                             
             except Exception as e:
-                self.log_operation('WARNING', f"Failed to process AMP scrappers: {str(e)}", thread_id)
+                self.log_operation('WARNING', f"Failed to process AMP scrappers: {str(e)}", thread_id, **log_context)
             
             # 3. Delete EKS-specific monitoring resources
             try:
@@ -752,12 +774,12 @@ class EKSClusterDeleteManager:
                                 addonName=addon_name
                             )
                             deleted_scrappers.append(f"EKS Addon: {addon_name}")
-                            self.log_operation('INFO', f"Deleted EKS monitoring addon: {addon_name}", thread_id)
+                            self.log_operation('INFO', f"Deleted EKS monitoring addon: {addon_name}", thread_id, **log_context)
                         except Exception as e:
-                            self.log_operation('WARNING', f"Failed to delete EKS addon {addon_name}: {str(e)}", thread_id)
+                            self.log_operation('WARNING', f"Failed to delete EKS addon {addon_name}: {str(e)}", thread_id, **log_context)
                             
             except Exception as e:
-                self.log_operation('WARNING', f"Failed to process EKS monitoring addons: {str(e)}", thread_id)
+                self.log_operation('WARNING', f"Failed to process EKS monitoring addons: {str(e)}", thread_id, **log_context)
             
             # 4. Delete EC2-based scrappers (instances with scrapper tags)
             try:
@@ -780,26 +802,29 @@ class EKSClusterDeleteManager:
                 if instance_ids:
                     ec2_client.terminate_instances(InstanceIds=instance_ids)
                     deleted_scrappers.extend([f"EC2 Scrapper Instance: {iid}" for iid in instance_ids])
-                    self.log_operation('INFO', f"Terminated {len(instance_ids)} scrapper EC2 instances", thread_id)
+                    self.log_operation('INFO', f"Terminated {len(instance_ids)} scrapper EC2 instances", thread_id, **log_context)
                     
             except Exception as e:
-                self.log_operation('WARNING', f"Failed to delete EC2 scrapper instances: {str(e)}", thread_id)
+                self.log_operation('WARNING', f"Failed to delete EC2 scrapper instances: {str(e)}", thread_id, **log_context)
             
             if deleted_scrappers:
-                self.log_operation('INFO', f"Successfully deleted {len(deleted_scrappers)} scrappers for cluster {cluster_name}", thread_id)
+                self.log_operation('INFO', f"Successfully deleted {len(deleted_scrappers)} scrappers for cluster {cluster_name}", thread_id, **log_context)
                 for scrapper in deleted_scrappers:
-                    self.log_operation('INFO', f"  - {scrapper}", thread_id)
+                    self.log_operation('INFO', f"  - {scrapper}", thread_id, **log_context)
             else:
-                self.log_operation('INFO', f"No scrappers found for cluster {cluster_name}", thread_id)
+                self.log_operation('INFO', f"No scrappers found for cluster {cluster_name}", thread_id, **log_context)
             
             return True
             
         except Exception as e:
-            self.log_operation('ERROR', f"Failed to delete scrappers: {str(e)}", thread_id)
+            self.log_operation('ERROR', f"Failed to delete scrappers: {str(e)}", thread_id, **log_context)
             return False
     
     def delete_single_cluster(self, cluster_info: Dict, thread_id: str = None) -> bool:
         """Delete a single EKS cluster (scrappers first, then nodegroups, then cluster) - Thread-safe"""
+        log_context = {'account': cluster_info.get('account_key'), 'region': cluster_info.get('region'),
+                       'resource': cluster_info.get('cluster', {}).get('name')}
+
         if thread_id is None:
             thread_id = str(threading.current_thread().ident)
         
@@ -809,7 +834,7 @@ class EKSClusterDeleteManager:
             cluster = cluster_info['cluster']
             cluster_name = cluster['name']
             
-            self.log_operation('INFO', f"Starting deletion of cluster {cluster_name} in {account_key} - {region}", thread_id)
+            self.log_operation('INFO', f"Starting deletion of cluster {cluster_name} in {account_key} - {region}", thread_id, **log_context)
             self.printer.print_colored(Colors.YELLOW, f"🗑️  Deleting cluster: {cluster_name} ({account_key} - {region})", thread_id)
             
             # Get admin credentials
@@ -823,56 +848,71 @@ class EKSClusterDeleteManager:
             )
             
             eks_client = admin_session.client('eks')
+            journal_key = self.get_journal_key(cluster_info)
             
-            # Step 1: Delete all scrappers first
-            self.printer.print_normal(f"   🔍 Step 1: Deleting scrappers...", thread_id)
-            scrappers_deleted = self.delete_cluster_scrappers(cluster_info, thread_id)
-            
-            if not scrappers_deleted:
-                self.log_operation('WARNING', f"Some scrappers may not have been deleted for cluster {cluster_name}", thread_id)
-                self.printer.print_colored(Colors.YELLOW, f"   ⚠️  Some scrappers may still exist (check logs)", thread_id)
+            # Steps 1-2 are skipped on resume when the nodegroups were already removed
+            if self.journal.is_done(journal_key, 'nodegroups_deleted'):
+                self.printer.print_normal("   ♻️  Scrappers and nodegroups already deleted in the resumed run", thread_id)
             else:
-                self.printer.print_normal(f"   ✅ All scrappers processed successfully", thread_id)
-            
-            # Step 2: Delete all nodegroups
-            self.printer.print_normal(f"   📦 Step 2: Deleting nodegroups...", thread_id)
-            nodegroups_deleted = self.delete_cluster_nodegroups(cluster_info, thread_id)
-            
-            if not nodegroups_deleted:
-                self.log_operation('ERROR', f"Failed to delete nodegroups for cluster {cluster_name}", thread_id)
-                self.printer.print_colored(Colors.RED, f"   ❌ Failed to delete nodegroups", thread_id)
-                return False
-            
-            self.printer.print_normal(f"   ✅ All nodegroups deleted successfully", thread_id)
+                # Step 1: Delete all scrappers first
+                self.printer.print_normal(f"   🔍 Step 1: Deleting scrappers...", thread_id)
+                with trace_span('scrapers', resource=cluster_name, account=account_key, region=region):
+                    scrappers_deleted = self.delete_cluster_scrappers(cluster_info, thread_id)
+                
+                if not scrappers_deleted:
+                    self.log_operation('WARNING', f"Some scrappers may not have been deleted for cluster {cluster_name}", thread_id, **log_context)
+                    self.printer.print_colored(Colors.YELLOW, f"   ⚠️  Some scrappers may still exist (check logs)", thread_id)
+                else:
+                    self.printer.print_normal(f"   ✅ All scrappers processed successfully", thread_id)
+                
+                # Step 2: Delete all nodegroups
+                self.printer.print_normal(f"   📦 Step 2: Deleting nodegroups...", thread_id)
+                with trace_span('nodegroups', resource=cluster_name, account=account_key, region=region):
+                    nodegroups_deleted = self.delete_cluster_nodegroups(cluster_info, thread_id)
+                
+                if not nodegroups_deleted:
+                    self.log_operation('ERROR', f"Failed to delete nodegroups for cluster {cluster_name}", thread_id, **log_context)
+                    self.printer.print_colored(Colors.RED, f"   ❌ Failed to delete nodegroups", thread_id)
+                    return False
+                
+                self.journal.record(journal_key, 'nodegroups_deleted')
+                self.printer.print_normal(f"   ✅ All nodegroups deleted successfully", thread_id)
             
             # Step 3: Delete the EKS cluster
             self.printer.print_normal(f"   🎯 Step 3: Deleting EKS cluster...", thread_id)
-            self.log_operation('INFO', f"Deleting EKS cluster {cluster_name}", thread_id)
+            self.log_operation('INFO', f"Deleting EKS cluster {cluster_name}", thread_id, **log_context)
             
-            eks_client.delete_cluster(name=cluster_name)
-            self.log_operation('INFO', f"EKS cluster {cluster_name} deletion initiated", thread_id)
+            with trace_span('cluster_delete', resource=cluster_name, account=account_key, region=region):
+                self.journal.step(journal_key, 'cluster_delete_requested',
+                                  lambda: eks_client.delete_cluster(name=cluster_name)['cluster']['arn'])
+            self.log_operation('INFO', f"EKS cluster {cluster_name} deletion initiated", thread_id, **log_context)
             
             # Step 4: Wait for cluster deletion
             self.printer.print_normal(f"   ⏳ Step 4: Waiting for cluster deletion to complete...", thread_id)
-            self.log_operation('INFO', f"Waiting for cluster {cluster_name} to be deleted...", thread_id)
+            self.log_operation('INFO', f"Waiting for cluster {cluster_name} to be deleted...", thread_id, **log_context)
             
             waiter = eks_client.get_waiter('cluster_deleted')
-            waiter.wait(
-                name=cluster_name,
-                WaiterConfig={'Delay': 30, 'MaxAttempts': 40}
-            )
+            with trace_span('waiter', resource=cluster_name, account=account_key, region=region, waiter='cluster_deleted'):
+                waiter.wait(
+                    name=cluster_name,
+                    WaiterConfig={'Delay': 30, 'MaxAttempts': 40}
+                )
             
-            self.log_operation('INFO', f"Cluster {cluster_name} successfully deleted", thread_id)
+            self.log_operation('INFO', f"Cluster {cluster_name} successfully deleted", thread_id, **log_context)
             self.printer.print_colored(Colors.GREEN, f"   ✅ Cluster {cluster_name} deleted successfully", thread_id)
             
             return True
             
         except Exception as e:
             error_msg = str(e)
-            self.log_operation('ERROR', f"Failed to delete cluster {cluster_name}: {error_msg}", thread_id)
+            self.log_operation('ERROR', f"Failed to delete cluster {cluster_name}: {error_msg}", thread_id, **log_context)
             self.printer.print_colored(Colors.RED, f"   ❌ Failed to delete cluster {cluster_name}: {error_msg}", thread_id)
         return False
     
+    def get_journal_key(self, cluster_info: Dict) -> str:
+        """Journal key identifying a cluster across runs"""
+        return f"{cluster_info['account_key']}/{cluster_info['region']}/{cluster_info['cluster']['name']}"
+    
     def get_regions_from_config(self) -> List[str]:
         """Extract regions from user_settings.user_regions in the config"""
         if not self.admin_config_data:
@@ -912,6 +952,13 @@ class EKSClusterDeleteManager:
             self.print_colored(Colors.YELLOW, "No clusters selected for deletion!")
             return
         
+        # Deletions finished by an interrupted earlier run come straight from the journal
+        for deletion_record in self.journal.completed_results():
+            self.update_deletion_summary(deletion_record)
+        selected_clusters = self.journal.pending(selected_clusters, self.get_journal_key)
+        if self.deletion_summary:
+            self.print_colored(Colors.CYAN, f"♻️  Resuming: {len(self.deletion_summary)} clusters already deleted, {len(selected_clusters)} pending")
+        
         self.log_operation('INFO', f"Starting parallel deletion of {len(selected_clusters)} clusters")
         self.print_colored(Colors.RED, f"\n🚨 Starting parallel deletion of {len(selected_clusters)} clusters...")
         self.print_colored(Colors.CYAN, f"🚀 Maximum parallel deletions: {self.max_parallel_deletions}")
@@ -950,11 +997,13 @@ class EKSClusterDeleteManager:
             cluster_name = cluster_info['cluster']['name']
             account_key = cluster_info['account_key']
             region = cluster_info['region']
+            log_context = {'account': account_key, 'region': region, 'resource': cluster_name}
             
             start_time = time.time()
             
             try:
-                success = self.delete_single_cluster(cluster_info, thread_id)
+                with trace_span('delete_cluster', 'cluster', resource=cluster_name, account=account_key, region=region):
+                    success = self.delete_single_cluster(cluster_info, thread_id)
                 end_time = time.time()
                 duration = end_time - start_time
                 
@@ -974,7 +1023,12 @@ class EKSClusterDeleteManager:
                         'nodegroups_deleted': len(cluster_info['cluster'].get('nodegroups', [])),
                         'nodes_removed': cluster_info['cluster'].get('total_nodes', 0)
                     })
+                    self.journal.record(self.get_journal_key(cluster_info), ExecutionJournal.COMPLETE, deletion_record)
                 
+                self.log_operation('INFO' if success else 'ERROR',
+                                   f"Cluster deletion finished with status {deletion_record['status']} in {duration:.2f}s",
+                                   thread_id, **log_context)
+
                 # Update summary thread-safely
                 self.update_deletion_summary(deletion_record)
                 
@@ -986,6 +1040,7 @@ class EKSClusterDeleteManager:
             except Exception as e:
                 end_time = time.time()
                 duration = end_time - start_time
+                self.log_operation('ERROR', f"Cluster deletion worker failed after {duration:.2f}s: {e}", thread_id, **log_context)
                 
                 deletion_record = {
                     'cluster_name': cluster_name,
@@ -1050,6 +1105,9 @@ class EKSClusterDeleteManager:
         
         # Generate deletion report
         self.generate_deletion_report()
+        
+        if not failed_deletions:
+            self.journal.mark_finished()
     
     def generate_deletion_report(self) -> None:
         """Generate detailed deletion report file with parallel execution details"""
@@ -1127,6 +1185,13 @@ class EKSClusterDeleteManager:
         """Display available admin accounts and return selection"""
         accounts = list(self.admin_config_data['accounts'].keys())
         
+        if self.batch_plan:
+            selected_accounts = [account_key for account_key in accounts if self.batch_plan.match_account(
+                account_key, self.admin_config_data['accounts'][account_key].get('account_id'),
+                self.admin_config_data['accounts'][account_key].get('email'))]
+            print(f"\n🏦 Batch mode: scanning {len(selected_accounts)} of {len(accounts)} accounts in {', '.join(self.scan_regions)}")
+            return selected_accounts
+        
         print(f"\n🏦 Available Admin Accounts ({len(accounts)} total):")
         print("=" * 60)
         
@@ -1206,6 +1271,12 @@ class EKSClusterDeleteManager:
             print("🚨 Deleted clusters cannot be recovered!")
             print("🚀 Parallel processing will speed up deletions but use more resources!")
             
+            # Resume an interrupted run without scanning or prompting again
+            if self.journal.resumed and self.journal.get_plan():
+                self.print_colored(Colors.CYAN, f"♻️  Resuming run from {self.journal.journal_file}")
+                self.delete_selected_clusters(self.journal.get_plan())
+                return
+            
             # Step 1: Select accounts to scan
             selected_accounts = self.display_accounts_menu()
             if not selected_accounts:
@@ -1227,6 +1298,7 @@ class EKSClusterDeleteManager:
                 return
             
             # Step 5: Delete selected clusters (parallel)
+            self.journal.save_plan(clusters_to_delete)
             self.delete_selected_clusters(clusters_to_delete)
             
         except KeyboardInterrupt:
@@ -1238,9 +1310,29 @@ class EKSClusterDeleteManager:
 
 def main():
     """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='EKS Cluster Deletion Manager (Parallel Edition)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue the latest interrupted run from its journal')
+    parser.add_argument('--api-metrics', action='store_true',
+                       help='Record per-call AWS API latency/retries and report them at exit (or set AWS_API_METRICS=1)')
+    parser.add_argument('--trace', action='store_true',
+                       help='Write a Chrome/Perfetto trace of every stage to logs/ at exit (or set AWS_TRACE=1)')
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        batch_plan = plan_from_args(args, 'eks_delete')
+    except BatchPlanError as e:
+        parser.error(str(e))
+    
+    enable_tracing('eks_cluster_deletion', args.trace or None)
+    enable_api_metrics('eks_cluster_deletion', args.api_metrics or None)
+    
     try:
         # Run the EKS deletion manager with parallel processing
-        manager = EKSClusterDeleteManager()
+        manager = EKSClusterDeleteManager(resume=args.resume, batch_plan=batch_plan)
         manager.run()
         
     except Exception as e:
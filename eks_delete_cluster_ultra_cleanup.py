@@ -52,6 +52,9 @@ except ImportError:
     )
     logger = logging.getLogger('eks_delete_manager')
 
+from region_occupancy_cache import RegionOccupancyCache
+from execution_journal import ExecutionJournal
+
 class Colors:
     """ANSI color codes for terminal output"""
     RED = '\033[0;31m'
@@ -66,12 +69,13 @@ class Colors:
 class EKSClusterDeleteManager:
     """Main class for deleting EKS clusters across multiple AWS accounts and regions"""
     
-    def __init__(self, admin_config_file: str = "aws_accounts_config.json"):
+    def __init__(self, admin_config_file: str = "aws_accounts_config.json", resume: bool = False):
         """
         Initialize the EKS Cluster Delete Manager
         
         Args:
             admin_config_file (str): Path to the admin AWS accounts configuration file
+            resume (bool): Continue the latest interrupted run from its journal
         """
         self.admin_config_file = admin_config_file
         self.admin_config_data = None
@@ -85,6 +89,12 @@ class EKSClusterDeleteManager:
         self.discovered_clusters = {}  # account -> region -> clusters
         self.deletion_summary = []
         
+        # Remembers empty account/region pairs between runs
+        self.region_cache = RegionOccupancyCache('eks')
+        
+        # Write-ahead journal of finished deletion steps for --resume
+        self.journal = ExecutionJournal('eks_cluster_ultra_deletion', resume=resume)
+        
         logger.info(f"Initializing EKS Cluster Delete Manager")
         self.load_admin_configuration()
         self.setup_detailed_logging()
@@ -292,6 +302,9 @@ class EKSClusterDeleteManager:
             else:
                 self.log_operation('INFO', f"No clusters found in {account_key} - {region}")
             
+            # list_clusters doubles as the cheap probe, so only the outcome is cached here
+            self.region_cache.record(account_key, region, len(cluster_names))
+            
             return clusters_info
             
         except Exception as e:
@@ -315,6 +328,7 @@ class EKSClusterDeleteManager:
             
             for region in self.scan_regions:
                 current_scan += 1
+                known_empty = self.region_cache.is_known_empty(account_key, region)
                 print(f"   🌍 [{current_scan}/{total_scans}] Scanning region: {region}...", end=" ")
                 
                 try:
@@ -334,8 +348,12 @@ class EKSClusterDeleteManager:
                 except Exception as e:
                     print(f"❌ Error: {str(e)}")
                     self.discovered_clusters[account_key][region] = []
-                    
-                time.sleep(0.5)  # Brief pause between API calls
+                
+                # A pair that was already empty only cost a single list call
+                if not (known_empty and not self.discovered_clusters[account_key][region]):
+                    time.sleep(0.5)  # Brief pause between API calls
+        
+        self.region_cache.save_async()
     
     def display_discovered_clusters(self) -> bool:
         """Display all discovered clusters and return True if any exist"""
@@ -625,33 +643,40 @@ class EKSClusterDeleteManager:
             )
             
             eks_client = admin_session.client('eks')
+            journal_key = self.get_journal_key(cluster_info)
 
-            # Step 1: Delete all scrappers first
-            print(f"   🔍 Step 1: Deleting scrappers...")
-            scrappers_deleted = self.delete_cluster_scrappers(cluster_info)
-            
-            if not scrappers_deleted:
-                self.log_operation('WARNING', f"Some scrappers may not have been deleted for cluster {cluster_name}")
-                self.print_colored(Colors.YELLOW, f"   ⚠️  Some scrappers may still exist (check logs)")
+            # Steps 1-2 are skipped on resume when the nodegroups were already removed
+            if self.journal.is_done(journal_key, 'nodegroups_deleted'):
+                print(f"   ♻️  Scrappers and nodegroups already deleted in the resumed run")
             else:
-                print(f"   ✅ All scrappers processed successfully")
-            
-            # Step 2: Delete all nodegroups first
-            print(f"   📦 Step 2: Deleting nodegroups...")
-            nodegroups_deleted = self.delete_cluster_nodegroups(cluster_info)
-            
-            if not nodegroups_deleted:
-                self.log_operation('ERROR', f"Failed to delete nodegroups for cluster {cluster_name}")
-                self.print_colored(Colors.RED, f"   ❌ Failed to delete nodegroups")
-                return False
-            
-            print(f"   ✅ All nodegroups deleted successfully")
+                # Step 1: Delete all scrappers first
+                print(f"   🔍 Step 1: Deleting scrappers...")
+                scrappers_deleted = self.delete_cluster_scrappers(cluster_info)
+                
+                if not scrappers_deleted:
+                    self.log_operation('WARNING', f"Some scrappers may not have been deleted for cluster {cluster_name}")
+                    self.print_colored(Colors.YELLOW, f"   ⚠️  Some scrappers may still exist (check logs)")
+                else:
+                    print(f"   ✅ All scrappers processed successfully")
+                
+                # Step 2: Delete all nodegroups first
+                print(f"   📦 Step 2: Deleting nodegroups...")
+                nodegroups_deleted = self.delete_cluster_nodegroups(cluster_info)
+                
+                if not nodegroups_deleted:
+                    self.log_operation('ERROR', f"Failed to delete nodegroups for cluster {cluster_name}")
+                    self.print_colored(Colors.RED, f"   ❌ Failed to delete nodegroups")
+                    return False
+                
+                self.journal.record(journal_key, 'nodegroups_deleted')
+                print(f"   ✅ All nodegroups deleted successfully")
             
             # Step 3: Delete the EKS cluster
             print(f"   🎯 Step 3: Deleting EKS cluster...")
             self.log_operation('INFO', f"Deleting EKS cluster {cluster_name}")
             
-            eks_client.delete_cluster(name=cluster_name)
+            self.journal.step(journal_key, 'cluster_delete_requested',
+                              lambda: eks_client.delete_cluster(name=cluster_name)['cluster']['arn'])
             self.log_operation('INFO', f"EKS cluster {cluster_name} deletion initiated")
             
             # Step 4: Wait for cluster deletion
@@ -675,12 +700,22 @@ class EKSClusterDeleteManager:
             self.print_colored(Colors.RED, f"   ❌ Failed to delete cluster {cluster_name}: {error_msg}")
             return False
     
+    def get_journal_key(self, cluster_info: Dict) -> str:
+        """Journal key identifying a cluster across runs"""
+        return f"{cluster_info['account_key']}/{cluster_info['region']}/{cluster_info['cluster']['name']}"
+    
     def delete_selected_clusters(self, selected_clusters: List[Dict]) -> None:
         """Delete all selected clusters"""
         if not selected_clusters:
             self.print_colored(Colors.YELLOW, "No clusters selected for deletion!")
             return
         
+        # Deletions finished by an interrupted earlier run come straight from the journal
+        self.deletion_summary.extend(self.journal.completed_results())
+        selected_clusters = self.journal.pending(selected_clusters, self.get_journal_key)
+        if self.deletion_summary:
+            self.print_colored(Colors.CYAN, f"♻️  Resuming: {len(self.deletion_summary)} clusters already deleted, {len(selected_clusters)} pending")
+        
         self.log_operation('INFO', f"Starting deletion of {len(selected_clusters)} clusters")
         self.print_colored(Colors.RED, f"\n🚨 Starting deletion of {len(selected_clusters)} clusters...")
         
@@ -713,6 +748,7 @@ class EKSClusterDeleteManager:
                 
                 successful_deletions.append(deletion_record)
                 self.deletion_summary.append(deletion_record)
+                self.journal.record(self.get_journal_key(cluster_info), ExecutionJournal.COMPLETE, deletion_record)
             else:
                 end_time = time.time()
                 duration = end_time - start_time
@@ -738,6 +774,9 @@ class EKSClusterDeleteManager:
         
         # Generate deletion report
         self.generate_deletion_report()
+        
+        if not failed_deletions:
+            self.journal.mark_finished()
 
     def delete_cluster_scrappers(self, cluster_info: Dict) -> bool:
         """Delete all scrappers associated with a cluster"""
@@ -1013,6 +1052,12 @@ class EKSClusterDeleteManager:
             print("⚠️  WARNING: This tool will permanently delete EKS clusters!")
             print("🚨 Deleted clusters cannot be recovered!")
             
+            # Resume an interrupted run without scanning or prompting again
+            if self.journal.resumed and self.journal.get_plan():
+                self.print_colored(Colors.CYAN, f"♻️  Resuming run from {self.journal.journal_file}")
+                self.delete_selected_clusters(self.journal.get_plan())
+                return
+            
             # Step 1: Select accounts to scan
             selected_accounts = self.display_accounts_menu()
             if not selected_accounts:
@@ -1034,6 +1079,7 @@ class EKSClusterDeleteManager:
                 return
             
             # Step 5: Delete selected clusters
+            self.journal.save_plan(clusters_to_delete)
             self.delete_selected_clusters(clusters_to_delete)
             
         except KeyboardInterrupt:
@@ -1045,9 +1091,16 @@ class EKSClusterDeleteManager:
 
 def main():
     """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='EKS Cluster Deletion Manager')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue the latest interrupted run from its journal')
+    args = parser.parse_args()
+    
     try:
         # Run the EKS deletion manager
-        manager = EKSClusterDeleteManager()
+        manager = EKSClusterDeleteManager(resume=args.resume)
         manager.run()
         
     except Exception as e:
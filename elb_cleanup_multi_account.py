@@ -65,6 +65,12 @@ except ImportError:
     )
     logger = logging.getLogger('elb_cleanup')
 
+from region_occupancy_cache import RegionOccupancyCache
+from async_logging import setup_async_logging, log_with_context
+from api_metrics import enable_api_metrics
+from trace_recorder import enable_tracing, trace_span, traced
+from batch_plan import BatchPlanError, add_batch_arguments, plan_from_args
+
 class Colors:
     """ANSI color codes for terminal output"""
     RED = '\033[0;31m'
@@ -96,14 +102,16 @@ class ThreadSafePrinter:
 class ELBCleanupManager:
     """Main class for deleting ELBs across multiple AWS accounts and regions"""
     
-    def __init__(self, config_file: str = "aws_accounts_config.json"):
+    def __init__(self, config_file: str = "aws_accounts_config.json", batch_plan=None):
         """
         Initialize the ELB Cleanup Manager
         
         Args:
             config_file (str): Path to the AWS accounts configuration file
+            batch_plan (BatchPlan): Headless selections; None runs the interactive menus
         """
         self.config_file = config_file
+        self.batch_plan = batch_plan
         self.config_data = None
         self.current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.current_user = "varadharajaan"
@@ -112,6 +120,9 @@ class ELBCleanupManager:
         self.discovered_elbs = {}  # account -> region -> {classic: [], alb: [], nlb: []}
         self.deletion_summary = []
         
+        # Remembers empty account/region pairs between runs
+        self.region_cache = RegionOccupancyCache('elb')
+        
         # Thread safety
         self.printer = ThreadSafePrinter()
         self.deletion_lock = threading.Lock()
@@ -125,6 +136,8 @@ class ELBCleanupManager:
         
         # Get regions from config after loading configuration
         self.scan_regions = self.get_regions_from_config()
+        if batch_plan:
+            self.scan_regions = [region for region in self.scan_regions if batch_plan.match_region(region)]
         
         self.setup_detailed_logging()
     
@@ -182,34 +195,14 @@ class ELBCleanupManager:
             # Create a file handler for detailed logging
             import logging
             
-            # Create logger for detailed operations
-            self.operation_logger = logging.getLogger('elb_cleanup_operations')
-            self.operation_logger.setLevel(logging.INFO)
-            
-            # Remove existing handlers to avoid duplicates
-            for handler in self.operation_logger.handlers[:]:
-                self.operation_logger.removeHandler(handler)
-            
-            # File handler with thread-safe formatter
-            file_handler = logging.FileHandler(self.log_filename, encoding='utf-8')
-            file_handler.setLevel(logging.INFO)
-            
-            # Console handler (reduced verbosity)
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.WARNING)
-            
-            # Thread-safe formatter
-            formatter = logging.Formatter(
-                '%(asctime)s | %(thread)d | %(levelname)8s | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
+            # Workers only enqueue; one listener thread writes the log, its .jsonl twin and the console
+            self.operation_logger, self.log_listener = setup_async_logging(
+                'elb_cleanup_operations',
+                self.log_filename,
+                console_level=logging.WARNING,
+                fmt='%(asctime)s | %(thread)d | %(levelname)8s | %(message)s'
             )
             
-            file_handler.setFormatter(formatter)
-            console_handler.setFormatter(formatter)
-            
-            self.operation_logger.addHandler(file_handler)
-            self.operation_logger.addHandler(console_handler)
-            
             # Log initial information
             self.operation_logger.info("=" * 80)
             self.operation_logger.info("ELB Cleanup Session Started (Parallel Processing)")
@@ -226,21 +219,13 @@ class ELBCleanupManager:
             print(f"Warning: Could not setup detailed logging: {e}")
             self.operation_logger = None
 
-    def log_operation(self, level, message, thread_id: str = None):
-        """Thread-safe log operation"""
+    def log_operation(self, level, message, thread_id: str = None, **context):
+        """Thread-safe log operation; account/region/resource context goes to the JSON log"""
         thread_info = f"[T-{thread_id}] " if thread_id else ""
         full_message = f"{thread_info}{message}"
         
-        if self.operation_logger:
-            if level.upper() == 'INFO':
-                self.operation_logger.info(full_message)
-            elif level.upper() == 'WARNING':
-                self.operation_logger.warning(full_message)
-            elif level.upper() == 'ERROR':
-                self.operation_logger.error(full_message)
-            elif level.upper() == 'DEBUG':
-                self.operation_logger.debug(full_message)
-        else:
+        # Non-blocking: the record is queued for the listener thread
+        if not log_with_context(self.operation_logger, level, full_message, thread_id, **context):
             if level.upper() in ['ERROR', 'WARNING']:
                 self.printer.print_normal(f"[{level.upper()}] {full_message}")
     
@@ -260,9 +245,11 @@ class ELBCleanupManager:
     
     def scan_elbs_in_region(self, account_key: str, region: str) -> Dict:
         """Scan all types of ELBs in a specific account and region"""
+        log_context = {'account': account_key, 'region': region}
+
         try:
             thread_id = threading.current_thread().ident
-            self.log_operation('INFO', f"Scanning ELBs in {account_key} - {region}", str(thread_id))
+            self.log_operation('INFO', f"Scanning ELBs in {account_key} - {region}", str(thread_id), **log_context)
             
             # Get credentials
             access_key, secret_key = self.get_credentials_for_account(account_key)
@@ -280,6 +267,18 @@ class ELBCleanupManager:
                 'nlb': []
             }
             
+            # Pairs that were empty last time get a single one-item probe instead of the full scan
+            if self.region_cache.is_known_empty(account_key, region):
+                v2_probe = session.client('elbv2').describe_load_balancers(PageSize=1)
+                classic_probe = session.client('elb').describe_load_balancers(PageSize=1)
+                if not v2_probe.get('LoadBalancers') and not classic_probe.get('LoadBalancerDescriptions'):
+                    self.region_cache.record(account_key, region, 0, full_scan=False)
+                    self.log_operation('INFO', f"No ELBs found in {account_key} - {region} (cached empty, probe confirmed)", str(thread_id), **log_context)
+                    return elb_results
+            
+            # A failed scan must not be cached as empty, or it would hide resources
+            scan_ok = True
+            
             # 1. Scan Classic Load Balancers
             try:
                 elb_client = session.client('elb')
@@ -314,7 +313,8 @@ class ELBCleanupManager:
                     elb_results['classic'].append(elb_info)
                     
             except Exception as e:
-                self.log_operation('WARNING', f"Failed to scan Classic ELBs: {str(e)}", str(thread_id))
+                scan_ok = False
+                self.log_operation('WARNING', f"Failed to scan Classic ELBs: {str(e)}", str(thread_id), **log_context)
             
             # 2. Scan Application and Network Load Balancers (ELBv2)
             try:
@@ -353,16 +353,19 @@ class ELBCleanupManager:
                         elb_results['nlb'].append(elb_info)
                         
             except Exception as e:
-                self.log_operation('WARNING', f"Failed to scan ALB/NLB: {str(e)}", str(thread_id))
+                scan_ok = False
+                self.log_operation('WARNING', f"Failed to scan ALB/NLB: {str(e)}", str(thread_id), **log_context)
             
             total_elbs = len(elb_results['classic']) + len(elb_results['alb']) + len(elb_results['nlb'])
-            self.log_operation('INFO', f"Found {total_elbs} ELBs in {account_key} - {region} (Classic: {len(elb_results['classic'])}, ALB: {len(elb_results['alb'])}, NLB: {len(elb_results['nlb'])})", str(thread_id))
+            if scan_ok:
+                self.region_cache.record(account_key, region, total_elbs)
+            self.log_operation('INFO', f"Found {total_elbs} ELBs in {account_key} - {region} (Classic: {len(elb_results['classic'])}, ALB: {len(elb_results['alb'])}, NLB: {len(elb_results['nlb'])})", str(thread_id), **log_context)
             
             return elb_results
             
         except Exception as e:
             thread_id = threading.current_thread().ident
-            self.log_operation('ERROR', f"Failed to scan ELBs in {account_key} - {region}: {str(e)}", str(thread_id))
+            self.log_operation('ERROR', f"Failed to scan ELBs in {account_key} - {region}: {str(e)}", str(thread_id), **log_context)
             return {'classic': [], 'alb': [], 'nlb': []}
     
     def scan_all_accounts_and_regions(self, selected_accounts: List[str]) -> None:
@@ -384,6 +387,7 @@ class ELBCleanupManager:
         for account_key in selected_accounts:
             for region in self.scan_regions:
                 scan_tasks.append((account_key, region))
+        scan_tasks = self.region_cache.order_tasks(scan_tasks)
         
         # Initialize ELB storage
         for account_key in selected_accounts:
@@ -396,7 +400,8 @@ class ELBCleanupManager:
         
         with ThreadPoolExecutor(max_workers=max_scan_workers, thread_name_prefix="ScanWorker") as executor:
             future_to_task = {
-                executor.submit(self.scan_elbs_in_region, account_key, region): (account_key, region)
+                executor.submit(traced('scan', self.scan_elbs_in_region, account=account_key, region=region),
+                                account_key, region): (account_key, region)
                 for account_key, region in scan_tasks
             }
             
@@ -421,6 +426,7 @@ class ELBCleanupManager:
                     self.discovered_elbs[account_key][region] = {'classic': [], 'alb': [], 'nlb': []}
                     self.printer.print_colored(Colors.RED, f"[{current_scan:2}/{total_scans}] {account_key} - {region}: ❌ Error: {str(e)}")
         
+        self.region_cache.save_async()
         self.printer.print_colored(Colors.GREEN, f"✅ Completed scanning {total_scans} account-region combinations")
     
     def display_discovered_elbs(self) -> bool:
@@ -563,6 +569,9 @@ class ELBCleanupManager:
         if not hasattr(self, 'elb_mapping') or not self.elb_mapping:
             return []
         
+        if self.batch_plan:
+            return self.select_elbs_from_plan()
+        
         total_elbs = len(self.elb_mapping)
         
         print(f"\n🗑️  ELB Deletion Selection")
@@ -675,6 +684,9 @@ class ELBCleanupManager:
     
     def delete_single_elb(self, elb_info: Dict, thread_id: str = None) -> bool:
         """Delete a single ELB - Thread-safe"""
+        log_context = {'account': elb_info.get('account_key'), 'region': elb_info.get('region'),
+                       'resource': elb_info.get('elb', {}).get('name')}
+
         if thread_id is None:
             thread_id = str(threading.current_thread().ident)
         
@@ -685,7 +697,7 @@ class ELBCleanupManager:
             elb = elb_info['elb']
             elb_name = elb['name']
             
-            self.log_operation('INFO', f"Starting deletion of {elb_type.upper()} ELB {elb_name} in {account_key} - {region}", thread_id)
+            self.log_operation('INFO', f"Starting deletion of {elb_type.upper()} ELB {elb_name} in {account_key} - {region}", thread_id, **log_context)
             self.printer.print_colored(Colors.YELLOW, f"🗑️  Deleting {elb_type.upper()} ELB: {elb_name} ({account_key} - {region})", thread_id)
             
             # Get credentials
@@ -702,7 +714,7 @@ class ELBCleanupManager:
                 # Delete Classic Load Balancer
                 elb_client = session.client('elb')
                 elb_client.delete_load_balancer(LoadBalancerName=elb_name)
-                self.log_operation('INFO', f"Classic ELB {elb_name} deletion initiated", thread_id)
+                self.log_operation('INFO', f"Classic ELB {elb_name} deletion initiated", thread_id, **log_context)
                 
             else:
                 # Delete ALB/NLB (ELBv2)
@@ -719,22 +731,22 @@ class ELBCleanupManager:
                             for tg in tg_response.get('TargetGroups', []):
                                 if tg['LoadBalancerArns'] and elb['arn'] in tg['LoadBalancerArns']:
                                     elbv2_client.delete_target_group(TargetGroupArn=tg['TargetGroupArn'])
-                                    self.log_operation('INFO', f"Deleted target group {tg_name}", thread_id)
+                                    self.log_operation('INFO', f"Deleted target group {tg_name}", thread_id, **log_context)
                         except Exception as e:
-                            self.log_operation('WARNING', f"Failed to delete target group {tg_name}: {str(e)}", thread_id)
+                            self.log_operation('WARNING', f"Failed to delete target group {tg_name}: {str(e)}", thread_id, **log_context)
                 
                 # Delete the load balancer
                 elbv2_client.delete_load_balancer(LoadBalancerArn=elb['arn'])
-                self.log_operation('INFO', f"{elb_type.upper()} ELB {elb_name} deletion initiated", thread_id)
+                self.log_operation('INFO', f"{elb_type.upper()} ELB {elb_name} deletion initiated", thread_id, **log_context)
             
-            self.log_operation('INFO', f"ELB {elb_name} successfully deleted", thread_id)
+            self.log_operation('INFO', f"ELB {elb_name} successfully deleted", thread_id, **log_context)
             self.printer.print_colored(Colors.GREEN, f"   ✅ ELB {elb_name} deleted successfully", thread_id)
             
             return True
             
         except Exception as e:
             error_msg = str(e)
-            self.log_operation('ERROR', f"Failed to delete ELB {elb_name}: {error_msg}", thread_id)
+            self.log_operation('ERROR', f"Failed to delete ELB {elb_name}: {error_msg}", thread_id, **log_context)
             self.printer.print_colored(Colors.RED, f"   ❌ Failed to delete ELB {elb_name}: {error_msg}", thread_id)
             return False
     
@@ -787,11 +799,13 @@ class ELBCleanupManager:
             account_key = elb_info['account_key']
             region = elb_info['region']
             elb_type = elb_info['type']
+            log_context = {'account': account_key, 'region': region, 'resource': elb_name}
             
             start_time = time.time()
             
             try:
-                success = self.delete_single_elb(elb_info, thread_id)
+                with trace_span('delete_elb', 'elb', resource=elb_name, account=account_key, region=region, elb_type=elb_type):
+                    success = self.delete_single_elb(elb_info, thread_id)
                 end_time = time.time()
                 duration = end_time - start_time
                 
@@ -812,6 +826,10 @@ class ELBCleanupManager:
                 elif success and elb_type == 'classic':
                     deletion_record['instances_detached'] = elb_info['elb'].get('instances', 0)
                 
+                self.log_operation('INFO' if success else 'ERROR',
+                                   f"ELB deletion finished with status {deletion_record['status']} in {duration:.2f}s",
+                                   thread_id, **log_context)
+
                 # Update summary thread-safely
                 self.update_deletion_summary(deletion_record)
                 
@@ -823,6 +841,7 @@ class ELBCleanupManager:
             except Exception as e:
                 end_time = time.time()
                 duration = end_time - start_time
+                self.log_operation('ERROR', f"ELB deletion worker failed after {duration:.2f}s: {e}", thread_id, **log_context)
                 
                 deletion_record = {
                     'elb_name': elb_name,
@@ -932,11 +951,32 @@ class ELBCleanupManager:
                     error_msg = record.get('error', 'Unknown error')[:47] + '...' if len(record.get('error', '')) > 50 else record.get('error', 'Unknown error')
                     f.write(f"{record['elb_name']:<30} {record['elb_type']:<8} {record['account_key']:<15} {record['region']:<15} {error_msg:<50}\n")
     
+    def select_elbs_from_plan(self) -> List[Dict]:
+        """Batch counterpart of select_elbs_to_delete: --resources patterns, this shard's ELBs, --yes to delete"""
+        candidates = [elb_info for elb_info in self.elb_mapping.values()
+                      if self.batch_plan.match_resource(elb_info['elb']['name'], elb_info['elb'].get('arn'))]
+        selected_elbs = self.batch_plan.plan_tasks(
+            candidates, key=lambda info: f"{info['account_key']}/{info['region']}/{info['type']}/{info['elb']['name']}")
+        self.batch_plan.print_tasks(selected_elbs, lambda info: (
+            f"{info['elb']['name']} ({info['type'].upper()}, {info['account_key']} - {info['region']})"))
+        
+        if not selected_elbs or not self.batch_plan.confirm(f"delete {len(selected_elbs)} ELBs"):
+            return []
+        self.log_operation('INFO', f"Batch plan selected {len(selected_elbs)} ELBs for deletion")
+        return selected_elbs
+    
     def display_accounts_menu(self) -> List[str]:
         """Display available accounts and return selection"""
         accounts = list(self.config_data['accounts'].keys())
         user_settings = self.config_data.get('user_settings', {})
         
+        if self.batch_plan:
+            selected_accounts = [account_key for account_key in accounts if self.batch_plan.match_account(
+                account_key, self.config_data['accounts'][account_key].get('account_id'),
+                self.config_data['accounts'][account_key].get('email'))]
+            print(f"\n🏦 Batch mode: scanning {len(selected_accounts)} of {len(accounts)} accounts in {', '.join(self.scan_regions)}")
+            return selected_accounts
+        
         print(f"\n🏦 Available AWS Accounts ({len(accounts)} total):")
         print("=" * 60)
         
@@ -1048,9 +1088,24 @@ class ELBCleanupManager:
 
 def main():
     """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='ELB Cleanup Manager (Parallel Edition)')
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        batch_plan = plan_from_args(args, 'elb_cleanup')
+    except BatchPlanError as e:
+        parser.error(str(e))
+    
+    # Opt-in via AWS_API_METRICS=1 / AWS_TRACE=1
+    enable_api_metrics('elb_cleanup')
+    enable_tracing('elb_cleanup')
+    
     try:
         # Run the ELB cleanup manager with parallel processing
-        manager = ELBCleanupManager()
+        manager = ELBCleanupManager(batch_plan=batch_plan)
         manager.run()
         
     except Exception as e:
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import glob
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+class ExecutionJournal:
+    """Append-only write-ahead journal of completed steps, used to resume interrupted runs"""
+
+    PLAN_KEY = '__plan__'
+    RUN_KEY = '__run__'
+    COMPLETE = 'complete'
+
+    def __init__(self, operation: str, resume: bool = False, journal_dir: str = 'journals'):
+        """
+        Open a new journal, or the latest unfinished one for this operation when resuming
+
+        Args:
+            operation (str): Name of the run type, used in the journal file name
+            resume (bool): Replay the latest unfinished journal instead of starting a new one
+            journal_dir (str): Directory holding the journal files
+        """
+        self.operation = operation
+        self.journal_dir = journal_dir
+        self._lock = threading.Lock()
+        self._steps = {}  # resource key -> step -> result
+        self.resumed = False
+
+        os.makedirs(self.journal_dir, exist_ok=True)
+
+        journal_file = self.find_unfinished_journal() if resume else None
+        if journal_file:
+            self.journal_file = journal_file
+            self._replay()
+            self.resumed = True
+        else:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.journal_file = os.path.join(self.journal_dir, f"{self.operation}_journal_{timestamp}.jsonl")
+
+        self._handle = open(self.journal_file, 'a', encoding='utf-8')
+
+        # Terminate a torn last line so the next entry starts on its own line
+        if self.resumed and self._handle.tell() > 0:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._handle.write('\n')
+
+    def find_unfinished_journal(self) -> Optional[str]:
+        """
+        Return the newest journal for this operation that saved a plan but never reached mark_finished()
+
+        Journals without a plan come from runs cancelled at a menu and have nothing to resume.
+        """
+        pattern = os.path.join(self.journal_dir, f"{self.operation}_journal_*.jsonl")
+        for journal_file in sorted(glob.glob(pattern), reverse=True):
+            has_plan, finished = self._scan(journal_file)
+            if has_plan and not finished:
+                return journal_file
+        return None
+
+    def _scan(self, journal_file: str) -> Tuple[bool, bool]:
+        """Return (has saved plan, is finished) for a journal file"""
+        has_plan = finished = False
+        try:
+            with open(journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if f'"key": "{self.PLAN_KEY}"' in line and '"step": "plan"' in line:
+                        has_plan = True
+                    elif f'"key": "{self.RUN_KEY}"' in line and '"step": "finished"' in line:
+                        finished = True
+        except OSError:
+            return False, True
+        return has_plan, finished
+
+    def _replay(self) -> None:
+        """Rebuild the step table from disk, ignoring a torn last line from a crash"""
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._steps.setdefault(entry['key'], {})[entry['step']] = entry.get('result')
+
+    def record(self, resource_key: str, step: str, result: Any = None) -> None:
+        """Append a completed step and force it to disk before returning"""
+        entry = {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'key': resource_key,
+            'step': step,
+            'result': result
+        }
+        line = json.dumps(entry, default=str)
+
+        with self._lock:
+            self._steps.setdefault(resource_key, {})[step] = json.loads(line)['result']
+            self._handle.write(line + '\n')
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def is_done(self, resource_key: str, step: str = COMPLETE) -> bool:
+        with self._lock:
+            return step in self._steps.get(resource_key, {})
+
+    def get_result(self, resource_key: str, step: str = COMPLETE) -> Any:
+        with self._lock:
+            return self._steps.get(resource_key, {}).get(step)
+
+    def has_started(self, resource_key: str) -> bool:
+        with self._lock:
+            return bool(self._steps.get(resource_key))
+
+    def step(self, resource_key: str, step: str, action: Callable[[], Any]) -> Any:
+        """Run action unless the step is already journaled, and return its recorded result"""
+        if self.is_done(resource_key, step):
+            return self.get_result(resource_key, step)
+
+        result = action()
+        self.record(resource_key, step, result)
+        return result
+
+    def save_plan(self, plan: Any) -> None:
+        """Record the selected work items so a resumed run can skip the menus"""
+        self.record(self.PLAN_KEY, 'plan', plan)
+
+    def get_plan(self) -> Any:
+        return self.get_result(self.PLAN_KEY, 'plan')
+
+    def pending(self, items: Iterable, key_fn: Callable[[Any], str]) -> List:
+        """Items from the plan whose resource key has not been completed yet"""
+        return [item for item in items if not self.is_done(key_fn(item))]
+
+    def completed_results(self) -> List[Any]:
+        """Results recorded with the 'complete' step, in journal order"""
+        with self._lock:
+            return [steps[self.COMPLETE] for key, steps in self._steps.items()
+                    if key not in (self.PLAN_KEY, self.RUN_KEY) and self.COMPLETE in steps]
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            keys = [key for key in self._steps if key not in (self.PLAN_KEY, self.RUN_KEY)]
+            completed = sum(1 for key in keys if self.COMPLETE in self._steps[key])
+        return {'started': len(keys), 'completed': completed}
+
+    def mark_finished(self) -> None:
+        """Seal the journal so --resume no longer picks it up"""
+        self.record(self.RUN_KEY, 'finished')
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.close()
@@ -31,16 +31,24 @@ operations; however:
 """
 
 import argparse
+import array
 import collections
+import concurrent.futures
 import fnmatch
 import gettext
+import heapq
 import io
+import itertools
 import os
+import pickle
 import platform
+import queue
 import re
 import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 import time
 import textwrap
 
@@ -59,6 +67,13 @@ public_globals = ["__builtins__", "argparse", "collections", "fnmatch",
                   "timedelta", "datetime"] + __all__
 
 deleted_hash = b'0'*40
+# Read buffer for fast-export output.  Parsing is line by line, and with the
+# default 8K buffer a sizeable share of the time went to read() syscalls.
+# 64K (a full Linux pipe) gets that back; larger buffers measured no faster.
+fast_export_buffer_size = 64*1024
+# Entries --analyze keeps in memory per size table or sort before spilling
+# sorted runs to temporary files; see _SizeAccumulator and _external_sorted()
+analysis_max_entries_in_memory = 500000
 write_marks = True
 date_format_permissive = True
 
@@ -217,28 +232,38 @@ class AncestryGraph(object):
   A note about identifiers in AncestryGraph objects, of which there are three:
     * A given AncestryGraph is based on either commit.old_id or commit.id, but
       not both.  These are the keys for self.value.
-    * Using full hashes (occasionally) for children in self.graph felt
-      wasteful, so we use our own internal integer within self.graph.
+    * Using full hashes (occasionally) for children in the graph felt
+      wasteful, so we use our own internal integer within the graph.
       self.value maps from commit {old_}id to our internal integer id.
     * When working with commit.old_id, it is also sometimes useful to be able
       to map these to the original hash, i.e. commit.original_id.  So, we
       also have self.git_hash for mapping from commit.old_id to git's commit
       hash.
+
+  A note about memory: histories can have millions of commits, so the graph
+  itself is kept in flat arrays indexed by internal id rather than in a dict
+  of tuples of lists, which cost a couple hundred bytes per commit.
   """
 
+  # Maximum number of remembered is_ancestor() results
+  max_cached_is_ancestor = 1000000
+
   def __init__(self):
     # The next internal identifier we will use; increments with every commit
     # added to the AncestryGraph
     self.cur_value = 0
 
     # A mapping from the external identifers given to us to the simple integers
-    # we use in self.graph
+    # we use in the graph
     self.value = {}
 
-    # A tuple of (depth, list-of-ancestors).  Values and keys in this graph are
-    # all integers from the (values of the) self.value dict.  The depth of a
-    # commit is one more than the max depth of any of its ancestors.
-    self.graph = {}
+    # The graph, with internal ids as indexes (index 0 is unused).  The depth
+    # of a commit is one more than the max depth of any of its ancestors.  The
+    # first parent of each commit is in _first_parent (0 for root commits);
+    # only merges have an entry in _other_parents, for the rest.
+    self._depth = array.array('I', [0])
+    self._first_parent = array.array('I', [0])
+    self._other_parents = {}
 
     # A mapping from external identifier (i.e. from the keys of self.value) to
     # the hash of the given commit.  Only populated for graphs based on
@@ -253,9 +278,23 @@ class AncestryGraph(object):
     self._reverse_value = {}
     self._hash_to_id = {}
 
-    # Cached results from previous calls to is_ancestor().
+    # Cached results from previous calls to is_ancestor()
     self._cached_is_ancestor = {}
 
+  def _add(self, depth, graph_parents):
+    self.cur_value += 1
+    self._depth.append(depth)
+    self._first_parent.append(graph_parents[0] if graph_parents else 0)
+    if len(graph_parents) > 1:
+      self._other_parents[self.cur_value] = tuple(graph_parents[1:])
+    return self.cur_value
+
+  def _graph_parents(self, value):
+    first_parent = self._first_parent[value]
+    if not first_parent:
+      return []
+    return [first_parent] + list(self._other_parents.get(value, ()))
+
   def record_external_commits(self, external_commits):
     """
     Record in graph that each commit in external_commits exists, and is
@@ -263,9 +302,7 @@ class AncestryGraph(object):
     """
     for c in external_commits:
       if c not in self.value:
-        self.cur_value += 1
-        self.value[c] = self.cur_value
-        self.graph[self.cur_value] = (1, [])
+        self.value[c] = self._add(1, [])
         self.git_hash[c] = c
 
   def add_commit_and_parents(self, commit, parents, githash = None):
@@ -279,18 +316,16 @@ class AncestryGraph(object):
     assert all(p in self.value for p in parents)
     assert commit not in self.value
 
-    # Get values for commit and parents
-    self.cur_value += 1
-    self.value[commit] = self.cur_value
-    if githash:
-      self.git_hash[commit] = githash
+    # Get values for parents
     graph_parents = [self.value[x] for x in parents]
 
     # Determine depth for commit, then insert the info into the graph
     depth = 1
     if parents:
-      depth += max(self.graph[p][0] for p in graph_parents)
-    self.graph[self.cur_value] = (depth, graph_parents)
+      depth += max(self._depth[p] for p in graph_parents)
+    self.value[commit] = self._add(depth, graph_parents)
+    if githash:
+      self.git_hash[commit] = githash
 
   def record_hash(self, commit_id, githash):
     '''
@@ -322,7 +357,7 @@ class AncestryGraph(object):
     self._ensure_reverse_maps_populated()
     commit_fast_export_id = self._hash_to_id[commit_hash]
     commit_graph_id = self.value[commit_fast_export_id]
-    parent_graph_ids = self.graph[commit_graph_id][1]
+    parent_graph_ids = self._graph_parents(commit_graph_id)
     parent_fast_export_ids = [self._reverse_value[x] for x in parent_graph_ids]
     parent_hashes = [self.git_hash[x] for x in parent_fast_export_ids]
     return parent_hashes
@@ -333,35 +368,44 @@ class AncestryGraph(object):
     '''
     return self.git_hash.get(commit_id, None)
 
+  def _remember_is_ancestor(self, pair, result):
+    cache = self._cached_is_ancestor
+    if len(cache) >= self.max_cached_is_ancestor:
+      # Starting over is cheaper than tracking recency on every lookup
+      cache.clear()
+    cache[pair] = result
+    return result
+
   def is_ancestor(self, possible_ancestor, check):
     """
     Return whether possible_ancestor is an ancestor of check
     """
     a, b = self.value[possible_ancestor], self.value[check]
     original_pair = (a,b)
-    a_depth = self.graph[a][0]
+    depth, first_parent = self._depth, self._first_parent
+    other_parents, cache = self._other_parents, self._cached_is_ancestor
+    a_depth = depth[a]
     ancestors = [b]
     visited = set()
     while ancestors:
       ancestor = ancestors.pop()
-      prev_pair = (a, ancestor)
-      if prev_pair in self._cached_is_ancestor:
-        if not self._cached_is_ancestor[prev_pair]:
+      cached = cache.get((a, ancestor))
+      if cached is not None:
+        if not cached:
           continue
-        self._cached_is_ancestor[original_pair] = True
-        return True
+        return self._remember_is_ancestor(original_pair, True)
       if ancestor in visited:
         continue
       visited.add(ancestor)
-      depth, more_ancestors = self.graph[ancestor]
       if ancestor == a:
-        self._cached_is_ancestor[original_pair] = True
-        return True
-      elif depth <= a_depth:
+        return self._remember_is_ancestor(original_pair, True)
+      elif depth[ancestor] <= a_depth:
         continue
-      ancestors.extend(more_ancestors)
-    self._cached_is_ancestor[original_pair] = False
-    return False
+      # Roots have depth 1, so anything this deep has a first parent
+      ancestors.append(first_parent[ancestor])
+      if ancestor in other_parents:
+        ancestors.extend(other_parents[ancestor])
+    return self._remember_is_ancestor(original_pair, False)
 
 class MailmapInfo(object):
   def __init__(self, filename):
@@ -1057,7 +1101,7 @@ class FastExportParser(object):
     """
     Grab the next line of input
     """
-    self._currentline = self._input.readline()
+    self._currentline = self._readline()
 
   def _parse_optional_mark(self):
     """
@@ -1065,10 +1109,12 @@ class FastExportParser(object):
     next line; return None otherwise
     """
     mark = None
-    matches = self._mark_re.match(self._currentline)
-    if matches:
-      mark = int(matches.group(1))
-      self._advance_currentline()
+    # Most lines are not marks; skip the regex for them
+    if self._currentline.startswith(b'mark :'):
+      matches = self._mark_re.match(self._currentline)
+      if matches:
+        mark = int(matches.group(1))
+        self._advance_currentline()
     return mark
 
   def _parse_optional_parent_ref(self, refname):
@@ -1188,10 +1234,9 @@ class FastExportParser(object):
     Reads data from _input. Current-line will be advanced until it is beyond
     the data.
     """
-    fields = self._currentline.split()
-    assert fields[0] == b'data'
-    size = int(fields[1])
-    data = self._input.read(size)
+    assert self._currentline.startswith(b'data ')
+    size = int(self._currentline[5:])
+    data = self._read(size)
     self._advance_currentline()
     if self._currentline == b'\n':
       self._advance_currentline()
@@ -1515,6 +1560,9 @@ class FastExportParser(object):
     # Set input. If no args provided, use stdin.
     self._input = input
     self._output = output
+    # Bound methods save an attribute lookup on every line and data read
+    self._readline = input.readline
+    self._read = input.read
 
     # Run over the input and do the filtering
     self._advance_currentline()
@@ -1944,6 +1992,11 @@ EXAMPLES
         dest='report_dir',
         help=_("Directory to write report, defaults to GIT_DIR/filter_repo/analysis,"
                "refuses to run if exists, --force delete existing dir first."))
+    analyze.add_argument('--analyze-jobs', metavar='N', type=int, default=1,
+        help=_("Number of worker processes for --analyze; the commit list is "
+               "split into slices that are diffed and parsed in parallel, "
+               "then analyzed in order, giving the same report.  Use 0 for "
+               "one per CPU.  Defaults to 1 (no worker processes)."))
 
     path = parser.add_argument_group(title=_("Filtering based on paths "
                                              "(see also --filename-callback)"),
@@ -2019,6 +2072,12 @@ EXAMPLES
                "end the line with '==>' and some replacement text to "
                "choose a replacement choice other than the default of '{}'."
                .format(decode(FilteringOptions.default_replace_text))))
+    contents.add_argument('--replace-text-jobs', metavar='N', type=int,
+                          default=1,
+        help=_("Number of worker processes to apply --replace-text with; "
+               "blobs are read ahead of the rest of the filtering and "
+               "rewritten in parallel, with identical results.  Use 0 for "
+               "one per CPU.  Defaults to 1 (no worker processes)."))
     contents.add_argument('--strip-blobs-bigger-than', metavar='SIZE',
                           dest='max_blob_size', default=0,
         help=_("Strip blobs (files) bigger than specified size (e.g. '5M', "
@@ -2325,6 +2384,13 @@ EXAMPLES
         args.max_blob_size = int(args.max_blob_size[0:-1]) * mult[suffix]
       else:
         args.max_blob_size = int(args.max_blob_size)
+    for jobs_option in ('replace_text_jobs', 'analyze_jobs'):
+      jobs = getattr(args, jobs_option)
+      if jobs < 0:
+        raise SystemExit(_("Error: --%s must not be negative")
+                         % jobs_option.replace('_', '-'))
+      if jobs == 0:
+        setattr(args, jobs_option, os.cpu_count() or 1)
     if args.file_info_callback and (
         args.stdin or args.blob_callback or args.filename_callback):
       raise SystemExit(_("Error: --file-info-callback is incompatible with "
@@ -2358,7 +2424,8 @@ EXAMPLES
           if not line:
             continue
           replace_literals.append((line, replacement))
-    return {'literals': replace_literals, 'regexes':  replace_regexes}
+    return {'literals': replace_literals, 'regexes':  replace_regexes,
+            'literal_passes': _compile_literal_passes(replace_literals)}
 
   @staticmethod
   def get_paths_from_file(filename):
@@ -2454,6 +2521,10 @@ EXAMPLES
 
 class RepoAnalyze(object):
 
+  diff_tree_args = ['diff-tree', '--stdin', '--always', '--root',
+                    '--format=%H%n%P%n%cd', '--date=short', '-M', '-t', '-c',
+                    '--raw', '--combined-all-paths']
+
   # First, several helper functions for analyze_commit()
 
   @staticmethod
@@ -2554,32 +2625,13 @@ class RepoAnalyze(object):
                          ) # pragma: no cover
 
   @staticmethod
-  def gather_data(args):
-    unpacked_size, packed_size = GitUtils.get_blob_sizes()
-    stats = {'names': collections.defaultdict(set),
-             'allnames' : set(),
-             'file_deletions': {},
-             'tree_deletions': {},
-             'equivalence': {},
-             'rename_history': collections.defaultdict(set),
-             'unpacked_size': unpacked_size,
-             'packed_size': packed_size,
-             'num_commits': 0}
-
-    # Setup the rev-list/diff-tree process
-    processed_commits_msg = _("Processed %d commits")
-    commit_parse_progress = ProgressWriter()
-    num_commits = 0
-    cmd = ('git rev-list --topo-order --reverse {}'.format(' '.join(args.refs)) +
-           ' | git diff-tree --stdin --always --root --format=%H%n%P%n%cd' +
-           ' --date=short -M -t -c --raw --combined-all-paths')
-    dtp = subproc.Popen(cmd, shell=True, bufsize=-1, stdout=subprocess.PIPE)
-    f = dtp.stdout
+  def parse_diff_tree_output(f):
+    """
+    Yields (commit, parents, date, file_changes) for each commit in the
+    output of the rev-list|diff-tree pipeline used by gather_data()
+    """
     line = f.readline()
-    if not line:
-      raise SystemExit(_("Nothing to analyze; repository is empty."))
     cont = bool(line)
-    graph = AncestryGraph()
     while cont:
       commit = line.rstrip()
       parents = f.readline().split()
@@ -2615,6 +2667,64 @@ class RepoAnalyze(object):
           filenames = [PathQuoting.dequote(x) for x in splits[1:]]
           file_changes.append([modes, shas, change_types, filenames])
 
+      yield commit, parents, date, file_changes
+
+  @staticmethod
+  def sharded_diff_tree_records(args):
+    """
+    Same records as parse_diff_tree_output(), in the same order, but with
+    slices of the commit list diffed and parsed in args.analyze_jobs worker
+    processes.  diff-tree looks at each commit on its own, so a slice's
+    output does not depend on the rest of the list.
+    """
+    cmd = 'git rev-list --topo-order --reverse {}'.format(' '.join(args.refs))
+    rlp = subproc.Popen(cmd, shell=True, bufsize=-1, stdout=subprocess.PIPE)
+    commits = rlp.stdout.readlines()
+    rlp.stdout.close()
+    if rlp.wait():
+      raise SystemExit(_("Error: rev-list failed; see above.")) # pragma: no cover
+
+    # Several slices per worker, so that slow slices even out and only a
+    # few parsed slices are held in memory at once
+    jobs = args.analyze_jobs
+    size = max(1000, -(-len(commits) // (8*jobs)))
+    slices = [commits[i:i+size] for i in range(0, len(commits), size)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers = jobs) as pool:
+      pending = collections.deque()
+      for commit_slice in slices:
+        pending.append(pool.submit(_diff_tree_records, commit_slice))
+        if len(pending) > 2*jobs:
+          yield from pending.popleft().result()
+      while pending:
+        yield from pending.popleft().result()
+
+  @staticmethod
+  def gather_data(args):
+    unpacked_size, packed_size = GitUtils.get_blob_sizes()
+    stats = {'names': collections.defaultdict(set),
+             'allnames' : set(),
+             'file_deletions': {},
+             'tree_deletions': {},
+             'equivalence': {},
+             'rename_history': collections.defaultdict(set),
+             'unpacked_size': unpacked_size,
+             'packed_size': packed_size,
+             'num_commits': 0}
+
+    # Setup the rev-list/diff-tree process
+    processed_commits_msg = _("Processed %d commits")
+    commit_parse_progress = ProgressWriter()
+    num_commits = 0
+    dtp = None
+    if args.analyze_jobs > 1:
+      records = RepoAnalyze.sharded_diff_tree_records(args)
+    else:
+      cmd = ('git rev-list --topo-order --reverse {}'.format(' '.join(args.refs)) +
+             ' | git ' + ' '.join(RepoAnalyze.diff_tree_args))
+      dtp = subproc.Popen(cmd, shell=True, bufsize=-1, stdout=subprocess.PIPE)
+      records = RepoAnalyze.parse_diff_tree_output(dtp.stdout)
+    graph = AncestryGraph()
+    for commit, parents, date, file_changes in records:
       # If someone is trying to analyze a subset of the history, make sure
       # to avoid dying on commits with parents that we haven't seen before
       if args.refs:
@@ -2626,15 +2736,18 @@ class RepoAnalyze(object):
                                  file_changes)
       num_commits += 1
       commit_parse_progress.show(processed_commits_msg % num_commits)
+    if not num_commits:
+      raise SystemExit(_("Nothing to analyze; repository is empty."))
 
     # Show the final commits processed message and record the number of commits
     commit_parse_progress.finish()
     stats['num_commits'] = num_commits
 
     # Close the output, ensure rev-list|diff-tree pipeline completed successfully
-    dtp.stdout.close()
-    if dtp.wait():
-      raise SystemExit(_("Error: rev-list|diff-tree pipeline failed; see above.")) # pragma: no cover
+    if dtp:
+      dtp.stdout.close()
+      if dtp.wait():
+        raise SystemExit(_("Error: rev-list|diff-tree pipeline failed; see above.")) # pragma: no cover
 
     return stats
 
@@ -2652,25 +2765,22 @@ class RepoAnalyze(object):
 
     # Compute aggregate size information for paths, extensions, and dirs
     total_size = {'packed': 0, 'unpacked': 0}
-    path_size = {'packed': collections.defaultdict(int),
-                 'unpacked': collections.defaultdict(int)}
-    ext_size = {'packed': collections.defaultdict(int),
-                'unpacked': collections.defaultdict(int)}
-    dir_size = {'packed': collections.defaultdict(int),
-                'unpacked': collections.defaultdict(int)}
+    path_size = _SizeAccumulator()
+    ext_size = _SizeAccumulator()
+    dir_size = _SizeAccumulator()
     for sha in stats['names']:
-      size = {'packed': stats['packed_size'][sha],
-              'unpacked': stats['unpacked_size'][sha]}
-      for which in ('packed', 'unpacked'):
-        for name in stats['names'][sha]:
-          total_size[which] += size[which]
-          path_size[which][name] += size[which]
-          basename, ext = os.path.splitext(name)
-          ext_size[which][ext] += size[which]
-          for dirname in dirnames(name):
-            dir_size[which][dirname] += size[which]
-
-    # Determine if and when extensions and directories were deleted
+      unpacked = stats['unpacked_size'][sha]
+      packed = stats['packed_size'][sha]
+      for name in stats['names'][sha]:
+        total_size['unpacked'] += unpacked
+        total_size['packed'] += packed
+        path_size.add(name, unpacked, packed)
+        basename, ext = os.path.splitext(name)
+        ext_size.add(ext, unpacked, packed)
+        for dirname in dirnames(name):
+          dir_size.add(dirname, unpacked, packed)
+
+    # Determine if and when extensions were deleted
     ext_deleted_data = {}
     for name in stats['allnames']:
       when = stats['file_deletions'].get(name, None)
@@ -2685,21 +2795,112 @@ class RepoAnalyze(object):
       else:
         ext_deleted_data[ext] = when
 
-    dir_deleted_data = {}
-    for name in dir_size['packed']:
-      dir_deleted_data[name] = stats['tree_deletions'].get(name, None)
+    # Equivalence classes for names, so if folks only want to keep a
+    # certain set of paths, they know the old names they want to include
+    # too.
+    with open(os.path.join(reportdir, b"renames.txt"), 'bw') as f:
+      seen = set()
+      for pathname,equiv_group in sorted(stats['equivalence'].items(),
+                                         key=lambda x:(x[1], x[0])):
+        if equiv_group in seen:
+          continue
+        seen.add(equiv_group)
+        f.write(("{} ->\n    ".format(decode(equiv_group[0])) +
+                     "\n    ".join(decode(x) for x in equiv_group[1:]) +
+                 "\n").encode())
+
+    # List directories in reverse sorted order of unpacked size
+    with open(os.path.join(reportdir, b"directories-deleted-sizes.txt"), 'bw') as f_deleted, \
+         open(os.path.join(reportdir, b"directories-all-sizes.txt"), 'bw') as f_all:
+      msg = "=== %s ===\n" % _("Deleted directories by reverse size")
+      f_deleted.write(msg.encode())
+      f_all.write(("=== %s ===\n" % _("All directories by reverse size")).encode())
+      msg = _("Format: unpacked size, packed size, date deleted, directory name\n")
+      f_deleted.write(msg.encode())
+      f_all.write(msg.encode())
+      for dirname, unpacked, packed in dir_size.by_reverse_size():
+        when = stats['tree_deletions'].get(dirname, None)
+        line = b"  %10d %10d %-10s %s\n" % (unpacked,
+                                            packed,
+                                            datestr(when),
+                                            dirname or _('<toplevel>').encode())
+        if when:
+          f_deleted.write(line)
+        f_all.write(line)
 
+    # List extensions in reverse sorted order of unpacked size
+    with open(os.path.join(reportdir, b"extensions-deleted-sizes.txt"), 'bw') as f_deleted, \
+         open(os.path.join(reportdir, b"extensions-all-sizes.txt"), 'bw') as f_all:
+      msg = "=== %s ===\n" % _("Deleted extensions by reverse size")
+      f_deleted.write(msg.encode())
+      f_all.write(("=== %s ===\n" % _("All extensions by reverse size")).encode())
+      msg = _("Format: unpacked size, packed size, date deleted, extension name\n")
+      f_deleted.write(msg.encode())
+      f_all.write(msg.encode())
+      for extname, unpacked, packed in ext_size.by_reverse_size():
+        when = ext_deleted_data[extname]
+        line = b"  %10d %10d %-10s %s\n" % (unpacked,
+                                            packed,
+                                            datestr(when),
+                                            extname or _('<no extension>').encode())
+        if when:
+          f_deleted.write(line)
+        f_all.write(line)
+
+    # List files in reverse sorted order of unpacked size
+    with open(os.path.join(reportdir, b"path-deleted-sizes.txt"), 'bw') as f_deleted, \
+         open(os.path.join(reportdir, b"path-all-sizes.txt"), 'bw') as f_all:
+      msg = "=== %s ===\n" % _("Deleted paths by reverse accumulated size")
+      f_deleted.write(msg.encode())
+      msg = _("Format: unpacked size, packed size, date deleted, path name(s)\n")
+      f_deleted.write(msg.encode())
+      msg = "=== %s ===\n" % _("All paths by reverse accumulated size")
+      f_all.write(msg.encode())
+      msg = _("Format: unpacked size, packed size, date deleted, path name\n")
+      f_all.write(msg.encode())
+      for pathname, unpacked, packed in path_size.by_reverse_size():
+        when = stats['file_deletions'].get(pathname, None)
+        line = b"  %10d %10d %-10s %s\n" % (unpacked,
+                                            packed,
+                                            datestr(when),
+                                            pathname)
+        if when:
+          f_deleted.write(line)
+        f_all.write(line)
+
+    # List of filenames and sizes in descending order
+    with open(os.path.join(reportdir, b"blob-shas-and-paths.txt"), 'bw') as f:
+      f.write(("=== %s ===\n" % _("Files by sha and associated pathnames in reverse size")).encode())
+      f.write(_("Format: sha, unpacked size, packed size, filename(s) object stored as\n").encode())
+      for sha, size in _external_sorted(stats['packed_size'].items(),
+                                        key=lambda x:(x[1],x[0]), reverse=True):
+        if sha not in stats['names']:
+          # Some objects in the repository might not be referenced, or not
+          # referenced by the branches/tags the user cares about; skip them.
+          continue
+        names_with_sha = stats['names'][sha]
+        if len(names_with_sha) == 1:
+          names_with_sha = names_with_sha.pop()
+        else:
+          names_with_sha = b'[' + b', '.join(sorted(names_with_sha)) + b']'
+        f.write(b"  %s %10d %10d %s\n" % (sha,
+                                          stats['unpacked_size'][sha],
+                                          size,
+                                          names_with_sha))
+
+    # The overview needs the number of distinct names, which the size
+    # accumulators only know once their sorted output has been consumed
     with open(os.path.join(reportdir, b"README"), 'bw') as f:
       # Give a basic overview of this file
       f.write(b"== %s ==\n" % _("Overall Statistics").encode())
       f.write(("  %s: %d\n" % (_("Number of commits"),
                                stats['num_commits'])).encode())
       f.write(("  %s: %d\n" % (_("Number of filenames"),
-                               len(path_size['packed']))).encode())
+                               path_size.num_keys)).encode())
       f.write(("  %s: %d\n" % (_("Number of directories"),
-                               len(dir_size['packed']))).encode())
+                               dir_size.num_keys)).encode())
       f.write(("  %s: %d\n" % (_("Number of file extensions"),
-                               len(ext_size['packed']))).encode())
+                               ext_size.num_keys)).encode())
       f.write(b"\n")
       f.write(("  %s: %d\n" % (_("Total unpacked size (bytes)"),
                                total_size['unpacked'])).encode())
@@ -2776,118 +2977,6 @@ class RepoAnalyze(object):
         """)[1:]).encode())
       f.write(b"\n")
 
-    # Equivalence classes for names, so if folks only want to keep a
-    # certain set of paths, they know the old names they want to include
-    # too.
-    with open(os.path.join(reportdir, b"renames.txt"), 'bw') as f:
-      seen = set()
-      for pathname,equiv_group in sorted(stats['equivalence'].items(),
-                                         key=lambda x:(x[1], x[0])):
-        if equiv_group in seen:
-          continue
-        seen.add(equiv_group)
-        f.write(("{} ->\n    ".format(decode(equiv_group[0])) +
-                     "\n    ".join(decode(x) for x in equiv_group[1:]) +
-                 "\n").encode())
-
-    # List directories in reverse sorted order of unpacked size
-    with open(os.path.join(reportdir, b"directories-deleted-sizes.txt"), 'bw') as f:
-      msg = "=== %s ===\n" % _("Deleted directories by reverse size")
-      f.write(msg.encode())
-      msg = _("Format: unpacked size, packed size, date deleted, directory name\n")
-      f.write(msg.encode())
-      for dirname, size in sorted(dir_size['packed'].items(),
-                                  key=lambda x:(x[1],x[0]), reverse=True):
-        if (dir_deleted_data[dirname]):
-          f.write(b"  %10d %10d %-10s %s\n" % (dir_size['unpacked'][dirname],
-                                              size,
-                                              datestr(dir_deleted_data[dirname]),
-                                              dirname or _('<toplevel>').encode()))
-
-    with open(os.path.join(reportdir, b"directories-all-sizes.txt"), 'bw') as f:
-      f.write(("=== %s ===\n" % _("All directories by reverse size")).encode())
-      msg = _("Format: unpacked size, packed size, date deleted, directory name\n")
-      f.write(msg.encode())
-      for dirname, size in sorted(dir_size['packed'].items(),
-                                  key=lambda x:(x[1],x[0]), reverse=True):
-        f.write(b"  %10d %10d %-10s %s\n" % (dir_size['unpacked'][dirname],
-                                            size,
-                                            datestr(dir_deleted_data[dirname]),
-                                            dirname or _("<toplevel>").encode()))
-
-    # List extensions in reverse sorted order of unpacked size
-    with open(os.path.join(reportdir, b"extensions-deleted-sizes.txt"), 'bw') as f:
-      msg = "=== %s ===\n" % _("Deleted extensions by reverse size")
-      f.write(msg.encode())
-      msg = _("Format: unpacked size, packed size, date deleted, extension name\n")
-      f.write(msg.encode())
-      for extname, size in sorted(ext_size['packed'].items(),
-                                  key=lambda x:(x[1],x[0]), reverse=True):
-        if (ext_deleted_data[extname]):
-          f.write(b"  %10d %10d %-10s %s\n" % (ext_size['unpacked'][extname],
-                                              size,
-                                              datestr(ext_deleted_data[extname]),
-                                              extname or _('<no extension>').encode()))
-
-    with open(os.path.join(reportdir, b"extensions-all-sizes.txt"), 'bw') as f:
-      f.write(("=== %s ===\n" % _("All extensions by reverse size")).encode())
-      msg = _("Format: unpacked size, packed size, date deleted, extension name\n")
-      f.write(msg.encode())
-      for extname, size in sorted(ext_size['packed'].items(),
-                                  key=lambda x:(x[1],x[0]), reverse=True):
-        f.write(b"  %10d %10d %-10s %s\n" % (ext_size['unpacked'][extname],
-                                            size,
-                                            datestr(ext_deleted_data[extname]),
-                                            extname or _('<no extension>').encode()))
-
-    # List files in reverse sorted order of unpacked size
-    with open(os.path.join(reportdir, b"path-deleted-sizes.txt"), 'bw') as f:
-      msg = "=== %s ===\n" % _("Deleted paths by reverse accumulated size")
-      f.write(msg.encode())
-      msg = _("Format: unpacked size, packed size, date deleted, path name(s)\n")
-      f.write(msg.encode())
-      for pathname, size in sorted(path_size['packed'].items(),
-                                   key=lambda x:(x[1],x[0]), reverse=True):
-        when = stats['file_deletions'].get(pathname, None)
-        if when:
-          f.write(b"  %10d %10d %-10s %s\n" % (path_size['unpacked'][pathname],
-                                              size,
-                                              datestr(when),
-                                              pathname))
-
-    with open(os.path.join(reportdir, b"path-all-sizes.txt"), 'bw') as f:
-      msg = "=== %s ===\n" % _("All paths by reverse accumulated size")
-      f.write(msg.encode())
-      msg = _("Format: unpacked size, packed size, date deleted, path name\n")
-      f.write(msg.encode())
-      for pathname, size in sorted(path_size['packed'].items(),
-                                   key=lambda x:(x[1],x[0]), reverse=True):
-        when = stats['file_deletions'].get(pathname, None)
-        f.write(b"  %10d %10d %-10s %s\n" % (path_size['unpacked'][pathname],
-                                            size,
-                                            datestr(when),
-                                            pathname))
-
-    # List of filenames and sizes in descending order
-    with open(os.path.join(reportdir, b"blob-shas-and-paths.txt"), 'bw') as f:
-      f.write(("=== %s ===\n" % _("Files by sha and associated pathnames in reverse size")).encode())
-      f.write(_("Format: sha, unpacked size, packed size, filename(s) object stored as\n").encode())
-      for sha, size in sorted(stats['packed_size'].items(),
-                              key=lambda x:(x[1],x[0]), reverse=True):
-        if sha not in stats['names']:
-          # Some objects in the repository might not be referenced, or not
-          # referenced by the branches/tags the user cares about; skip them.
-          continue
-        names_with_sha = stats['names'][sha]
-        if len(names_with_sha) == 1:
-          names_with_sha = names_with_sha.pop()
-        else:
-          names_with_sha = b'[' + b', '.join(sorted(names_with_sha)) + b']'
-        f.write(b"  %s %10d %10d %s\n" % (sha,
-                                          stats['unpacked_size'][sha],
-                                          size,
-                                          names_with_sha))
-
   @staticmethod
   def run(args):
     if args.report_dir:
@@ -2920,11 +3009,537 @@ class RepoAnalyze(object):
     RepoAnalyze.write_report(reportdir, stats)
     sys.stdout.write(_("done.\n"))
 
+def _spill_run(records):
+  # Writes already sorted records to an anonymous temporary file, for
+  # reading back with _read_run()
+  f = tempfile.TemporaryFile()
+  for i in range(0, len(records), 10000):
+    pickle.dump(records[i:i+10000], f, pickle.HIGHEST_PROTOCOL)
+  f.seek(0)
+  return f
+
+def _read_run(f):
+  with f:
+    while True:
+      try:
+        chunk = pickle.load(f)
+      except EOFError:
+        return
+      yield from chunk
+
+def _external_sorted(records, key, reverse = False):
+  """
+  Like sorted(), but only up to analysis_max_entries_in_memory records are
+  sorted in memory at a time; with more, the sorted runs are spilled to
+  temporary files and merged.  Returns an iterator.
+  """
+  runs = []
+  chunk = []
+  for record in records:
+    chunk.append(record)
+    if len(chunk) >= analysis_max_entries_in_memory:
+      chunk.sort(key = key, reverse = reverse)
+      runs.append(_spill_run(chunk))
+      chunk = []
+  chunk.sort(key = key, reverse = reverse)
+  if not runs:
+    return iter(chunk)
+  runs.append(_spill_run(chunk))
+  return heapq.merge(*[_read_run(f) for f in runs],
+                     key = key, reverse = reverse)
+
+class _SizeAccumulator:
+  """
+  Unpacked and packed size totals per name for RepoAnalyze.write_report().
+  Totals are summed in a dict; whenever that holds more than
+  analysis_max_entries_in_memory names it is spilled to a temporary file as
+  a sorted run, and the runs are merged back when reading the totals.
+  """
+  def __init__(self):
+    self._sizes = {}
+    self._runs = []
+    self.num_keys = None
+
+  def add(self, name, unpacked, packed):
+    sizes = self._sizes.get(name)
+    if sizes is None:
+      self._sizes[name] = [unpacked, packed]
+      if len(self._sizes) > analysis_max_entries_in_memory:
+        self._spill()
+    else:
+      sizes[0] += unpacked
+      sizes[1] += packed
+
+  def _spill(self):
+    self._runs.append(_spill_run(sorted((name, unpacked, packed)
+                                        for name, (unpacked, packed)
+                                        in self._sizes.items())))
+    self._sizes = {}
+
+  def _totals(self):
+    # Yields (name, unpacked, packed) once per name, with num_keys set at
+    # the end
+    num_keys = 0
+    if not self._runs:
+      for name, (unpacked, packed) in self._sizes.items():
+        num_keys += 1
+        yield (name, unpacked, packed)
+    else:
+      self._spill()
+      current = None
+      for (name, unpacked, packed) in heapq.merge(*[_read_run(f)
+                                                    for f in self._runs]):
+        if current and current[0] == name:
+          current[1] += unpacked
+          current[2] += packed
+          continue
+        if current:
+          num_keys += 1
+          yield tuple(current)
+        current = [name, unpacked, packed]
+      if current:
+        num_keys += 1
+        yield tuple(current)
+      self._runs = []
+    self.num_keys = num_keys
+
+  def by_reverse_size(self):
+    """
+    Returns an iterator over (name, unpacked, packed) in reverse order of
+    (packed, name); num_keys is set once it has been exhausted
+    """
+    return _external_sorted(self._totals(), key = lambda x:(x[2], x[0]),
+                            reverse = True)
+
+def _is_binary(contents):
+  # Same heuristic git uses: a zero byte in the first 8Kb means binary data
+  return b"\0" in contents[0:8192]
+
+def _apply_replace_text(contents, replace_text):
+  # 'literal_passes' is the 'literals' list with runs of literals merged into
+  # single-pass matchers; see _compile_literal_passes()
+  for literal_pass in replace_text.get('literal_passes',
+                                       replace_text['literals']):
+    if isinstance(literal_pass, _MultiLiteralReplacer):
+      contents = literal_pass.replace(contents)
+    else:
+      literal, replacement = literal_pass
+      contents = contents.replace(literal, replacement)
+  for regex,   replacement in replace_text['regexes']:
+    contents = regex.sub(replacement, contents)
+  return contents
+
+def _literal_trie_pattern(literals):
+  """
+  Returns a regex matching any of the given sorted, prefix-free literals.
+  It is shaped like a trie, so that matching costs about the same whether
+  there are ten literals or thousands.
+  """
+  if len(literals) == 1:
+    return re.escape(literals[0])
+  prefix = os.path.commonprefix(literals)
+  if prefix:
+    return re.escape(prefix) + \
+           _literal_trie_pattern([x[len(prefix):] for x in literals])
+  branches = collections.OrderedDict()
+  for literal in literals:
+    branches.setdefault(literal[0:1], []).append(literal)
+  return b'(?:' + b'|'.join(_literal_trie_pattern(x)
+                            for x in branches.values()) + b')'
+
+class _MultiLiteralReplacer:
+  """
+  Replaces a _LiteralGroup of literals in a single pass.
+
+  Even a trie-shaped regex is slow to try at every byte, so candidate
+  regions are found first: every match lies within a run of at least
+  min-length bytes that all appear somewhere in the literals.  Translating
+  the contents to a two-letter alphabet lets bytes.find() locate those runs
+  at memory speed, and the regex only runs inside them.  Secrets rarely
+  share runs that long with ordinary text, so most blobs never reach the
+  regex at all.
+  """
+  # Roughly how many bytes.replace() calls cost as much as running the regex
+  # over the same number of bytes; past that, plain replacing is cheaper
+  REGEX_COST = 500
+
+  def __init__(self, table):
+    self.table = table  # literal -> replacement, in --replace-text order
+    self.regex = re.compile(_literal_trie_pattern(sorted(table)))
+    in_literals = set(b''.join(table))
+    self.translation = bytes(1 if x in in_literals else 0 for x in range(256))
+    self.needle = b'\1' * min(len(x) for x in table)
+
+  def _candidate_runs(self, contents):
+    translated = contents.translate(self.translation)
+    start = translated.find(self.needle)
+    while start != -1:
+      end = translated.find(b'\0', start + len(self.needle))
+      if end == -1:
+        end = len(contents)
+      yield start, end
+      start = translated.find(self.needle, end)
+
+  def _replace_one_at_a_time(self, contents):
+    for literal, replacement in self.table.items():
+      contents = contents.replace(literal, replacement)
+    return contents
+
+  def replace(self, contents):
+    runs = list(self._candidate_runs(contents))
+    covered = sum(end - start for start, end in runs)
+    if covered * self.REGEX_COST > len(contents) * len(self.table):
+      # Literals made of the same bytes as most of these contents
+      return self._replace_one_at_a_time(contents)
+
+    pieces = []
+    last = 0
+    for run_start, run_end in runs:
+      for match in self.regex.finditer(contents, run_start, run_end):
+        start, end = match.span()
+        # Another literal starting inside this match overlaps it.  Which of
+        # the two gets replaced depends on their order, so do them one at a
+        # time as the literals were listed.
+        if any(self.regex.match(contents, pos, run_end)
+               for pos in range(start+1, end)):
+          return self._replace_one_at_a_time(contents)
+        pieces.append(contents[last:start])
+        pieces.append(self.table[match.group(0)])
+        last = end
+    if not pieces:
+      return contents
+    pieces.append(contents[last:])
+    return b''.join(pieces)
+
+class _LiteralGroup:
+  """
+  A run of consecutive --replace-text literals that can be replaced in one
+  pass with the same result as replacing them one after another.  No literal
+  may contain another (so at most one matches at any spot), and no literal
+  may overlap, contain or be contained in the replacement text of an earlier
+  one (so earlier replacements never create or destroy matches for later
+  ones).  Literals that merely can overlap each other in the text are
+  allowed; _MultiLiteralReplacer checks for that when it happens.
+  """
+  MAX_LENGTH = 256  # Keeps the trie regex within the re module's limits
+
+  class _Strings:
+    def __init__(self, partial_overlaps):
+      self.members = set()
+      self.lengths = set()
+      self.partial_overlaps = partial_overlaps
+      self.prefixes = set()  # Proper prefixes of members
+      self.suffixes = set()  # Proper suffixes of members
+      self.joined = bytearray()  # Members separated by newlines
+
+    def add(self, string):
+      if string in self.members:
+        return
+      self.members.add(string)
+      self.lengths.add(len(string))
+      if self.partial_overlaps:
+        for i in range(1, len(string)):
+          self.prefixes.add(string[:i])
+          self.suffixes.add(string[i:])
+      self.joined += string + b'\n'
+
+    def overlaps(self, literal):
+      # Literals come from lines of a file, so never contain a newline
+      if literal in self.joined:
+        return True
+      for length in self.lengths:
+        if any(literal[i:i+length] in self.members
+               for i in range(len(literal) - length + 1)):
+          return True
+      return any(literal[:i] in self.suffixes or literal[i:] in self.prefixes
+                 for i in range(1, len(literal)))
+
+  def __init__(self):
+    self.table = collections.OrderedDict()  # literal -> replacement
+    self._literals = self._Strings(partial_overlaps = False)
+    self._replacements = self._Strings(partial_overlaps = True)
+
+  def accepts(self, literal):
+    return (len(literal) <= self.MAX_LENGTH and
+            not self._literals.overlaps(literal) and
+            not self._replacements.overlaps(literal))
+
+  def add(self, literal, replacement):
+    self.table[literal] = replacement
+    self._literals.add(literal)
+    self._replacements.add(replacement)
+
+def _compile_literal_passes(literals, min_group = 8):
+  """
+  Turns the ordered (literal, replacement) pairs of --replace-text into an
+  ordered list of passes: either (literal, replacement) for bytes.replace(),
+  or a _MultiLiteralReplacer for a _LiteralGroup of at least min_group
+  literals.  Applying the passes in order gives the same result as applying
+  every literal in order.
+  """
+  groups = []
+  for literal, replacement in literals:
+    if not groups or not groups[-1].accepts(literal):
+      groups.append(_LiteralGroup())
+    groups[-1].add(literal, replacement)
+
+  passes = []
+  for group in groups:
+    if len(group.table) >= min_group:
+      try:
+        passes.append(_MultiLiteralReplacer(group.table))
+        continue
+      except RecursionError: # pragma: no cover
+        pass  # Pathologically nested literals; just do them one at a time
+    passes.extend(group.table.items())
+  return passes
+
+class _PathLiteralIndex:
+  """
+  Finds which of a list of literal path expressions (--path and --path-rename
+  arguments) match a pathname: b'' matches everything, an expression with a
+  trailing slash matches a leading directory, and any other expression the
+  pathname itself or a leading directory.  The expressions are kept in a
+  trie of path components, so the cost depends on how deep the pathname is
+  rather than on how many expressions there are.
+  """
+  def __init__(self, expressions):
+    self._everything = []
+    # Trie nodes are [children, indices matching the pathname itself or a
+    # leading directory, indices only matching a leading directory]
+    self._root = [{}, [], []]
+    for index, expression in enumerate(expressions):
+      if expression == b'':
+        self._everything.append(index)
+        continue
+      dir_only = expression.endswith(b'/')
+      if dir_only:
+        expression = expression[:-1]
+      node = self._root
+      for component in expression.split(b'/'):
+        node = node[0].setdefault(component, [{}, [], []])
+      node[2 if dir_only else 1].append(index)
+
+  def matches(self, pathname):
+    """Indices of the expressions matching pathname, in no particular order"""
+    found = self._everything[:]
+    components = pathname.split(b'/')
+    last = len(components) - 1
+    node = self._root
+    for depth, component in enumerate(components):
+      node = node[0].get(component)
+      if node is None:
+        break
+      found += node[1]
+      if depth < last:
+        found += node[2]
+    return found
+
+class _PathFilterMatcher:
+  """
+  Answers whether any of a run of ('match'|'glob'|'regex', path_exp) path
+  filters matches a pathname, without trying them one at a time: literal
+  paths go in a _PathLiteralIndex, globs are merged into one regex, and
+  regexes are merged into one regex where that cannot change what they match.
+  """
+  def __init__(self, filters):
+    literals = []
+    globs = []
+    mergeable_regexes = []
+    self._regexes = []
+    default_flags = re.compile(b'').flags
+    for match_type, path_exp in filters:
+      assert match_type in ('match', 'glob', 'regex')
+      if match_type == 'match':
+        literals.append(path_exp)
+      elif match_type == 'glob':
+        globs.append(path_exp)
+      elif (isinstance(path_exp.pattern, bytes) and path_exp.groups == 0 and
+            path_exp.flags == default_flags):
+        mergeable_regexes.append(path_exp)
+      else:
+        # Groups could clash (or change backreference numbers) and inline
+        # flags would apply to the other regexes too; keep these separate.
+        self._regexes.append(path_exp)
+
+    self._literals = _PathLiteralIndex(literals) if literals else None
+    self._glob_match = None
+    if globs:
+      # What fnmatch.fnmatch() compiles each glob to, as alternatives
+      self._glob_match = re.compile(b'|'.join(
+        fnmatch.translate(os.path.normcase(glob).decode('latin-1'))
+                                                .encode('latin-1')
+        for glob in dict.fromkeys(globs))).match
+    if len(mergeable_regexes) == 1:
+      self._regexes.append(mergeable_regexes[0])
+    elif mergeable_regexes:
+      try:
+        merged = b'|'.join(dict.fromkeys(b'(?:' + regex.pattern + b')'
+                                         for regex in mergeable_regexes))
+        self._regexes.append(re.compile(merged))
+      except re.error: # pragma: no cover
+        self._regexes.extend(mergeable_regexes)
+
+  def matches(self, pathname):
+    if self._literals and self._literals.matches(pathname):
+      return True
+    if self._glob_match and self._glob_match(os.path.normcase(pathname)):
+      return True
+    return any(regex.search(pathname) for regex in self._regexes)
+
+class _PathRenamer:
+  """
+  Applies a run of literal ('match') path renames, (old, new) pairs, in
+  order; only the renames matching the pathname as it is by then are tried.
+  """
+  def __init__(self, renames):
+    self._renames = renames
+    self._literals = _PathLiteralIndex([old for old, new in renames])
+
+  def rename(self, pathname):
+    """Returns the renamed pathname, or None if no rename applied"""
+    renamed = None
+    start = 0
+    while True:
+      later = [index for index in self._literals.matches(pathname)
+               if index >= start]
+      if not later:
+        return renamed
+      start = min(later)
+      old, new = self._renames[start]
+      pathname = renamed = pathname.replace(old, new, 1)
+      start += 1
+
+def _compile_path_changes(path_changes):
+  """
+  Returns path_changes with each run of consecutive 'filter' entries
+  replaced by one ('filter', 'compiled', _PathFilterMatcher) entry, and each
+  run of consecutive literal renames by one ('rename', 'compiled',
+  _PathRenamer) entry.  The runs stay in order, since filters and renames
+  after a rename see the new name.
+  """
+  def compiler(change):
+    mod_type, match_type, path_exp = change
+    if mod_type == 'filter':
+      return _PathFilterMatcher
+    return _PathRenamer if match_type == 'match' else None
+
+  compiled = []
+  for kind, changes in itertools.groupby(path_changes, compiler):
+    changes = list(changes)
+    if kind is _PathFilterMatcher:
+      filters = [(match_type, path_exp) for _, match_type, path_exp in changes]
+      compiled.append(('filter', 'compiled', _PathFilterMatcher(filters)))
+    elif kind is _PathRenamer:
+      renames = [path_exp for _, _, path_exp in changes]
+      compiled.append(('rename', 'compiled', _PathRenamer(renames)))
+    else:
+      compiled.extend(changes)
+  return compiled
+
+def _diff_tree_records(commits):
+  # Runs in a worker process for RepoAnalyze.sharded_diff_tree_records()
+  dtp = subproc.Popen(['git'] + RepoAnalyze.diff_tree_args,
+                      stdin = subprocess.PIPE, stdout = subprocess.PIPE)
+  output = dtp.communicate(b''.join(commits))[0]
+  if dtp.returncode:
+    raise SystemExit(_("Error: diff-tree failed; see above.")) # pragma: no cover
+  return list(RepoAnalyze.parse_diff_tree_output(io.BytesIO(output)))
+
+class BatchedCatFile:
+  """
+  Pipelined client for `git cat-file --batch-command --buffer`.  Requests are
+  sent in batches ended by a flush command, and a reader thread parses the
+  replies to one batch while the next is being queued, so looking up many
+  objects costs no round trip per object.
+  """
+  def __init__(self, command, cwd, batch_size = 1024):
+    assert command in (b'info', b'contents')
+    self._command = command
+    self._batch_size = batch_size
+    self._process = subproc.Popen(['git', 'cat-file', '--batch-command',
+                                   '--buffer'],
+                                  stdin = subprocess.PIPE,
+                                  stdout = subprocess.PIPE,
+                                  cwd = cwd)
+    self._replies = queue.Queue()
+    self._reader = threading.Thread(target = self._read_replies, daemon = True)
+    self._reader.start()
+
+  def _read_replies(self):
+    readline = self._process.stdout.readline
+    read = self._process.stdout.read
+    while True:
+      line = readline()
+      if not line:
+        break
+      try:
+        (oid, oidtype, size) = line.split()
+      except ValueError:
+        # "<object> missing" or "<object> ambiguous"
+        self._replies.put((None, None, None))
+        continue
+      size = int(size)
+      contents = None
+      if self._command == b'contents':
+        contents = read(size+1)[:-1] # all but the newline
+      self._replies.put((oidtype, size, contents))
+    self._replies.put(None)
+
+  def _next_reply(self):
+    reply = self._replies.get()
+    if reply is None:
+      raise SystemExit(_("Error: git cat-file exited unexpectedly")) # pragma: no cover
+    return reply
+
+  def lookup(self, objects):
+    """
+    Yields (object, type, size, contents) for each of objects, in order.
+    type and size are None for missing objects; contents is None for info
+    lookups.
+    """
+    write = self._process.stdin.write
+    command = self._command + b' '
+    sent = collections.deque()
+    unflushed = 0
+    try:
+      for obj in objects:
+        write(command + obj + b'\n')
+        sent.append(obj)
+        unflushed += 1
+        if unflushed == self._batch_size:
+          write(b'flush\n')
+          self._process.stdin.flush()
+          unflushed = 0
+          # Leave one batch for cat-file to work on while we queue the next
+          while len(sent) > self._batch_size:
+            yield (sent.popleft(),) + self._next_reply()
+      if unflushed:
+        write(b'flush\n')
+        self._process.stdin.flush()
+        unflushed = 0
+      while sent:
+        yield (sent.popleft(),) + self._next_reply()
+    finally:
+      # Consume the replies to anything still outstanding, so that a caller
+      # stopping early does not leave them for the next lookup()
+      if unflushed:
+        write(b'flush\n')
+        self._process.stdin.flush()
+      for obj in sent:
+        self._next_reply()
+
+  def close(self):
+    self._process.stdin.close()
+    self._process.wait()
+    self._reader.join()
+
 class FileInfoValueHelper:
   def __init__(self, replace_text, insert_blob_func, source_working_dir):
     self.data = {}
     self._replace_text = replace_text
     self._insert_blob_func = insert_blob_func
+    self._source_working_dir = source_working_dir
     cmd = ['git', 'cat-file', '--batch-command']
     self._cat_file_process = subproc.Popen(cmd,
                                            stdin = subprocess.PIPE,
@@ -2958,21 +3573,31 @@ class FileInfoValueHelper:
     assert(oidtype == b'blob')
     return size
 
+  def get_small_blob_contents(self, identifiers, max_size):
+    """
+    Yields (identifier, contents) for those of identifiers which are blobs
+    smaller than max_size; other objects are skipped.  Sizes and contents
+    are looked up through two pipelined cat-file processes.
+    """
+    sizes = BatchedCatFile(b'info', self._source_working_dir)
+    contents = BatchedCatFile(b'contents', self._source_working_dir)
+    small_blobs = (oid for (oid, oidtype, size, _) in sizes.lookup(identifiers)
+                   if oidtype == b'blob' and size < max_size)
+    for (oid, _, _, data) in contents.lookup(small_blobs):
+      yield (oid, data)
+    sizes.close()
+    contents.close()
+
   def insert_file_with_contents(self, contents):
     blob = Blob(contents)
     self._insert_blob_func(blob)
     return blob.id
 
   def is_binary(self, contents):
-    return b"\0" in contents[0:8192]
+    return _is_binary(contents)
 
   def apply_replace_text(self, contents):
-    new_contents = contents
-    for literal, replacement in self._replace_text['literals']:
-      new_contents = new_contents.replace(literal, replacement)
-    for regex,   replacement in self._replace_text['regexes']:
-      new_contents = regex.sub(replacement, new_contents)
-    return new_contents
+    return _apply_replace_text(contents, self._replace_text)
 
 class LFSObjectTracker:
   class LFSObjs:
@@ -3049,18 +3674,12 @@ class LFSObjectTracker:
     p = subproc.Popen(["git", "rev-list", "--objects", "--all"],
                       stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                       cwd=repo)
-    for line in p.stdout.readlines():
-      try:
-        (git_oid, filename) = line.split()
-      except ValueError:
-        # Commit and tree objects only have oid
-        continue
-
-      mymap = self.source_objects if source else self.target_objects
-      size = self.file_info.get_size_by_identifier(git_oid)
-      if size >= 1024:
-        continue
-      contents = self.file_info.get_contents_by_identifier(git_oid)
+    # Commits are listed without a path; trees and blobs with one (possibly
+    # empty for root trees), and get_small_blob_contents() skips the trees
+    oids = (line.split(b' ', 1)[0] for line in p.stdout if b' ' in line)
+    mymap = self.source_objects if source else self.target_objects
+    for (git_oid, contents) in self.file_info.get_small_blob_contents(oids,
+                                                                      1024):
       lfs_object_id = self._get_lfs_values(contents).get(b'oid')
       if lfs_object_id:
         mymap.objects.add(lfs_object_id)
@@ -3103,6 +3722,138 @@ class DualFileWriter:
     self.file1.close()
     self.file2.close()
 
+_worker_replace_text = None
+
+def _init_replace_text_worker(replace_text):
+  global _worker_replace_text
+  _worker_replace_text = replace_text
+
+def _replace_text_in_batch(batch):
+  # Runs in a worker process.  Contents that come out unchanged are returned
+  # as None so they do not need to be sent back.
+  results = []
+  for contents in batch:
+    new_contents = contents
+    if not _is_binary(contents):
+      new_contents = _apply_replace_text(contents, _worker_replace_text)
+    results.append(None if new_contents == contents else new_contents)
+  return results
+
+class ReplaceTextPrefetcher:
+  """
+  Wraps the fast-export stream when --replace-text-jobs asks for more than
+  one process.  Blob contents are read ahead of the parser, up to a bounded
+  window, and handed in batches to a pool of worker processes, so that by the
+  time the parser gets to a blob its replacement has usually been done.  The
+  parser still sees exactly the same lines and data in the same order, and
+  all callbacks still run serially, so the result is identical to doing the
+  replacement inline.
+  """
+  class Batch:
+    def __init__(self):
+      self.contents = []
+      self.size = 0
+      self.future = None
+
+  BATCH_BYTES = 1024*1024
+  BATCH_BLOBS = 256
+  WINDOW_BYTES = 64*1024*1024
+  ENTRY_OVERHEAD = 64  # Rough cost of queueing one line, to bound tiny lines
+
+  def __init__(self, input_file, replace_text, jobs):
+    self.input_file = input_file
+    self._executor = concurrent.futures.ProcessPoolExecutor(
+                       max_workers = jobs,
+                       initializer = _init_replace_text_worker,
+                       initargs = (replace_text,))
+    # Lines and data read from input_file that the parser has not asked for
+    self._queue = collections.deque()
+    self._queued_bytes = 0
+    self._eof = False
+    self._in_blob = False
+    # id(contents) -> (contents, batch, index within batch).  The entry keeps
+    # contents alive, so its id cannot be reused while it is pending.
+    self._pending = {}
+    self._open_batch = None
+
+  def close(self):
+    self._executor.shutdown()
+    self.input_file.close()
+
+  def read(self, size):
+    # The parser only calls read() for the data following a 'data' line,
+    # which _read_ahead() always queues together with that line
+    contents = self._pop()
+    assert len(contents) == size
+    return contents
+
+  def readline(self):
+    if not self._eof and self._queued_bytes < self.WINDOW_BYTES//2:
+      self._read_ahead()
+    if not self._queue:
+      return b''
+    return self._pop()
+
+  def replaced_data(self, contents):
+    """
+    Return the result of applying --replace-text to contents, if contents
+    are blob data read through this object, and None otherwise.
+    """
+    entry = self._pending.pop(id(contents), None)
+    if entry is None:
+      return None
+    contents, batch, index = entry
+    if batch.future is None:
+      self._submit_open_batch()
+    new_contents = batch.future.result()[index]
+    return contents if new_contents is None else new_contents
+
+  def _pop(self):
+    item = self._queue.popleft()
+    self._queued_bytes -= len(item) + self.ENTRY_OVERHEAD
+    return item
+
+  def _push(self, item):
+    self._queue.append(item)
+    self._queued_bytes += len(item) + self.ENTRY_OVERHEAD
+
+  def _read_ahead(self):
+    while self._queued_bytes < self.WINDOW_BYTES:
+      line = self.input_file.readline()
+      if not line:
+        self._eof = True
+        break
+      self._push(line)
+      if line == b'blob\n':
+        self._in_blob = True
+      elif line.startswith(b'data '):
+        contents = self.input_file.read(int(line[5:]))
+        self._push(contents)
+        if self._in_blob:
+          self._add_blob(contents)
+        self._in_blob = False
+    # Do not leave a partial batch waiting until the parser gets to it
+    self._submit_open_batch()
+
+  def _add_blob(self, contents):
+    if self._open_batch is None:
+      self._open_batch = ReplaceTextPrefetcher.Batch()
+    batch = self._open_batch
+    self._pending[id(contents)] = (contents, batch, len(batch.contents))
+    batch.contents.append(contents)
+    batch.size += len(contents)
+    if batch.size >= self.BATCH_BYTES or \
+       len(batch.contents) >= self.BATCH_BLOBS:
+      self._submit_open_batch()
+
+  def _submit_open_batch(self):
+    batch = self._open_batch
+    if batch is None:
+      return
+    batch.future = self._executor.submit(_replace_text_in_batch,
+                                         batch.contents)
+    self._open_batch = None
+
 class RepoFilter(object):
   def __init__(self,
                args,
@@ -3185,12 +3936,13 @@ class RepoFilter(object):
     # id (i.e. commit.id)
     self._pending_renames = collections.OrderedDict()
 
-    # A dict of commit_hash[0:7] -> set(commit_hashes with that prefix).
+    # A dict of commit_hash[0:7] -> commit_hash, or to a tuple of the
+    # commit_hashes with that prefix in the rare case there are several.
     #
     # It's common for commit messages to refer to commits by abbreviated
     # commit hashes, as short as 7 characters.  To facilitate translating
     # such short hashes, we have a mapping of prefixes to full old hashes.
-    self._commit_short_old_hashes = collections.defaultdict(set)
+    self._commit_short_old_hashes = {}
 
     # A set of commit hash references appearing in commit messages which
     # mapped to a valid commit that was removed entirely in the filtering
@@ -3215,7 +3967,10 @@ class RepoFilter(object):
     self._finalize_handled = False
     self._orig_refs = None
     self._config_settings = {}
+    # Filename -> new filename (or None) memo for _filter_files(), and the
+    # path_changes it applies, compiled on first use
     self._newnames = {}
+    self._compiled_path_changes = None
     self._stash = None
 
     # Cache a few message translations for performance reasons
@@ -3289,7 +4044,9 @@ class RepoFilter(object):
       current_time = time.time()
       file_mod_time = os.path.getmtime(ran_path)
       file_age = current_time - file_mod_time
-      if file_age > 86400: # file older than a day
+      # With --state-branch, continuing from previous runs is the point
+      # (e.g. nightly re-filtering of new commits), so don't ask
+      if file_age > 86400 and not self._args.state_branch: # older than a day
         msg = (f"The previous run is older than a day ({decode(ran_path)} already exists).\n"
                f"See \"Already Ran\" section in the manual for more information.\n"
                f"Treat this run as a continuation of filtering in the previous run (Y/N)? ")
@@ -3569,17 +4326,22 @@ class RepoFilter(object):
     #   old_hash != None and we found a rename for old_hash
     #   limit > 0 and len(self._pending_renames) started less than 2*limit
     #   limit > 0 and len(self._pending_renames) < limit
-    if limit and len(self._pending_renames) < 2 * limit:
+    pending = self._pending_renames
+    if not pending or (limit and len(pending) < 2 * limit):
       return
+    # The get-mark requests were not flushed when made; see _record_remapping()
     fi_input, fi_output = self._import_pipes
-    while self._pending_renames:
-      orig_hash, new_fast_export_id = self._pending_renames.popitem(last=False)
-      new_hash = fi_output.readline().rstrip()
+    if not fi_input.closed:
+      self._output.flush()
+    readline = fi_output.readline
+    while pending:
+      orig_hash, new_fast_export_id = pending.popitem(last=False)
+      new_hash = readline().rstrip()
       self._commit_renames[orig_hash] = new_hash
       self._graph.record_hash(new_fast_export_id, new_hash)
       if old_hash == orig_hash:
         return
-      if limit and len(self._pending_renames) < limit:
+      if limit and len(pending) < limit:
         return
 
   def _translate_commit_hash(self, matchobj_or_oldhash):
@@ -3587,14 +4349,20 @@ class RepoFilter(object):
     if not isinstance(matchobj_or_oldhash, bytes):
       old_hash = matchobj_or_oldhash.group(1)
     orig_len = len(old_hash)
-    new_hash = self._get_rename(old_hash)
-    if new_hash is None:
-      if old_hash[0:7] not in self._commit_short_old_hashes:
+    # Most references are to commits whose rename is already known, and
+    # most others are abbreviated or not commits at all; only go through
+    # _get_rename() when we may have to wait for fast-import
+    new_hash = self._commit_renames.get(old_hash)
+    if not new_hash and old_hash in self._pending_renames:
+      new_hash = self._get_rename(old_hash)
+    if not new_hash:
+      possibilities = self._commit_short_old_hashes.get(old_hash[0:7])
+      if possibilities is None:
         self._commits_referenced_but_removed.add(old_hash)
         return old_hash
-      possibilities = self._commit_short_old_hashes[old_hash[0:7]]
-      matches = [x for x in possibilities
-                 if x[0:orig_len] == old_hash]
+      if isinstance(possibilities, bytes):
+        possibilities = (possibilities,)
+      matches = [x for x in possibilities if x.startswith(old_hash)]
       if len(matches) != 1:
         self._commits_referenced_but_removed.add(old_hash)
         return old_hash
@@ -3795,10 +4563,19 @@ class RepoFilter(object):
     # Record the mapping of old commit hash to new one
     if commit.original_id and self._import_pipes:
       fi_input, fi_output = self._import_pipes
+      # Not flushed here: fast-import answers once _flush_renames() flushes,
+      # rather than us paying for a write (and fast-import a read) per commit
       self._output.write(b"get-mark :%d\n" % commit.id)
-      self._output.flush()
       orig_id = commit.original_id
-      self._commit_short_old_hashes[orig_id[0:7]].add(orig_id)
+      short_hashes = self._commit_short_old_hashes
+      known = short_hashes.get(orig_id[0:7])
+      if known is None:
+        short_hashes[orig_id[0:7]] = orig_id
+      elif isinstance(known, bytes):
+        if known != orig_id:
+          short_hashes[orig_id[0:7]] = (known, orig_id)
+      elif orig_id not in known:
+        short_hashes[orig_id[0:7]] = known + (orig_id,)
       # Note that we have queued up an id for later reading; flush a
       # few of the older ones if we have too many queued up
       self._pending_renames[orig_id] = commit.id
@@ -3821,15 +4598,19 @@ class RepoFilter(object):
     if blob.original_id in self._args.strip_blobs_with_ids:
       blob.skip()
 
-    if ( self._args.replace_text
+    # With --replace-text-jobs, worker processes already did the replacement
+    # below for blobs read from fast-export
+    prefetched = None
+    if isinstance(self._input, ReplaceTextPrefetcher):
+      prefetched = self._input.replaced_data(blob.data)
+    if prefetched is not None:
+      blob.data = prefetched
+    elif ( self._args.replace_text
         and not self._file_info_callback
         # not (if blob contains zero byte in the first 8Kb, that is, if blob is binary data)
-        and not b"\0" in blob.data[0:8192]
+        and not _is_binary(blob.data)
     ):
-      for literal, replacement in self._args.replace_text['literals']:
-        blob.data = blob.data.replace(literal, replacement)
-      for regex,   replacement in self._args.replace_text['regexes']:
-        blob.data = regex.sub(replacement, blob.data)
+      blob.data = _apply_replace_text(blob.data, self._args.replace_text)
 
     if self._blob_callback:
       self._blob_callback(blob, self.callback_metadata())
@@ -3837,20 +4618,6 @@ class RepoFilter(object):
     self._insert_into_stream(blob)
 
   def _filter_files(self, commit):
-    def filename_matches(path_expression, pathname):
-      ''' Returns whether path_expression matches pathname or a leading
-          directory thereof, allowing path_expression to not have a trailing
-          slash even if it is meant to match a leading directory. '''
-      if path_expression == b'':
-        return True
-      n = len(path_expression)
-      if (pathname.startswith(path_expression) and
-          (path_expression[n-1:n] == b'/' or
-           len(pathname) == n or
-           pathname[n:n+1] == b'/')):
-        return True
-      return False
-
     def newname(path_changes, pathname, use_base_name, filtering_is_inclusive):
       ''' Applies filtering and rename changes from path_changes to pathname,
           returning any of None (file isn't wanted), original filename (file
@@ -3861,25 +4628,26 @@ class RepoFilter(object):
         pathname = os.path.basename(pathname)
       for (mod_type, match_type, path_exp) in path_changes:
         if mod_type == 'filter' and not wanted:
-          assert match_type in ('match', 'glob', 'regex')
-          if match_type == 'match' and filename_matches(path_exp, pathname):
-            wanted = True
-          if match_type == 'glob' and fnmatch.fnmatch(pathname, path_exp):
-            wanted = True
-          if match_type == 'regex' and path_exp.search(pathname):
+          assert match_type == 'compiled' # see _compile_path_changes()
+          if path_exp.matches(pathname):
             wanted = True
         elif mod_type == 'rename':
-          match, repl = path_exp
-          assert match_type in ('match','regex') # glob was translated to regex
-          if match_type == 'match' and filename_matches(match, full_pathname):
-            full_pathname = full_pathname.replace(match, repl, 1)
-            pathname = full_pathname # rename incompatible with use_base_name
+          # glob was translated to regex, and literals compiled
+          assert match_type in ('compiled','regex')
+          if match_type == 'compiled':
+            renamed = path_exp.rename(full_pathname)
+            if renamed is not None:
+              full_pathname = renamed
+              pathname = full_pathname # rename incompatible with use_base_name
           if match_type == 'regex':
+            match, repl = path_exp
             full_pathname = match.sub(repl, full_pathname)
             pathname = full_pathname # rename incompatible with use_base_name
       return full_pathname if (wanted == filtering_is_inclusive) else None
 
     args = self._args
+    if self._compiled_path_changes is None:
+      self._compiled_path_changes = _compile_path_changes(args.path_changes)
     new_file_changes = {}  # Assumes no renames or copies, otherwise collisions
     for change in commit.file_changes:
       # NEEDSWORK: _If_ we ever want to pass `--full-tree` to fast-export and
@@ -3894,7 +4662,7 @@ class RepoFilter(object):
         change.filename = self._newnames[change.filename]
       else:
         original_filename = change.filename
-        change.filename = newname(args.path_changes, change.filename,
+        change.filename = newname(self._compiled_path_changes, change.filename,
                                   args.use_base_name, args.inclusive)
         if self._filename_callback:
           change.filename = self._filename_callback(change.filename)
@@ -3944,10 +4712,8 @@ class RepoFilter(object):
 
   def _tweak_commit(self, commit, aux_info):
     if self._args.replace_message:
-      for literal, replacement in self._args.replace_message['literals']:
-        commit.message = commit.message.replace(literal, replacement)
-      for regex,   replacement in self._args.replace_message['regexes']:
-        commit.message = regex.sub(replacement, commit.message)
+      commit.message = _apply_replace_text(commit.message,
+                                           self._args.replace_message)
     if self._message_callback:
       commit.message = self._message_callback(commit.message)
 
@@ -4161,10 +4927,7 @@ class RepoFilter(object):
   def _tweak_tag(self, tag):
     # Tweak the tag message according to callbacks
     if self._args.replace_message:
-      for literal, replacement in self._args.replace_message['literals']:
-        tag.message = tag.message.replace(literal, replacement)
-      for regex,   replacement in self._args.replace_message['regexes']:
-        tag.message = regex.sub(replacement, tag.message)
+      tag.message = _apply_replace_text(tag.message, self._args.replace_message)
     if self._message_callback:
       tag.message = self._message_callback(tag.message)
 
@@ -4319,7 +5082,8 @@ class RepoFilter(object):
 
   def _setup_input(self, use_done_feature):
     if self._args.stdin:
-      self._input = sys.stdin.detach()
+      self._input = io.BufferedReader(sys.stdin.detach().detach(),
+                                      fast_export_buffer_size)
       sys.stdin = None # Make sure no one tries to accidentally use it
       self._fe_orig = None
     else:
@@ -4352,7 +5116,8 @@ class RepoFilter(object):
                  '--signed-tags=strip', '--tag-of-filtered-object=rewrite',
                  '--fake-missing-tagger', '--reference-excluded-parents'
                  ] + extra_flags + self._args.refs
-      self._fep = subproc.Popen(fep_cmd, bufsize=-1, stdout=subprocess.PIPE)
+      self._fep = subproc.Popen(fep_cmd, bufsize=fast_export_buffer_size,
+                                stdout=subprocess.PIPE)
       self._input = self._fep.stdout
       if self._args.dry_run or self._args.debug:
         self._fe_orig = os.path.join(self.results_tmp_dir(),
@@ -4548,59 +5313,130 @@ class RepoFilter(object):
     new_hash = self._graph.git_hash[new_id] if new_id else deleted_hash
     return new_hash
 
+  @staticmethod
+  def _scan_commit_map(filename, keys, values, renames):
+    """
+    Look up entries of a commit-map from previous runs in a single pass over
+    the file, without loading all of it.  Returns
+      renames_of:     {old: new} for each old in keys found in the map
+      unrenames:      {new: old} for each new in values found in the map
+                      (the last such old, like reversing the whole map would)
+      changed_values: the members of values that are a new commit for some
+                      old commit other than themselves
+    """
+    renames_of = {}
+    unrenames = {}
+    changed_values = set()
+    with open(filename, 'br') as f:
+      f.readline() # Skip the header line
+      for line in f:
+        (old, new) = line.split()
+        if old in keys:
+          renames_of[old] = new
+        if new in values:
+          unrenames[new] = old
+          if old != new and new != deleted_hash:
+            changed_values.add(new)
+    return renames_of, unrenames, changed_values
+
+  @staticmethod
+  def _merged_commit_renames(filename, renames, seen):
+    """
+    Yields, sorted by old commit, the commit renames composed from the
+    A->B mappings in the commit-map of previous runs and the B->C mappings
+    in renames, plus the mappings in renames whose old commit is not
+    among the B's (seen).
+    """
+    added = sorted((old, new) for (old, new) in renames.items()
+                   if old not in seen)
+    i = 0
+    with open(filename, 'br') as f:
+      f.readline() # Skip the header line
+      for line in f:
+        (old, newish) = line.split()
+        while i < len(added) and added[i][0] < old:
+          yield added[i]
+          i += 1
+        if i < len(added) and added[i][0] == old:
+          continue
+        yield (old, renames.get(newish, newish))
+    yield from added[i:]
+
   def _compute_metadata(self, metadata_dir, orig_refs):
+    renames = self._commit_renames
+    self._orig_graph._ensure_reverse_maps_populated()
+
     #
-    # First, handle commit_renames
+    # First, read what we need from the metadata of previous runs
     #
-    old_commit_renames = dict()
-    if not self._already_ran:
-      commit_renames = {old: new
-                        for old, new in self._commit_renames.items()
-                       }
-    else:
-      # Read commit-map into old_commit_renames
-      with open(os.path.join(metadata_dir, b'commit-map'), 'br') as f:
+    old_ref_map = {}
+    old_first_changes = dict()
+    renames_of, unrenames, changed_values = {}, {}, set()
+    if self._already_ran:
+      # Populate old_ref_map from the 'ref-map' file
+      with open(os.path.join(metadata_dir, b'ref-map'), 'br') as f:
         f.readline() # Skip the header line
         for line in f:
-          (old,new) = line.split()
-          old_commit_renames[old] = new
-      # Use A->B mappings in old_commit_renames, and B->C mappings in
-      # self._commit_renames to yield A->C mappings in commit_renames
-      commit_renames = {old: self._commit_renames.get(newish, newish)
-                        for old, newish in old_commit_renames.items()}
-      # If there are any B->C mappings in self._commit_renames for which
-      # there was no A->B mapping in old_commit_renames, then add the
-      # B->C mapping to commit_renames too.
-      seen = set(old_commit_renames.values())
-      commit_renames.update({old: new
-                             for old, new in self._commit_renames.items()
-                             if old not in seen})
+          (old,intermediate,ref) = line.split()
+          old_ref_map[ref] = (old, intermediate)
+      # Read first_changes into old_first_changes
+      with open(os.path.join(metadata_dir, b'first-changed-commits'), 'br') as f:
+        for line in f:
+          changed_commit, undeleted_self_or_ancestor = line.strip().split()
+          old_first_changes[changed_commit] = undeleted_self_or_ancestor
+
+      # The commit-map only grows from run to run, while this run only needs
+      # the entries for refs, for commits it processed, and for their
+      # parents; look those up instead of loading the whole map.
+      commit_map = os.path.join(metadata_dir, b'commit-map')
+      keys = set(old_first_changes)
+      keys.update(old for (old, intermediate) in old_ref_map.values())
+      keys.update(orig_refs.values())
+      values = set(orig_refs.values())
+      values.update(renames)
+      for commit in renames:
+        values.update(self._orig_graph.get_parent_hashes(commit))
+      renames_of, unrenames, changed_values = \
+        RepoFilter._scan_commit_map(commit_map, keys, values, renames)
+
+    #
+    # Second, handle commit_renames
+    #
+    seen = set()
+    if not self._already_ran:
+      commit_renames = sorted(renames.items())
+    else:
+      # Use A->B mappings in the old commit-map, and B->C mappings in
+      # renames to yield A->C mappings in commit_renames.  If there are any
+      # B->C mappings in renames for which there was no A->B mapping in the
+      # old commit-map, then add the B->C mapping to commit_renames too.
+      seen = set(old for old in renames if old in unrenames)
+      commit_renames = RepoFilter._merged_commit_renames(commit_map, renames,
+                                                         seen)
+
+    def in_commit_renames(commit):
+      # Only asked about the old commits of refs, which were among the keys
+      # looked up in the old commit-map
+      return commit in renames_of or (commit in renames and
+                                       commit not in seen)
 
     #
-    # Second, handle ref_maps
+    # Third, handle ref_maps
     #
     exported_refs, imported_refs = self.get_exported_and_imported_refs()
 
-    old_commit_unrenames = dict()
     if not self._already_ran:
       old_ref_map = dict((refname, (old_hash, deleted_hash))
                          for refname, old_hash in orig_refs.items()
                          if refname in exported_refs)
     else:
-      # old_commit_renames talk about how commits were renamed in the original
-      # run.  Let's reverse it to find out how to get from the intermediate
-      # commit name, back to the original.  Because everything in orig_refs
-      # right now refers to the intermediate commits after the first run(s),
-      # and we need to map them back to what they were before any changes.
-      old_commit_unrenames = dict((v,k) for (k,v) in old_commit_renames.items())
-
-      old_ref_map = {}
-      # Populate old_ref_map from the 'ref-map' file
-      with open(os.path.join(metadata_dir, b'ref-map'), 'br') as f:
-        f.readline() # Skip the header line
-        for line in f:
-          (old,intermediate,ref) = line.split()
-          old_ref_map[ref] = (old, intermediate)
+      # The old commit-map talks about how commits were renamed in the
+      # original run.  Use it in reverse to find out how to get from the
+      # intermediate commit name, back to the original.  Because everything
+      # in orig_refs right now refers to the intermediate commits after the
+      # first run(s), and we need to map them back to what they were before
+      # any changes.
+      #
       # Append to old_ref_map items from orig_refs that were exported, but
       # get the actual original commit name
       for refname, old_hash in orig_refs.items():
@@ -4609,20 +5445,21 @@ class RepoFilter(object):
         if refname not in exported_refs:
           continue
         # Compute older_hash
-        original_hash = old_commit_unrenames.get(old_hash, old_hash)
+        original_hash = unrenames.get(old_hash, old_hash)
+        if original_hash != old_hash:
+          renames_of[original_hash] = old_hash
         old_ref_map[refname] = (original_hash, deleted_hash)
 
     new_refs = {}
     new_refs_initialized = False
     ref_maps = {}
-    self._orig_graph._ensure_reverse_maps_populated()
     for refname, pair in old_ref_map.items():
       old_hash, hash_ref_becomes_if_not_imported_in_this_run = pair
       if refname not in imported_refs:
         new_hash = hash_ref_becomes_if_not_imported_in_this_run
-      elif old_hash in commit_renames:
-        intermediate = old_commit_renames.get(old_hash,old_hash)
-        if intermediate in self._commit_renames:
+      elif in_commit_renames(old_hash):
+        intermediate = renames_of.get(old_hash,old_hash)
+        if intermediate in renames:
           new_hash = self._remap_to(intermediate)
         else:
           new_hash = intermediate
@@ -4647,47 +5484,32 @@ class RepoFilter(object):
           ref_maps[ref] = (old_hash, new_hash)
 
     #
-    # Third, handle first_changes
+    # Fourth, handle first_changes
     #
 
-    old_first_changes = dict()
-    if self._already_ran:
-      # Read first_changes into old_first_changes
-      with open(os.path.join(metadata_dir, b'first-changed-commits'), 'br') as f:
-        for line in f:
-          changed_commit, undeleted_self_or_ancestor = line.strip().split()
-          old_first_changes[changed_commit] = undeleted_self_or_ancestor
     # We need to find the commits that were modified whose parents were not.
     # To be able to find parents, we need the commit names as of the beginning
     # of this run, and then when we are done, we need to map them back to the
     # name of the commits from before any git-filter-repo runs.
     #
-    # We are excluding here any commits deleted in previous git-filter-repo
-    # runs
-    undo_old_commit_renames = dict((v,k) for (k,v) in old_commit_renames.items()
-                                   if v != deleted_hash)
-    # Get a list of all commits that were changed, as of the beginning of
-    # this latest run.
-    changed_commits = {new
-                       for (old,new) in old_commit_renames.items()
-                       if old != new and new != deleted_hash} | \
-                      {old
-                       for (old,new) in self._commit_renames.items()
-                       if old != new}
-    special_changed_commits = {old
-                               for (old,new) in old_commit_renames.items()
-                               if new == deleted_hash}
+    # A commit was changed, as of the beginning of this latest run, if a
+    # previous run rewrote some commit to it, or this run rewrote it.  (We
+    # only ask about parents of commits in this run, which were among the
+    # values looked up in the old commit-map.)
+    def was_changed(commit):
+      return commit in changed_values or renames.get(commit, commit) != commit
+
     first_changes = dict()
-    for (old,new) in self._commit_renames.items():
+    for (old,new) in renames.items():
       if old == new:
         # old wasn't modified, can't be first change if not even a change
         continue
-      if old_commit_unrenames.get(old,old) != old:
+      if unrenames.get(old,old) != old:
         # old was already modified in previous run; while it might represent
         # something that is still a first change, we'll handle that as we
         # loop over old_first_changes below
         continue
-      if any(parent in changed_commits
+      if any(was_changed(parent)
              for parent in self._orig_graph.get_parent_hashes(old)):
         # a parent of old was modified, so old is not a first change
         continue
@@ -4703,9 +5525,9 @@ class RepoFilter(object):
         # was pruned.  So, old is still a first change
         first_changes[old] = undeleted_self_or_ancestor
         continue
-      intermediate = old_commit_renames.get(old, old)
+      intermediate = renames_of.get(old, old)
       usoa = undeleted_self_or_ancestor
-      new_ancestor = self._commit_renames.get(usoa, usoa)
+      new_ancestor = renames.get(usoa, usoa)
       if intermediate == deleted_hash:
         # old was pruned in previous rewrite
         if usoa != new_ancestor:
@@ -4724,12 +5546,12 @@ class RepoFilter(object):
       # processed by the latest filtering (not necessarily that it changed),
       # but we need to know that before we can check for parent hashes having
       # changed.
-      if intermediate not in self._commit_renames:
+      if intermediate not in renames:
         # This commit was not processed by this run, so it remains a first
         # change
         first_changes[old] = usoa
         continue
-      if any(parent in changed_commits
+      if any(was_changed(parent)
              for parent in self._orig_graph.get_parent_hashes(intermediate)):
         # An ancestor was modified by this run, so it is no longer a first
         # change; continue to the next one.
@@ -4774,9 +5596,22 @@ class RepoFilter(object):
     commit_renames, ref_maps, first_changes = \
       self._compute_metadata(metadata_dir, orig_refs)
 
+    # commit_renames may be read from the old commit-map as the new one is
+    # written, so write to a temporary file and rename it into place after
+    commit_map = os.path.join(metadata_dir, b'commit-map')
+    num_commits = 0
+    changed_commits = 0
+    with open(commit_map + b'.tmp', 'bw') as f:
+      f.write(("%-40s %s\n" % (_("old"), _("new"))).encode())
+      for (old,new) in commit_renames:
+        num_commits += 1
+        changed_commits += (old != new)
+        msg = b'%s %s\n' % (old, new if new != None else deleted_hash)
+        f.write(msg)
+    os.replace(commit_map + b'.tmp', commit_map)
+
     if self._args.sensitive_data_removal:
-      changed_commits = sum(k!=v for (k,v) in commit_renames.items())
-      print(f"You rewrote {changed_commits} (of {len(commit_renames)}) commits.")
+      print(f"You rewrote {changed_commits} (of {num_commits}) commits.")
       print("") # Add a blank line before important rewrite information
       print(f"NOTE: First Changed Commit(s) is/are:\n  "
             + decode(b"\n  ".join(x for x in first_changes)))
@@ -4787,12 +5622,6 @@ class RepoFilter(object):
       self._handle_lfs_metadata(metadata_dir)
       print("") # Add a blank line after important rewrite information
 
-    with open(os.path.join(metadata_dir, b'commit-map'), 'bw') as f:
-      f.write(("%-40s %s\n" % (_("old"), _("new"))).encode())
-      for (old,new) in sorted(commit_renames.items()):
-        msg = b'%s %s\n' % (old, new if new != None else deleted_hash)
-        f.write(msg)
-
     with open(os.path.join(metadata_dir, b'ref-map'), 'bw') as f:
       f.write(("%-40s %-40s %s\n" % (_("old"), _("new"), _("ref"))).encode())
       for refname, hash_pair in sorted(ref_maps.items()):
@@ -4889,6 +5718,13 @@ class RepoFilter(object):
     assert self._sanity_checks_handled
 
     if self._input:
+      # Do --replace-text in worker processes, if requested
+      if (self._args.replace_text and self._args.replace_text_jobs > 1
+          and not self._file_info_callback):
+        self._input = ReplaceTextPrefetcher(self._input,
+                                            self._args.replace_text,
+                                            self._args.replace_text_jobs)
+
       # Create and run the filter
       self._repo_working_dir = self._args.source or b'.'
       self._parser = FastExportParser(blob_callback   = self._tweak_blob,
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+class InstanceStateWaiter:
+    """Shared EC2 state poller: one describe_instances call per tick for every watched instance in a group"""
+
+    # Filter values are limited to 200 per filter in describe_instances
+    BATCH_SIZE = 200
+
+    def __init__(self, log_fn: Optional[Callable[[str, str], None]] = None,
+                 initial_delay: float = 2, max_delay: float = 10):
+        """
+        Initialize the instance state waiter
+
+        Args:
+            log_fn (callable): Optional log_operation(level, message) of the owning manager
+            initial_delay (float): Seconds between polls right after a registration or state change
+            max_delay (float): Upper bound of the exponential backoff between polls
+        """
+        self.log_fn = log_fn
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._groups = {}  # group key -> {'client', 'watches', 'wakeup', 'thread'}
+
+    def _log(self, level: str, message: str) -> None:
+        if self.log_fn:
+            self.log_fn(level, message)
+
+    @staticmethod
+    def default_group_key(ec2_client) -> Hashable:
+        """Clients are created per account/region, so one client is one polling group"""
+        return (ec2_client.meta.region_name, id(ec2_client))
+
+    def watch(self, ec2_client, instance_id: str, target_states: Iterable[str],
+              fail_states: Iterable[str] = (), timeout: float = 300,
+              callback: Optional[Callable[[Dict], None]] = None,
+              missing_state: Optional[str] = None, group_key: Hashable = None) -> Future:
+        """
+        Register an instance and return a Future resolved when it reaches a target or fail state
+
+        The future's result is a dict with 'instance_id', 'state', 'instance' (the last
+        describe_instances entry, or None), and 'elapsed_seconds'. On timeout the state
+        is 'timeout'. If callback is given it is called with the same dict.
+
+        Args:
+            ec2_client: EC2 client used to poll the group
+            instance_id (str): Instance to watch
+            target_states (iterable): States that resolve the watch successfully
+            fail_states (iterable): States that resolve the watch early as a failure
+            timeout (float): Seconds before the watch resolves with state 'timeout'
+            callback (callable): Optional function called with the result dict
+            missing_state (str): State to assume when the instance is no longer listed
+                (e.g. 'terminated'); if None a missing instance keeps being polled
+            group_key: Instances sharing a key are polled together (e.g. (account, region))
+        """
+        future = Future()
+        watch = {
+            'instance_id': instance_id,
+            'target_states': set(target_states),
+            'fail_states': set(fail_states),
+            'missing_state': missing_state,
+            'deadline': time.time() + timeout,
+            'started_at': time.time(),
+            'last_state': None,
+            'instance': None,
+            'callback': callback,
+            'future': future
+        }
+
+        key = group_key if group_key is not None else self.default_group_key(ec2_client)
+
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = {'client': ec2_client, 'watches': {}, 'wakeup': threading.Event(), 'thread': None}
+                self._groups[key] = group
+
+            group['watches'][instance_id] = watch
+            group['wakeup'].set()
+
+            if group['thread'] is None:
+                group['thread'] = threading.Thread(
+                    target=self._poll_group, args=(key, group),
+                    name=f"InstanceStateWaiter-{key[0] if isinstance(key, tuple) else key}",
+                    daemon=True
+                )
+                group['thread'].start()
+
+        return future
+
+    def _resolve(self, watch: Dict, state: str) -> None:
+        result = {
+            'instance_id': watch['instance_id'],
+            'state': state,
+            'instance': watch['instance'],
+            'elapsed_seconds': int(time.time() - watch['started_at'])
+        }
+
+        if watch['callback']:
+            try:
+                watch['callback'](result)
+            except Exception as e:
+                self._log('ERROR', f"State callback for {watch['instance_id']} failed: {e}")
+
+        watch['future'].set_result(result)
+
+    def _describe_states(self, ec2_client, instance_ids) -> Dict[str, Dict]:
+        """Return instance_id -> instance for every listed ID, in batches"""
+        instances = {}
+        paginator = ec2_client.get_paginator('describe_instances')
+
+        for i in range(0, len(instance_ids), self.BATCH_SIZE):
+            batch = instance_ids[i:i + self.BATCH_SIZE]
+            # A filter (unlike InstanceIds) tolerates IDs that are not visible yet right after launch
+            pages = paginator.paginate(Filters=[{'Name': 'instance-id', 'Values': batch}])
+            for page in pages:
+                for reservation in page.get('Reservations', []):
+                    for instance in reservation.get('Instances', []):
+                        instances[instance['InstanceId']] = instance
+
+        return instances
+
+    def _poll_group(self, key: Hashable, group: Dict) -> None:
+        delay = self.initial_delay
+
+        while True:
+            with self._lock:
+                watches = dict(group['watches'])
+                if not watches:
+                    group['thread'] = None
+                    del self._groups[key]
+                    return
+                group['wakeup'].clear()
+
+            changed = False
+            try:
+                instances = self._describe_states(group['client'], list(watches))
+            except Exception as e:
+                self._log('ERROR', f"Error polling {len(watches)} instance(s) in {key}: {e}")
+                instances = None
+
+            now = time.time()
+            finished = []
+
+            for instance_id, watch in watches.items():
+                state = None
+                if instances is not None:
+                    instance = instances.get(instance_id)
+                    if instance is not None:
+                        watch['instance'] = instance
+                        state = instance['State']['Name']
+                    elif watch['missing_state']:
+                        state = watch['missing_state']
+
+                if state and state != watch['last_state']:
+                    self._log('INFO', f"Instance {instance_id} state changed: {watch['last_state']} → {state}")
+                    watch['last_state'] = state
+                    changed = True
+
+                if state in watch['target_states'] or state in watch['fail_states']:
+                    self._resolve(watch, state)
+                    finished.append(instance_id)
+                elif now >= watch['deadline']:
+                    self._resolve(watch, 'timeout')
+                    finished.append(instance_id)
+
+            with self._lock:
+                for instance_id in finished:
+                    if group['watches'].get(instance_id) is watches[instance_id]:
+                        del group['watches'][instance_id]
+                if not group['watches']:
+                    continue
+
+            # Poll quickly while states move, back off while everything is pending
+            delay = self.initial_delay if changed else min(delay * 2, self.max_delay)
+            if group['wakeup'].wait(delay):
+                delay = self.initial_delay
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+class PrerequisiteReconciler:
+    """Per-run memo of shared cluster prerequisites (IAM roles, VPC resources) per account/region"""
+
+    def __init__(self, log_fn: Optional[Callable[[str, str], None]] = None):
+        """
+        Initialize the prerequisite reconciler
+
+        Args:
+            log_fn (callable): Optional log_operation(level, message) of the owning manager
+        """
+        self.log_fn = log_fn
+        self._lock = threading.Lock()
+        self._key_locks = {}  # prerequisite key -> lock serializing its first resolution
+        self._resolved = {}  # prerequisite key -> resolved value
+        self.stats = {'resolved': 0, 'reused': 0}
+
+    def _log(self, level: str, message: str) -> None:
+        if self.log_fn:
+            self.log_fn(level, message)
+
+    def resolve(self, key: Hashable, action: Callable[[], Any]) -> Any:
+        """
+        Return the memoized value for key, running action only the first time
+
+        Concurrent callers for the same key wait for the first one instead of
+        repeating the API calls. A failed action is not memoized, so the next
+        cluster in the same account retries it.
+        """
+        with self._lock:
+            if key in self._resolved:
+                self.stats['reused'] += 1
+                return self._resolved[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._resolved:
+                    self.stats['reused'] += 1
+                    return self._resolved[key]
+
+            value = action()
+
+            with self._lock:
+                self._resolved[key] = value
+                self.stats['resolved'] += 1
+
+        self._log('DEBUG', f"Prerequisites resolved for {key}")
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Forget a memoized value, e.g. after the resource was found to be gone"""
+        with self._lock:
+            self._resolved.pop(key, None)
+
+    def wait_for_role_propagation(self, iam_client, role_name: str, policy_arns: Iterable[str],
+                                  timeout: float = 60, initial_delay: float = 1, max_delay: float = 8) -> bool:
+        """
+        Poll until a freshly created role is readable and has all its policies attached
+
+        Replaces a fixed sleep after create_role/attach_role_policy: returns as soon as
+        IAM reports the role with every expected policy, backing off between polls.
+        IAM accepting the writes does not mean EKS can assume the role yet, so create
+        clusters with create_cluster_with_role_retry().
+
+        Returns:
+            bool: True if the role converged before the timeout
+        """
+        expected = set(policy_arns)
+        deadline = time.time() + timeout
+        delay = initial_delay
+
+        while True:
+            try:
+                iam_client.get_role(RoleName=role_name)
+                paginator = iam_client.get_paginator('list_attached_role_policies')
+                attached = set()
+                for page in paginator.paginate(RoleName=role_name):
+                    attached.update(p['PolicyArn'] for p in page.get('AttachedPolicies', []))
+                if expected <= attached:
+                    self._log('DEBUG', f"Role {role_name} visible with {len(expected)} policies attached")
+                    return True
+            except iam_client.exceptions.NoSuchEntityException:
+                pass
+
+            if time.time() + delay > deadline:
+                self._log('WARNING', f"Role {role_name} did not converge within {timeout}s, continuing")
+                return False
+
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+    def create_cluster_with_role_retry(self, eks_client, cluster_config: Dict, timeout: float = 120,
+                                       initial_delay: float = 2, max_delay: float = 16) -> Dict:
+        """
+        Call eks_client.create_cluster, retrying while EKS cannot assume the cluster role yet
+
+        A freshly created role can be readable in IAM before EKS is able to assume it; until
+        then create_cluster fails with an InvalidParameterException naming the role. Any other
+        error, or that one past the timeout, is raised.
+        """
+        deadline = time.time() + timeout
+        delay = initial_delay
+
+        while True:
+            try:
+                return eks_client.create_cluster(**cluster_config)
+            except eks_client.exceptions.InvalidParameterException as e:
+                if 'assume' not in str(e).lower() or time.time() + delay > deadline:
+                    raise
+                self._log('INFO', f"Role for cluster {cluster_config.get('name')} cannot be assumed yet, "
+                                  f"retrying in {delay}s")
+
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+    def get_summary(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
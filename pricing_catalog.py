@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+
+import csv
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional
+
+class _JsonStream:
+    """Incremental JSON reader: walks large objects member by member and only
+    decodes the values asked for, reading the file in fixed-size chunks"""
+
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, f, chunk_size: int = 1 << 20):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, without consuming it ('' at end of file)"""
+        while True:
+            self._pos = self.WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"Malformed JSON: expected {chars!r}, found {char or 'end of file'!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete value"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Most likely cut at the chunk boundary
+                if not self._fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of the object at the current position; the caller
+        consumes each value (value(), skip() or members()) before the next key"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+    def skip(self) -> None:
+        """Consume the next value, walking objects member by member so that
+        large sections are never decoded whole"""
+        if self._peek() == '{':
+            for _ in self.members():
+                self.skip()
+        else:
+            self.value()
+
+class PricingCatalog:
+    """Offline EC2/EBS price catalog built from AWS Price List offer files, with memoized lookups"""
+
+    DEFAULT_STORE = 'pricing_catalog.json'
+    HOURS_PER_MONTH = 730
+
+    # Built-in on-demand Linux/Shared rates for us-east-1 (USD per hour), used
+    # until an offer file has been ingested or for types missing from it
+    SEED_EC2_RATES = {
+        't2.micro': 0.0116,
+        't2.small': 0.023,
+        't2.medium': 0.0464,
+        't2.large': 0.0928,
+        't3.micro': 0.0104,
+        't3.small': 0.0208,
+        't3.medium': 0.0416,
+        't3.large': 0.0832,
+        't3.xlarge': 0.1664,
+        't3.2xlarge': 0.3328,
+        'c5.large': 0.0850,
+        'c5.xlarge': 0.1700,
+        'c5.2xlarge': 0.3400,
+        'c5.4xlarge': 0.6800,
+        'c5.9xlarge': 1.6200,
+        'c6a.large': 0.0864,
+        'c6a.xlarge': 0.1728,
+        'm5.large': 0.0960,
+        'm5.xlarge': 0.1920,
+        'm5.2xlarge': 0.3840,
+        'm5.4xlarge': 0.7680,
+    }
+
+    # Regional multipliers applied to the seed rates (simplified)
+    SEED_REGIONAL_MULTIPLIERS = {
+        'us-east-1': 1.0,
+        'us-west-1': 1.05,
+        'us-west-2': 1.05,
+        'eu-west-1': 1.1,
+        'ap-southeast-1': 1.15,
+    }
+
+    # EBS storage, USD per GB per month
+    SEED_EBS_MONTHLY_RATES = {
+        'gp3': 0.08,
+        'gp2': 0.10,
+        'io1': 0.125,
+        'io2': 0.125,
+    }
+
+    # Offer file attribute values that identify the plain on-demand compute price
+    OS_NAMES = {'Linux', 'RHEL', 'SUSE', 'Windows', 'Red Hat Enterprise Linux with HA', 'Ubuntu Pro'}
+
+    def __init__(self, store_file: str = DEFAULT_STORE, cache_size: int = 4096):
+        """
+        Initialize the pricing catalog
+
+        Args:
+            store_file (str): Local catalog produced by ingest_offer_file()
+            cache_size (int): Number of memoized lookups kept in the LRU
+        """
+        self.store_file = store_file
+        self._lock = threading.Lock()
+        self._warned = set()
+        self.ec2 = {}  # region -> "os|tenancy" -> instance type -> USD per hour
+        self.ebs = {}  # region -> volume type -> USD per GB-month
+        self.metadata = {}
+        self._load()
+
+        self._ec2_lookup = lru_cache(maxsize=cache_size)(self._lookup_ec2)
+        self._ebs_lookup = lru_cache(maxsize=cache_size)(self._lookup_ebs)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.store_file):
+            return
+        try:
+            with open(self.store_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.ec2 = data.get('ec2', {})
+            self.ebs = data.get('ebs', {})
+            self.metadata = data.get('metadata', {})
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load pricing catalog {self.store_file}: {e}")
+
+    def save(self) -> None:
+        """Write the catalog atomically"""
+        data = {
+            'metadata': self.metadata,
+            'ec2': self.ec2,
+            'ebs': self.ebs
+        }
+        temp_file = f"{self.store_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), sort_keys=True)
+        os.replace(temp_file, self.store_file)
+
+    @staticmethod
+    def _ec2_key(operating_system: str, tenancy: str) -> str:
+        return f"{operating_system}|{tenancy}"
+
+    def _lookup_ec2(self, instance_type: str, region: str, operating_system: str, tenancy: str) -> Optional[float]:
+        rate = self.ec2.get(region, {}).get(self._ec2_key(operating_system, tenancy), {}).get(instance_type)
+        if rate is not None:
+            return rate
+
+        if operating_system == 'Linux' and tenancy == 'Shared' and instance_type in self.SEED_EC2_RATES:
+            return self.SEED_EC2_RATES[instance_type] * self.SEED_REGIONAL_MULTIPLIERS.get(region, 1.0)
+
+        return None
+
+    def _lookup_ebs(self, volume_type: str, region: str) -> Optional[float]:
+        rate = self.ebs.get(region, {}).get(volume_type)
+        if rate is not None:
+            return rate
+        return self.SEED_EBS_MONTHLY_RATES.get(volume_type)
+
+    def get_ec2_hourly_rate(self, instance_type: str, region: str = 'us-east-1',
+                            operating_system: str = 'Linux', tenancy: str = 'Shared',
+                            default: Optional[float] = None) -> Optional[float]:
+        """On-demand hourly rate, or default (with a one-time warning) for unknown types"""
+        rate = self._ec2_lookup(instance_type, region, operating_system, tenancy)
+        if rate is None:
+            self._warn_missing('EC2', instance_type, region, default)
+            return default
+        return rate
+
+    def get_ebs_monthly_rate(self, volume_type: str = 'gp3', region: str = 'us-east-1',
+                             default: Optional[float] = 0.08) -> Optional[float]:
+        """EBS rate in USD per GB-month"""
+        rate = self._ebs_lookup(volume_type, region)
+        if rate is None:
+            self._warn_missing('EBS', volume_type, region, default)
+            return default
+        return rate
+
+    def get_ebs_hourly_rate(self, volume_type: str = 'gp3', region: str = 'us-east-1') -> float:
+        """EBS rate in USD per GB-hour"""
+        return self.get_ebs_monthly_rate(volume_type, region) / self.HOURS_PER_MONTH
+
+    def _warn_missing(self, service: str, item: str, region: str, default: Optional[float]) -> None:
+        if default is None:
+            return
+        key = (service, item, region)
+        with self._lock:
+            if key in self._warned:
+                return
+            self._warned.add(key)
+        print(f"⚠️  No {service} price for {item} in {region} in the pricing catalog, using ${default} "
+              f"(run: python pricing_catalog.py ingest <offer-file>)")
+
+    def clear_cache(self) -> None:
+        self._ec2_lookup.cache_clear()
+        self._ebs_lookup.cache_clear()
+
+    @staticmethod
+    def _parse_price(value) -> Optional[float]:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _add_product(self, attributes: Dict, unit: str, price: Optional[float], regions: Optional[set]) -> bool:
+        """Index one priced product from an offer file; returns True if it was kept"""
+        region = attributes.get('regionCode')
+        if not region or price is None or (regions and region not in regions):
+            return False
+
+        family = attributes.get('productFamily')
+        if family == 'Compute Instance' and unit == 'Hrs':
+            # Only the plain instance price: no pre-installed software, no reservation capacity lines,
+            # and no BYOL rows, which are priced like Linux but share the Windows slot
+            if attributes.get('preInstalledSw', 'NA') != 'NA' or attributes.get('capacitystatus', 'Used') != 'Used':
+                return False
+            if attributes.get('licenseModel') == 'Bring your own license':
+                return False
+            operating_system = attributes.get('operatingSystem')
+            if operating_system not in self.OS_NAMES or price <= 0:
+                return False
+            key = self._ec2_key(operating_system, attributes.get('tenancy', 'Shared'))
+            self.ec2.setdefault(region, {}).setdefault(key, {})[attributes['instanceType']] = price
+            return True
+
+        if family == 'Storage' and unit == 'GB-Mo' and attributes.get('volumeApiName'):
+            self.ebs.setdefault(region, {})[attributes['volumeApiName']] = price
+            return True
+
+        return False
+
+    # Product families _add_product() can index; other products are dropped while streaming
+    INDEXED_FAMILIES = {'Compute Instance', 'Storage'}
+
+    def _add_prices(self, attributes: Optional[Dict], dimensions: List, regions: Optional[set]) -> int:
+        if not attributes:
+            return 0
+        return sum(1 for unit, price in dimensions if self._add_product(attributes, unit, price, regions))
+
+    def _ingest_json(self, offer_file: str, regions: Optional[set]) -> int:
+        """Stream a JSON offer file one SKU at a time, keeping only the attributes
+        _add_product() looks at, so the multi-GB EC2 offer never sits in memory"""
+        wanted = set(self.CSV_COLUMNS.values())
+        products = {}  # sku -> indexed attributes
+        pending = {}   # sku -> [(unit, price)], for OnDemand terms that come before the products
+        seen_products = False
+        count = 0
+
+        with open(offer_file, 'r', encoding='utf-8') as f:
+            stream = _JsonStream(f)
+            for section in stream.members():
+                if section == 'products':
+                    for sku in stream.members():
+                        product = stream.value()
+                        attributes = product.get('attributes', {})
+                        if product.get('productFamily') not in self.INDEXED_FAMILIES:
+                            continue
+                        if regions and attributes.get('regionCode') not in regions:
+                            continue
+                        # The same few values repeat across hundreds of thousands of SKUs
+                        attributes = {sys.intern(key): sys.intern(value) for key, value in attributes.items()
+                                      if key in wanted and isinstance(value, str)}
+                        attributes['productFamily'] = sys.intern(product['productFamily'])
+                        products[sku] = attributes
+                    seen_products = True
+                elif section == 'terms':
+                    for term_type in stream.members():
+                        if term_type != 'OnDemand':
+                            stream.skip()
+                            continue
+                        for sku in stream.members():
+                            dimensions = [(dimension.get('unit'),
+                                           self._parse_price(dimension.get('pricePerUnit', {}).get('USD')))
+                                          for term in stream.value().values()
+                                          for dimension in term.get('priceDimensions', {}).values()]
+                            if seen_products:
+                                count += self._add_prices(products.get(sku), dimensions, regions)
+                            else:
+                                pending[sku] = dimensions
+                else:
+                    stream.skip()
+
+        for sku, dimensions in pending.items():
+            count += self._add_prices(products.get(sku), dimensions, regions)
+        return count
+
+    # CSV offer file column -> JSON offer attribute name
+    CSV_COLUMNS = {
+        'Product Family': 'productFamily',
+        'Region Code': 'regionCode',
+        'Instance Type': 'instanceType',
+        'Operating System': 'operatingSystem',
+        'Tenancy': 'tenancy',
+        'Pre Installed S/W': 'preInstalledSw',
+        'CapacityStatus': 'capacitystatus',
+        'License Model': 'licenseModel',
+        'Volume API Name': 'volumeApiName',
+    }
+
+    def _ingest_csv(self, offer_file: str, regions: Optional[set]) -> int:
+        """Stream a CSV offer file row by row, so the multi-GB EC2 offer never sits in memory"""
+        count = 0
+        with open(offer_file, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = None
+            for row in reader:
+                # Offer CSVs start with a few metadata lines before the header
+                if header is None:
+                    if 'SKU' in row and 'TermType' in row:
+                        header = {name: i for i, name in enumerate(row)}
+                    continue
+
+                if row[header['TermType']] != 'OnDemand':
+                    continue
+
+                attributes = {attr: row[header[column]] for column, attr in self.CSV_COLUMNS.items()
+                              if column in header}
+                price = self._parse_price(row[header['PricePerUnit']])
+                if self._add_product(attributes, row[header['Unit']], price, regions):
+                    count += 1
+
+        return count
+
+    def ingest_offer_file(self, offer_file: str, regions: Optional[Iterable[str]] = None) -> int:
+        """
+        Load an AWS Price List bulk offer file (JSON or CSV) into the local catalog
+
+        Args:
+            offer_file (str): AmazonEC2 offer file downloaded from the Price List bulk API
+            regions (iterable): Only keep these region codes (default: all)
+
+        Returns:
+            int: Number of prices indexed
+        """
+        region_filter = set(regions) if regions else None
+
+        if offer_file.lower().endswith('.csv'):
+            count = self._ingest_csv(offer_file, region_filter)
+        else:
+            count = self._ingest_json(offer_file, region_filter)
+
+        self.metadata = {
+            'source': os.path.basename(offer_file),
+            'ingested_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'regions': sorted(self.ec2),
+            'prices': count
+        }
+        self.clear_cache()
+        return count
+
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+def get_pricing_catalog() -> PricingCatalog:
+    """Process-wide catalog, loaded once and shared by every cost path"""
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = PricingCatalog()
+        return _default_catalog
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Offline AWS pricing catalog')
+    parser.add_argument('--store', default=PricingCatalog.DEFAULT_STORE,
+                       help='Path to the local pricing catalog')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help='Index an AWS Price List offer file (JSON or CSV)')
+    ingest_parser.add_argument('offer_file', help='AmazonEC2 offer file')
+    ingest_parser.add_argument('--regions', nargs='+', help='Only keep these region codes')
+
+    lookup_parser = subparsers.add_parser('lookup', help='Show the hourly rate of an instance type')
+    lookup_parser.add_argument('instance_type')
+    lookup_parser.add_argument('--region', default='us-east-1')
+    lookup_parser.add_argument('--os', default='Linux', dest='operating_system')
+    lookup_parser.add_argument('--tenancy', default='Shared')
+
+    args = parser.parse_args()
+
+    try:
+        catalog = PricingCatalog(args.store)
+
+        if args.command == 'ingest':
+            print(f"📥 Ingesting {args.offer_file} ...")
+            count = catalog.ingest_offer_file(args.offer_file, args.regions)
+            catalog.save()
+            print(f"✅ Indexed {count} prices for {len(catalog.ec2)} regions into {args.store}")
+        else:
+            rate = catalog.get_ec2_hourly_rate(args.instance_type, args.region,
+                                               args.operating_system, args.tenancy)
+            if rate is None:
+                print(f"❌ No price for {args.instance_type} in {args.region}")
+                sys.exit(1)
+            print(f"💰 {args.instance_type} ({args.region}, {args.operating_system}, {args.tenancy}): "
+                  f"${rate:.4f}/hr, ${rate * PricingCatalog.HOURS_PER_MONTH:.2f}/month")
+    except KeyboardInterrupt:
+        print("\n\n❌ Interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
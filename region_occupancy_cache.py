@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+class RegionOccupancyCache:
+    """Persisted record of which account/region pairs were empty on previous scans"""
+
+    def __init__(self, scope: str, cache_file: str = 'region_occupancy_cache.json', max_age_hours: float = 24):
+        """
+        Initialize the region occupancy cache
+
+        Args:
+            scope (str): Resource family the entries belong to (e.g. 'eks', 'elb', 'ec2')
+            cache_file (str): JSON file shared by all tools, one section per scope
+            max_age_hours (float): Force a full scan once an empty entry is older than this
+        """
+        self.scope = scope
+        self.cache_file = cache_file
+        self.max_age_seconds = max_age_hours * 3600
+        self._lock = threading.Lock()
+        self._save_thread = None
+        self._entries = self._load_entries()
+
+    def _load_entries(self) -> Dict[str, Dict]:
+        """Load the entries for this scope, treating a missing or corrupt file as empty"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            entries = data.get(self.scope, {})
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    @staticmethod
+    def _key(account_key: str, region: str) -> str:
+        return f"{account_key}|{region}"
+
+    def is_known_empty(self, account_key: str, region: str) -> bool:
+        """True if the last full scan of this pair found nothing and is still fresh"""
+        with self._lock:
+            entry = self._entries.get(self._key(account_key, region))
+
+        if not entry or entry.get('resource_count', 1) != 0:
+            return False
+
+        return time.time() - entry.get('scanned_at', 0) <= self.max_age_seconds
+
+    def record(self, account_key: str, region: str, resource_count: int, full_scan: bool = True) -> None:
+        """Record the outcome of a full scan or of a cheap probe for a pair"""
+        now = time.time()
+        key = self._key(account_key, region)
+
+        with self._lock:
+            entry = self._entries.get(key, {})
+            entry['resource_count'] = resource_count
+            entry['checked_at'] = now
+            if full_scan or 'scanned_at' not in entry:
+                entry['scanned_at'] = now
+            self._entries[key] = entry
+
+    def order_tasks(self, tasks: List[Tuple]) -> List[Tuple]:
+        """Move pairs known to be empty to the front so their quick probes finish first"""
+        return sorted(tasks, key=lambda task: not self.is_known_empty(task[0], task[-1]))
+
+    def _write(self) -> None:
+        """Merge this scope into the cache file and replace it atomically"""
+        with self._lock:
+            entries = dict(self._entries)
+
+        try:
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    data = {}
+            except (OSError, ValueError):
+                data = {}
+
+            data[self.scope] = entries
+            data['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"Warning: Could not save region occupancy cache: {e}")
+
+    def save_async(self) -> None:
+        """Persist the cache on a background thread so scans never wait on disk"""
+        self.flush()
+        self._save_thread = threading.Thread(target=self._write, name="RegionCacheWriter")
+        self._save_thread.start()
+
+    def flush(self) -> None:
+        """Wait for a pending background save to finish"""
+        if self._save_thread is not None:
+            self._save_thread.join()
+            self._save_thread = None
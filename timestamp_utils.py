@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Every digit maps to '9', so "2025-06-03 12:10:46" and "2024-01-30 09:00:00" share a shape
+_DIGIT_SHAPE = str.maketrans('0123456789', '9999999999')
+_MAX_SHAPES = 256
+
+def _parse_iso(text: str) -> datetime:
+    return datetime.fromisoformat(text)
+
+def _parse_iso_z(text: str) -> datetime:
+    """ISO with a trailing Z, for Pythons whose fromisoformat rejects it"""
+    if not text.endswith('Z'):
+        raise ValueError(text)
+    return datetime.fromisoformat(text[:-1]).replace(tzinfo=timezone.utc)
+
+def _parse_compact(text: str) -> datetime:
+    """YYYYMMDD_HHMMSS, as used in the state and report file names"""
+    if len(text) != 15 or text[8] != '_':
+        raise ValueError(text)
+    return datetime(int(text[0:4]), int(text[4:6]), int(text[6:8]),
+                    int(text[9:11]), int(text[11:13]), int(text[13:15]))
+
+def _strptime_parser(fmt: str) -> Callable[[str], datetime]:
+    return lambda text: datetime.strptime(text, fmt)
+
+# Tried in order the first time a shape is seen; the winner is remembered per shape
+_PARSERS = [
+    _parse_iso,
+    _parse_iso_z,
+    _parse_compact,
+    _strptime_parser('%Y-%m-%d %H:%M:%S %Z'),
+    _strptime_parser('%d/%m/%Y %H:%M:%S'),
+]
+
+_shape_parsers: Dict[str, Callable[[str], datetime]] = {}
+
+def parse_timestamp(value, naive_tz: Optional[timezone] = timezone.utc) -> Optional[datetime]:
+    """
+    Parse a timestamp string or datetime in one pass, or return None if it is not a timestamp
+
+    Handles ISO 8601 with or without 'T', microseconds, 'Z' or +HH:MM offsets, a
+    trailing ' IST', and the compact YYYYMMDD_HHMMSS form. The parser that succeeded
+    for a given input shape is cached, so repeated timestamps skip the trial-and-error.
+
+    Args:
+        value: String or datetime to parse
+        naive_tz (timezone): Zone assumed for values without one (None keeps them naive)
+    """
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        if value is None:
+            return None
+        text = str(value).strip()
+        if not text or text == 'Unknown':
+            return None
+
+        marked_tz = None
+        if text.endswith('IST'):
+            text = text[:-3].rstrip()
+            marked_tz = IST
+
+        shape = text.translate(_DIGIT_SHAPE)
+        dt = None
+        parser = _shape_parsers.get(shape)
+        if parser is not None:
+            try:
+                dt = parser(text)
+            except ValueError:
+                dt = None
+
+        if dt is None:
+            for parser in _PARSERS:
+                try:
+                    dt = parser(text)
+                except ValueError:
+                    continue
+                if len(_shape_parsers) < _MAX_SHAPES:
+                    _shape_parsers[shape] = parser
+                break
+            else:
+                return None
+
+        if marked_tz is not None and dt.tzinfo is None:
+            dt = dt.replace(tzinfo=marked_tz)
+
+    if dt.tzinfo is None and naive_tz is not None:
+        dt = dt.replace(tzinfo=naive_tz)
+    return dt
+
+def to_utc(value) -> Optional[datetime]:
+    """Parse and convert to an aware UTC datetime (naive values are taken as UTC)"""
+    dt = parse_timestamp(value)
+    return dt.astimezone(timezone.utc) if dt is not None else None
+
+def to_ist(value) -> Optional[datetime]:
+    """Parse and convert to an aware IST datetime (naive values are taken as UTC)"""
+    dt = parse_timestamp(value)
+    return dt.astimezone(IST) if dt is not None else None
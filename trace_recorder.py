@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+class TraceRecorder:
+    """Records stage spans per worker thread and writes them as a Chrome/Perfetto trace_event file"""
+
+    def __init__(self, tool_name: str):
+        """
+        Initialize the recorder
+
+        Args:
+            tool_name (str): Used in the trace file name, e.g. 'eks_cluster_deletion'
+        """
+        self.tool_name = tool_name
+        self.started_at = datetime.now()
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._events: List[Dict] = []
+        self._thread_names: Dict[int, str] = {}
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _thread(self) -> int:
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self._thread_names:
+            self._thread_names[tid] = thread.name
+        return tid
+
+    @contextmanager
+    def span(self, name: str, category: str = 'stage', **attrs):
+        """
+        Time a block as one complete ('X') event on the current thread
+
+        Args:
+            name (str): Stage name, e.g. 'scan', 'nodegroups', 'waiter'
+            category (str): Trace category used for filtering in the viewer
+            **attrs: Resource/account/region attributes shown in the event args
+        """
+        tid = self._thread()
+        start = self._now_us()
+        status = 'ok'
+        try:
+            yield
+        except BaseException as e:
+            status = f"error: {type(e).__name__}"
+            raise
+        finally:
+            args = {key: value for key, value in attrs.items() if value is not None}
+            args['status'] = status
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': round(start, 1),
+                'dur': round(self._now_us() - start, 1),
+                'pid': self.pid,
+                'tid': tid,
+                'args': args,
+            }
+            with self._lock:
+                self._events.append(event)
+
+    def instant(self, name: str, category: str = 'event', **attrs) -> None:
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'i',
+            's': 't',
+            'ts': round(self._now_us(), 1),
+            'pid': self.pid,
+            'tid': self._thread(),
+            'args': {key: value for key, value in attrs.items() if value is not None},
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def write(self, folder: str = 'logs') -> Optional[str]:
+        """Write logs/trace_<tool>_<timestamp>.json (open in chrome://tracing or ui.perfetto.dev)"""
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        if not events:
+            return None
+
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'args': {'name': self.tool_name}}]
+        metadata.extend({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+                        for tid, name in thread_names.items())
+
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"trace_{self.tool_name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'traceEvents': metadata + sorted(events, key=lambda event: event['ts']),
+                'displayTimeUnit': 'ms',
+                'otherData': {'tool': self.tool_name, 'started_at': self.started_at.isoformat()},
+            }, f)
+        os.replace(temp_path, path)
+        return path
+
+    def report(self) -> None:
+        path = self.write()
+        if path:
+            print(f"🧭 Trace timeline saved to: {path} (open in ui.perfetto.dev or chrome://tracing)")
+
+_active_tracer = None
+
+def enable_tracing(tool_name: str, enabled: Optional[bool] = None) -> Optional[TraceRecorder]:
+    """
+    Opt-in span recording for a tool run, written at exit
+
+    Args:
+        tool_name (str): Name used in the trace file
+        enabled (bool): Explicit switch (e.g. --trace); None reads AWS_TRACE=1
+    """
+    global _active_tracer
+    if enabled is None:
+        enabled = os.environ.get('AWS_TRACE', '').lower() in ('1', 'true', 'yes')
+    if not enabled:
+        return None
+    if _active_tracer is None:
+        _active_tracer = TraceRecorder(tool_name)
+        atexit.register(_active_tracer.report)
+    return _active_tracer
+
+@contextmanager
+def trace_span(name: str, category: str = 'stage', **attrs):
+    """Span on the active tracer; a no-op when tracing is off"""
+    if _active_tracer is None:
+        yield
+        return
+    with _active_tracer.span(name, category, **attrs):
+        yield
+
+def traced(name: str, func: Callable, category: str = 'stage', **attrs) -> Callable:
+    """Wrap a callable (e.g. an executor task) so each call is recorded as a span"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with trace_span(name, category, **attrs):
+            return func(*args, **kwargs)
+    return wrapper
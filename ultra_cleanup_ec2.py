@@ -9,6 +9,11 @@ import threading
 from datetime import datetime
 from botocore.exceptions import ClientError, BotoCoreError
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from region_occupancy_cache import RegionOccupancyCache
+from credential_validator import get_credential_validator
+from async_logging import setup_async_logging, log_with_context
+from api_metrics import enable_api_metrics
+from trace_recorder import enable_tracing, trace_span, traced
 
 class UltraEC2CleanupManager:
     def __init__(self, config_file='aws_accounts_config.json'):
@@ -28,6 +33,9 @@ class UltraEC2CleanupManager:
         # Load configuration
         self.load_configuration()
         
+        # Remembers empty account/region pairs between runs
+        self.region_cache = RegionOccupancyCache('ec2')
+        
         # Storage for cleanup results
         self.cleanup_results = {
             'accounts_processed': [],
@@ -47,34 +55,14 @@ class UltraEC2CleanupManager:
             # Create a file handler for detailed logging
             import logging
             
-            # Create logger for detailed operations
-            self.operation_logger = logging.getLogger('ultra_ec2_cleanup')
-            self.operation_logger.setLevel(logging.INFO)
-            
-            # Remove existing handlers to avoid duplicates
-            for handler in self.operation_logger.handlers[:]:
-                self.operation_logger.removeHandler(handler)
-            
-            # File handler
-            file_handler = logging.FileHandler(self.log_filename, encoding='utf-8')
-            file_handler.setLevel(logging.INFO)
-            
-            # Console handler
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.INFO)
-            
-            # Formatter
-            formatter = logging.Formatter(
-                '%(asctime)s | %(levelname)8s | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
+            # Workers only enqueue; one listener thread writes the log, its .jsonl twin and the console
+            self.operation_logger, self.log_listener = setup_async_logging(
+                'ultra_ec2_cleanup',
+                self.log_filename,
+                console_level=logging.INFO,
+                fmt='%(asctime)s | %(levelname)8s | %(message)s'
             )
             
-            file_handler.setFormatter(formatter)
-            console_handler.setFormatter(formatter)
-            
-            self.operation_logger.addHandler(file_handler)
-            self.operation_logger.addHandler(console_handler)
-            
             # Log initial information
             self.operation_logger.info("=" * 100)
             self.operation_logger.info("🚨 ULTRA EC2 CLEANUP SESSION STARTED 🚨")
@@ -89,19 +77,11 @@ class UltraEC2CleanupManager:
             print(f"Warning: Could not setup detailed logging: {e}")
             self.operation_logger = None
 
-    def log_operation(self, level, message):
-        """Thread-safe logging operation"""
-        with self.log_lock:
-            if self.operation_logger:
-                if level.upper() == 'INFO':
-                    self.operation_logger.info(message)
-                elif level.upper() == 'WARNING':
-                    self.operation_logger.warning(message)
-                elif level.upper() == 'ERROR':
-                    self.operation_logger.error(message)
-                elif level.upper() == 'DEBUG':
-                    self.operation_logger.debug(message)
-            else:
+    def log_operation(self, level, message, **context):
+        """Thread-safe logging operation; account/region/resource context goes to the JSON log"""
+        # Non-blocking: the record is queued for the listener thread
+        if not log_with_context(self.operation_logger, level, message, **context):
+            with self.log_lock:
                 print(f"[{level.upper()}] {message}")
 
     def load_configuration(self):
@@ -157,6 +137,8 @@ class UltraEC2CleanupManager:
 
     def create_ec2_client(self, access_key, secret_key, region):
         """Create EC2 client using root account credentials"""
+        log_context = {'region': region}
+
         try:
             ec2_client = boto3.client(
                 'ec2',
@@ -165,20 +147,22 @@ class UltraEC2CleanupManager:
                 region_name=region
             )
             
-            # Test the connection
-            ec2_client.describe_regions(RegionNames=[region])
+            # Key pair is checked once per process via STS instead of a per-client probe
+            get_credential_validator().validate(access_key, secret_key)
             return ec2_client
             
         except Exception as e:
-            self.log_operation('ERROR', f"Failed to create EC2 client for {region}: {e}")
+            self.log_operation('ERROR', f"Failed to create EC2 client for {region}: {e}", **log_context)
             raise
 
-    def get_all_instances_in_region(self, ec2_client, region, account_name):
-        """Get all EC2 instances in a specific region"""
+    def get_all_instances_in_region(self, ec2_client, region, account_name, scan_errors=None):
+        """Get all EC2 instances in a specific region (failures are appended to scan_errors)"""
+        log_context = {'account': account_name, 'region': region}
+
         try:
             instances = []
             
-            self.log_operation('INFO', f"🔍 Scanning for instances in {region} ({account_name})")
+            self.log_operation('INFO', f"🔍 Scanning for instances in {region} ({account_name})", **log_context)
             
             paginator = ec2_client.get_paginator('describe_instances')
             
@@ -221,20 +205,24 @@ class UltraEC2CleanupManager:
                         
                         instances.append(instance_info)
             
-            self.log_operation('INFO', f"📦 Found {len(instances)} instances in {region} ({account_name})")
+            self.log_operation('INFO', f"📦 Found {len(instances)} instances in {region} ({account_name})", **log_context)
             
             return instances
             
         except Exception as e:
-            self.log_operation('ERROR', f"Error getting instances in {region} ({account_name}): {e}")
+            self.log_operation('ERROR', f"Error getting instances in {region} ({account_name}): {e}", **log_context)
+            if scan_errors is not None:
+                scan_errors.append(e)
             return []
 
-    def get_all_security_groups_in_region(self, ec2_client, region, account_name):
-        """Get all security groups in a specific region"""
+    def get_all_security_groups_in_region(self, ec2_client, region, account_name, scan_errors=None):
+        """Get all security groups in a specific region (failures are appended to scan_errors)"""
+        log_context = {'account': account_name, 'region': region}
+
         try:
             security_groups = []
             
-            self.log_operation('INFO', f"🔍 Scanning for security groups in {region} ({account_name})")
+            self.log_operation('INFO', f"🔍 Scanning for security groups in {region} ({account_name})", **log_context)
             
             paginator = ec2_client.get_paginator('describe_security_groups')
             
@@ -262,14 +250,24 @@ class UltraEC2CleanupManager:
                     
                     security_groups.append(sg_info)
             
-            self.log_operation('INFO', f"🛡️  Found {len(security_groups)} security groups in {region} ({account_name})")
+            self.log_operation('INFO', f"🛡️  Found {len(security_groups)} security groups in {region} ({account_name})", **log_context)
             
             return security_groups
             
         except Exception as e:
-            self.log_operation('ERROR', f"Error getting security groups in {region} ({account_name}): {e}")
+            self.log_operation('ERROR', f"Error getting security groups in {region} ({account_name}): {e}", **log_context)
+            if scan_errors is not None:
+                scan_errors.append(e)
             return []
 
+    def has_non_default_security_group(self, ec2_client):
+        """True if the region has any security group other than the per-VPC 'default' ones"""
+        paginator = ec2_client.get_paginator('describe_security_groups')
+        for page in paginator.paginate(PaginationConfig={'PageSize': 50}):
+            if any(sg['GroupName'] != 'default' for sg in page['SecurityGroups']):
+                return True
+        return False
+
     def correlate_instances_and_security_groups(self, instances, security_groups):
         """Correlate instances with their security groups"""
         try:
@@ -305,6 +303,9 @@ class UltraEC2CleanupManager:
 
     def terminate_instance(self, ec2_client, instance_info, wait_for_termination=False):
         """Terminate an EC2 instance"""
+        log_context = {'account': instance_info.get('account_name'), 'region': instance_info.get('region'),
+                       'resource': instance_info.get('instance_id')}
+
         try:
             instance_id = instance_info['instance_id']
             region = instance_info['region']
@@ -312,7 +313,7 @@ class UltraEC2CleanupManager:
             current_state = instance_info['state']
             
             if current_state in ['terminated', 'terminating']:
-                self.log_operation('INFO', f"Instance {instance_id} already {current_state}")
+                self.log_operation('INFO', f"Instance {instance_id} already {current_state}", **log_context)
                 self.cleanup_results['skipped_resources'].append({
                     'resource_type': 'instance',
                     'resource_id': instance_id,
@@ -322,14 +323,14 @@ class UltraEC2CleanupManager:
                 })
                 return True
             
-            self.log_operation('INFO', f"🗑️  Terminating instance {instance_id} in {region} ({account_name})")
+            self.log_operation('INFO', f"🗑️  Terminating instance {instance_id} in {region} ({account_name})", **log_context)
             
             response = ec2_client.terminate_instances(InstanceIds=[instance_id])
             
             current_state = response['TerminatingInstances'][0]['CurrentState']['Name']
             previous_state = response['TerminatingInstances'][0]['PreviousState']['Name']
             
-            self.log_operation('INFO', f"✅ Instance {instance_id} termination initiated: {previous_state} → {current_state}")
+            self.log_operation('INFO', f"✅ Instance {instance_id} termination initiated: {previous_state} → {current_state}", **log_context)
             
             self.cleanup_results['deleted_instances'].append({
                 'instance_id': instance_id,
@@ -347,7 +348,7 @@ class UltraEC2CleanupManager:
             return True
             
         except Exception as e:
-            self.log_operation('ERROR', f"Failed to terminate instance {instance_id}: {e}")
+            self.log_operation('ERROR', f"Failed to terminate instance {instance_id}: {e}", **log_context)
             self.cleanup_results['failed_deletions'].append({
                 'resource_type': 'instance',
                 'resource_id': instance_id,
@@ -359,8 +360,10 @@ class UltraEC2CleanupManager:
         
     def clear_security_group_rules(self, ec2_client, sg_id):
         """Clear all ingress and egress rules from a security group"""
+        log_context = {'resource': sg_id}
+
         try:
-            self.log_operation('INFO', f"🧹 Clearing rules for security group {sg_id}")
+            self.log_operation('INFO', f"🧹 Clearing rules for security group {sg_id}", **log_context)
             
             # Get security group details
             try:
@@ -368,7 +371,7 @@ class UltraEC2CleanupManager:
                 sg_info = response['SecurityGroups'][0]
             except ClientError as e:
                 if e.response['Error']['Code'] == 'InvalidGroupId.NotFound':
-                    self.log_operation('INFO', f"Security group {sg_id} does not exist, skipping rule clearing")
+                    self.log_operation('INFO', f"Security group {sg_id} does not exist, skipping rule clearing", **log_context)
                     return True
                 else:
                     raise
@@ -382,21 +385,21 @@ class UltraEC2CleanupManager:
             
             # Clear ingress rules
             if ingress_rules:
-                self.log_operation('INFO', f"Removing {len(ingress_rules)} ingress rules from {sg_id} ({sg_name})")
+                self.log_operation('INFO', f"Removing {len(ingress_rules)} ingress rules from {sg_id} ({sg_name})", **log_context)
                 try:
                     ec2_client.revoke_security_group_ingress(
                         GroupId=sg_id,
                         IpPermissions=ingress_rules
                     )
                     rules_cleared += len(ingress_rules)
-                    self.log_operation('INFO', f"✅ Successfully removed {len(ingress_rules)} ingress rules from {sg_id}")
+                    self.log_operation('INFO', f"✅ Successfully removed {len(ingress_rules)} ingress rules from {sg_id}", **log_context)
                 except ClientError as e:
                     error_code = e.response['Error']['Code']
                     if error_code == 'InvalidGroupId.NotFound':
-                        self.log_operation('INFO', f"Security group {sg_id} no longer exists")
+                        self.log_operation('INFO', f"Security group {sg_id} no longer exists", **log_context)
                         return True
                     else:
-                        self.log_operation('ERROR', f"Failed to remove ingress rules from {sg_id}: {e}")
+                        self.log_operation('ERROR', f"Failed to remove ingress rules from {sg_id}: {e}", **log_context)
                         rules_failed += len(ingress_rules)
             
             # Clear egress rules (but keep the default allow-all rule if it exists)
@@ -417,69 +420,72 @@ class UltraEC2CleanupManager:
                         non_default_egress.append(rule)
                 
                 if non_default_egress:
-                    self.log_operation('INFO', f"Removing {len(non_default_egress)} non-default egress rules from {sg_id} ({sg_name})")
+                    self.log_operation('INFO', f"Removing {len(non_default_egress)} non-default egress rules from {sg_id} ({sg_name})", **log_context)
                     try:
                         ec2_client.revoke_security_group_egress(
                             GroupId=sg_id,
                             IpPermissions=non_default_egress
                         )
                         rules_cleared += len(non_default_egress)
-                        self.log_operation('INFO', f"✅ Successfully removed {len(non_default_egress)} egress rules from {sg_id}")
+                        self.log_operation('INFO', f"✅ Successfully removed {len(non_default_egress)} egress rules from {sg_id}", **log_context)
                     except ClientError as e:
                         error_code = e.response['Error']['Code']
                         if error_code == 'InvalidGroupId.NotFound':
-                            self.log_operation('INFO', f"Security group {sg_id} no longer exists")
+                            self.log_operation('INFO', f"Security group {sg_id} no longer exists", **log_context)
                             return True
                         else:
-                            self.log_operation('ERROR', f"Failed to remove egress rules from {sg_id}: {e}")
+                            self.log_operation('ERROR', f"Failed to remove egress rules from {sg_id}: {e}", **log_context)
                             rules_failed += len(non_default_egress)
                 else:
-                    self.log_operation('INFO', f"No non-default egress rules to remove from {sg_id}")
+                    self.log_operation('INFO', f"No non-default egress rules to remove from {sg_id}", **log_context)
             
             total_rules = len(ingress_rules) + len(egress_rules)
             if total_rules == 0:
-                self.log_operation('INFO', f"No rules found in security group {sg_id}")
+                self.log_operation('INFO', f"No rules found in security group {sg_id}", **log_context)
             else:
-                self.log_operation('INFO', f"Rule clearing summary for {sg_id}: {rules_cleared} cleared, {rules_failed} failed")
+                self.log_operation('INFO', f"Rule clearing summary for {sg_id}: {rules_cleared} cleared, {rules_failed} failed", **log_context)
             
             # Wait briefly for rule changes to propagate
             if rules_cleared > 0:
-                self.log_operation('INFO', f"Waiting 5 seconds for rule changes to propagate...")
+                self.log_operation('INFO', f"Waiting 5 seconds for rule changes to propagate...", **log_context)
                 time.sleep(5)
             
             return rules_failed == 0
             
         except Exception as e:
-            self.log_operation('ERROR', f"Unexpected error clearing rules for security group {sg_id}: {e}")
+            self.log_operation('ERROR', f"Unexpected error clearing rules for security group {sg_id}: {e}", **log_context)
             return False
 
     def delete_security_group(self, ec2_client, sg_info, force_delete=False):
         """Delete a security group after clearing its rules"""
+        log_context = {'account': sg_info.get('account_name'), 'region': sg_info.get('region'),
+                       'resource': sg_info.get('group_id')}
+
         try:
             sg_id = sg_info['group_id']
             sg_name = sg_info['group_name']
             region = sg_info['region']
             account_name = sg_info['account_name']
             
-            self.log_operation('INFO', f"🗑️  Deleting security group {sg_id} ({sg_name}) in {region} ({account_name})")
+            self.log_operation('INFO', f"🗑️  Deleting security group {sg_id} ({sg_name}) in {region} ({account_name})", **log_context)
             
             # If it's attached to instances and force_delete is True, wait a bit
             if sg_info['is_attached'] and force_delete:
-                self.log_operation('INFO', f"Security group {sg_id} is attached to instances, waiting for termination...")
+                self.log_operation('INFO', f"Security group {sg_id} is attached to instances, waiting for termination...", **log_context)
                 time.sleep(30)  # Wait for instance termination
             
             # Step 1: Clear all security group rules first
-            self.log_operation('INFO', f"Step 1: Clearing security group rules for {sg_id}")
+            self.log_operation('INFO', f"Step 1: Clearing security group rules for {sg_id}", **log_context)
             rules_cleared = self.clear_security_group_rules(ec2_client, sg_id)
             
             if not rules_cleared:
-                self.log_operation('WARNING', f"Some rules could not be cleared from {sg_id}, proceeding with deletion attempt")
+                self.log_operation('WARNING', f"Some rules could not be cleared from {sg_id}, proceeding with deletion attempt", **log_context)
             
             # Step 2: Delete the security group
-            self.log_operation('INFO', f"Step 2: Attempting to delete security group {sg_id}")
+            self.log_operation('INFO', f"Step 2: Attempting to delete security group {sg_id}", **log_context)
             ec2_client.delete_security_group(GroupId=sg_id)
             
-            self.log_operation('INFO', f"✅ Successfully deleted security group {sg_id} ({sg_name})")
+            self.log_operation('INFO', f"✅ Successfully deleted security group {sg_id} ({sg_name})", **log_context)
             
             self.cleanup_results['deleted_security_groups'].append({
                 'group_id': sg_id,
@@ -499,10 +505,10 @@ class UltraEC2CleanupManager:
         except ClientError as e:
             error_code = e.response['Error']['Code']
             if error_code == 'InvalidGroupId.NotFound':
-                self.log_operation('INFO', f"Security group {sg_id} does not exist")
+                self.log_operation('INFO', f"Security group {sg_id} does not exist", **log_context)
                 return True
             elif error_code == 'DependencyViolation':
-                self.log_operation('WARNING', f"Cannot delete security group {sg_id}: dependency violation (still in use)")
+                self.log_operation('WARNING', f"Cannot delete security group {sg_id}: dependency violation (still in use)", **log_context)
                 self.cleanup_results['failed_deletions'].append({
                     'resource_type': 'security_group',
                     'resource_id': sg_id,
@@ -512,7 +518,7 @@ class UltraEC2CleanupManager:
                 })
                 return False
             else:
-                self.log_operation('ERROR', f"Failed to delete security group {sg_id}: {e}")
+                self.log_operation('ERROR', f"Failed to delete security group {sg_id}: {e}", **log_context)
                 self.cleanup_results['failed_deletions'].append({
                     'resource_type': 'security_group',
                     'resource_id': sg_id,
@@ -522,7 +528,7 @@ class UltraEC2CleanupManager:
                 })
                 return False
         except Exception as e:
-            self.log_operation('ERROR', f"Unexpected error deleting security group {sg_id}: {e}")
+            self.log_operation('ERROR', f"Unexpected error deleting security group {sg_id}: {e}", **log_context)
             self.cleanup_results['failed_deletions'].append({
                 'resource_type': 'security_group',
                 'resource_id': sg_id,
@@ -534,21 +540,37 @@ class UltraEC2CleanupManager:
 
     def cleanup_account_region(self, account_name, account_data, region):
         """Clean up all resources in a specific account and region"""
+        log_context = {'account': account_name, 'region': region}
+
         try:
             access_key = account_data['access_key']
             secret_key = account_data['secret_key']
             account_id = account_data['account_id']
             
-            self.log_operation('INFO', f"🧹 Starting cleanup for {account_name} ({account_id}) in {region}")
+            self.log_operation('INFO', f"🧹 Starting cleanup for {account_name} ({account_id}) in {region}", **log_context)
             
             # Create EC2 client
             ec2_client = self.create_ec2_client(access_key, secret_key, region)
             
-            # Get all instances
-            instances = self.get_all_instances_in_region(ec2_client, region, account_name)
+            # Pairs that were empty last time get a cheap probe instead of the full scan
+            if self.region_cache.is_known_empty(account_name, region):
+                probe_response = ec2_client.describe_instances(
+                    Filters=[{'Name': 'instance-state-name', 'Values': ['pending', 'running', 'stopping', 'stopped']}],
+                    MaxResults=5
+                )
+                if not probe_response.get('Reservations') and not self.has_non_default_security_group(ec2_client):
+                    self.region_cache.record(account_name, region, 0, full_scan=False)
+                    self.log_operation('INFO', f"No resources found in {account_name} ({region}) (cached empty, probe confirmed)", **log_context)
+                    return True
             
-            # Get all security groups
-            security_groups = self.get_all_security_groups_in_region(ec2_client, region, account_name)
+            # A failed scan must not be cached as empty, or it would hide resources
+            scan_errors = []
+            with trace_span('scan', account=account_name, region=region):
+                # Get all instances
+                instances = self.get_all_instances_in_region(ec2_client, region, account_name, scan_errors)
+                
+                # Get all security groups
+                security_groups = self.get_all_security_groups_in_region(ec2_client, region, account_name, scan_errors)
             
             # Correlate instances and security groups
             attached_sgs, unattached_sgs = self.correlate_instances_and_security_groups(instances, security_groups)
@@ -565,44 +587,49 @@ class UltraEC2CleanupManager:
             
             self.cleanup_results['regions_processed'].append(region_summary)
             
-            self.log_operation('INFO', f"📊 {account_name} ({region}) summary:")
-            self.log_operation('INFO', f"   💻 Instances: {len(instances)}")
-            self.log_operation('INFO', f"   🛡️  Total Security Groups: {len(security_groups)}")
-            self.log_operation('INFO', f"   📎 Attached SGs: {len(attached_sgs)}")
-            self.log_operation('INFO', f"   🔓 Unattached SGs: {len(unattached_sgs)}")
+            self.log_operation('INFO', f"📊 {account_name} ({region}) summary:", **log_context)
+            self.log_operation('INFO', f"   💻 Instances: {len(instances)}", **log_context)
+            self.log_operation('INFO', f"   🛡️  Total Security Groups: {len(security_groups)}", **log_context)
+            self.log_operation('INFO', f"   📎 Attached SGs: {len(attached_sgs)}", **log_context)
+            self.log_operation('INFO', f"   🔓 Unattached SGs: {len(unattached_sgs)}", **log_context)
+            
+            if not scan_errors:
+                self.region_cache.record(account_name, region, len(instances) + len(security_groups))
             
             if not instances and not security_groups:
-                self.log_operation('INFO', f"No resources found in {account_name} ({region})")
+                self.log_operation('INFO', f"No resources found in {account_name} ({region})", **log_context)
                 return True
             
             # Step 1: Terminate all instances
             if instances:
-                self.log_operation('INFO', f"🗑️  Terminating {len(instances)} instances in {account_name} ({region})")
+                self.log_operation('INFO', f"🗑️  Terminating {len(instances)} instances in {account_name} ({region})", **log_context)
                 
                 for instance in instances:
                     try:
-                        self.terminate_instance(ec2_client, instance)
+                        with trace_span('terminate_instance', resource=instance['instance_id'], account=account_name, region=region):
+                            self.terminate_instance(ec2_client, instance)
                     except Exception as e:
-                        self.log_operation('ERROR', f"Error terminating instance {instance['instance_id']}: {e}")
+                        self.log_operation('ERROR', f"Error terminating instance {instance['instance_id']}: {e}", **log_context)
                 
                 # Wait for instances to start terminating
                 if attached_sgs:
-                    self.log_operation('INFO', f"⏳ Waiting 60 seconds for instances to start terminating...")
-                    time.sleep(60)
+                    self.log_operation('INFO', f"⏳ Waiting 60 seconds for instances to start terminating...", **log_context)
+                    with trace_span('waiter', account=account_name, region=region, waiter='instances_terminating'):
+                        time.sleep(60)
             
             # Step 2: Delete unattached security groups first
             if unattached_sgs:
-                self.log_operation('INFO', f"🗑️  Deleting {len(unattached_sgs)} unattached security groups in {account_name} ({region})")
+                self.log_operation('INFO', f"🗑️  Deleting {len(unattached_sgs)} unattached security groups in {account_name} ({region})", **log_context)
                 
                 for sg in unattached_sgs:
                     try:
                         self.delete_security_group(ec2_client, sg)
                     except Exception as e:
-                        self.log_operation('ERROR', f"Error deleting unattached security group {sg['group_id']}: {e}")
+                        self.log_operation('ERROR', f"Error deleting unattached security group {sg['group_id']}: {e}", **log_context)
             
             # Step 3: Delete attached security groups (with retries)
             if attached_sgs:
-                self.log_operation('INFO', f"🗑️  Deleting {len(attached_sgs)} attached security groups in {account_name} ({region})")
+                self.log_operation('INFO', f"🗑️  Deleting {len(attached_sgs)} attached security groups in {account_name} ({region})", **log_context)
                 
                 max_retries = 3
                 retry_delay = 60  # seconds
@@ -616,25 +643,26 @@ class UltraEC2CleanupManager:
                             if not success:
                                 remaining_sgs.append(sg)
                         except Exception as e:
-                            self.log_operation('ERROR', f"Error deleting attached security group {sg['group_id']}: {e}")
+                            self.log_operation('ERROR', f"Error deleting attached security group {sg['group_id']}: {e}", **log_context)
                             remaining_sgs.append(sg)
                     
                     if not remaining_sgs:
-                        self.log_operation('INFO', f"✅ All attached security groups deleted in {account_name} ({region})")
+                        self.log_operation('INFO', f"✅ All attached security groups deleted in {account_name} ({region})", **log_context)
                         break
                     
                     if retry < max_retries - 1:
-                        self.log_operation('INFO', f"⏳ {len(remaining_sgs)} security groups still have dependencies. Waiting {retry_delay}s before retry {retry + 2}/{max_retries}")
-                        time.sleep(retry_delay)
+                        self.log_operation('INFO', f"⏳ {len(remaining_sgs)} security groups still have dependencies. Waiting {retry_delay}s before retry {retry + 2}/{max_retries}", **log_context)
+                        with trace_span('waiter', account=account_name, region=region, waiter='security_group_dependencies'):
+                            time.sleep(retry_delay)
                         attached_sgs = remaining_sgs
                     else:
-                        self.log_operation('WARNING', f"⚠️  {len(remaining_sgs)} security groups could not be deleted after {max_retries} retries")
+                        self.log_operation('WARNING', f"⚠️  {len(remaining_sgs)} security groups could not be deleted after {max_retries} retries", **log_context)
             
-            self.log_operation('INFO', f"✅ Cleanup completed for {account_name} ({region})")
+            self.log_operation('INFO', f"✅ Cleanup completed for {account_name} ({region})", **log_context)
             return True
             
         except Exception as e:
-            self.log_operation('ERROR', f"Error cleaning up {account_name} ({region}): {e}")
+            self.log_operation('ERROR', f"Error cleaning up {account_name} ({region}): {e}", **log_context)
             self.cleanup_results['errors'].append({
                 'account_name': account_name,
                 'region': region,
@@ -653,6 +681,7 @@ class UltraEC2CleanupManager:
             for account_name, account_data in accounts.items():
                 for region in regions:
                     tasks.append((account_name, account_data, region))
+            tasks = self.region_cache.order_tasks(tasks)
             
             self.log_operation('INFO', f"🚀 Starting parallel cleanup across {len(accounts)} accounts and {len(regions)} regions")
             self.log_operation('INFO', f"📋 Total tasks: {len(tasks)} (max workers: {max_workers})")
@@ -663,7 +692,8 @@ class UltraEC2CleanupManager:
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 # Submit all tasks
                 future_to_task = {
-                    executor.submit(self.cleanup_account_region, account_name, account_data, region): (account_name, region)
+                    executor.submit(traced('cleanup_region', self.cleanup_account_region, 'region', account=account_name, region=region),
+                                    account_name, account_data, region): (account_name, region)
                     for account_name, account_data, region in tasks
                 }
                 
@@ -680,6 +710,8 @@ class UltraEC2CleanupManager:
                         self.log_operation('ERROR', f"Task failed for {account_name} ({region}): {e}")
                         failed_tasks += 1
             
+            self.region_cache.save_async()
+            
             self.log_operation('INFO', f"🎯 Parallel cleanup completed:")
             self.log_operation('INFO', f"   ✅ Successful tasks: {successful_tasks}")
             self.log_operation('INFO', f"   ❌ Failed tasks: {failed_tasks}")
@@ -921,6 +953,10 @@ class UltraEC2CleanupManager:
 
 def main():
     """Main function"""
+    # Opt-in via AWS_API_METRICS=1 / AWS_TRACE=1
+    enable_api_metrics('ultra_ec2_cleanup')
+    enable_tracing('ultra_ec2_cleanup')
+    
     try:
         manager = UltraEC2CleanupManager()
         manager.run()